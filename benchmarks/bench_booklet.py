@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""Çok formlu PDF kitapçığının hızı, boyutu ve bellek kullanımı.
+
+Her boyut için sentetik formlar geçici bir veritabanına yazılır ve tek
+kitapçık olarak üretilir; karşılaştırma için aynı formlar ayrı ayrı PDF'e
+(``export_form_to_pdf``) dönüştürülür. Saniyedeki form ve sayfa sayısı,
+toplam çıktı boyutu ve ``tracemalloc`` ile ölçülen tepe bellek raporlanır.
+
+Kitapçığın sayfaları kapanır kapanmaz çıktıya yazıldığından bellekte form
+başına yalnızca nesne tablosu, içindekiler satırı ve ana hat girdisi kalır. Birden fazla
+boyut verildiğinde ardışık ölçümler arasındaki eğimden form başına ek bellek de
+yazdırılır (ilk ölçümdeki yazı tipi yükleme gibi sabit maliyetler eğime girmez).
+
+Kullanım::
+
+    python benchmarks/bench_booklet.py --sizes 400 2000 4000
+"""
+from __future__ import annotations
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Optional, Tuple
+
+from common import seed_forms
+
+from core import form_service, pdf_booklet
+
+
+def _measure(func: Callable[[], Tuple[int, int]]) -> Tuple[float, int, int, int]:
+    tracemalloc.start()
+    started = time.perf_counter()
+    pages, size = func()
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, pages, size, peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[400, 1200])
+    args = parser.parse_args()
+
+    previous: Optional[Tuple[int, int]] = None
+    for size in sorted(args.sizes):
+        with tempfile.TemporaryDirectory() as base_path:
+            seed_forms(base_path, size)
+            entries = pdf_booklet.booklet_entries(base_path=base_path)
+
+            def booklet() -> Tuple[int, int]:
+                with tempfile.TemporaryFile() as handle:
+                    pages = pdf_booklet.write_booklet(entries, handle, base_path=base_path)
+                    return pages, handle.tell()
+
+            def separate() -> Tuple[int, int]:
+                total = 0
+                for entry in entries:
+                    form_data = form_service.load_form_data(entry["form_no"], base_path=base_path)
+                    total += len(form_service.export_form_to_pdf(entry["form_no"], form_data).getvalue())
+                return len(entries), total
+
+            print(f"{size} form")
+            for name, func in (("kitapçık", booklet), ("ayrı PDF", separate)):
+                elapsed, pages, output_size, peak = _measure(func)
+                print(
+                    f"  {name:<9} | {size / elapsed:7.1f} form/sn"
+                    f" | {pages / elapsed:7.1f} sayfa/sn"
+                    f" | çıktı {output_size / 1024:9.1f} KiB"
+                    f" | tepe bellek {peak / 1024 / 1024:6.1f} MiB"
+                )
+                if name != "kitapçık":
+                    continue
+                if previous is not None and size > previous[0]:
+                    per_form = (peak - previous[1]) / (size - previous[0])
+                    print(f"  {'':<9} | form başına {per_form / 1024:6.1f} KiB")
+                previous = (size, peak)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+"""Form dışa aktarım (Excel/PDF) hızının ve bellek kullanımının ölçümü.
+
+Sentetik bir form art arda dışa aktarılır; saniyedeki dışa aktarım sayısı ve
+``tracemalloc`` ile ölçülen dışa aktarım başına en yüksek bellek kullanımı
+raporlanır.
+
+Kullanım::
+
+    python benchmarks/bench_exports.py --count 200
+"""
+from __future__ import annotations
+
+import argparse
+import random
+import time
+import tracemalloc
+from datetime import date
+from typing import Any, Callable, Dict
+
+from common import synthetic_form
+
+from core import form_service
+
+
+def _sample_form() -> Dict[str, Any]:
+    form = synthetic_form(1, rng=random.Random(7), start=date(2024, 1, 1))
+    form["harcama_bildirimleri"] = form_service.normalize_expenses(form["harcama_bildirimleri"])
+    form["yapilan_isler"] = "Arıza tespiti, bakım ve test çalışmaları yapıldı. " * 20
+    return form
+
+
+def measure(name: str, export: Callable[[str, Dict[str, Any]], object], count: int) -> None:
+    form = _sample_form()
+    export("00001", form)  # ısınma: modül içi önbellekler dolsun
+
+    started = time.perf_counter()
+    for _ in range(count):
+        export("00001", form)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    export("00001", form)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"{name:<6} | {count / elapsed:8.1f} dışa aktarım/sn"
+        f" | {elapsed / count * 1000:7.2f} ms"
+        f" | tepe bellek {peak / 1024:8.1f} KiB"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count", type=int, default=200)
+    args = parser.parse_args()
+    measure("excel", form_service.export_form_to_excel, args.count)
+    measure("pdf", form_service.export_form_to_pdf, args.count)
+
+
+if __name__ == "__main__":
+    main()
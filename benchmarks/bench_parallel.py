@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+"""Paralel (aylık dilimli) rapor motorunun çekirdek sayısına göre ölçeklenmesi.
+
+Beş yıllık sentetik veri üzerinde tek geçişli motor ile 1, 2, 4, ... işçili
+paralel motor karşılaştırılır. Her satır medyan süreyi ve tek geçişli motora
+göre hızlanmayı gösterir.
+
+Kullanım::
+
+    python benchmarks/bench_parallel.py --size 100000 --workers 1 2 4 8
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import tempfile
+from typing import Callable, List
+
+from common import seed_forms, timed
+
+from core import form_service, report_parallel
+
+
+def _median(func: Callable[[], object], repeat: int) -> float:
+    durations: List[float] = []
+    for _ in range(repeat):
+        with timed(durations):
+            func()
+    return statistics.median(durations)
+
+
+def main() -> None:
+    cores = os.cpu_count() or 1
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=100_000)
+    parser.add_argument(
+        "--workers",
+        type=int,
+        nargs="+",
+        default=sorted({1, 2, 4, cores}),
+    )
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as base_path:
+        seed_forms(base_path, args.size)
+        start, end = "2020-01-01", "2024-12-31"
+        print(f"{args.size} form, {cores} çekirdek, "
+              f"{len(report_parallel.monthly_shards(start, end, base_path=base_path))} dilim")
+
+        baseline = _median(
+            lambda: form_service._compute_reporting_summary(
+                start, end, base_path=base_path, engine="python"
+            ),
+            args.repeat,
+        )
+        print(f"tek geçiş     | {baseline * 1000:8.1f} ms")
+        for workers in args.workers:
+            elapsed = _median(
+                lambda: report_parallel.compute_reporting_summary(
+                    start, end, base_path=base_path, workers=workers
+                ),
+                args.repeat,
+            )
+            print(
+                f"{workers:>2} işçi       | {elapsed * 1000:8.1f} ms"
+                f" | hızlanma x{baseline / elapsed:.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
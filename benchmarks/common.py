@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""Benchmark betikleri için ortak yardımcılar (sentetik veri üretimi, zamanlama)."""
+from __future__ import annotations
+
+import random
+import sys
+import time
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import db, form_service  # noqa: E402
+
+PEOPLE = [f"Personel {index:03d}" for index in range(1, 121)]
+CITIES = ["İstanbul", "Ankara", "İzmir", "Bursa", "Kocaeli", "Konya", "Adana"]
+
+
+def synthetic_form(index: int, *, rng: random.Random, start: date) -> Dict[str, Any]:
+    day = start + timedelta(days=rng.randrange(0, 5 * 365))
+    duration_days = rng.choice((0, 0, 0, 1, 2))
+    return_day = day + timedelta(days=duration_days)
+    team = rng.sample(PEOPLE, rng.randint(1, 5))
+    city = rng.choice(CITIES)
+    form = {
+        "tarih": day.strftime("%d.%m.%Y"),
+        "dok_no": "F-001",
+        "rev_no": "00 / 06.05.24",
+        "avans": str(rng.randrange(0, 5000, 250)),
+        "taseron": "Yok",
+        "gorev_tanimi": f"Saha bakımı #{index}",
+        "gorev_yeri": city,
+        "gorev_il": city,
+        "gorev_ilce": "Merkez",
+        "gorev_firma": f"Firma {rng.randint(1, 40)}",
+        "gorev_tarih": day.strftime("%d.%m.%Y"),
+        "yola_cikis_tarih": day.strftime("%d.%m.%Y"),
+        "yola_cikis_saat": f"{rng.randint(6, 9):02d}:00",
+        "calisma_baslangic_tarih": day.strftime("%d.%m.%Y"),
+        "calisma_baslangic_saat": f"{rng.randint(9, 11):02d}:30",
+        "calisma_bitis_tarih": return_day.strftime("%d.%m.%Y"),
+        "calisma_bitis_saat": f"{rng.randint(15, 18):02d}:00",
+        "donus_tarih": return_day.strftime("%d.%m.%Y"),
+        "donus_saat": f"{rng.randint(18, 22):02d}:15",
+        "mola_suresi": str(rng.choice((0, 30, 45, 60))),
+        "arac_plaka": "34 ABC 123",
+        "hazirlayan": "Admin",
+        "harcama_bildirimleri": [
+            {
+                "description": f"Harcama {item}",
+                "amount": round(rng.uniform(50, 2500), 2),
+                "category": rng.choice(("Yakıt", "Konaklama", "Yemek")),
+                "attachments": [],
+            }
+            for item in range(rng.randint(0, 4))
+        ],
+    }
+    for position, person in enumerate(team, 1):
+        form[f"personel_{position}"] = person
+    return form
+
+
+def seed_forms(base_path: str, count: int, *, seed: int = 42) -> None:
+    """``count`` adet sentetik formu tek transaction içinde veritabanına yaz."""
+
+    rng = random.Random(seed)
+    start = date(2020, 1, 1)
+    db.reset_schema_flag()
+    with db.get_connection(base_path) as connection:
+        for index in range(1, count + 1):
+            form_no = f"{index:05d}"
+            form_data = synthetic_form(index, rng=rng, start=start)
+            status = form_service.determine_form_status(form_data)
+            payload = form_service._prepare_payload(form_no, form_data, status)
+            columns = ", ".join(payload.keys())
+            placeholders = ", ".join(["?"] * len(payload))
+            connection.execute(
+                f"INSERT INTO forms ({columns}) VALUES ({placeholders})",
+                tuple(payload.values()),
+            )
+            form_service._replace_expenses(
+                connection,
+                form_no,
+                form_service.normalize_expenses(form_data["harcama_bildirimleri"]),
+            )
+            form_service._replace_person_days(connection, form_no)
+        connection.commit()
+
+
+@contextmanager
+def timed(results: List[float]) -> Iterator[None]:
+    started = time.perf_counter()
+    yield
+    results.append(time.perf_counter() - started)
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+"""Bir formun tüm eklerinin tek ZIP olarak akıtılması.
+
+Görev ekleri ``Görev Ekleri/`` klasörüne, harcama fişleri her harcama için ayrı
+bir klasöre (``Harcama 01 - Yakıt/``) yüklendikleri özgün adlarıyla konur.
+Arşiv istek sırasında üretilir: dosyalar ``READ_CHUNK_SIZE`` parçalar halinde
+okunup ZIP akışına yazılır ve her parça hemen istemciye gönderilir. Geçici dosya
+kullanılmaz; bellekte en fazla bir okuma parçası tutulur, indirme ilk dosyanın
+ilk parçasıyla başlar.
+
+Fotoğraf ve PDF gibi zaten sıkıştırılmış dosyalar yeniden sıkıştırılmadan
+(``ZIP_STORED``) eklenir; diğerleri deflate ile sıkıştırılır.
+"""
+from __future__ import annotations
+
+import os
+import re
+import time
+import zipfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
+
+from .bulk_export import ChunkSink
+
+READ_CHUNK_SIZE = 256 * 1024
+TASK_ATTACHMENT_FOLDER = "Görev Ekleri"
+
+_COMPRESSED_EXTENSIONS = frozenset(
+    {
+        ".jpg", ".jpeg", ".png", ".gif", ".webp", ".heic", ".heif",
+        ".pdf", ".zip", ".gz", ".7z", ".rar", ".mp4", ".mov",
+        ".docx", ".xlsx", ".pptx",
+    }
+)
+_UNSAFE_CHARACTERS = re.compile(r'[\x00-\x1f/\\:*?"<>|]+')
+
+
+@dataclass(frozen=True)
+class ArchiveEntry:
+    """Arşive eklenecek dosya: diskteki yol ve arşiv içindeki ad."""
+
+    path: Path
+    name: str
+
+
+def _component(value: Any, fallback: str) -> str:
+    """Arşiv yolunun tek parçası için güvenli ad (ayraç ve ``..`` içermez)."""
+
+    text = _UNSAFE_CHARACTERS.sub("_", str(value or "")).strip(" .")
+    return text[:120] or fallback
+
+
+def _unique(name: str, used: Set[str]) -> str:
+    candidate = name
+    stem, extension = os.path.splitext(name)
+    counter = 2
+    while candidate.lower() in used:
+        candidate = f"{stem} ({counter}){extension}"
+        counter += 1
+    used.add(candidate.lower())
+    return candidate
+
+
+def archive_entries(form_data: Dict[str, Any], upload_dir: Path) -> List[ArchiveEntry]:
+    """Formun ekleri için (dosya yolu, arşiv adı) listesi.
+
+    Yüklenme klasörünün dışına çıkan ya da diskte bulunmayan dosyalar atlanır.
+    Aynı klasörde aynı adla birden çok dosya varsa adlara ``(2)``, ``(3)``
+    eklenir.
+    """
+
+    base_dir = upload_dir.resolve()
+    groups: List[Tuple[str, List[Any]]] = [(TASK_ATTACHMENT_FOLDER, form_data.get("gorev_ekleri") or [])]
+    for index, expense in enumerate(form_data.get("harcama_bildirimleri") or [], 1):
+        if not isinstance(expense, dict):
+            continue
+        label = _component(expense.get("description"), "")
+        folder = f"Harcama {index:02d}" + (f" - {label}" if label else "")
+        groups.append((folder, expense.get("attachments") or []))
+
+    entries: List[ArchiveEntry] = []
+    used: Set[str] = set()
+    for folder, attachments in groups:
+        for attachment in attachments:
+            if not isinstance(attachment, dict) or not attachment.get("filename"):
+                continue
+            try:
+                path = (base_dir / attachment["filename"]).resolve()
+                path.relative_to(base_dir)
+            except (ValueError, RuntimeError):
+                continue
+            if not path.is_file():
+                continue
+            original_name = _component(attachment.get("original_name"), path.name)
+            entries.append(ArchiveEntry(path, _unique(f"{folder}/{original_name}", used)))
+    return entries
+
+
+def _zip_info(entry: ArchiveEntry, stat: os.stat_result) -> zipfile.ZipInfo:
+    info = zipfile.ZipInfo(entry.name, date_time=time.localtime(stat.st_mtime)[:6])
+    if entry.path.suffix.lower() in _COMPRESSED_EXTENSIONS:
+        info.compress_type = zipfile.ZIP_STORED
+    else:
+        info.compress_type = zipfile.ZIP_DEFLATED
+    info.file_size = stat.st_size
+    return info
+
+
+def stream_attachments(
+    entries: Iterable[ArchiveEntry], *, chunk_size: int = READ_CHUNK_SIZE
+) -> Iterator[bytes]:
+    """Ekleri ZIP olarak parça parça üret."""
+
+    sink = ChunkSink()
+    with zipfile.ZipFile(sink, mode="w", allowZip64=True) as archive:
+        for entry in entries:
+            try:
+                stat = entry.path.stat()
+                handle = entry.path.open("rb")
+            except OSError:
+                # İstek sırasında silinen dosya arşivi bozmaz; yalnızca atlanır.
+                continue
+            with handle:
+                info = _zip_info(entry, stat)
+                with archive.open(info, mode="w") as target:
+                    while True:
+                        chunk = handle.read(chunk_size)
+                        if not chunk:
+                            break
+                        target.write(chunk)
+                        data = sink.drain()
+                        if data:
+                            yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
+
+
+def archive_filename(form_no: str) -> str:
+    return f"gorev_formu_{form_no}_ekler.zip"
+
+
+__all__ = [
+    "ArchiveEntry",
+    "READ_CHUNK_SIZE",
+    "archive_entries",
+    "archive_filename",
+    "stream_attachments",
+]
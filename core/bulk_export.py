@@ -0,0 +1,181 @@
+# -*- coding: utf-8 -*-
+"""Birden çok formun tek ZIP arşivinde toplu dışa aktarımı.
+
+``iter_archive`` formları süreç havuzunda XLSX/PDF olarak üretir ve her dosya
+hazır olduğu anda ZIP akışına ekler. Arşiv bellekte biriktirilmez; yalnızca o
+an yazılan girdi tampondadır. İş kaydı, ilerleme ve eşzamanlılık sınırı
+``export_jobs`` kuyruğundadır.
+"""
+from __future__ import annotations
+
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Callable, Iterator, List, Optional, Sequence, Set, Tuple
+
+from .export_cache import get_export
+from .form_service import load_form_data, search_forms
+from .pdf_layout import register_fonts
+
+BULK_EXPORT_FORMATS: Tuple[str, ...] = ("xlsx", "pdf")
+MAX_FORMS_PER_EXPORT = 2000
+PROGRESS_INTERVAL_SECONDS = 0.5
+
+
+class BulkExportError(Exception):
+    """Toplu dışa aktarım hatası."""
+
+
+def max_workers() -> int:
+    """Bir toplu iş için kullanılacak işçi süreç sayısı; 1 süreç havuzunu kapatır."""
+
+    raw = os.environ.get("BULK_EXPORT_WORKERS", "")
+    try:
+        return max(1, int(raw))
+    except (TypeError, ValueError):
+        return min(4, os.cpu_count() or 1)
+
+
+def normalize_formats(formats: Sequence[str]) -> List[str]:
+    selected = [item for item in BULK_EXPORT_FORMATS if item in {value.strip().lower() for value in formats}]
+    if not selected:
+        raise BulkExportError("En az bir dosya biçimi seçilmelidir.")
+    return selected
+
+
+def matching_form_nos(
+    *,
+    person: str = "",
+    location: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> List[str]:
+    """Arama filtrelerine uyan form numaraları; boş ya da çok büyük sonuçta ``BulkExportError``."""
+
+    form_nos = [
+        item["form_no"]
+        for item in search_forms(
+            person=person,
+            location=location,
+            start_date=start_date,
+            end_date=end_date,
+            base_path=base_path,
+        )
+    ]
+    if not form_nos:
+        raise BulkExportError("Kriterlere uygun form bulunamadı.")
+    if len(form_nos) > MAX_FORMS_PER_EXPORT:
+        raise BulkExportError(
+            f"Tek seferde en fazla {MAX_FORMS_PER_EXPORT} form dışa aktarılabilir; filtreleri daraltın."
+        )
+    return form_nos
+
+
+def render_form_files(
+    form_no: str, formats: Sequence[str], base_path: str
+) -> List[Tuple[str, bytes]]:
+    """Formu seçilen biçimlerde üret ya da dışa aktarım önbelleğinden al (işçi süreçte çalışır)."""
+
+    form_data = load_form_data(form_no, base_path=base_path)
+    files: List[Tuple[str, bytes]] = []
+    for file_format in formats:
+        export = get_export(form_no, form_data, file_format, base_path=base_path)
+        files.append((export.filename, export.data))
+    return files
+
+
+class ChunkSink:
+    """``zipfile`` için yazılabilir, konumlanamayan (non-seekable) akış.
+
+    Yazılan baytlar ``drain`` ile alınana kadar tutulur; ``zipfile`` bu
+    durumda girdileri veri tanımlayıcısıyla (data descriptor) yazar.
+    """
+
+    def __init__(self) -> None:
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def _rendered_files(
+    form_nos: Sequence[str], formats: Sequence[str], base_path: str
+) -> Iterator[List[Tuple[str, bytes]]]:
+    """Formları tamamlanma sırasıyla üret; havuzda en fazla ``2 × işçi`` iş bekler."""
+
+    workers = min(max_workers(), len(form_nos))
+    if workers <= 1:
+        for form_no in form_nos:
+            yield render_form_files(form_no, formats, base_path)
+        return
+
+    pending: Set[Future] = set()
+    remaining = iter(form_nos)
+    with ProcessPoolExecutor(max_workers=workers, initializer=register_fonts) as executor:
+        try:
+            for form_no in remaining:
+                pending.add(executor.submit(render_form_files, form_no, formats, base_path))
+                if len(pending) >= workers * 2:
+                    break
+            while pending:
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    yield future.result()
+                    next_form = next(remaining, None)
+                    if next_form is not None:
+                        pending.add(executor.submit(render_form_files, next_form, formats, base_path))
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def iter_archive(
+    form_nos: Sequence[str],
+    formats: Sequence[str],
+    base_path: str,
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[bytes]:
+    """Formların ZIP arşivini parça parça üret.
+
+    ``on_progress`` en fazla ``PROGRESS_INTERVAL_SECONDS`` aralıkla o ana
+    kadar arşive eklenen dosya sayısıyla çağrılır.
+    """
+
+    sink = ChunkSink()
+    done = 0
+    last_progress = time.monotonic()
+    with zipfile.ZipFile(sink, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for files in _rendered_files(form_nos, formats, base_path):
+            for name, data in files:
+                archive.writestr(name, data)
+                done += 1
+            yield sink.drain()
+            if on_progress is not None and time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                on_progress(done)
+                last_progress = time.monotonic()
+    yield sink.drain()
+    if on_progress is not None:
+        on_progress(done)
+
+
+__all__ = [
+    "BULK_EXPORT_FORMATS",
+    "BulkExportError",
+    "ChunkSink",
+    "iter_archive",
+    "matching_form_nos",
+    "max_workers",
+    "normalize_formats",
+    "render_form_files",
+]
@@ -0,0 +1,264 @@
+# -*- coding: utf-8 -*-
+"""Formlar ve görev talepleri için makine tarafından okunabilir veri akışı.
+
+Portal ve BI betikleri kayıtları NDJSON (satır başına bir JSON nesnesi) ya da
+CSV olarak çeker. Kayıtlar ``updated_at, id`` sırasıyla sunucu tarafı imleçten
+parça parça okunur ve parça parça yazılır; bellekte tam sonuç oluşmaz, böylece
+tüm geçmişin tek istekte çekilmesi de mümkündür.
+
+Artımlı çekim için ``updated_since`` verilir: bu andan itibaren (dahil)
+değişen kayıtlar döner. İstemci son gördüğü ``updated_at`` değerini bir
+sonraki çekimde kullanabilir; aynı saniyedeki kayıtlar tekrar gelebileceğinden
+kayıtlar ``form_no``/``id`` ile tekilleştirilmelidir.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import json
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from . import reporting
+from .db import get_connection
+from .form_service import PERSONEL_FIELDS, report_where, row_hours, to_iso_date
+
+FEED_FORMATS: Tuple[str, ...] = ("ndjson", "csv")
+FEED_MIMETYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+FETCH_BATCH_SIZE = 1000
+STREAM_RECORDS_PER_CHUNK = 500
+
+
+class FeedError(Exception):
+    """Geçersiz veri akışı isteği."""
+
+
+_FORM_COLUMNS: Tuple[str, ...] = (
+    "form_no",
+    "tarih",
+    "tarih_iso",
+    "dok_no",
+    "rev_no",
+    "avans",
+    "taseron",
+    "gorev_tanimi",
+    "gorev_yeri",
+    "gorev_il",
+    "gorev_ilce",
+    "gorev_firma",
+    "gorev_tarih",
+    "gorev_tarih_iso",
+    "yapilan_isler",
+    "yola_cikis_tarih",
+    "yola_cikis_tarih_iso",
+    "yola_cikis_saat",
+    "donus_tarih",
+    "donus_tarih_iso",
+    "donus_saat",
+    "calisma_baslangic_tarih",
+    "calisma_baslangic_tarih_iso",
+    "calisma_baslangic_saat",
+    "calisma_bitis_tarih",
+    "calisma_bitis_tarih_iso",
+    "calisma_bitis_saat",
+    "mola_suresi",
+    "arac_plaka",
+    "hazirlayan",
+    "durum",
+) + PERSONEL_FIELDS + (
+    "assigned_to_user_id",
+    "assigned_by_user_id",
+    "assigned_at",
+    "created_at",
+    "updated_at",
+)
+
+_TASK_REQUEST_COLUMNS: Tuple[str, ...] = (
+    "id",
+    "customer_name",
+    "customer_phone",
+    "customer_email",
+    "customer_address",
+    "request_description",
+    "requirements",
+    "urgency",
+    "requested_by_user_id",
+    "status",
+    "notes",
+    "assigned_to_user_id",
+    "converted_form_no",
+    "created_at",
+    "updated_at",
+    "converted_at",
+)
+
+
+def _value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S")
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+def _form_record(row) -> Dict[str, Any]:
+    record = {column: _value(row[column]) for column in _FORM_COLUMNS}
+    record["travel_hours"], record["work_hours"] = row_hours(row)
+    record["expense_count"] = int(row["expense_count"] or 0)
+    return record
+
+
+def _task_request_record(row) -> Dict[str, Any]:
+    return {column: _value(row[column]) for column in _TASK_REQUEST_COLUMNS}
+
+
+def _task_request_where(start_iso: Optional[str], end_iso: Optional[str]) -> Tuple[str, List[Any]]:
+    filters: List[str] = []
+    params: List[Any] = []
+    if start_iso:
+        filters.append("created_at >= ?")
+        params.append(start_iso)
+    if end_iso:
+        filters.append("created_at < ?")
+        params.append((date.fromisoformat(end_iso) + timedelta(days=1)).isoformat())
+    return (" WHERE " + " AND ".join(filters)) if filters else "", params
+
+
+@dataclass(frozen=True)
+class _Feed:
+    table: str
+    select: str
+    fields: Tuple[str, ...]
+    where: Callable[[Optional[str], Optional[str]], Tuple[str, List[Any]]]
+    record: Callable[[Any], Dict[str, Any]]
+
+
+FEEDS: Dict[str, _Feed] = {
+    "forms": _Feed(
+        table="forms",
+        select=", ".join(_FORM_COLUMNS) + f", {reporting.EXPENSE_COUNT_EXPR} AS expense_count",
+        fields=_FORM_COLUMNS + ("travel_hours", "work_hours", "expense_count"),
+        where=report_where,
+        record=_form_record,
+    ),
+    "task_requests": _Feed(
+        table="task_requests",
+        select=", ".join(_TASK_REQUEST_COLUMNS),
+        fields=_TASK_REQUEST_COLUMNS,
+        where=_task_request_where,
+        record=_task_request_record,
+    ),
+}
+
+
+def parse_updated_since(value: str) -> Optional[str]:
+    """ISO 8601 tarih/zamanı veritabanındaki UTC ``YYYY-MM-DD HH:MM:SS`` biçimine çevir."""
+
+    value = (value or "").strip()
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace(" ", "T"))
+    except ValueError as exc:
+        raise FeedError("updated_since ISO 8601 biçiminde olmalıdır (ör. 2024-01-31T08:00:00Z).") from exc
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def iter_records(
+    feed_name: str,
+    *,
+    updated_since: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> Iterator[Dict[str, Any]]:
+    """Filtrelere uyan kayıtları ``updated_at`` sırasıyla tek tek üret."""
+
+    feed = FEEDS[feed_name]
+    since = parse_updated_since(updated_since)
+    where_clause, params = feed.where(to_iso_date(start_date), to_iso_date(end_date))
+    if since:
+        where_clause += (" AND " if where_clause else " WHERE ") + "updated_at >= ?"
+        params.append(since)
+    order_key = "form_no" if feed.table == "forms" else "id"
+    query = (
+        f"SELECT {feed.select} FROM {feed.table}{where_clause}"
+        f" ORDER BY updated_at, {order_key}"
+    )
+    with get_connection(base_path) as connection:
+        for row in connection.iter_rows(query, tuple(params), batch_size=FETCH_BATCH_SIZE):
+            yield feed.record(row)
+
+
+def _ndjson_chunks(records: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+    lines: List[str] = []
+    for record in records:
+        lines.append(json.dumps(record, ensure_ascii=False, default=str))
+        if len(lines) >= STREAM_RECORDS_PER_CHUNK:
+            yield ("\n".join(lines) + "\n").encode("utf-8")
+            lines.clear()
+    if lines:
+        yield ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _csv_chunks(records: Iterator[Dict[str, Any]], fields: Tuple[str, ...]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields)
+    writer.writeheader()
+    for index, record in enumerate(records, 1):
+        writer.writerow(record)
+        if index % STREAM_RECORDS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def stream_feed(
+    feed_name: str,
+    file_format: str = "ndjson",
+    *,
+    updated_since: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> Iterator[bytes]:
+    """Veri akışını ``ndjson`` ya da ``csv`` parçaları olarak döndür.
+
+    Parametreler bu çağrı sırasında doğrulanır ve hatalı istekte
+    ``FeedError`` yükseltilir; veritabanı yanıt akıtılırken okunur.
+    """
+
+    if feed_name not in FEEDS:
+        raise FeedError("Bilinmeyen veri akışı.")
+    if file_format not in FEED_FORMATS:
+        raise FeedError("Geçersiz biçim; ndjson ya da csv seçin.")
+    parse_updated_since(updated_since)
+    for label, value in (("start_date", start_date), ("end_date", end_date)):
+        if (value or "").strip() and to_iso_date(value) is None:
+            raise FeedError(f"{label} geçerli bir tarih olmalıdır.")
+
+    records = iter_records(
+        feed_name,
+        updated_since=updated_since,
+        start_date=start_date,
+        end_date=end_date,
+        base_path=base_path,
+    )
+    if file_format == "csv":
+        return _csv_chunks(records, FEEDS[feed_name].fields)
+    return _ndjson_chunks(records)
+
+
+__all__ = [
+    "FEED_FORMATS",
+    "FEED_MIMETYPES",
+    "FEEDS",
+    "FeedError",
+    "iter_records",
+    "parse_updated_since",
+    "stream_feed",
+]
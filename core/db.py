@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import os
 import sqlite3
-from typing import Any, Optional, Sequence, Union
+import uuid
+from typing import Any, Iterator, Optional, Sequence, Union
 
 # ---------------------------------------------------------------------------
 # Configuration
@@ -77,6 +78,47 @@ class Connection:
             cur = self._conn.execute(query, params)
             return cur.lastrowid
 
+    def executemany(self, query: str, seq_of_params: Sequence[Sequence[Any]]) -> None:
+        """Execute *query* once per parameter tuple (batched on PostgreSQL)."""
+        if not seq_of_params:
+            return
+        if self._postgres:
+            cur = self._conn.cursor()
+            psycopg2.extras.execute_batch(cur, _convert_placeholders(query), seq_of_params)
+        else:
+            self._conn.executemany(query, seq_of_params)
+
+    def iter_rows(
+        self,
+        query: str,
+        params: Union[tuple, Sequence] = (),
+        *,
+        batch_size: int = 500,
+    ) -> Iterator[Any]:
+        """Yield result rows in batches without materializing the whole result.
+
+        PostgreSQL uses a named (server-side) cursor so rows are pulled from
+        the server ``batch_size`` at a time; SQLite steps its cursor lazily.
+        """
+        if self._postgres:
+            query = _convert_placeholders(query)
+            cur = self._conn.cursor(
+                name=f"stream_{uuid.uuid4().hex}",
+                cursor_factory=psycopg2.extras.RealDictCursor,
+            )
+            cur.itersize = batch_size
+        else:
+            cur = self._conn.cursor()
+        try:
+            cur.execute(query, (params or None) if self._postgres else params)
+            while True:
+                rows = cur.fetchmany(batch_size)
+                if not rows:
+                    break
+                yield from rows
+        finally:
+            cur.close()
+
     # -- transaction helpers -----------------------------------------------
 
     def commit(self) -> None:
@@ -137,11 +179,112 @@ def reset_schema_flag() -> None:
 # Schema
 # ---------------------------------------------------------------------------
 
+# Arbitrary application-wide key for pg_advisory_xact_lock.
+_MIGRATION_LOCK_ID = 7_301_934
+
+
 def _ensure_schema(conn: Connection) -> None:
     if _USE_POSTGRES:
         _ensure_schema_postgres(conn)
+        # Workers starting together run the data migrations one at a time;
+        # the lock is released when the schema transaction commits.
+        conn.execute("SELECT pg_advisory_xact_lock(?)", (_MIGRATION_LOCK_ID,))
     else:
         _ensure_schema_sqlite(conn)
+    _migrate_legacy_expenses(conn)
+    _backfill_person_days(conn)
+
+
+def _migration_done(conn: Connection, name: str) -> bool:
+    return conn.execute("SELECT 1 FROM schema_migrations WHERE name = ?", (name,)).fetchone() is not None
+
+
+def _record_migration(conn: Connection, name: str) -> None:
+    conn.execute(
+        "INSERT INTO schema_migrations (name, applied_at) VALUES (?, CURRENT_TIMESTAMP) "
+        "ON CONFLICT (name) DO NOTHING",
+        (name,),
+    )
+
+
+LEGACY_EXPENSES_MIGRATION = "legacy_expenses_to_tables"
+PERSON_DAYS_BACKFILL = "person_days_backfill"
+
+
+def _migrate_legacy_expenses(conn: Connection) -> None:
+    """Move expenses stored as JSON in ``forms.harcama_bildirimleri`` into
+    ``form_expenses`` / ``expense_attachments``.
+
+    Entries go through the same normalization as a form save, so amounts are
+    parsed with ``parse_amount``. Each form's migrated rows are checked against
+    its JSON (row count and amount total); a mismatch raises and the schema
+    transaction is not committed. The JSON column is left untouched so the
+    result can be verified before it is dropped; the migration is recorded in
+    ``schema_migrations`` and runs only once. Cached reports are invalidated by
+    bumping ``data_version``.
+    """
+    if _migration_done(conn, LEGACY_EXPENSES_MIGRATION):
+        return
+
+    # Imported here because both modules import this module.
+    from .form_service import normalize_expenses
+    from .report_cache import bump_data_version
+
+    rows = conn.execute(
+        "SELECT id, harcama_bildirimleri FROM forms "
+        "WHERE harcama_bildirimleri IS NOT NULL AND harcama_bildirimleri <> ''"
+    ).fetchall()
+    for row in rows:
+        expenses = normalize_expenses(row["harcama_bildirimleri"])
+        conn.execute("DELETE FROM form_expenses WHERE form_id = ?", (row["id"],))
+        for position, expense in enumerate(expenses):
+            expense_id = conn.execute_returning_id(
+                "INSERT INTO form_expenses (form_id, position, description, amount, currency, category) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    row["id"],
+                    position,
+                    expense["description"],
+                    expense["amount"],
+                    expense["currency"],
+                    expense["category"] or None,
+                ),
+            )
+            conn.executemany(
+                "INSERT INTO expense_attachments (expense_id, position, filename, original_name) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (expense_id, index, attachment["filename"], attachment["original_name"])
+                    for index, attachment in enumerate(expense["attachments"])
+                ],
+            )
+        stored = conn.execute(
+            "SELECT COUNT(*) AS count, SUM(amount) AS total FROM form_expenses WHERE form_id = ?",
+            (row["id"],),
+        ).fetchone()
+        expected_total = sum(item["amount"] for item in expenses if item["amount"] is not None)
+        if int(stored["count"]) != len(expenses) or abs(float(stored["total"] or 0) - expected_total) > 0.005:
+            raise RuntimeError(f"Legacy expense migration mismatch for form id {row['id']}")
+    if rows:
+        bump_data_version(conn)
+    _record_migration(conn, LEGACY_EXPENSES_MIGRATION)
+
+
+def _backfill_person_days(conn: Connection) -> None:
+    """Index forms saved before ``person_days`` existed, once per database.
+
+    Form saves keep the index current afterwards. A database that already has
+    index rows is only marked as done.
+    """
+    if _migration_done(conn, PERSON_DAYS_BACKFILL):
+        return
+
+    # Imported here because form_service imports this module.
+    from .form_service import write_person_days
+
+    if conn.execute("SELECT 1 FROM person_days LIMIT 1").fetchone() is None:
+        write_person_days(conn)
+    _record_migration(conn, PERSON_DAYS_BACKFILL)
 
 
 def _ensure_schema_sqlite(conn: Connection) -> None:
@@ -257,10 +400,188 @@ def _ensure_schema_sqlite(conn: Connection) -> None:
         """
     )
 
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute("INSERT OR IGNORE INTO data_version (id, version) VALUES (1, 0)")
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TEXT NOT NULL
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS report_cache (
+            cache_key TEXT PRIMARY KEY,
+            data_version INTEGER NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            last_accessed REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_report_cache_accessed ON report_cache(last_accessed)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            name TEXT PRIMARY KEY,
+            hits INTEGER NOT NULL DEFAULT 0,
+            misses INTEGER NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS report_jobs (
+            job_id TEXT PRIMARY KEY,
+            start_date TEXT,
+            end_date TEXT,
+            data_version INTEGER NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            created_at REAL NOT NULL,
+            started_at REAL,
+            finished_at REAL
+        )
+        """
+    )
+
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS export_jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL,
+            requested_by INTEGER,
+            total INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            filename TEXT,
+            mimetype TEXT,
+            artifact_path TEXT,
+            size_bytes BIGINT,
+            created_at REAL NOT NULL,
+            available_at REAL NOT NULL,
+            started_at REAL,
+            heartbeat_at REAL,
+            finished_at REAL,
+            expires_at REAL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_export_jobs_status ON export_jobs(status, available_at)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS web_sessions (
+            session_id TEXT PRIMARY KEY,
+            payload BLOB NOT NULL,
+            created_at REAL NOT NULL,
+            updated_at REAL NOT NULL,
+            expires_at REAL NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_web_sessions_expires_at ON web_sessions(expires_at)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS form_drafts (
+            user_id INTEGER NOT NULL,
+            form_no TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            form_updated_at TEXT,
+            updated_at REAL NOT NULL,
+            PRIMARY KEY (user_id, form_no)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_form_drafts_updated_at ON form_drafts(updated_at)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS form_expenses (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            form_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            description TEXT,
+            amount REAL,
+            currency TEXT NOT NULL DEFAULT 'TRY',
+            category TEXT,
+            FOREIGN KEY(form_id) REFERENCES forms(id) ON DELETE CASCADE,
+            UNIQUE(form_id, position)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expense_attachments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            expense_id INTEGER NOT NULL,
+            position INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            original_name TEXT,
+            FOREIGN KEY(expense_id) REFERENCES form_expenses(id) ON DELETE CASCADE
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expense_attachments_expense "
+        "ON expense_attachments(expense_id)"
+    )
+
+    # Person x date index for utilization reports: the primary key makes a
+    # single person's range a single index scan.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS person_days (
+            person TEXT NOT NULL,
+            work_date TEXT NOT NULL,
+            form_id INTEGER NOT NULL,
+            travel_hours REAL NOT NULL DEFAULT 0,
+            work_hours REAL NOT NULL DEFAULT 0,
+            break_hours REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (person, work_date, form_id),
+            FOREIGN KEY(form_id) REFERENCES forms(id) ON DELETE CASCADE
+        ) WITHOUT ROWID
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_person_days_date ON person_days(work_date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_person_days_form ON person_days(form_id)"
+    )
+
     # -- Lightweight SQLite migrations for older databases ---
     # ALL column additions MUST run BEFORE index creation
     _sqlite_add_column_if_missing(conn, "users", "portal_user_id", "INTEGER")
     _sqlite_add_column_if_missing(conn, "task_requests", "converted_at", "TEXT")
+    _sqlite_add_column_if_missing(conn, "form_drafts", "form_updated_at", "TEXT")
     for col, defn in (
         ("yapilan_isler", "TEXT"),
         ("gorev_ekleri", "TEXT"),
@@ -281,6 +602,16 @@ def _ensure_schema_sqlite(conn: Connection) -> None:
     conn.execute(
         "CREATE INDEX IF NOT EXISTS idx_forms_assigned_to ON forms(assigned_to_user_id)"
     )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_forms_report_date "
+        "ON forms (COALESCE(yola_cikis_tarih_iso, gorev_tarih_iso))"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_forms_updated_at ON forms(updated_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_task_requests_updated_at ON task_requests(updated_at)"
+    )
     conn.execute(
         "CREATE UNIQUE INDEX IF NOT EXISTS idx_users_portal_id "
         "ON users(portal_user_id) WHERE portal_user_id IS NOT NULL"
@@ -418,6 +749,191 @@ def _ensure_schema_postgres(conn: Connection) -> None:
         """
     )
 
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_version (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            version BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+    conn.execute(
+        "INSERT INTO data_version (id, version) VALUES (1, 0) ON CONFLICT DO NOTHING"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            name TEXT PRIMARY KEY,
+            applied_at TIMESTAMP NOT NULL
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS report_cache (
+            cache_key TEXT PRIMARY KEY,
+            data_version BIGINT NOT NULL,
+            payload TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_accessed DOUBLE PRECISION NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_report_cache_accessed ON report_cache(last_accessed)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS cache_stats (
+            name TEXT PRIMARY KEY,
+            hits BIGINT NOT NULL DEFAULT 0,
+            misses BIGINT NOT NULL DEFAULT 0
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS report_jobs (
+            job_id TEXT PRIMARY KEY,
+            start_date TEXT,
+            end_date TEXT,
+            data_version BIGINT NOT NULL,
+            status TEXT NOT NULL,
+            result TEXT,
+            error TEXT,
+            created_at DOUBLE PRECISION NOT NULL,
+            started_at DOUBLE PRECISION,
+            finished_at DOUBLE PRECISION
+        )
+        """
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS export_jobs (
+            job_id TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            params TEXT NOT NULL,
+            status TEXT NOT NULL,
+            requested_by INTEGER,
+            total INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            error TEXT,
+            filename TEXT,
+            mimetype TEXT,
+            artifact_path TEXT,
+            size_bytes BIGINT,
+            created_at DOUBLE PRECISION NOT NULL,
+            available_at DOUBLE PRECISION NOT NULL,
+            started_at DOUBLE PRECISION,
+            heartbeat_at DOUBLE PRECISION,
+            finished_at DOUBLE PRECISION,
+            expires_at DOUBLE PRECISION
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_export_jobs_status ON export_jobs(status, available_at)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS web_sessions (
+            session_id TEXT PRIMARY KEY,
+            payload BYTEA NOT NULL,
+            created_at DOUBLE PRECISION NOT NULL,
+            updated_at DOUBLE PRECISION NOT NULL,
+            expires_at DOUBLE PRECISION NOT NULL
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_web_sessions_expires_at ON web_sessions(expires_at)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS form_drafts (
+            user_id INTEGER NOT NULL,
+            form_no TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            form_updated_at TEXT,
+            updated_at DOUBLE PRECISION NOT NULL,
+            PRIMARY KEY (user_id, form_no)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_form_drafts_updated_at ON form_drafts(updated_at)"
+    )
+    conn.execute("ALTER TABLE form_drafts ADD COLUMN IF NOT EXISTS form_updated_at TEXT")
+
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS form_expenses (
+            id SERIAL PRIMARY KEY,
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            description TEXT,
+            amount NUMERIC(14, 2),
+            currency TEXT NOT NULL DEFAULT 'TRY',
+            category TEXT,
+            UNIQUE(form_id, position)
+        )
+        """
+    )
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS expense_attachments (
+            id SERIAL PRIMARY KEY,
+            expense_id INTEGER NOT NULL REFERENCES form_expenses(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            original_name TEXT
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_expense_attachments_expense "
+        "ON expense_attachments(expense_id)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_forms_report_date "
+        "ON forms ((COALESCE(yola_cikis_tarih_iso, gorev_tarih_iso)))"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_forms_updated_at ON forms(updated_at)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_task_requests_updated_at ON task_requests(updated_at)"
+    )
+
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS person_days (
+            person TEXT NOT NULL,
+            work_date DATE NOT NULL,
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            travel_hours DOUBLE PRECISION NOT NULL DEFAULT 0,
+            work_hours DOUBLE PRECISION NOT NULL DEFAULT 0,
+            break_hours DOUBLE PRECISION NOT NULL DEFAULT 0,
+            PRIMARY KEY (person, work_date, form_id)
+        )
+        """
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_person_days_date ON person_days(work_date)"
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_person_days_form ON person_days(form_id)"
+    )
+
 
 # ---------------------------------------------------------------------------
 # Internal helpers
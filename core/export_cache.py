@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+"""Form dışa aktarımları (XLSX/PDF) için içerik adresli disk önbelleği.
+
+Anahtar; form numarası, dosya biçimi, o biçimin renderer sürümü ve
+normalleştirilmiş form verisinin SHA-256 özetidir. Formda yapılan her
+değişiklik farklı bir anahtar ürettiğinden geçersiz kılma gerekmez; eski
+dosyalar erişilmedikçe LRU sırasıyla silinir. Dosyalar paylaşılan bir dizinde
+tutulduğundan tüm işçi süreçleri aynı önbelleği kullanır; son erişim zamanı
+dosyanın ``mtime`` değerinde saklanır.
+
+Her süreç önbelleğin toplam boyutunu bellekte tahmin eder: dizin ilk yazmada
+bir kez taranır, sonraki yazmalar tahmine eklenir. Tahmin sınırı aştığında
+dizin yeniden taranır ve en eski dosyalar toplam ``EVICT_LOW_WATER`` oranına
+inene kadar silinir; böylece tam tarama her ıskalamada değil, sınırın bu
+oran kadarlık yeni yazmadan sonra bir kez yapılır.
+
+TAMAMLANDI durumuna geçen formun çıktıları artık değişmeyeceğinden
+``schedule_prerender`` ile kayıt anında arka planda üretilip önbelleğe yazılır;
+böylece tamamlanmış formların ilk indirmesi de beklemeden sunulur.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import report_cache
+from .form_service import (
+    EXCEL_RENDERER_VERSION,
+    PDF_RENDERER_VERSION,
+    export_form_to_excel,
+    export_form_to_pdf,
+    load_form_data,
+    normalize_expenses,
+)
+
+EXPORT_CACHE_NAME = "export"
+EXPORT_CACHE_DIRNAME = "export_cache"
+EVICT_LOW_WATER = 0.9
+
+logger = logging.getLogger(__name__)
+
+# Oturuma özgü, çıktıyı etkilemeyen alanlar anahtara katılmaz.
+_VOLATILE_FIELDS = ("last_step",)
+
+_prerender_executor: Optional[ThreadPoolExecutor] = None
+_prerender_lock = threading.Lock()
+
+# Dizin → bu sürecin bildiği toplam boyut tahmini.
+_size_estimates: Dict[str, int] = {}
+_size_lock = threading.Lock()
+
+_RENDERERS: Dict[str, Tuple[int, str, Callable[[str, Dict[str, Any]], Any]]] = {
+    "xlsx": (
+        EXCEL_RENDERER_VERSION,
+        "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        export_form_to_excel,
+    ),
+    "pdf": (PDF_RENDERER_VERSION, "application/pdf", export_form_to_pdf),
+}
+
+
+@dataclass
+class ExportFile:
+    """Üretilmiş ya da önbellekten okunmuş dışa aktarım dosyası."""
+
+    data: bytes
+    filename: str
+    mimetype: str
+    etag: str
+    cached: bool
+
+
+def max_bytes() -> int:
+    """Önbelleğin disk üst sınırı; ``EXPORT_CACHE_MAX_MB=0`` önbelleği kapatır."""
+
+    raw = os.environ.get("EXPORT_CACHE_MAX_MB", "256")
+    try:
+        return max(0, int(float(raw) * 1024 * 1024))
+    except (TypeError, ValueError):
+        return 256 * 1024 * 1024
+
+
+def cache_dir(base_path: str = ".") -> str:
+    configured = os.environ.get("EXPORT_CACHE_DIR", "").strip()
+    if configured:
+        return configured
+    data_folder = os.environ.get("DATA_FOLDER", "").strip()
+    return os.path.join(data_folder or base_path, EXPORT_CACHE_DIRNAME)
+
+
+def cache_key(form_no: str, form_data: Dict[str, Any], file_format: str) -> str:
+    """Form içeriğinin ve renderer sürümünün SHA-256 özeti."""
+
+    version = _RENDERERS[file_format][0]
+    normalized = {key: value for key, value in form_data.items() if key not in _VOLATILE_FIELDS}
+    payload = json.dumps(
+        [form_no, file_format, version, normalized],
+        sort_keys=True,
+        ensure_ascii=False,
+        separators=(",", ":"),
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(directory: str, key: str, file_format: str) -> str:
+    return os.path.join(directory, key[:2], f"{key}.{file_format}")
+
+
+def _entries(directory: str) -> List[Tuple[float, int, str]]:
+    """Önbellekteki dosyaları (son erişim, boyut, yol) olarak listele."""
+
+    entries: List[Tuple[float, int, str]] = []
+    try:
+        shards = list(os.scandir(directory))
+    except FileNotFoundError:
+        return entries
+    for shard in shards:
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.name.startswith(".tmp_"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+    return entries
+
+
+def _evict(directory: str, target: int) -> int:
+    """En uzun süredir erişilmeyen dosyaları toplam boyut ``target`` altına inene kadar sil.
+
+    Kalan toplam boyutu döndürür.
+    """
+
+    entries = _entries(directory)
+    total = sum(size for _, size, _ in entries)
+    if total <= target:
+        return total
+    for _, size, path in sorted(entries):
+        try:
+            os.unlink(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+        if total <= target:
+            break
+    return total
+
+
+def _note_stored(directory: str, size: int, limit: int) -> None:
+    """Yeni dosyayı boyut tahminine ekle; tahmin sınırı aştıysa toplu silme yap."""
+
+    with _size_lock:
+        total = _size_estimates.get(directory)
+        if total is None:
+            # İlk yazmada dizin bir kez taranır; tarama yeni dosyayı da içerir.
+            total = sum(item_size for _, item_size, _ in _entries(directory))
+        else:
+            total += size
+        if total > limit:
+            total = _evict(directory, int(limit * EVICT_LOW_WATER))
+        _size_estimates[directory] = total
+
+
+def _store(path: str, data: bytes) -> None:
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            stream.write(data)
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.unlink(temp_path)
+        raise
+
+
+def get_export(
+    form_no: str,
+    form_data: Dict[str, Any],
+    file_format: str,
+    *,
+    base_path: str = ".",
+) -> ExportFile:
+    """Formun ``file_format`` (``xlsx``/``pdf``) çıktısını önbellekten ya da üreterek döndür."""
+
+    if file_format not in _RENDERERS:
+        raise ValueError(f"Desteklenmeyen dışa aktarım biçimi: {file_format}")
+    _, mimetype, render = _RENDERERS[file_format]
+    key = cache_key(form_no, form_data, file_format)
+    filename = f"gorev_formu_{form_no}.{file_format}"
+    limit = max_bytes()
+    if limit == 0:
+        return ExportFile(render(form_no, form_data).getvalue(), filename, mimetype, key, False)
+
+    directory = cache_dir(base_path)
+    path = _entry_path(directory, key, file_format)
+    try:
+        with open(path, "rb") as stream:
+            data = stream.read()
+        os.utime(path)
+    except FileNotFoundError:
+        pass
+    else:
+        report_cache.record_cache_event(EXPORT_CACHE_NAME, hit=True, base_path=base_path)
+        return ExportFile(data, filename, mimetype, key, True)
+
+    data = render(form_no, form_data).getvalue()
+    _store(path, data)
+    _note_stored(directory, len(data), limit)
+    report_cache.record_cache_event(EXPORT_CACHE_NAME, hit=False, base_path=base_path)
+    return ExportFile(data, filename, mimetype, key, False)
+
+
+def load_export_data(form_no: str, *, base_path: str = ".") -> Dict[str, Any]:
+    """Formun kayıtlı halini indirme rotalarının kullandığı biçimde döndür.
+
+    Kayıttan sonra oturumdaki kopya da bu veriyle değiştirilir; böylece
+    önceden üretilen dosyalar indirme sırasında aynı anahtarla bulunur.
+    """
+
+    form_data = load_form_data(form_no, base_path=base_path)
+    form_data["harcama_bildirimleri"] = normalize_expenses(form_data.get("harcama_bildirimleri", []))
+    return form_data
+
+
+def prerender_exports(form_no: str, *, base_path: str = ".") -> List[ExportFile]:
+    """Formun kayıtlı halinin tüm biçimlerdeki çıktısını üretip önbelleğe yaz."""
+
+    form_data = load_export_data(form_no, base_path=base_path)
+    return [get_export(form_no, form_data, file_format, base_path=base_path) for file_format in _RENDERERS]
+
+
+def _prerender_quietly(form_no: str, base_path: str) -> None:
+    try:
+        prerender_exports(form_no, base_path=base_path)
+    except Exception:  # pragma: no cover - indirme sırasında yeniden üretilir
+        logger.exception("Form %s çıktıları arka planda üretilemedi", form_no)
+
+
+def schedule_prerender(form_no: str, *, base_path: str = ".") -> Optional[Future]:
+    """Çıktıların arka planda üretilmesini planla; önbellek kapalıysa hiçbir şey yapmaz."""
+
+    global _prerender_executor
+    if max_bytes() == 0:
+        return None
+    with _prerender_lock:
+        if _prerender_executor is None:
+            _prerender_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="export-prerender")
+        return _prerender_executor.submit(_prerender_quietly, form_no, base_path)
+
+
+def get_cache_stats(*, base_path: str = ".") -> Dict[str, Any]:
+    """İsabet/ıskalama sayaçları ile diskteki dosya sayısı ve toplam boyut."""
+
+    stats = report_cache.get_cache_stats(EXPORT_CACHE_NAME, base_path=base_path)
+    entries = _entries(cache_dir(base_path))
+    stats["entries"] = len(entries)
+    stats["size_bytes"] = sum(size for _, size, _ in entries)
+    stats["max_bytes"] = max_bytes()
+    return stats
+
+
+def clear_export_cache(*, base_path: str = ".") -> None:
+    directory = cache_dir(base_path)
+    with _size_lock:
+        for _, _, path in _entries(directory):
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+        _size_estimates.pop(directory, None)
+
+
+__all__ = [
+    "ExportFile",
+    "cache_dir",
+    "cache_key",
+    "clear_export_cache",
+    "get_cache_stats",
+    "get_export",
+    "load_export_data",
+    "max_bytes",
+    "prerender_exports",
+    "schedule_prerender",
+]
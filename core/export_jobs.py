@@ -0,0 +1,557 @@
+# -*- coding: utf-8 -*-
+"""Büyük dışa aktarımlar için kalıcı arka plan iş kuyruğu.
+
+Toplu ZIP ve kayıt defteri gibi uzun sürebilen dışa aktarımlar istek içinde
+üretilmez: ``submit_export_job`` parametreleri doğrulayıp ``export_jobs``
+tablosuna bir iş yazar ve iş kimliğini döndürür. İşler süreç içindeki küçük
+bir iş parçacığı havuzunda yürütülür; üretilen dosya diskte saklanır ve
+``EXPORT_JOB_TTL_HOURS`` sonunda silinir. Durum, ilerleme ve indirme bağlantısı
+ayrı bir istekle sorgulanır.
+
+İş kaydı veritabanında tutulduğundan:
+
+* eşzamanlı çalışan iş sayısı tüm gunicorn işçileri genelinde
+  ``EXPORT_JOB_MAX_CONCURRENT`` ile sınırlanır; böylece dışa aktarımlar form
+  sihirbazı trafiğini aç bırakmaz,
+* hata veren işler artan bekleme süreleriyle ``EXPORT_JOB_MAX_ATTEMPTS`` kez
+  denenir,
+* süreci yeniden başlatılan ya da yanıt vermeyen işler yeniden kuyruğa alınır
+  ve bir sonraki gönderim ya da durum sorgusunda kaldığı yerden çalışır.
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from . import parquet_snapshot, pdf_booklet, register_export
+from .bulk_export import (
+    BULK_EXPORT_FORMATS,
+    BulkExportError,
+    ChunkSink,
+    iter_archive,
+    matching_form_nos,
+    normalize_formats,
+)
+from .db import get_connection
+
+EXPORT_JOB_KINDS: Tuple[str, ...] = ("bulk", "booklet", "register", "parquet")
+# Yalnızca admin kullanıcıların başlatabileceği iş türleri.
+ADMIN_EXPORT_JOB_KINDS: Tuple[str, ...] = ("parquet",)
+ACTIVE_STATUSES = ("queued", "running")
+EXPORT_JOB_DIRNAME = "export_jobs"
+
+HEARTBEAT_SECONDS = 5.0
+# Bu süre boyunca nabız göndermeyen çalışan işin süreci ölmüş sayılır.
+STALE_JOB_SECONDS = 5 * 60
+RETRY_BASE_SECONDS = 30.0
+
+logger = logging.getLogger(__name__)
+
+_FILTER_KEYS = ("person", "location", "start_date", "end_date")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_active_drains = 0
+
+
+class ExportJobError(Exception):
+    """Dışa aktarım işi oluşturulamadı ya da indirilemiyor."""
+
+
+def _int_env(name: str, default: int, minimum: int) -> int:
+    raw = os.environ.get(name, str(default))
+    try:
+        return max(minimum, int(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def max_concurrent_jobs() -> int:
+    return _int_env("EXPORT_JOB_MAX_CONCURRENT", 1, 1)
+
+
+def max_attempts() -> int:
+    return _int_env("EXPORT_JOB_MAX_ATTEMPTS", 3, 1)
+
+
+def artifact_ttl_seconds() -> int:
+    return _int_env("EXPORT_JOB_TTL_HOURS", 24, 1) * 60 * 60
+
+
+def artifact_dir(base_path: str = ".") -> str:
+    configured = os.environ.get("EXPORT_JOB_DIR", "").strip()
+    if configured:
+        return configured
+    data_folder = os.environ.get("DATA_FOLDER", "").strip()
+    return os.path.join(data_folder or base_path, EXPORT_JOB_DIRNAME)
+
+
+def _filters(params: Dict[str, Any]) -> Dict[str, str]:
+    return {key: str(params.get(key) or "").strip() for key in _FILTER_KEYS}
+
+
+@dataclass(frozen=True)
+class _ExportKind:
+    # Gönderimde çalışır: parametreleri doğrular, (parametreler, dosya adı, MIME, toplam) döndürür.
+    prepare: Callable[[Dict[str, Any], str], Tuple[Dict[str, Any], str, str, int]]
+    # İşçide çalışır: dosya içeriğini parça parça üretir ve ilerlemeyi bildirir.
+    produce: Callable[[Dict[str, Any], str, Callable[[int], None]], Iterator[bytes]]
+
+
+def _prepare_bulk(params: Dict[str, Any], base_path: str) -> Tuple[Dict[str, Any], str, str, int]:
+    formats = normalize_formats(params.get("formats") or BULK_EXPORT_FORMATS)
+    form_nos = matching_form_nos(**_filters(params), base_path=base_path)
+    filename = f"gorev_formlari_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+    prepared = {"form_nos": form_nos, "formats": formats}
+    return prepared, filename, "application/zip", len(form_nos) * len(formats)
+
+
+def _produce_bulk(
+    params: Dict[str, Any], base_path: str, progress: Callable[[int], None]
+) -> Iterator[bytes]:
+    return iter_archive(params["form_nos"], params["formats"], base_path, progress)
+
+
+def _prepare_booklet(params: Dict[str, Any], base_path: str) -> Tuple[Dict[str, Any], str, str, int]:
+    filters = _filters(params)
+    try:
+        entries = pdf_booklet.booklet_entries(**filters, base_path=base_path)
+    except pdf_booklet.BookletError as exc:
+        raise ExportJobError(str(exc)) from exc
+    prepared = {
+        "title": pdf_booklet.booklet_title(filters["start_date"], filters["end_date"]),
+        # İçindekiler satırları gönderim anındaki arama sonucundan üretilir.
+        "entries": [
+            {key: entry.get(key) for key in ("form_no", "tarih", "yola_cikis_tarih", "gorev_yeri", "personel")}
+            for entry in entries
+        ],
+    }
+    filename = pdf_booklet.booklet_filename(filters["start_date"], filters["end_date"])
+    return prepared, filename, "application/pdf", len(entries)
+
+
+def _produce_booklet(
+    params: Dict[str, Any], base_path: str, progress: Callable[[int], None]
+) -> Iterator[bytes]:
+    return pdf_booklet.stream_booklet(
+        params["entries"], title=params["title"], base_path=base_path, on_progress=progress
+    )
+
+
+def _prepare_register(params: Dict[str, Any], base_path: str) -> Tuple[Dict[str, Any], str, str, int]:
+    file_format = str(params.get("format") or "xlsx").strip().lower()
+    if file_format not in register_export.REGISTER_FORMATS:
+        raise ExportJobError("Geçersiz dosya biçimi.")
+    filters = _filters(params)
+    label = "_".join(part for part in (filters["start_date"], filters["end_date"]) if part) or "tumu"
+    mimetype = register_export.CSV_MIMETYPE if file_format == "csv" else register_export.XLSX_MIMETYPE
+    total = register_export.count_register_rows(**filters, base_path=base_path)
+    return dict(filters, format=file_format), f"form_kayitlari_{label}.{file_format}", mimetype, total
+
+
+def _produce_register(
+    params: Dict[str, Any], base_path: str, progress: Callable[[int], None]
+) -> Iterator[bytes]:
+    return register_export.stream_register(
+        params["format"], **_filters(params), base_path=base_path, on_progress=progress
+    )
+
+
+def _flag(value: Any) -> bool:
+    return str(value or "").strip().lower() in {"1", "true", "on", "yes", "evet"}
+
+
+def _prepare_parquet(params: Dict[str, Any], base_path: str) -> Tuple[Dict[str, Any], str, str, int]:
+    if not parquet_snapshot.is_available():
+        raise ExportJobError("Parquet dışa aktarımı için sunucuda pyarrow kurulu olmalıdır.")
+    tables = [str(name) for name in params.get("tables") or parquet_snapshot.SNAPSHOT_TABLES]
+    unknown = [name for name in tables if name not in parquet_snapshot.SNAPSHOT_TABLES]
+    if unknown:
+        raise ExportJobError(f"Bilinmeyen tablo: {', '.join(unknown)}")
+    prepared = {
+        "tables": tables,
+        "incremental": _flag(params.get("incremental")),
+        "partition_by_year": _flag(params.get("partition_year")),
+    }
+    kind = "artimli" if prepared["incremental"] else "tam"
+    filename = f"parquet_{kind}_{datetime.now().strftime('%Y%m%d_%H%M')}.zip"
+    return prepared, filename, "application/zip", len(tables)
+
+
+def _produce_parquet(
+    params: Dict[str, Any], base_path: str, progress: Callable[[int], None]
+) -> Iterator[bytes]:
+    """Görüntüyü sunucudaki klasöre yaz, bu çalışmada yazılan dosyaları ZIP olarak akıt."""
+
+    output_dir = parquet_snapshot.snapshot_dir(base_path)
+    try:
+        summary = parquet_snapshot.write_snapshot(
+            output_dir,
+            tables=params["tables"],
+            incremental=params["incremental"],
+            partition_by_year=params["partition_by_year"],
+            base_path=base_path,
+        )
+    except parquet_snapshot.SnapshotError as exc:
+        raise ExportJobError(str(exc)) from exc
+
+    sink = ChunkSink()
+    # Parquet dosyaları zaten sıkıştırılmış olduğundan yeniden sıkıştırılmaz.
+    with zipfile.ZipFile(sink, "w", zipfile.ZIP_STORED) as archive:
+        for index, info in enumerate(summary["tables"].values(), 1):
+            for relative_path in info["files"]:
+                archive.write(os.path.join(output_dir, relative_path), relative_path)
+                yield sink.drain()
+            progress(index)
+        archive.write(
+            os.path.join(output_dir, parquet_snapshot.STATE_FILENAME), parquet_snapshot.STATE_FILENAME
+        )
+    yield sink.drain()
+
+
+EXPORT_KINDS: Dict[str, _ExportKind] = {
+    "bulk": _ExportKind(prepare=_prepare_bulk, produce=_produce_bulk),
+    "booklet": _ExportKind(prepare=_prepare_booklet, produce=_produce_booklet),
+    "register": _ExportKind(prepare=_prepare_register, produce=_produce_register),
+    "parquet": _ExportKind(prepare=_prepare_parquet, produce=_produce_parquet),
+}
+
+
+def _job_to_dict(row) -> Dict[str, Any]:
+    return {
+        "job_id": row["job_id"],
+        "kind": row["kind"],
+        "status": row["status"],
+        "requested_by": row["requested_by"],
+        "total": int(row["total"] or 0),
+        "done": int(row["done"] or 0),
+        "attempts": int(row["attempts"] or 0),
+        "max_attempts": max_attempts(),
+        "error": row["error"] or "",
+        "filename": row["filename"] or "",
+        "size_bytes": int(row["size_bytes"] or 0),
+        "created_at": row["created_at"],
+        "finished_at": row["finished_at"],
+        "expires_at": row["expires_at"],
+    }
+
+
+def _update_job(base_path: str, job_id: str, **fields: Any) -> None:
+    assignments = ", ".join(f"{name} = ?" for name in fields)
+    with get_connection(base_path) as connection:
+        connection.execute(
+            f"UPDATE export_jobs SET {assignments} WHERE job_id = ?",
+            (*fields.values(), job_id),
+        )
+        connection.commit()
+
+
+def _remove_file(path: Optional[str]) -> None:
+    if path and os.path.exists(path):
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+
+
+def purge_expired_jobs(*, base_path: str = ".") -> int:
+    """Süresi dolan iş kayıtlarını ve dosyalarını sil; silinen iş sayısını döndür."""
+
+    with get_connection(base_path) as connection:
+        rows = connection.execute(
+            "SELECT job_id, artifact_path FROM export_jobs WHERE expires_at IS NOT NULL AND expires_at < ?",
+            (time.time(),),
+        ).fetchall()
+        for row in rows:
+            _remove_file(row["artifact_path"])
+            connection.execute("DELETE FROM export_jobs WHERE job_id = ?", (row["job_id"],))
+        connection.commit()
+    return len(rows)
+
+
+def _requeue_stale_jobs(connection, now: float) -> None:
+    """Nabzı kesilen işleri yeniden kuyruğa al; deneme hakkı bitenleri başarısız say."""
+
+    stale_before = now - STALE_JOB_SECONDS
+    message = "İşi yürüten süreç yanıt vermedi."
+    connection.execute(
+        """
+        UPDATE export_jobs SET status = 'failed', error = ?, finished_at = ?, expires_at = ?
+        WHERE status = 'running' AND heartbeat_at < ? AND attempts >= ?
+        """,
+        (message, now, now + artifact_ttl_seconds(), stale_before, max_attempts()),
+    )
+    connection.execute(
+        """
+        UPDATE export_jobs SET status = 'queued', error = ?, available_at = ?
+        WHERE status = 'running' AND heartbeat_at < ?
+        """,
+        (message, now, stale_before),
+    )
+
+
+def _claim_next(base_path: str):
+    """Sınır izin veriyorsa sıradaki işi ``running`` durumuna al ve satırını döndür."""
+
+    now = time.time()
+    with get_connection(base_path) as connection:
+        _requeue_stale_jobs(connection, now)
+        candidate = connection.execute(
+            """
+            SELECT job_id FROM export_jobs
+            WHERE status = 'queued' AND available_at <= ?
+            ORDER BY created_at
+            LIMIT 1
+            """,
+            (now,),
+        ).fetchone()
+        if candidate is None:
+            connection.commit()
+            return None
+        cursor = connection.execute(
+            """
+            UPDATE export_jobs
+            SET status = 'running', attempts = attempts + 1, started_at = ?, heartbeat_at = ?
+            WHERE job_id = ? AND status = 'queued'
+              AND (SELECT COUNT(*) FROM export_jobs WHERE status = 'running') < ?
+            """,
+            (now, now, candidate["job_id"], max_concurrent_jobs()),
+        )
+        row = None
+        if cursor.rowcount > 0:
+            row = connection.execute(
+                "SELECT * FROM export_jobs WHERE job_id = ?", (candidate["job_id"],)
+            ).fetchone()
+        connection.commit()
+    return row
+
+
+def _retry_delay(attempts: int) -> float:
+    return RETRY_BASE_SECONDS * (2 ** max(0, attempts - 1))
+
+
+@contextmanager
+def _heartbeat(base_path: str, job_id: str) -> Iterator[None]:
+    """İş sürerken ``HEARTBEAT_SECONDS`` aralıkla nabız yaz.
+
+    Nabız ayrı bir iş parçacığından yazılır; böylece ilk parçayı üretmeden
+    uzun süre çalışan adımlar (ör. Parquet görüntüsü) da bayat sayılmaz.
+    """
+
+    stopped = threading.Event()
+
+    def beat() -> None:
+        while not stopped.wait(HEARTBEAT_SECONDS):
+            try:
+                _update_job(base_path, job_id, heartbeat_at=time.time())
+            except Exception:  # pragma: no cover - bir sonraki nabızda yeniden denenir
+                logger.exception("Dışa aktarım işinin nabzı yazılamadı: %s", job_id)
+
+    thread = threading.Thread(target=beat, name=f"export-job-heartbeat-{job_id}", daemon=True)
+    thread.start()
+    try:
+        yield
+    finally:
+        stopped.set()
+        thread.join()
+
+
+def _run_job(row, base_path: str) -> None:
+    job_id = row["job_id"]
+    kind = EXPORT_KINDS[row["kind"]]
+    directory = artifact_dir(base_path)
+    os.makedirs(directory, exist_ok=True)
+    extension = os.path.splitext(row["filename"] or "")[1]
+    handle, temp_path = tempfile.mkstemp(dir=directory, prefix=".tmp_")
+
+    def progress(done: int) -> None:
+        _update_job(base_path, job_id, done=done, heartbeat_at=time.time())
+
+    try:
+        with _heartbeat(base_path, job_id), os.fdopen(handle, "wb") as stream:
+            for chunk in kind.produce(json.loads(row["params"]), base_path, progress):
+                stream.write(chunk)
+        path = os.path.join(directory, f"{job_id}{extension}")
+        os.replace(temp_path, path)
+    except Exception as exc:
+        _remove_file(temp_path)
+        _record_failure(row, base_path, str(exc) or exc.__class__.__name__)
+        return
+
+    now = time.time()
+    _update_job(
+        base_path,
+        job_id,
+        status="done",
+        artifact_path=path,
+        size_bytes=os.path.getsize(path),
+        error=None,
+        heartbeat_at=now,
+        finished_at=now,
+        expires_at=now + artifact_ttl_seconds(),
+    )
+
+
+def _record_failure(row, base_path: str, error: str) -> None:
+    now = time.time()
+    attempts = int(row["attempts"] or 0)
+    if attempts < max_attempts():
+        delay = _retry_delay(attempts)
+        _update_job(base_path, row["job_id"], status="queued", error=error, available_at=now + delay)
+        timer = threading.Timer(delay, _kick, (base_path,))
+        timer.daemon = True
+        timer.start()
+        return
+    _update_job(
+        base_path,
+        row["job_id"],
+        status="failed",
+        error=error,
+        finished_at=now,
+        expires_at=now + artifact_ttl_seconds(),
+    )
+
+
+def run_pending_jobs(*, base_path: str = ".") -> int:
+    """Sınır izin verdikçe bekleyen işleri bu iş parçacığında çalıştır; çalıştırılan iş sayısını döndür."""
+
+    count = 0
+    while True:
+        row = _claim_next(base_path)
+        if row is None:
+            return count
+        _run_job(row, base_path)
+        count += 1
+
+
+def _drain(base_path: str) -> None:
+    global _active_drains
+    try:
+        run_pending_jobs(base_path=base_path)
+    finally:
+        with _executor_lock:
+            _active_drains -= 1
+
+
+def _kick(base_path: str) -> None:
+    """Havuzda boş iş parçacığı varsa kuyruğu boşaltacak bir görev başlat."""
+
+    # Havuz ilk kullanımda oluşturulur; böylece gunicorn fork ettikten sonra
+    # her işçi kendi iş parçacıklarına sahip olur.
+    global _executor, _active_drains
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max_concurrent_jobs(), thread_name_prefix="export-job"
+            )
+        if _active_drains >= max_concurrent_jobs():
+            return
+        _active_drains += 1
+        _executor.submit(_drain, base_path)
+
+
+def submit_export_job(
+    kind: str,
+    params: Dict[str, Any],
+    *,
+    requested_by: Optional[int] = None,
+    base_path: str = ".",
+    start: bool = True,
+) -> Dict[str, Any]:
+    """Dışa aktarım işini doğrula, kuyruğa al ve iş kaydını döndür.
+
+    Geçersiz istekte ``ExportJobError`` yükseltilir. ``start=False`` işi
+    yalnızca kuyruğa yazar (ör. ``run_pending_jobs`` ile ayrı çalıştırmak için).
+    """
+
+    if kind not in EXPORT_KINDS:
+        raise ExportJobError("Bilinmeyen dışa aktarım türü.")
+    try:
+        prepared, filename, mimetype, total = EXPORT_KINDS[kind].prepare(params, base_path)
+    except BulkExportError as exc:
+        raise ExportJobError(str(exc)) from exc
+
+    purge_expired_jobs(base_path=base_path)
+    job_id = uuid.uuid4().hex
+    now = time.time()
+    with get_connection(base_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO export_jobs (
+                job_id, kind, params, status, requested_by, total, done, attempts,
+                filename, mimetype, created_at, available_at
+            )
+            VALUES (?, ?, ?, 'queued', ?, ?, 0, 0, ?, ?, ?, ?)
+            """,
+            (
+                job_id,
+                kind,
+                json.dumps(prepared, ensure_ascii=False),
+                requested_by,
+                total,
+                filename,
+                mimetype,
+                now,
+                now,
+            ),
+        )
+        row = connection.execute("SELECT * FROM export_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        connection.commit()
+
+    if start:
+        _kick(base_path)
+    return _job_to_dict(row)
+
+
+def get_export_job(job_id: str, *, base_path: str = ".", resume: bool = True) -> Optional[Dict[str, Any]]:
+    """İş kaydını döndür; ``resume`` bekleyen işler için kuyruğu yeniden tetikler."""
+
+    with get_connection(base_path) as connection:
+        row = connection.execute("SELECT * FROM export_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    if row is None:
+        return None
+    if resume and row["status"] in ACTIVE_STATUSES:
+        _kick(base_path)
+    return _job_to_dict(row)
+
+
+def get_export_artifact(job_id: str, *, base_path: str = ".") -> Tuple[str, str, str]:
+    """Tamamlanan işin (dosya yolu, dosya adı, MIME türü) bilgisini döndür."""
+
+    with get_connection(base_path) as connection:
+        row = connection.execute("SELECT * FROM export_jobs WHERE job_id = ?", (job_id,)).fetchone()
+    if row is None:
+        raise ExportJobError("Dışa aktarım işi bulunamadı.")
+    if row["status"] != "done":
+        raise ExportJobError("Dışa aktarım henüz hazır değil.")
+    path = row["artifact_path"]
+    if (row["expires_at"] or 0) < time.time() or not path or not os.path.exists(path):
+        raise ExportJobError("Dışa aktarım dosyasının süresi doldu; lütfen yeniden oluşturun.")
+    return path, row["filename"], row["mimetype"]
+
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "EXPORT_JOB_KINDS",
+    "ExportJobError",
+    "artifact_dir",
+    "artifact_ttl_seconds",
+    "get_export_artifact",
+    "get_export_job",
+    "max_attempts",
+    "max_concurrent_jobs",
+    "purge_expired_jobs",
+    "run_pending_jobs",
+    "submit_export_job",
+]
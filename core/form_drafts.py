@@ -0,0 +1,309 @@
+# -*- coding: utf-8 -*-
+"""Oturumdaki açık formlar için sınırlı (LRU) önbellek ve taslak deposu.
+
+Sihirbazda açılan her form oturumda tutulur; bir kullanıcı gün içinde yüzlerce
+formu gezerse oturum verisi sınırsız büyür. ``SessionFormCache`` oturumda en
+fazla ``SESSION_MAX_FORMS`` (varsayılan 8) form tutar ve en uzun süredir
+kullanılmayanı çıkarır. Çıkarılan form kaydedilmemiş değişiklik içeriyorsa
+(kirli) ``form_drafts`` tablosuna kullanıcı ve form numarasıyla yazılır; form
+yeniden açıldığında veritabanındaki kayıt yerine bu taslak yüklenir. Form
+kaydedildiğinde taslak silinir. ``DRAFT_TTL_DAYS`` (varsayılan 30) gün
+dokunulmayan taslaklar oturum temizliğiyle birlikte silinir.
+
+Taslak, üzerine kurulduğu kaydın ``forms.updated_at`` değerini de saklar. Form
+o tarihten sonra (ör. başka bir kullanıcı tarafından) kaydedildiyse taslak
+eskimiş sayılır ve yüklenmez; böylece eski kopya yeni kaydın üzerine yazılmaz.
+"""
+from __future__ import annotations
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, List, MutableMapping, Optional
+
+from .db import get_connection
+
+FORMS_KEY = "forms"
+ORDER_KEY = "form_order"
+DIRTY_KEY = "dirty_forms"
+VERSIONS_KEY = "form_versions"
+
+
+def _int_env(name: str, default: int, minimum: int) -> int:
+    raw = os.environ.get(name, str(default))
+    try:
+        return max(minimum, int(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def max_session_forms() -> int:
+    return _int_env("SESSION_MAX_FORMS", 8, 1)
+
+
+def draft_ttl_seconds() -> int:
+    return _int_env("DRAFT_TTL_DAYS", 30, 1) * 24 * 60 * 60
+
+
+def form_version(form_no: str, *, base_path: str = ".") -> Optional[str]:
+    """Formun veritabanındaki ``updated_at`` değeri; kayıt yoksa ``None``."""
+
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            "SELECT updated_at FROM forms WHERE form_no = ?", (form_no,)
+        ).fetchone()
+    if row is None or row["updated_at"] is None:
+        return None
+    return str(row["updated_at"])
+
+
+@dataclass(frozen=True)
+class FormDraft:
+    """Kullanıcının taslağı ve üzerine kurulduğu kayıt sürümü."""
+
+    payload: Dict[str, Any]
+    form_updated_at: Optional[str]
+    current_updated_at: Optional[str]
+
+    @property
+    def is_stale(self) -> bool:
+        """Taslak alındıktan sonra form veritabanında yeniden kaydedildiyse ``True``."""
+
+        return self.form_updated_at != self.current_updated_at
+
+
+def save_draft(
+    user_id: int,
+    form_no: str,
+    form_data: Dict[str, Any],
+    *,
+    form_updated_at: Optional[str] = None,
+    base_path: str = ".",
+) -> None:
+    with get_connection(base_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO form_drafts (user_id, form_no, payload, form_updated_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(user_id, form_no) DO UPDATE SET
+                payload = excluded.payload,
+                form_updated_at = excluded.form_updated_at,
+                updated_at = excluded.updated_at
+            """,
+            (
+                user_id,
+                form_no,
+                json.dumps(form_data, ensure_ascii=False),
+                form_updated_at,
+                time.time(),
+            ),
+        )
+        connection.commit()
+
+
+def load_draft(user_id: int, form_no: str, *, base_path: str = ".") -> Optional[FormDraft]:
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            """
+            SELECT d.payload, d.form_updated_at, f.updated_at AS current_updated_at
+            FROM form_drafts d
+            LEFT JOIN forms f ON f.form_no = d.form_no
+            WHERE d.user_id = ? AND d.form_no = ?
+            """,
+            (user_id, form_no),
+        ).fetchone()
+    if row is None:
+        return None
+    try:
+        payload = json.loads(row["payload"])
+    except ValueError:
+        return None
+    if not isinstance(payload, dict):
+        return None
+    current = row["current_updated_at"]
+    return FormDraft(
+        payload=payload,
+        form_updated_at=row["form_updated_at"],
+        current_updated_at=None if current is None else str(current),
+    )
+
+
+def delete_draft(user_id: int, form_no: str, *, base_path: str = ".") -> None:
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "DELETE FROM form_drafts WHERE user_id = ? AND form_no = ?", (user_id, form_no)
+        )
+        connection.commit()
+
+
+def purge_stale_drafts(*, base_path: str = ".", now: Optional[float] = None) -> int:
+    """``DRAFT_TTL_DAYS`` süresince güncellenmeyen taslakları sil."""
+
+    cutoff = (now if now is not None else time.time()) - draft_ttl_seconds()
+    with get_connection(base_path) as connection:
+        cursor = connection.execute("DELETE FROM form_drafts WHERE updated_at < ?", (cutoff,))
+        connection.commit()
+    return cursor.rowcount
+
+
+class SessionFormCache:
+    """Oturum eşlemesi (ör. Flask ``session``) üzerinde LRU sınırlı form önbelleği.
+
+    Formlar ``forms`` anahtarında, kullanım sırası ``form_order`` listesinde
+    (en son kullanılan sonda), kaydedilmemiş değişiklik içerenler
+    ``dirty_forms`` listesinde, her formun üzerine kurulduğu kayıt sürümü
+    ``form_versions`` içinde tutulur. Her değişiklikten sonra anahtarlar
+    yeniden atanır; böylece oturum değişmiş olarak işaretlenir.
+    """
+
+    def __init__(
+        self,
+        store: MutableMapping[str, Any],
+        *,
+        user_id: Optional[int],
+        base_path: str = ".",
+        capacity: Optional[int] = None,
+    ) -> None:
+        self.store = store
+        self.user_id = user_id
+        self.base_path = base_path
+        self.capacity = capacity or max_session_forms()
+        # ``get`` eskimiş bir taslağı attıysa True olur; arayüz kullanıcıyı uyarır.
+        self.discarded_stale_draft = False
+
+    def _state(self):
+        forms: Dict[str, Any] = dict(self.store.get(FORMS_KEY) or {})
+        order = [form_no for form_no in self.store.get(ORDER_KEY) or [] if form_no in forms]
+        # Sıra listesinden önce eklenmiş (eski oturumlardaki) formlar en eski sayılır.
+        order = [form_no for form_no in forms if form_no not in order] + order
+        dirty = [form_no for form_no in self.store.get(DIRTY_KEY) or [] if form_no in forms]
+        versions: Dict[str, Optional[str]] = dict(self.store.get(VERSIONS_KEY) or {})
+        return forms, order, dirty, versions
+
+    def _commit(
+        self,
+        forms: Dict[str, Any],
+        order: List[str],
+        dirty: List[str],
+        versions: Dict[str, Optional[str]],
+    ) -> None:
+        self.store[FORMS_KEY] = forms
+        self.store[ORDER_KEY] = order
+        self.store[DIRTY_KEY] = dirty
+        self.store[VERSIONS_KEY] = {
+            form_no: version for form_no, version in versions.items() if form_no in forms
+        }
+
+    def get(self, form_no: str) -> Optional[Dict[str, Any]]:
+        """Formu oturumdan ya da kullanıcının taslağından döndür; yoksa ``None``.
+
+        Form, taslak alındıktan sonra veritabanında yeniden kaydedildiyse taslak
+        silinir, ``discarded_stale_draft`` işaretlenir ve ``None`` döner.
+        """
+
+        forms, order, dirty, versions = self._state()
+        form_data = forms.get(form_no)
+        if form_data:
+            if order[-1:] != [form_no]:
+                order.remove(form_no)
+                order.append(form_no)
+                self._commit(forms, order, dirty, versions)
+            return form_data
+        if self.user_id is None:
+            return None
+        draft = load_draft(self.user_id, form_no, base_path=self.base_path)
+        if draft is None:
+            return None
+        if draft.is_stale:
+            delete_draft(self.user_id, form_no, base_path=self.base_path)
+            self.discarded_stale_draft = True
+            return None
+        self.put(form_no, draft.payload, dirty=True, version=draft.form_updated_at)
+        return draft.payload
+
+    def put(
+        self,
+        form_no: str,
+        form_data: Dict[str, Any],
+        *,
+        dirty: bool = True,
+        version: Optional[str] = None,
+    ) -> List[str]:
+        """Formu en son kullanılan olarak yaz; oturumdan çıkarılan form numaralarını döndür.
+
+        ``dirty=False`` formu kirli olarak işaretlemez ama mevcut işareti de
+        kaldırmaz; işaret yalnızca ``mark_saved`` ile temizlenir. ``version``
+        verilirse formun üzerine kurulduğu ``forms.updated_at`` değeri olarak
+        saklanır.
+        """
+
+        forms, order, dirty_forms, versions = self._state()
+        forms[form_no] = form_data
+        if version is not None:
+            versions[form_no] = version
+        if form_no in order:
+            order.remove(form_no)
+        order.append(form_no)
+        if dirty and form_no not in dirty_forms:
+            dirty_forms.append(form_no)
+
+        evicted: List[str] = []
+        for candidate in list(order[:-1]):
+            if len(forms) <= self.capacity:
+                break
+            if candidate in dirty_forms:
+                if self.user_id is None:
+                    # Taslak sahibi olmadan kirli form atılamaz; oturumda kalır.
+                    continue
+                save_draft(
+                    self.user_id,
+                    candidate,
+                    forms[candidate],
+                    form_updated_at=versions.get(candidate),
+                    base_path=self.base_path,
+                )
+                dirty_forms.remove(candidate)
+            del forms[candidate]
+            order.remove(candidate)
+            evicted.append(candidate)
+        self._commit(forms, order, dirty_forms, versions)
+        return evicted
+
+    def write_draft(self, form_no: str) -> None:
+        """Oturumdaki kopyayı, kayıt sürümüyle birlikte kullanıcının taslağına yaz."""
+
+        forms, _, _, versions = self._state()
+        if self.user_id is None or form_no not in forms:
+            return
+        save_draft(
+            self.user_id,
+            form_no,
+            forms[form_no],
+            form_updated_at=versions.get(form_no),
+            base_path=self.base_path,
+        )
+
+    def mark_saved(self, form_no: str) -> None:
+        """Form veritabanına kaydedildi: temiz say, sürümü güncelle, taslağı sil."""
+
+        forms, order, dirty, versions = self._state()
+        if form_no in dirty:
+            dirty.remove(form_no)
+        if form_no in forms:
+            versions[form_no] = form_version(form_no, base_path=self.base_path)
+        self._commit(forms, order, dirty, versions)
+        if self.user_id is not None:
+            delete_draft(self.user_id, form_no, base_path=self.base_path)
+
+
+__all__ = [
+    "FormDraft",
+    "SessionFormCache",
+    "delete_draft",
+    "form_version",
+    "load_draft",
+    "max_session_forms",
+    "purge_stale_drafts",
+    "save_draft",
+]
@@ -4,20 +4,29 @@ from __future__ import annotations
 
 import io
 import json
+import math
 import os
+import re
 import unicodedata
+from bisect import bisect_right
 from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from openpyxl import Workbook
-from openpyxl.styles import Border, Font, PatternFill, Side
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.cell.cell import ILLEGAL_CHARACTERS_RE
+from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+from openpyxl.styles.fonts import DEFAULT_FONT
+from openpyxl.worksheet.cell_range import CellRange
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import cm
 from reportlab.pdfgen import canvas
 
+from . import report_cache, reporting
+from .pdf_layout import PdfLayout
 from .db import get_connection, is_postgres
 
 DB_FILENAME = "forms.db"
@@ -77,7 +86,7 @@ def determine_form_status(form_data: Dict[str, Any]) -> FormStatus:
     return FormStatus(code=status_code, missing_fields=missing_fields)
 
 
-def _to_iso_date(value: str | None) -> str | None:
+def to_iso_date(value: str | None) -> str | None:
     value = (value or "").strip()
     if not value:
         return None
@@ -115,6 +124,115 @@ def _normalize_optional_int(value: Any) -> Optional[int]:
         return None
 
 
+EXPENSE_CURRENCIES: Tuple[str, ...] = ("TRY", "USD", "EUR")
+DEFAULT_EXPENSE_CURRENCY = "TRY"
+
+
+_GROUPED_THOUSANDS = re.compile(r"^\d{1,3}(\.\d{3})+$")
+
+
+def parse_amount(value: Any) -> Optional[float]:
+    """Tutarı sayıya çevir; "1.250,50", "1.250", "1250,5" ve "1250.5" biçimlerini kabul eder.
+
+    Yalnızca noktalı ve üçer basamak gruplu değerler ("1.250", "1.250.000")
+    binlik ayraçlı sayılır. Negatif, sonsuz ve NaN sonuçlar geçersizdir.
+    """
+
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        amount = float(value)
+    else:
+        text = str(value).strip().replace(" ", "").replace("₺", "")
+        if not text:
+            return None
+        if "," in text:
+            text = text.replace(".", "").replace(",", ".")
+        elif _GROUPED_THOUSANDS.match(text):
+            text = text.replace(".", "")
+        try:
+            amount = float(text)
+        except ValueError:
+            return None
+    if not math.isfinite(amount) or amount < 0:
+        return None
+    return round(amount, 2)
+
+
+def format_amount(amount: Optional[float], currency: str = DEFAULT_EXPENSE_CURRENCY) -> str:
+    """Tutarı Türkçe sayı biçiminde yaz (ör. ``1.250,50 TRY``)."""
+
+    if amount is None:
+        return ""
+    text = f"{amount:,.2f}".replace(",", " ").replace(".", ",").replace(" ", ".")
+    return f"{text} {currency}"
+
+
+def normalize_expenses(raw: Any) -> List[Dict[str, Any]]:
+    """Harcama listesini kayıt/gösterim için ortak yapıya getir."""
+
+    if isinstance(raw, str):
+        try:
+            raw = json.loads(raw)
+        except json.JSONDecodeError:
+            raw = []
+    expenses: List[Dict[str, Any]] = []
+    if not isinstance(raw, list):
+        return expenses
+    for item in raw:
+        if not isinstance(item, dict):
+            continue
+        currency = (item.get("currency") or DEFAULT_EXPENSE_CURRENCY).strip().upper()
+        if currency not in EXPENSE_CURRENCIES:
+            currency = DEFAULT_EXPENSE_CURRENCY
+        attachments_list: List[Dict[str, str]] = []
+        raw_attachments = item.get("attachments", [])
+        if isinstance(raw_attachments, list):
+            for attachment in raw_attachments:
+                if isinstance(attachment, dict) and attachment.get("filename"):
+                    attachments_list.append(
+                        {
+                            "filename": attachment["filename"],
+                            "original_name": attachment.get("original_name")
+                            or attachment["filename"],
+                        }
+                    )
+        expenses.append(
+            {
+                "description": (item.get("description") or "").strip(),
+                "amount": parse_amount(item.get("amount")),
+                "currency": currency,
+                "category": (item.get("category") or "").strip(),
+                "attachments": attachments_list,
+            }
+        )
+    return expenses
+
+
+def _expense_line(index: int, expense: Dict[str, Any]) -> str:
+    description = (expense.get("description") or "Açıklama belirtilmedi").strip() or "Açıklama belirtilmedi"
+    details = [
+        part
+        for part in (
+            expense.get("category") or "",
+            format_amount(expense.get("amount"), expense.get("currency") or DEFAULT_EXPENSE_CURRENCY),
+        )
+        if part
+    ]
+    line = f"{index}. {description}"
+    if details:
+        line += f" - {' / '.join(details)}"
+    receipt_names: List[str] = []
+    for receipt in expense.get("attachments", []) or []:
+        if isinstance(receipt, dict):
+            name = receipt.get("original_name") or receipt.get("filename")
+            if name:
+                receipt_names.append(name)
+    if receipt_names:
+        line += f" (Ekler: {', '.join(receipt_names)})"
+    return line
+
+
 # ------------------------------------------------------------------
 # Payload preparation
 # ------------------------------------------------------------------
@@ -127,7 +245,7 @@ def _prepare_payload(form_no: str, form_data: Dict[str, Any], status: FormStatus
     gorev_yeri = (form_data.get("gorev_yeri") or "").strip()
 
     payload["tarih"] = tarih
-    payload["tarih_iso"] = _to_iso_date(tarih)
+    payload["tarih_iso"] = to_iso_date(tarih)
     payload["dok_no"] = (form_data.get("dok_no") or "").strip()
     payload["rev_no"] = (form_data.get("rev_no") or "").strip()
     payload["avans"] = (form_data.get("avans") or "").strip()
@@ -140,7 +258,7 @@ def _prepare_payload(form_no: str, form_data: Dict[str, Any], status: FormStatus
     payload["gorev_firma"] = (form_data.get("gorev_firma") or "").strip()
     gorev_tarih = (form_data.get("gorev_tarih") or "").strip()
     payload["gorev_tarih"] = gorev_tarih
-    payload["gorev_tarih_iso"] = _to_iso_date(gorev_tarih)
+    payload["gorev_tarih_iso"] = to_iso_date(gorev_tarih)
     payload["yapilan_isler"] = (form_data.get("yapilan_isler") or "").strip()
     payload["last_step"] = _normalize_last_step(form_data.get("last_step"))
 
@@ -164,34 +282,6 @@ def _prepare_payload(form_no: str, form_data: Dict[str, Any], status: FormStatus
                 )
     payload["gorev_ekleri"] = json.dumps(attachments, ensure_ascii=False)
 
-    expenses_raw = form_data.get("harcama_bildirimleri", [])
-    expenses: List[Dict[str, Any]] = []
-    if isinstance(expenses_raw, str):
-        try:
-            parsed_expenses = json.loads(expenses_raw)
-        except json.JSONDecodeError:
-            parsed_expenses = []
-    else:
-        parsed_expenses = expenses_raw
-    if isinstance(parsed_expenses, list):
-        for item in parsed_expenses:
-            if not isinstance(item, dict):
-                continue
-            description = (item.get("description") or "").strip()
-            attachments_list: List[Dict[str, str]] = []
-            raw_attachments = item.get("attachments", [])
-            if isinstance(raw_attachments, list):
-                for attachment in raw_attachments:
-                    if isinstance(attachment, dict) and attachment.get("filename"):
-                        attachments_list.append(
-                            {
-                                "filename": attachment["filename"],
-                                "original_name": attachment.get("original_name")
-                                or attachment["filename"],
-                            }
-                        )
-            expenses.append({"description": description, "attachments": attachments_list})
-    payload["harcama_bildirimleri"] = json.dumps(expenses, ensure_ascii=False)
 
     for key in (
         "yola_cikis_tarih",
@@ -201,7 +291,7 @@ def _prepare_payload(form_no: str, form_data: Dict[str, Any], status: FormStatus
     ):
         value = (form_data.get(key) or "").strip()
         payload[key] = value
-        payload[f"{key}_iso"] = _to_iso_date(value)
+        payload[f"{key}_iso"] = to_iso_date(value)
 
     payload["yola_cikis_saat"] = (form_data.get("yola_cikis_saat") or "").strip()
     payload["donus_saat"] = (form_data.get("donus_saat") or "").strip()
@@ -235,68 +325,306 @@ def _prepare_payload(form_no: str, form_data: Dict[str, Any], status: FormStatus
 # Persistence
 # ------------------------------------------------------------------
 
-def _persist_form(
-    form_no: str,
-    form_data: Dict[str, Any],
-    status: FormStatus,
-    base_path: str = ".",
-) -> str:
-    payload = _prepare_payload(form_no, form_data, status)
+def _replace_expenses(connection, form_no: str, expenses: List[Dict[str, Any]]) -> None:
+    """Formun harcama satırlarını ve fiş eklerini verilen listeyle değiştir."""
+
+    row = connection.execute("SELECT id FROM forms WHERE form_no = ?", (form_no,)).fetchone()
+    if row is None:
+        return
+    form_id = row["id"]
+    connection.execute(
+        "DELETE FROM expense_attachments WHERE expense_id IN "
+        "(SELECT id FROM form_expenses WHERE form_id = ?)",
+        (form_id,),
+    )
+    connection.execute("DELETE FROM form_expenses WHERE form_id = ?", (form_id,))
+    _insert_expenses(connection, form_id, expenses)
+
 
-    if is_postgres():
-        columns = ", ".join(payload.keys())
-        placeholders = ", ".join(["?"] * len(payload))
-        updates = ", ".join(
-            f"{col}=EXCLUDED.{col}" for col in payload.keys() if col != "form_no"
+def _insert_expenses(connection, form_id: int, expenses: List[Dict[str, Any]]) -> None:
+    for position, expense in enumerate(expenses):
+        expense_id = connection.execute_returning_id(
+            """
+            INSERT INTO form_expenses (form_id, position, description, amount, currency, category)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (
+                form_id,
+                position,
+                expense["description"],
+                expense["amount"],
+                expense["currency"],
+                expense["category"] or None,
+            ),
         )
-        with get_connection(base_path) as connection:
+        for index, attachment in enumerate(expense["attachments"]):
             connection.execute(
-                f"""
-                INSERT INTO forms ({columns}, created_at, updated_at)
-                VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                ON CONFLICT(form_no) DO UPDATE SET
-                    {updates},
-                    updated_at=CURRENT_TIMESTAMP
+                """
+                INSERT INTO expense_attachments (expense_id, position, filename, original_name)
+                VALUES (?, ?, ?, ?)
                 """,
-                tuple(payload.values()),
+                (expense_id, index, attachment["filename"], attachment["original_name"]),
             )
-            try:
-                numeric_form_no = int(form_no)
-            except ValueError:
-                numeric_form_no = None
-            if numeric_form_no is not None:
-                connection.execute(
-                    "UPDATE form_sequence SET last_no = GREATEST(last_no, ?) WHERE id = 1",
-                    (numeric_form_no,),
-                )
-            connection.commit()
-    else:
-        columns = ", ".join(payload.keys())
-        placeholders = ", ".join(["?"] * len(payload))
-        updates = ", ".join(
-            f"{col}=excluded.{col}" for col in payload.keys() if col != "form_no"
+
+
+# Hatalı tarihli bir formun indekste binlerce gün üretmesini engeller.
+PERSON_DAYS_MAX_SPAN = 31
+
+
+def _break_hours(value: Any) -> float:
+    """``mola_suresi`` (dakika) değerini saate çevir; okunamıyorsa 0."""
+
+    match = re.search(r"\d+(?:[.,]\d+)?", str(value or ""))
+    if not match:
+        return 0.0
+    return float(match.group(0).replace(",", ".")) / 60
+
+
+def _person_day_rows(row) -> List[Tuple[str, str, int, float, float, float]]:
+    """Form satırını kişi × gün indeks satırlarına aç.
+
+    Görevin kapsadığı her takvim günü için formdaki her kişiye bir satır
+    yazılır; yol, çalışma ve mola süreleri günlere eşit bölünür.
+    """
+
+    people = sorted({(row[field] or "").strip() for field in PERSONEL_FIELDS} - {""})
+    if not people:
+        return []
+
+    days = [
+        to_iso_date(row[iso_key] or row[raw_key])
+        for iso_key, raw_key in (
+            ("yola_cikis_tarih_iso", "yola_cikis_tarih"),
+            ("calisma_baslangic_tarih_iso", "calisma_baslangic_tarih"),
+            ("calisma_bitis_tarih_iso", "calisma_bitis_tarih"),
+            ("donus_tarih_iso", "donus_tarih"),
         )
-        with get_connection(base_path) as connection:
-            connection.execute(
-                f"""
-                INSERT INTO forms ({columns}, created_at, updated_at)
-                VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
-                ON CONFLICT(form_no) DO UPDATE SET
-                    {updates},
-                    updated_at=CURRENT_TIMESTAMP
-                """,
-                tuple(payload.values()),
+    ]
+    days = [value for value in days if value]
+    if not days:
+        fallback = to_iso_date(row["gorev_tarih_iso"] or row["gorev_tarih"])
+        days = [fallback] if fallback else []
+    if not days:
+        return []
+
+    first = date.fromisoformat(min(days))
+    last = date.fromisoformat(max(days))
+    span = min((last - first).days + 1, PERSON_DAYS_MAX_SPAN)
+    travel_hours, work_hours = row_hours(row)
+    shares = (
+        (travel_hours or 0.0) / span,
+        (work_hours or 0.0) / span,
+        _break_hours(row["mola_suresi"]) / span,
+    )
+    return [
+        (person, (first + timedelta(days=offset)).isoformat(), row["id"], *shares)
+        for person in people
+        for offset in range(span)
+    ]
+
+
+def _replace_person_days(connection, form_no: str) -> None:
+    """Formun kişi × gün indeks satırlarını güncel verisiyle yeniden yaz."""
+
+    row = connection.execute("SELECT * FROM forms WHERE form_no = ?", (form_no,)).fetchone()
+    if row is None:
+        return
+    connection.execute("DELETE FROM person_days WHERE form_id = ?", (row["id"],))
+    connection.executemany(
+        """
+        INSERT INTO person_days (person, work_date, form_id, travel_hours, work_hours, break_hours)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        _person_day_rows(row),
+    )
+
+
+def write_person_days(connection) -> int:
+    """Kişi × gün indeksini tüm formlardan açık bağlantıya yeniden yaz (commit etmez).
+
+    Yazılan satır sayısını döndürür.
+    """
+
+    written = 0
+    connection.execute("DELETE FROM person_days")
+    for row in connection.execute("SELECT * FROM forms").fetchall():
+        entries = _person_day_rows(row)
+        connection.executemany(
+            """
+            INSERT INTO person_days (person, work_date, form_id, travel_hours, work_hours, break_hours)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            entries,
+        )
+        written += len(entries)
+    report_cache.bump_data_version(connection)
+    return written
+
+
+def rebuild_person_days(*, base_path: str = ".") -> int:
+    """Kişi × gün indeksini tüm formlardan yeniden oluştur; yazılan satır sayısını döndür."""
+
+    with get_connection(base_path) as connection:
+        written = write_person_days(connection)
+        connection.commit()
+    return written
+
+
+def _load_expenses(connection, form_id: int) -> List[Dict[str, Any]]:
+    rows = connection.execute(
+        """
+        SELECT e.id, e.description, e.amount, e.currency, e.category,
+               a.filename, a.original_name
+        FROM form_expenses AS e
+        LEFT JOIN expense_attachments AS a ON a.expense_id = e.id
+        WHERE e.form_id = ?
+        ORDER BY e.position, a.position
+        """,
+        (form_id,),
+    ).fetchall()
+    expenses: List[Dict[str, Any]] = []
+    by_id: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        expense = by_id.get(row["id"])
+        if expense is None:
+            expense = {
+                "description": row["description"] or "",
+                "amount": float(row["amount"]) if row["amount"] is not None else None,
+                "currency": row["currency"] or DEFAULT_EXPENSE_CURRENCY,
+                "category": row["category"] or "",
+                "attachments": [],
+            }
+            by_id[row["id"]] = expense
+            expenses.append(expense)
+        if row["filename"]:
+            expense["attachments"].append(
+                {
+                    "filename": row["filename"],
+                    "original_name": row["original_name"] or row["filename"],
+                }
             )
-            try:
-                numeric_form_no = int(form_no)
-            except ValueError:
-                numeric_form_no = None
-            if numeric_form_no is not None:
-                connection.execute(
-                    "UPDATE form_sequence SET last_no = MAX(last_no, ?) WHERE id = 1",
-                    (numeric_form_no,),
-                )
-            connection.commit()
+    return expenses
+
+
+def write_form(connection, form_no: str, form_data: Dict[str, Any], status: FormStatus) -> None:
+    """Formu, harcamalarını ve kişi × gün satırlarını açık bağlantıya yaz (commit etmez)."""
+
+    payload = _prepare_payload(form_no, form_data, status)
+    expenses = normalize_expenses(form_data.get("harcama_bildirimleri", []))
+    postgres = is_postgres()
+
+    columns = ", ".join(payload.keys())
+    placeholders = ", ".join(["?"] * len(payload))
+    excluded = "EXCLUDED" if postgres else "excluded"
+    updates = ", ".join(
+        f"{col}={excluded}.{col}" for col in payload.keys() if col != "form_no"
+    )
+    connection.execute(
+        f"""
+        INSERT INTO forms ({columns}, created_at, updated_at)
+        VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        ON CONFLICT(form_no) DO UPDATE SET
+            {updates},
+            updated_at=CURRENT_TIMESTAMP
+        """,
+        tuple(payload.values()),
+    )
+    try:
+        numeric_form_no = int(form_no)
+    except ValueError:
+        numeric_form_no = None
+    if numeric_form_no is not None:
+        greatest = "GREATEST" if postgres else "MAX"
+        connection.execute(
+            f"UPDATE form_sequence SET last_no = {greatest}(last_no, ?) WHERE id = 1",
+            (numeric_form_no,),
+        )
+    _replace_expenses(connection, form_no, expenses)
+    _replace_person_days(connection, form_no)
+
+
+def insert_new_forms(connection, forms: Sequence[Tuple[str, Dict[str, Any]]]) -> List[str]:
+    """Veritabanında bulunmayan formları toplu ekle (commit etmez).
+
+    Var olan form numaraları aynı işlem içinde yeniden sorgulanıp atlanır ve
+    satırlar ``ON CONFLICT DO NOTHING`` ile eklenir; mevcut kayıtların üzerine
+    yazılmaz. Eklenen form numaralarını döndürür.
+    """
+
+    if not forms:
+        return []
+    # Veri sürümü önce artırılır: böylece yazma kilidi sorgudan önce alınır ve
+    # her kayıt da sürümü artırdığından işlem bitene kadar başka bir form
+    # kaydı commit edilemez.
+    report_cache.bump_data_version(connection)
+    placeholders = ", ".join(["?"] * len(forms))
+    existing = {
+        row["form_no"]
+        for row in connection.execute(
+            f"SELECT form_no FROM forms WHERE form_no IN ({placeholders})",
+            tuple(form_no for form_no, _ in forms),
+        ).fetchall()
+    }
+    new_forms = [(form_no, form_data) for form_no, form_data in forms if form_no not in existing]
+    if not new_forms:
+        return []
+
+    payloads = [
+        _prepare_payload(form_no, form_data, determine_form_status(form_data))
+        for form_no, form_data in new_forms
+    ]
+    columns = ", ".join(payloads[0].keys())
+    placeholders = ", ".join(["?"] * len(payloads[0]))
+    connection.executemany(
+        f"""
+        INSERT INTO forms ({columns}, created_at, updated_at)
+        VALUES ({placeholders}, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+        ON CONFLICT(form_no) DO NOTHING
+        """,
+        [tuple(payload.values()) for payload in payloads],
+    )
+
+    numeric_form_nos = [int(form_no) for form_no, _ in new_forms if form_no.isdigit()]
+    if numeric_form_nos:
+        greatest = "GREATEST" if is_postgres() else "MAX"
+        connection.execute(
+            f"UPDATE form_sequence SET last_no = {greatest}(last_no, ?) WHERE id = 1",
+            (max(numeric_form_nos),),
+        )
+
+    form_nos = [form_no for form_no, _ in new_forms]
+    placeholders = ", ".join(["?"] * len(form_nos))
+    rows = {
+        row["form_no"]: row
+        for row in connection.execute(
+            f"SELECT * FROM forms WHERE form_no IN ({placeholders})", tuple(form_nos)
+        ).fetchall()
+    }
+    person_days: List[Tuple[str, str, int, float, float, float]] = []
+    for form_no, form_data in new_forms:
+        row = rows[form_no]
+        _insert_expenses(connection, row["id"], normalize_expenses(form_data.get("harcama_bildirimleri", [])))
+        person_days.extend(_person_day_rows(row))
+    connection.executemany(
+        """
+        INSERT INTO person_days (person, work_date, form_id, travel_hours, work_hours, break_hours)
+        VALUES (?, ?, ?, ?, ?, ?)
+        """,
+        person_days,
+    )
+    return form_nos
+
+
+def _persist_form(
+    form_no: str,
+    form_data: Dict[str, Any],
+    status: FormStatus,
+    base_path: str = ".",
+) -> str:
+    with get_connection(base_path) as connection:
+        write_form(connection, form_no, form_data, status)
+        report_cache.bump_data_version(connection)
+        connection.commit()
 
     return get_db_path(base_path)
 
@@ -332,6 +660,7 @@ def load_form_data(form_no: str, base_path: str = ".") -> Dict[str, Any]:
         row = connection.execute(
             "SELECT * FROM forms WHERE form_no = ?", (form_no,)
         ).fetchone()
+        expenses = _load_expenses(connection, row["id"]) if row is not None else []
 
     if row is None:
         raise FormServiceError(f"Form {form_no} bulunamadı.")
@@ -380,30 +709,6 @@ def load_form_data(form_no: str, base_path: str = ".") -> Dict[str, Any]:
                 )
     form_data["gorev_ekleri"] = attachments
 
-    expenses_raw = row["harcama_bildirimleri"] or "[]"
-    try:
-        parsed_expenses = json.loads(expenses_raw)
-    except (TypeError, json.JSONDecodeError):
-        parsed_expenses = []
-    expenses: List[Dict[str, Any]] = []
-    if isinstance(parsed_expenses, list):
-        for item in parsed_expenses:
-            if not isinstance(item, dict):
-                continue
-            description = item.get("description") or ""
-            attachments_list: List[Dict[str, str]] = []
-            raw_attachments = item.get("attachments", [])
-            if isinstance(raw_attachments, list):
-                for attachment in raw_attachments:
-                    if isinstance(attachment, dict) and attachment.get("filename"):
-                        attachments_list.append(
-                            {
-                                "filename": attachment["filename"],
-                                "original_name": attachment.get("original_name")
-                                or attachment["filename"],
-                            }
-                        )
-            expenses.append({"description": description, "attachments": attachments_list})
     form_data["harcama_bildirimleri"] = expenses
 
     for field in PERSONEL_FIELDS:
@@ -456,6 +761,7 @@ def assign_form(
         )
         if result.rowcount == 0:
             raise FormServiceError(f"Form {form_no} bulunamadı.")
+        report_cache.bump_data_version(connection)
         connection.commit()
 
     return assigned_at
@@ -492,23 +798,21 @@ def list_form_numbers(base_path: str = ".") -> List[str]:
     return [row["form_no"] for row in rows]
 
 
-def search_forms(
-    *,
-    person: str = "",
-    location: str = "",
-    start_date: str = "",
-    end_date: str = "",
-    base_path: str = ".",
-) -> List[Dict[str, Any]]:
-    """Verilen filtrelere göre form kayıtlarını listele."""
+SEARCH_FORM_ORDER = " ORDER BY COALESCE(yola_cikis_tarih_iso, '') DESC, CAST(form_no AS INTEGER) DESC"
+
+
+def search_where(
+    *, person: str = "", location: str = "", start_date: str = "", end_date: str = ""
+) -> Tuple[str, List[Any]]:
+    """Arama filtrelerinden ``forms`` tablosu için WHERE koşulu ve parametreleri üret."""
 
     filters: List[str] = []
     params: List[Any] = []
 
     person = _normalize_for_search(person)
     location = _normalize_for_search(location)
-    start_iso = _to_iso_date(start_date)
-    end_iso = _to_iso_date(end_date)
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
 
     if person:
         filters.append("personel_search LIKE ?")
@@ -529,14 +833,29 @@ def search_forms(
     where_clause = ""
     if filters:
         where_clause = " WHERE " + " AND ".join(filters)
+    return where_clause, params
+
 
+def search_forms(
+    *,
+    person: str = "",
+    location: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> List[Dict[str, Any]]:
+    """Verilen filtrelere göre form kayıtlarını listele."""
+
+    where_clause, params = search_where(
+        person=person, location=location, start_date=start_date, end_date=end_date
+    )
     query = (
         "SELECT form_no, tarih, gorev_yeri, hazirlayan, durum, "
         "yola_cikis_tarih, yola_cikis_tarih_iso, gorev_tanimi, avans, taseron,"
         + ", ".join(PERSONEL_FIELDS)
         + " FROM forms"
         + where_clause
-        + " ORDER BY COALESCE(yola_cikis_tarih_iso, '') DESC, CAST(form_no AS INTEGER) DESC"
+        + SEARCH_FORM_ORDER
     )
 
     with get_connection(base_path) as connection:
@@ -672,17 +991,206 @@ def list_forms_for_assignee(
     return assignments
 
 
+# Özet yapısı değiştiğinde artırılır; önbellekteki eski biçimli sonuçlar kullanılmaz.
+REPORT_SUMMARY_LAYOUT = 3
+
+
 def get_reporting_summary(
     *,
     start_date: str = "",
     end_date: str = "",
     base_path: str = ".",
 ) -> Dict[str, Any]:
-    """Derlenmiş raporlama metriklerini döndür."""
+    """Derlenmiş raporlama metriklerini döndür.
+
+    Sonuçlar ``report_cache`` üzerinden veri sürümüyle birlikte önbelleğe
+    alınır; veri değişmediği sürece tekrar eden istekler yeniden hesaplanmaz.
+    """
+
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
+
+    return report_cache.get_or_compute(
+        ("summary", REPORT_SUMMARY_LAYOUT, start_iso, end_iso),
+        lambda: _compute_reporting_summary(start_iso, end_iso, base_path=base_path),
+        base_path=base_path,
+    )
+
+
+def get_cached_reporting_summary(
+    *,
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> Optional[Dict[str, Any]]:
+    """Önbellekte güncel özet varsa döndür; yoksa hesaplamadan ``None`` döndür."""
+
+    return report_cache.get_cached(
+        ("summary", REPORT_SUMMARY_LAYOUT, to_iso_date(start_date), to_iso_date(end_date)),
+        base_path=base_path,
+    )
+
+
+def combine_datetime(row, date_key: str, iso_key: str, time_key: str) -> datetime | None:
+    date_iso = row[iso_key] or None
+    if not date_iso:
+        date_iso = to_iso_date(row[date_key])
+    if not date_iso:
+        return None
+    time_value = (row[time_key] or "").strip()
+    if not time_value:
+        time_value = "00:00"
+    if len(time_value.split(":")) == 2:
+        time_value = f"{time_value}:00"
+    try:
+        return datetime.fromisoformat(f"{date_iso}T{time_value}")
+    except ValueError:
+        return None
 
-    start_iso = _to_iso_date(start_date)
-    end_iso = _to_iso_date(end_date)
 
+def _hours_between(start: datetime | None, end: datetime | None) -> Optional[float]:
+    if start and end and end >= start:
+        return round((end - start).total_seconds() / 3600, 2)
+    return None
+
+
+# Süre histogramı kova alt sınırları (saat); son kova üstten açıktır.
+HOURS_HISTOGRAM_EDGES: Tuple[float, ...] = (0.0, 2.0, 4.0, 8.0, 12.0, 24.0, 48.0)
+HOURS_HISTOGRAM_LABELS: Tuple[str, ...] = (
+    "0-2 sa",
+    "2-4 sa",
+    "4-8 sa",
+    "8-12 sa",
+    "12-24 sa",
+    "24-48 sa",
+    "48+ sa",
+)
+
+
+def _percentile(sorted_values: Sequence[float], fraction: float) -> float:
+    """Doğrusal enterpolasyonlu yüzdelik."""
+
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    weight = position - lower
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * weight
+
+
+def _distribution(values: List[float]) -> Dict[str, Any]:
+    ordered = sorted(values)
+    total = sum(ordered)
+    counts = [0] * len(HOURS_HISTOGRAM_EDGES)
+    for value in ordered:
+        counts[bisect_right(HOURS_HISTOGRAM_EDGES, value) - 1] += 1
+    return {
+        "total": round(total, 2),
+        "average": round(total / len(ordered), 2) if ordered else 0.0,
+        "samples": len(ordered),
+        "p50": round(_percentile(ordered, 0.50), 2),
+        "p90": round(_percentile(ordered, 0.90), 2),
+        "p99": round(_percentile(ordered, 0.99), 2),
+        "histogram": {
+            "labels": list(HOURS_HISTOGRAM_LABELS),
+            "counts": counts,
+        },
+    }
+
+
+def row_hours(row) -> Tuple[Optional[float], Optional[float]]:
+    """Tek bir form satırı için (yol, çalışma) sürelerini saat olarak döndür."""
+
+    travel_hours = _hours_between(
+        combine_datetime(row, "yola_cikis_tarih", "yola_cikis_tarih_iso", "yola_cikis_saat"),
+        combine_datetime(row, "donus_tarih", "donus_tarih_iso", "donus_saat"),
+    )
+    work_hours = _hours_between(
+        combine_datetime(
+            row,
+            "calisma_baslangic_tarih",
+            "calisma_baslangic_tarih_iso",
+            "calisma_baslangic_saat",
+        ),
+        combine_datetime(
+            row,
+            "calisma_bitis_tarih",
+            "calisma_bitis_tarih_iso",
+            "calisma_bitis_saat",
+        ),
+    )
+    return travel_hours, work_hours
+
+
+def _compute_duration_metrics(rows: Sequence[Any]) -> Dict[str, Any]:
+    """Yol/çalışma sürelerini, dağılımlarını ve kişi bazında saatleri hesapla."""
+
+    travel: List[Optional[float]] = []
+    work: List[Optional[float]] = []
+    person_hours: Dict[str, Dict[str, float]] = {}
+
+    for row in rows:
+        travel_hours, work_hours = row_hours(row)
+        travel.append(travel_hours)
+        work.append(work_hours)
+
+        for field in PERSONEL_FIELDS:
+            person = (row[field] or "").strip()
+            if not person:
+                continue
+            totals = person_hours.setdefault(person, {"travel": 0.0, "work": 0.0})
+            totals["travel"] += travel_hours or 0.0
+            totals["work"] += work_hours or 0.0
+
+    return {
+        "travel": travel,
+        "work": work,
+        "travel_hours": _distribution([value for value in travel if value is not None]),
+        "work_hours": _distribution([value for value in work if value is not None]),
+        "person_hours": {
+            name: {"travel": round(totals["travel"], 2), "work": round(totals["work"], 2)}
+            for name, totals in person_hours.items()
+        },
+    }
+
+
+REPORT_FORM_COLUMNS: Tuple[str, ...] = (
+    "form_no",
+    "gorev_tanimi",
+    "avans",
+    f"{reporting.EXPENSE_COUNT_EXPR} AS expense_count",
+    "yola_cikis_tarih",
+    "yola_cikis_tarih_iso",
+    "yola_cikis_saat",
+    "donus_tarih",
+    "donus_tarih_iso",
+    "donus_saat",
+    "calisma_baslangic_tarih",
+    "calisma_baslangic_tarih_iso",
+    "calisma_baslangic_saat",
+    "calisma_bitis_tarih",
+    "calisma_bitis_tarih_iso",
+    "calisma_bitis_saat",
+    "gorev_yeri",
+    "gorev_il",
+    "gorev_ilce",
+    "gorev_firma",
+    "gorev_tarih",
+    "gorev_tarih_iso",
+) + PERSONEL_FIELDS
+
+REPORT_FORM_ORDER = (
+    " ORDER BY COALESCE(yola_cikis_tarih_iso, gorev_tarih_iso, '') DESC, CAST(form_no AS INTEGER) DESC"
+)
+
+# Grafikte gösterilecek en fazla çubuk; fazlası "Diğer" altında toplanır.
+REPORT_CHART_MAX_BARS = 25
+REPORT_FORMS_MAX_PER_PAGE = 200
+REPORT_BREAKDOWN_LIMIT = 25
+
+
+def report_where(start_iso: Optional[str], end_iso: Optional[str]) -> Tuple[str, List[Any]]:
     filters: List[str] = []
     params: List[Any] = []
 
@@ -703,162 +1211,195 @@ def get_reporting_summary(
     where_clause = ""
     if filters:
         where_clause = " WHERE " + " AND ".join(filters)
+    return where_clause, params
 
-    columns = [
-        "form_no",
-        "gorev_tanimi",
-        "avans",
-        "harcama_bildirimleri",
-        "yola_cikis_tarih",
-        "yola_cikis_tarih_iso",
-        "yola_cikis_saat",
-        "donus_tarih",
-        "donus_tarih_iso",
-        "donus_saat",
-        "calisma_baslangic_tarih",
-        "calisma_baslangic_tarih_iso",
-        "calisma_baslangic_saat",
-        "calisma_bitis_tarih",
-        "calisma_bitis_tarih_iso",
-        "calisma_bitis_saat",
-        "gorev_yeri",
-        "gorev_il",
-        "gorev_ilce",
-        "gorev_firma",
-        "gorev_tarih",
-        "gorev_tarih_iso",
-    ]
-    columns.extend(PERSONEL_FIELDS)
 
-    query = (
-        "SELECT "
-        + ", ".join(columns)
-        + " FROM forms"
-        + where_clause
-        + " ORDER BY COALESCE(yola_cikis_tarih_iso, gorev_tarih_iso, '') DESC, CAST(form_no AS INTEGER) DESC"
-    )
+def _report_form_item(
+    row, travel_hours: Optional[float], work_hours: Optional[float], expense_count: int
+) -> Dict[str, Any]:
+    return {
+        "form_no": row["form_no"],
+        "gorev_tanimi": row["gorev_tanimi"] or "",
+        "personel": [row[field] for field in PERSONEL_FIELDS if row[field]],
+        "travel_hours": travel_hours,
+        "work_hours": work_hours,
+        "expense_count": expense_count,
+        "gorev_il": row["gorev_il"] or "",
+        "gorev_ilce": row["gorev_ilce"] or "",
+        "gorev_firma": row["gorev_firma"] or "",
+        "gorev_yeri": row["gorev_yeri"] or "",
+        "gorev_tarih": row["gorev_tarih"] or "",
+    }
 
-    with get_connection(base_path) as connection:
-        rows = connection.execute(query, tuple(params)).fetchall()
 
-    def _combine_datetime(row, date_key: str, iso_key: str, time_key: str) -> datetime | None:
-        date_iso = row[iso_key] or None
-        if not date_iso:
-            date_iso = _to_iso_date(row[date_key])
-        if not date_iso:
-            return None
-        time_value = (row[time_key] or "").strip()
-        if not time_value:
-            time_value = "00:00"
-        if len(time_value.split(":")) == 2:
-            time_value = f"{time_value}:00"
-        try:
-            return datetime.fromisoformat(f"{date_iso}T{time_value}")
-        except ValueError:
-            return None
+def _top_chart(labels: List[str], values: List[float], limit: int) -> Dict[str, Any]:
+    """Çubuk sayısını ``limit`` ile sınırla; kalan değerleri tek "Diğer" çubuğunda topla."""
 
-    person_counts: Dict[str, int] = {}
-    unique_people: set[str] = set()
-    total_travel_hours = 0.0
-    total_work_hours = 0.0
-    travel_samples = 0
-    work_samples = 0
-    expense_labels: List[str] = []
-    expense_values: List[float] = []
-    location_counter: Dict[Tuple[str, str, str], int] = {}
-    forms_summary: List[Dict[str, Any]] = []
+    if len(labels) <= limit:
+        return {"labels": labels, "values": values, "aggregated": False}
+    ranked = sorted(range(len(values)), key=lambda index: (-values[index], index))
+    keep = ranked[: limit - 1]
+    rest = ranked[limit - 1 :]
+    return {
+        "labels": [labels[index] for index in keep] + [f"Diğer ({len(rest)} form)"],
+        "values": [values[index] for index in keep] + [sum(values[index] for index in rest)],
+        "aggregated": True,
+    }
 
-    for row in rows:
-        personel = [row[field] for field in PERSONEL_FIELDS if row[field]]
-        for person in personel:
-            normalized = person.strip()
-            if not normalized:
-                continue
-            person_counts[normalized] = person_counts.get(normalized, 0) + 1
-            unique_people.add(normalized)
-
-        start_dt = _combine_datetime(row, "yola_cikis_tarih", "yola_cikis_tarih_iso", "yola_cikis_saat")
-        end_dt = _combine_datetime(row, "donus_tarih", "donus_tarih_iso", "donus_saat")
-        travel_hours = None
-        if start_dt and end_dt and end_dt >= start_dt:
-            delta = end_dt - start_dt
-            travel_hours = round(delta.total_seconds() / 3600, 2)
-            total_travel_hours += travel_hours
-            travel_samples += 1
-
-        work_start = _combine_datetime(
-            row,
-            "calisma_baslangic_tarih",
-            "calisma_baslangic_tarih_iso",
-            "calisma_baslangic_saat",
-        )
-        work_end = _combine_datetime(
-            row,
-            "calisma_bitis_tarih",
-            "calisma_bitis_tarih_iso",
-            "calisma_bitis_saat",
-        )
-        work_hours = None
-        if work_start and work_end and work_end >= work_start:
-            delta = work_end - work_start
-            work_hours = round(delta.total_seconds() / 3600, 2)
-            total_work_hours += work_hours
-            work_samples += 1
-
-        expenses_raw = row["harcama_bildirimleri"] or "[]"
-        try:
-            expenses = json.loads(expenses_raw)
-        except (TypeError, json.JSONDecodeError):
-            expenses = []
-        if not isinstance(expenses, list):
-            expenses = []
-        expense_count = len(expenses)
-        expense_labels.append(row["form_no"])
-        expense_values.append(float(expense_count))
 
-        location_key = (
-            (row["gorev_il"] or "").strip(),
-            (row["gorev_ilce"] or "").strip(),
-            (row["gorev_firma"] or "").strip(),
-        )
-        if not any(location_key):
-            location_key = ((row["gorev_yeri"] or "Belirtilmedi").strip(), "", "")
-        location_counter[location_key] = location_counter.get(location_key, 0) + 1
+def get_report_forms_page(
+    *,
+    start_date: str = "",
+    end_date: str = "",
+    page: int = 1,
+    per_page: int = 50,
+    base_path: str = ".",
+) -> Dict[str, Any]:
+    """Rapor tablosundaki formları sayfa sayfa döndür.
 
-        forms_summary.append(
-            {
-                "form_no": row["form_no"],
-                "gorev_tanimi": row["gorev_tanimi"] or "",
-                "personel": personel,
-                "travel_hours": travel_hours,
-                "work_hours": work_hours,
-                "expense_count": expense_count,
-                "gorev_il": row["gorev_il"] or "",
-                "gorev_ilce": row["gorev_ilce"] or "",
-                "gorev_firma": row["gorev_firma"] or "",
-                "gorev_yeri": row["gorev_yeri"] or "",
-                "gorev_tarih": row["gorev_tarih"] or "",
-            }
-        )
+    Yalnızca istenen sayfanın satırları okunur ve süreleri hesaplanır; böylece
+    yanıt boyutu tarih aralığından bağımsız kalır.
+    """
 
-    sorted_persons = sorted(person_counts.items(), key=lambda item: (-item[1], item[0]))
-    person_breakdown = [
-        {"person": name, "count": count}
-        for name, count in sorted_persons
-    ]
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
+    per_page = max(1, min(int(per_page), REPORT_FORMS_MAX_PER_PAGE))
+    page = max(1, int(page))
+    where_clause, params = report_where(start_iso, end_iso)
 
-    sorted_locations = sorted(
-        location_counter.items(),
-        key=lambda item: (-item[1], item[0]),
-    )
-    location_breakdown = [
+    with get_connection(base_path) as connection:
+        count_row = connection.execute(
+            "SELECT COUNT(*) AS total FROM forms" + where_clause, tuple(params)
+        ).fetchone()
+        rows = connection.execute(
+            "SELECT "
+            + ", ".join(REPORT_FORM_COLUMNS)
+            + " FROM forms"
+            + where_clause
+            + REPORT_FORM_ORDER
+            + " LIMIT ? OFFSET ?",
+            tuple(params) + (per_page, (page - 1) * per_page),
+        ).fetchall()
+
+    total = int(count_row["total"] or 0) if count_row else 0
+    durations = _compute_duration_metrics(rows)
+    return {
+        "page": page,
+        "per_page": per_page,
+        "total": total,
+        "pages": max(1, -(-total // per_page)),
+        "items": [
+            _report_form_item(
+                row, durations["travel"][index], durations["work"][index], int(row["expense_count"] or 0)
+            )
+            for index, row in enumerate(rows)
+        ],
+    }
+
+
+def _breakdown_items(rows) -> List[Dict[str, Any]]:
+    return [
         {
-            "label": ", ".join(filter(None, key)).strip() or "Belirtilmedi",
-            "count": count,
+            "label": row["label"],
+            "currency": row["currency"],
+            "count": int(row["expense_count"] or 0),
+            "total": round(float(row["total"] or 0), 2),
+            "average": round(float(row["average"] or 0), 2),
         }
-        for key, count in sorted_locations
+        for row in rows
     ]
 
+
+def compute_expense_breakdown(
+    connection, where_clause: str, params: List[Any]
+) -> Dict[str, Any]:
+    """Harcama tutarlarını para birimi, kişi, firma ve ay bazında SQL ile topla."""
+
+    source = " FROM forms JOIN form_expenses AS e ON e.form_id = forms.id"
+    joined = source + where_clause
+    aggregates = "COUNT(*) AS expense_count, SUM(amount) AS total, AVG(amount) AS average"
+
+    totals = connection.execute(
+        f"""
+        SELECT e.currency AS label, e.currency AS currency,
+               COUNT(*) AS expense_count, SUM(e.amount) AS total, AVG(e.amount) AS average
+        {joined}
+        GROUP BY e.currency
+        ORDER BY total DESC
+        """,
+        tuple(params),
+    ).fetchall()
+
+    firm_label = "COALESCE(NULLIF(TRIM(forms.gorev_firma), ''), 'Belirtilmedi')"
+    by_firm = connection.execute(
+        f"""
+        SELECT label, currency, {aggregates}
+        FROM (SELECT {firm_label} AS label, e.currency, e.amount {joined}) AS firm_expenses
+        GROUP BY label, currency
+        ORDER BY total DESC
+        LIMIT ?
+        """,
+        tuple(params) + (REPORT_BREAKDOWN_LIMIT,),
+    ).fetchall()
+
+    # Her form beş personel sütununa açılır; harcama, formdaki her kişiye
+    # (süre metriklerinde olduğu gibi) tam olarak yazılır.
+    slots = " UNION ALL ".join(f"SELECT {index} AS slot" for index in range(1, len(PERSONEL_FIELDS) + 1))
+    person_case = " ".join(
+        f"WHEN {index} THEN forms.{field}" for index, field in enumerate(PERSONEL_FIELDS, 1)
+    )
+    person_joined = f"{source} CROSS JOIN ({slots}) AS s{where_clause}"
+    by_person = connection.execute(
+        f"""
+        SELECT label, currency, {aggregates}
+        FROM (
+            SELECT TRIM(CASE s.slot {person_case} END) AS label, e.currency, e.amount
+            {person_joined}
+        ) AS person_expenses
+        WHERE label <> ''
+        GROUP BY label, currency
+        ORDER BY total DESC
+        LIMIT ?
+        """,
+        tuple(params) + (REPORT_BREAKDOWN_LIMIT,),
+    ).fetchall()
+
+    month_label = reporting.truncate_date_expr(reporting.FORM_DATE_EXPR, "month")
+    by_month = connection.execute(
+        f"""
+        SELECT label, currency, {aggregates}
+        FROM (SELECT {month_label} AS label, e.currency, e.amount {joined}) AS month_expenses
+        WHERE label IS NOT NULL
+        GROUP BY label, currency
+        ORDER BY label, currency
+        """,
+        tuple(params),
+    ).fetchall()
+
+    return {
+        "totals": _breakdown_items(totals),
+        "by_person": _breakdown_items(by_person),
+        "by_firm": _breakdown_items(by_firm),
+        "by_month": _breakdown_items(by_month),
+    }
+
+
+def form_location_key(row) -> Tuple[str, str, str]:
+    location_key = (
+        (row["gorev_il"] or "").strip(),
+        (row["gorev_ilce"] or "").strip(),
+        (row["gorev_firma"] or "").strip(),
+    )
+    if not any(location_key):
+        location_key = ((row["gorev_yeri"] or "Belirtilmedi").strip(), "", "")
+    return location_key
+
+
+def task_request_metrics(
+    start_iso: Optional[str], end_iso: Optional[str], *, base_path: str
+) -> Tuple[int, int, set[str]]:
+    """(talep sayısı, dönüştürülen talep sayısı, dönüşen form numaraları) döndür."""
+
     request_filters: List[str] = []
     request_params: List[Any] = []
     if start_iso:
@@ -902,10 +1443,54 @@ def get_reporting_summary(
         for row in converted_form_rows
         if row["converted_form_no"]
     }
-    converted_forms_in_summary = sum(
-        1 for form in forms_summary if form["form_no"] in converted_form_nos
+    return total_requests, converted_requests, converted_form_nos
+
+
+def build_summary(
+    *,
+    start_iso: Optional[str],
+    end_iso: Optional[str],
+    total_forms: int,
+    converted_forms: int,
+    person_counts: Dict[str, int],
+    durations: Dict[str, Any],
+    expense_chart: Dict[str, Any],
+    expense_breakdown: Dict[str, Any],
+    location_counter: Dict[Tuple[str, str, str], int],
+    total_requests: int,
+    converted_requests: int,
+    engine_name: str,
+) -> Dict[str, Any]:
+    """Form bazlı toplamlardan rapor özetinin son halini oluştur.
+
+    Tek geçişli motorlar ile ay dilimlerini birleştiren paralel motor aynı
+    yapıyı üretmek için bu fonksiyonu paylaşır.
+    """
+
+    sorted_persons = sorted(person_counts.items(), key=lambda item: (-item[1], item[0]))
+    person_hours = durations["person_hours"]
+    person_breakdown = [
+        {
+            "person": name,
+            "count": count,
+            "travel_hours": person_hours.get(name, {}).get("travel", 0.0),
+            "work_hours": person_hours.get(name, {}).get("work", 0.0),
+        }
+        for name, count in sorted_persons
+    ]
+
+    sorted_locations = sorted(
+        location_counter.items(),
+        key=lambda item: (-item[1], item[0]),
     )
-    direct_forms = max(len(forms_summary) - converted_forms_in_summary, 0)
+    location_breakdown = [
+        {
+            "label": ", ".join(filter(None, key)).strip() or "Belirtilmedi",
+            "count": count,
+        }
+        for key, count in sorted_locations
+    ]
+
     conversion_rate = (
         round((converted_requests / total_requests) * 100, 2)
         if total_requests
@@ -913,24 +1498,13 @@ def get_reporting_summary(
     )
 
     return {
-        "total_forms": len(forms_summary),
-        "unique_person_count": len(unique_people),
+        "total_forms": total_forms,
+        "unique_person_count": len(person_counts),
         "person_breakdown": person_breakdown,
-        "forms": forms_summary,
-        "travel_hours": {
-            "total": round(total_travel_hours, 2),
-            "average": round(total_travel_hours / travel_samples, 2) if travel_samples else 0.0,
-            "samples": travel_samples,
-        },
-        "work_hours": {
-            "total": round(total_work_hours, 2),
-            "average": round(total_work_hours / work_samples, 2) if work_samples else 0.0,
-            "samples": work_samples,
-        },
-        "expense_chart": {
-            "labels": expense_labels,
-            "values": expense_values,
-        },
+        "travel_hours": durations["travel_hours"],
+        "work_hours": durations["work_hours"],
+        "expense_chart": expense_chart,
+        "expenses": expense_breakdown,
         "locations": location_breakdown,
         "task_requests": {
             "total": total_requests,
@@ -938,78 +1512,142 @@ def get_reporting_summary(
             "conversion_rate": conversion_rate,
         },
         "form_origins": {
-            "converted": converted_forms_in_summary,
-            "direct": direct_forms,
+            "converted": converted_forms,
+            "direct": max(total_forms - converted_forms, 0),
         },
         "filters": {
             "start_date": start_iso or "",
             "end_date": end_iso or "",
         },
+        "engine": engine_name,
     }
 
 
-# ------------------------------------------------------------------
-# Excel / PDF export (unchanged)
-# ------------------------------------------------------------------
-
-def _build_excel_workbook(form_no: str, form_data: Dict[str, Any], status: FormStatus) -> Workbook:
-    workbook = Workbook()
-    worksheet = workbook.active
-    worksheet.title = "Görev Formu"
+def _compute_reporting_summary(
+    start_iso: Optional[str],
+    end_iso: Optional[str],
+    *,
+    base_path: str = ".",
+    engine: str = "auto",
+) -> Dict[str, Any]:
+    if engine in {"auto", "parallel"}:
+        from . import report_parallel
+
+        if engine == "parallel" or report_parallel.should_parallelize(
+            start_iso, end_iso, base_path=base_path
+        ):
+            return report_parallel.compute_reporting_summary(
+                start_iso, end_iso, base_path=base_path
+            )
 
-    header_fill = PatternFill(start_color="FFEB3B", end_color="FFEB3B", fill_type="solid")
-    status_fill = (
-        PatternFill(start_color="4CAF50", end_color="4CAF50", fill_type="solid")
-        if status.is_complete
-        else PatternFill(start_color="FF9800", end_color="FF9800", fill_type="solid")
-    )
-    status_value_fill = (
-        PatternFill(start_color="81C784", end_color="81C784", fill_type="solid")
-        if status.is_complete
-        else PatternFill(start_color="FFC107", end_color="FFC107", fill_type="solid")
+    where_clause, params = report_where(start_iso, end_iso)
+    query = (
+        "SELECT "
+        + ", ".join(REPORT_FORM_COLUMNS)
+        + " FROM forms"
+        + where_clause
+        + REPORT_FORM_ORDER
     )
 
-    border = Border(
-        left=Side(style="thin"),
-        right=Side(style="thin"),
-        top=Side(style="thin"),
-        bottom=Side(style="thin"),
-    )
+    with get_connection(base_path) as connection:
+        rows = connection.execute(query, tuple(params)).fetchall()
+        expense_breakdown = compute_expense_breakdown(connection, where_clause, params)
 
-    row_index = 1
-    worksheet[f"A{row_index}"] = "DELTA PROJE - GÖREV FORMU"
-    worksheet[f"A{row_index}"].font = Font(size=16, bold=True, color="D32F2F")
-    worksheet.merge_cells(f"A{row_index}:B{row_index}")
-    row_index += 1
+    durations = _compute_duration_metrics(rows)
 
-    data_map: Sequence[Tuple[str, str]] = [
-        ("Form No", form_no),
-        ("Tarih", form_data.get("tarih", "")),
-        ("Görev Tarihi", form_data.get("gorev_tarih", "")),
-        ("DOK.NO", form_data.get("dok_no", "")),
-        ("REV.NO/TRH", form_data.get("rev_no", "")),
-        ("", ""),
-        ("Görevli Personel", ""),
-    ]
+    person_counts: Dict[str, int] = {}
+    expense_labels: List[str] = []
+    expense_values: List[float] = []
+    location_counter: Dict[Tuple[str, str, str], int] = {}
+    form_nos: List[str] = []
+
+    for row in rows:
+        personel = [row[field] for field in PERSONEL_FIELDS if row[field]]
+        for person in personel:
+            normalized = person.strip()
+            if not normalized:
+                continue
+            person_counts[normalized] = person_counts.get(normalized, 0) + 1
 
-    for label, value in data_map:
-        if label:
-            worksheet[f"A{row_index}"] = label
-            worksheet[f"A{row_index}"].font = Font(bold=True)
-            worksheet[f"A{row_index}"].fill = header_fill
-            worksheet[f"A{row_index}"].border = border
-            worksheet[f"B{row_index}"] = value
-            worksheet[f"B{row_index}"].border = border
-        row_index += 1
+        expense_labels.append(row["form_no"])
+        expense_values.append(float(int(row["expense_count"] or 0)))
+        form_nos.append(row["form_no"])
 
-    for field in PERSONEL_FIELDS:
-        worksheet[f"A{row_index}"] = field.replace("_", " ").title()
-        worksheet[f"A{row_index}"].border = border
-        worksheet[f"B{row_index}"] = form_data.get(field, "")
-        worksheet[f"B{row_index}"].border = border
-        row_index += 1
+        location_key = form_location_key(row)
+        location_counter[location_key] = location_counter.get(location_key, 0) + 1
 
-    row_index += 1
+    total_requests, converted_requests, converted_form_nos = task_request_metrics(
+        start_iso, end_iso, base_path=base_path
+    )
+
+    return build_summary(
+        start_iso=start_iso,
+        end_iso=end_iso,
+        total_forms=len(form_nos),
+        converted_forms=sum(1 for form_no in form_nos if form_no in converted_form_nos),
+        person_counts=person_counts,
+        durations=durations,
+        expense_chart=_top_chart(expense_labels, expense_values, REPORT_CHART_MAX_BARS),
+        expense_breakdown=expense_breakdown,
+        location_counter=location_counter,
+        total_requests=total_requests,
+        converted_requests=converted_requests,
+        engine_name="python",
+    )
+
+
+# ------------------------------------------------------------------
+# Excel / PDF export
+# ------------------------------------------------------------------
+
+# Excel çıktısının düzeni değiştiğinde artırılır (önbellek anahtarlarında kullanılır).
+EXCEL_RENDERER_VERSION = 3
+
+# Hücre biçimleri adlandırılmış stiller olarak her çalışma kitabına kaydedilir;
+# write-only hücreler stile adıyla bağlanır.
+_EXCEL_BORDER = Border(
+    left=Side(style="thin"),
+    right=Side(style="thin"),
+    top=Side(style="thin"),
+    bottom=Side(style="thin"),
+)
+_EXCEL_LABEL_FONT = Font(bold=True)
+# Çok satırlı değerler (yapılan işler, harcamalar, ekler) hücre içinde kaydırılır.
+_EXCEL_VALUE_ALIGNMENT = Alignment(wrap_text=True, vertical="top")
+
+
+def _solid_fill(color: str) -> PatternFill:
+    return PatternFill(start_color=color, end_color=color, fill_type="solid")
+
+
+_EXCEL_STYLE_SPECS: Sequence[Tuple[str, Dict[str, Any]]] = (
+    ("Form Başlık", {"font": Font(size=16, bold=True, color="D32F2F")}),
+    ("Form Etiket", {"font": _EXCEL_LABEL_FONT, "fill": _solid_fill("FFEB3B"), "border": _EXCEL_BORDER}),
+    ("Form Değer", {"font": DEFAULT_FONT, "border": _EXCEL_BORDER, "alignment": _EXCEL_VALUE_ALIGNMENT}),
+    ("Form Durum Tamam", {"font": _EXCEL_LABEL_FONT, "fill": _solid_fill("4CAF50"), "border": _EXCEL_BORDER}),
+    (
+        "Form Durum Tamam Değer",
+        {"font": DEFAULT_FONT, "fill": _solid_fill("81C784"), "border": _EXCEL_BORDER, "alignment": _EXCEL_VALUE_ALIGNMENT},
+    ),
+    ("Form Durum Açık", {"font": _EXCEL_LABEL_FONT, "fill": _solid_fill("FF9800"), "border": _EXCEL_BORDER}),
+    (
+        "Form Durum Açık Değer",
+        {"font": DEFAULT_FONT, "fill": _solid_fill("FFC107"), "border": _EXCEL_BORDER, "alignment": _EXCEL_VALUE_ALIGNMENT},
+    ),
+)
+_EXCEL_STATUS_STYLES = {
+    True: ("Form Durum Tamam", "Form Durum Tamam Değer"),
+    False: ("Form Durum Açık", "Form Durum Açık Değer"),
+}
+
+# Satır türleri: başlıklı (etiket vurgulu), düz (personel), boş ve durum satırı.
+_LABEL, _PLAIN, _BLANK, _STATUS = range(4)
+
+
+def _excel_rows(
+    form_no: str, form_data: Dict[str, Any], status: FormStatus
+) -> List[Tuple[int, str, str]]:
+    """Excel sayfasının (tür, etiket, değer) satırlarını başlık satırı hariç üret."""
 
     def format_datetime(date_key: str, time_key: str) -> str:
         tarih = (form_data.get(date_key) or "").strip()
@@ -1019,80 +1657,107 @@ def _build_excel_workbook(form_no: str, form_data: Dict[str, Any], status: FormS
         return tarih or saat
 
     mola = (form_data.get("mola_suresi") or "").strip()
-    mola_text = f"{mola} dakika" if mola else ""
-    yapilan_isler = (form_data.get("yapilan_isler") or "").strip()
-    attachment_names = []
-    for item in form_data.get("gorev_ekleri", []):
-        if isinstance(item, dict):
-            original = item.get("original_name")
-            if original:
-                attachment_names.append(original)
-    attachments_text = "\n".join(attachment_names)
-
-    expense_lines: List[str] = []
-    for index, expense in enumerate(form_data.get("harcama_bildirimleri", []), 1):
-        if not isinstance(expense, dict):
-            continue
-        description = (expense.get("description") or "Açıklama belirtilmedi").strip() or "Açıklama belirtilmedi"
-        receipt_names: List[str] = []
-        for receipt in expense.get("attachments", []) or []:
-            if isinstance(receipt, dict):
-                name = receipt.get("original_name") or receipt.get("filename")
-                if name:
-                    receipt_names.append(name)
-        if receipt_names:
-            expense_lines.append(f"{index}. {description} (Ekler: {', '.join(receipt_names)})")
-        else:
-            expense_lines.append(f"{index}. {description}")
-    expenses_text = "\n".join(expense_lines)
-
-    detail_map: Sequence[Tuple[str, str]] = [
-        ("Avans Tutarı", form_data.get("avans", "")),
-        ("Taşeron Şirket", form_data.get("taseron", "")),
-        ("Görevin Tanımı", form_data.get("gorev_tanimi", "")),
-        ("Görev Yeri", form_data.get("gorev_yeri", "")),
-        ("Görev İli", form_data.get("gorev_il", "")),
-        ("Görev İlçesi", form_data.get("gorev_ilce", "")),
-        ("Firma/Lokasyon", form_data.get("gorev_firma", "")),
-        ("Yapılan İşler", yapilan_isler),
-        ("Harcama Bildirimleri", expenses_text),
-        ("Ekler", attachments_text),
-        ("", ""),
-        ("Yola Çıkış", format_datetime("yola_cikis_tarih", "yola_cikis_saat")),
-        ("Dönüş", format_datetime("donus_tarih", "donus_saat")),
-        (
-            "Çalışma Başlangıç",
-            format_datetime("calisma_baslangic_tarih", "calisma_baslangic_saat"),
-        ),
-        (
-            "Çalışma Bitiş",
-            format_datetime("calisma_bitis_tarih", "calisma_bitis_saat"),
-        ),
-        ("Toplam Mola", mola_text),
-        ("", ""),
-        ("Araç Plaka No", form_data.get("arac_plaka", "")),
-        ("Hazırlayan", form_data.get("hazirlayan", "")),
-        ("", ""),
-        ("DURUM", status.code),
+    attachment_names = [
+        item["original_name"]
+        for item in form_data.get("gorev_ekleri", [])
+        if isinstance(item, dict) and item.get("original_name")
+    ]
+    expense_lines = [
+        _expense_line(index, expense)
+        for index, expense in enumerate(form_data.get("harcama_bildirimleri", []), 1)
+        if isinstance(expense, dict)
+    ]
+
+    rows: List[Tuple[int, str, str]] = [
+        (_LABEL, "Form No", form_no),
+        (_LABEL, "Tarih", form_data.get("tarih", "")),
+        (_LABEL, "Görev Tarihi", form_data.get("gorev_tarih", "")),
+        (_LABEL, "DOK.NO", form_data.get("dok_no", "")),
+        (_LABEL, "REV.NO/TRH", form_data.get("rev_no", "")),
+        (_BLANK, "", ""),
+        (_LABEL, "Görevli Personel", ""),
     ]
+    rows.extend(
+        (_PLAIN, field.replace("_", " ").title(), form_data.get(field, ""))
+        for field in PERSONEL_FIELDS
+    )
+    rows.extend(
+        [
+            (_BLANK, "", ""),
+            (_LABEL, "Avans Tutarı", form_data.get("avans", "")),
+            (_LABEL, "Taşeron Şirket", form_data.get("taseron", "")),
+            (_LABEL, "Görevin Tanımı", form_data.get("gorev_tanimi", "")),
+            (_LABEL, "Görev Yeri", form_data.get("gorev_yeri", "")),
+            (_LABEL, "Görev İli", form_data.get("gorev_il", "")),
+            (_LABEL, "Görev İlçesi", form_data.get("gorev_ilce", "")),
+            (_LABEL, "Firma/Lokasyon", form_data.get("gorev_firma", "")),
+            (_LABEL, "Yapılan İşler", (form_data.get("yapilan_isler") or "").strip()),
+            (_LABEL, "Harcama Bildirimleri", "\n".join(expense_lines)),
+            (_LABEL, "Ekler", "\n".join(attachment_names)),
+            (_BLANK, "", ""),
+            (_LABEL, "Yola Çıkış", format_datetime("yola_cikis_tarih", "yola_cikis_saat")),
+            (_LABEL, "Dönüş", format_datetime("donus_tarih", "donus_saat")),
+            (
+                _LABEL,
+                "Çalışma Başlangıç",
+                format_datetime("calisma_baslangic_tarih", "calisma_baslangic_saat"),
+            ),
+            (_LABEL, "Çalışma Bitiş", format_datetime("calisma_bitis_tarih", "calisma_bitis_saat")),
+            (_LABEL, "Toplam Mola", f"{mola} dakika" if mola else ""),
+            (_BLANK, "", ""),
+            (_LABEL, "Araç Plaka No", form_data.get("arac_plaka", "")),
+            (_LABEL, "Hazırlayan", form_data.get("hazirlayan", "")),
+            (_BLANK, "", ""),
+            (_STATUS, "DURUM", status.code),
+        ]
+    )
+    return rows
+
 
-    for label, value in detail_map:
-        if label:
-            worksheet[f"A{row_index}"] = label
-            worksheet[f"A{row_index}"].font = Font(bold=True)
-            if label == "DURUM":
-                worksheet[f"A{row_index}"].fill = status_fill
-                worksheet[f"B{row_index}"].fill = status_value_fill
-            else:
-                worksheet[f"A{row_index}"].fill = header_fill
-            worksheet[f"A{row_index}"].border = border
-            worksheet[f"B{row_index}"] = value
-            worksheet[f"B{row_index}"].border = border
-        row_index += 1
+def _form_workbook() -> Tuple[Workbook, Any]:
+    """Stilleri kayıtlı, sütun genişlikleri ve başlık birleştirmesi ayarlı boş form sayfası."""
 
+    workbook = Workbook(write_only=True)
+    for name, parts in _EXCEL_STYLE_SPECS:
+        workbook.add_named_style(NamedStyle(name=name, **parts))
+    worksheet = workbook.create_sheet("Görev Formu")
     worksheet.column_dimensions["A"].width = 25
     worksheet.column_dimensions["B"].width = 60
-    return workbook
+    worksheet.merged_cells.add(CellRange("A1:B1"))
+    return workbook, worksheet
+
+
+def _excel_row_styles(kind: int, status: FormStatus) -> Tuple[str, str]:
+    if kind == _PLAIN:
+        return "Form Değer", "Form Değer"
+    if kind == _STATUS:
+        return _EXCEL_STATUS_STYLES[status.is_complete]
+    return "Form Etiket", "Form Değer"
+
+
+def _render_excel_workbook(form_no: str, form_data: Dict[str, Any], status: FormStatus) -> bytes:
+    """Form sayfasını openpyxl'in write-only API'siyle üret ve XLSX baytlarını döndür."""
+
+    workbook, worksheet = _form_workbook()
+
+    def cell(value: Any, style: str) -> WriteOnlyCell:
+        if isinstance(value, str):
+            value = ILLEGAL_CHARACTERS_RE.sub("", value) or None
+        item = WriteOnlyCell(worksheet, value=value)
+        item.style = style
+        return item
+
+    worksheet.append([cell("DELTA PROJE - GÖREV FORMU", "Form Başlık")])
+    for kind, label, value in _excel_rows(form_no, form_data, status):
+        if kind == _BLANK:
+            worksheet.append([])
+            continue
+        first, second = _excel_row_styles(kind, status)
+        worksheet.append([cell(label, first), cell(value, second)])
+
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
 
 
 def export_form_to_excel(
@@ -1102,89 +1767,57 @@ def export_form_to_excel(
     """Formu Excel dosyası olarak dışa aktar."""
 
     status = determine_form_status(form_data)
-    workbook = _build_excel_workbook(form_no, form_data, status)
-    stream = io.BytesIO()
-    workbook.save(stream)
-    stream.seek(0)
-    return stream
+    return io.BytesIO(_render_excel_workbook(form_no, form_data, status))
 
 
-def export_form_to_pdf(
-    form_no: str,
-    form_data: Dict[str, Any],
-) -> io.BytesIO:
-    """Formu PDF dosyası olarak dışa aktar."""
+# PDF çıktısının düzeni değiştiğinde artırılır (önbellek anahtarlarında kullanılır).
+PDF_RENDERER_VERSION = 2
+
+
+def _datetime_text(form_data: Dict[str, Any], date_key: str, time_key: str) -> str:
+    return f"{form_data.get(date_key, '') or ''} {form_data.get(time_key, '') or ''}".strip()
 
-    status = determine_form_status(form_data)
-    buffer = io.BytesIO()
-    pdf = canvas.Canvas(buffer, pagesize=A4)
-    width, height = A4
 
-    margin = 2 * cm
-    y_position = height - margin
+def draw_form_pdf(layout: PdfLayout, form_no: str, form_data: Dict[str, Any]) -> None:
+    """Formu verilen yerleşimin geçerli konumundan başlayarak çiz.
 
-    pdf.setFillColor(colors.HexColor("#D32F2F"))
-    pdf.setFont("Helvetica-Bold", 16)
-    pdf.drawString(margin, y_position, "DELTA PROJE - GÖREV FORMU")
-    y_position -= 1.2 * cm
+    Uzun alanlar satırlara kaydırılır ve gerektiğinde yeni sayfaya taşar;
+    son sayfanın kapatılması çağırana bırakılır.
+    """
 
-    pdf.setFillColor(colors.black)
-    pdf.setFont("Helvetica-Bold", 10)
-    metadata = [
+    status = determine_form_status(form_data)
+    layout.text("DELTA PROJE - GÖREV FORMU", size=16, bold=True, color=colors.HexColor("#D32F2F"))
+    layout.spacer(0.5 * cm)
+
+    for label, value in (
         ("Form No", form_no),
         ("Tarih", form_data.get("tarih", "")),
         ("Görev Tarihi", form_data.get("gorev_tarih", "")),
         ("DOK.NO", form_data.get("dok_no", "")),
         ("REV.NO/TRH", form_data.get("rev_no", "")),
-    ]
-    for label, value in metadata:
-        pdf.drawString(margin, y_position, f"{label}: ")
-        pdf.setFont("Helvetica", 10)
-        pdf.drawString(margin + 4.5 * cm, y_position, value or "-")
-        pdf.setFont("Helvetica-Bold", 10)
-        y_position -= 0.7 * cm
-
-    y_position -= 0.3 * cm
-
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.setFillColor(colors.HexColor("#0D47A1"))
-    pdf.drawString(margin, y_position, "Görevli Personel")
-    pdf.setFillColor(colors.black)
-    pdf.setFont("Helvetica", 10)
-    y_position -= 0.6 * cm
+    ):
+        layout.field(label, value)
+    layout.spacer(0.3 * cm)
+
+    layout.heading("Görevli Personel")
     for field in PERSONEL_FIELDS:
-        value = form_data.get(field, "") or "-"
-        pdf.drawString(margin + 0.5 * cm, y_position, f"{field.replace('_', ' ').title()}: {value}")
-        y_position -= 0.5 * cm
-
-    y_position -= 0.2 * cm
-    yapilan_isler = (form_data.get("yapilan_isler") or "").strip()
-    attachment_names = []
-    for item in form_data.get("gorev_ekleri", []):
-        if isinstance(item, dict):
-            original = item.get("original_name")
-            if original:
-                attachment_names.append(original)
-    attachments_text = ", ".join(attachment_names)
-
-    expense_lines: List[str] = []
-    for index, expense in enumerate(form_data.get("harcama_bildirimleri", []), 1):
-        if not isinstance(expense, dict):
-            continue
-        description = (expense.get("description") or "Açıklama belirtilmedi").strip() or "Açıklama belirtilmedi"
-        receipt_names: List[str] = []
-        for receipt in expense.get("attachments", []) or []:
-            if isinstance(receipt, dict):
-                name = receipt.get("original_name") or receipt.get("filename")
-                if name:
-                    receipt_names.append(name)
-        if receipt_names:
-            expense_lines.append(f"{index}. {description} (Ekler: {', '.join(receipt_names)})")
-        else:
-            expense_lines.append(f"{index}. {description}")
-    expenses_text = "; ".join(expense_lines)
-
-    sections: Iterable[Tuple[str, str]] = (
+        layout.field(field.replace("_", " ").title(), form_data.get(field, ""), indent=0.5 * cm, label_width=4 * cm)
+    layout.spacer(0.3 * cm)
+
+    attachment_names = [
+        item["original_name"]
+        for item in form_data.get("gorev_ekleri", [])
+        if isinstance(item, dict) and item.get("original_name")
+    ]
+    expense_lines = [
+        _expense_line(index, expense)
+        for index, expense in enumerate(form_data.get("harcama_bildirimleri", []), 1)
+        if isinstance(expense, dict)
+    ]
+    mola = (form_data.get("mola_suresi") or "").strip()
+
+    layout.heading("Görev Bilgileri")
+    for label, value in (
         ("Avans Tutarı", form_data.get("avans", "")),
         ("Taşeron Şirket", form_data.get("taseron", "")),
         ("Görevin Tanımı", form_data.get("gorev_tanimi", "")),
@@ -1192,44 +1825,40 @@ def export_form_to_pdf(
         ("Görev İli", form_data.get("gorev_il", "")),
         ("Görev İlçesi", form_data.get("gorev_ilce", "")),
         ("Firma/Lokasyon", form_data.get("gorev_firma", "")),
-        ("Yapılan İşler", yapilan_isler),
-        ("Harcama Bildirimleri", expenses_text),
-        ("Ekler", attachments_text),
-        ("Yola Çıkış", f"{form_data.get('yola_cikis_tarih', '')} {form_data.get('yola_cikis_saat', '')}".strip()),
-        ("Dönüş", f"{form_data.get('donus_tarih', '')} {form_data.get('donus_saat', '')}".strip()),
-        (
-            "Çalışma Başlangıç",
-            f"{form_data.get('calisma_baslangic_tarih', '')} {form_data.get('calisma_baslangic_saat', '')}".strip(),
-        ),
-        (
-            "Çalışma Bitiş",
-            f"{form_data.get('calisma_bitis_tarih', '')} {form_data.get('calisma_bitis_saat', '')}".strip(),
-        ),
-        ("Toplam Mola", (form_data.get("mola_suresi") or "") + (" dakika" if form_data.get("mola_suresi") else "")),
+        ("Yapılan İşler", (form_data.get("yapilan_isler") or "").strip()),
+        ("Harcama Bildirimleri", "\n".join(expense_lines)),
+        ("Ekler", "\n".join(attachment_names)),
+        ("Yola Çıkış", _datetime_text(form_data, "yola_cikis_tarih", "yola_cikis_saat")),
+        ("Dönüş", _datetime_text(form_data, "donus_tarih", "donus_saat")),
+        ("Çalışma Başlangıç", _datetime_text(form_data, "calisma_baslangic_tarih", "calisma_baslangic_saat")),
+        ("Çalışma Bitiş", _datetime_text(form_data, "calisma_bitis_tarih", "calisma_bitis_saat")),
+        ("Toplam Mola", f"{mola} dakika" if mola else ""),
         ("Araç Plaka No", form_data.get("arac_plaka", "")),
         ("Hazırlayan", form_data.get("hazirlayan", "")),
+    ):
+        layout.field(label, value, indent=0.5 * cm)
+
+    layout.spacer(0.5 * cm)
+    layout.text(
+        f"DURUM: {status.code}",
+        size=12,
+        bold=True,
+        color=colors.HexColor("#4CAF50" if status.is_complete else "#FF9800"),
     )
 
-    pdf.setFont("Helvetica-Bold", 11)
-    pdf.setFillColor(colors.HexColor("#0D47A1"))
-    pdf.drawString(margin, y_position, "Görev Bilgileri")
-    pdf.setFillColor(colors.black)
-    pdf.setFont("Helvetica", 10)
-    y_position -= 0.6 * cm
 
-    for label, value in sections:
-        pdf.drawString(margin + 0.5 * cm, y_position, f"{label}: {value or '-'}")
-        y_position -= 0.5 * cm
-
-    if y_position < margin + 4 * cm:
-        pdf.showPage()
-        y_position = height - margin
-
-    pdf.setFont("Helvetica-Bold", 12)
-    pdf.setFillColor(colors.HexColor("#4CAF50" if status.is_complete else "#FF9800"))
-    pdf.drawString(margin, y_position, f"DURUM: {status.code}")
+def export_form_to_pdf(
+    form_no: str,
+    form_data: Dict[str, Any],
+) -> io.BytesIO:
+    """Formu PDF dosyası olarak dışa aktar."""
 
-    pdf.showPage()
+    buffer = io.BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=A4)
+    pdf.setTitle(f"Görev Formu {form_no}")
+    layout = PdfLayout(pdf, footer=f"Görev Formu {form_no}")
+    draw_form_pdf(layout, form_no, form_data)
+    layout.finish_page()
     pdf.save()
     buffer.seek(0)
     return buffer
@@ -1237,20 +1866,42 @@ def export_form_to_pdf(
 
 __all__ = [
     "DB_FILENAME",
+    "EXCEL_RENDERER_VERSION",
     "FormServiceError",
     "FormStatus",
+    "HOURS_HISTOGRAM_EDGES",
+    "HOURS_HISTOGRAM_LABELS",
+    "build_summary",
+    "combine_datetime",
+    "compute_expense_breakdown",
     "determine_form_status",
+    "draw_form_pdf",
     "export_form_to_excel",
     "export_form_to_pdf",
+    "form_location_key",
+    "format_amount",
     "get_db_path",
     "generate_form_number",
     "get_next_form_no",
+    "get_cached_reporting_summary",
+    "get_report_forms_page",
     "get_reporting_summary",
+    "insert_new_forms",
     "list_distinct_locations",
     "list_distinct_personnel",
     "list_form_numbers",
     "load_form_data",
+    "normalize_expenses",
+    "PDF_RENDERER_VERSION",
+    "parse_amount",
+    "report_where",
+    "row_hours",
     "save_form",
     "save_partial_form",
     "search_forms",
+    "search_where",
+    "task_request_metrics",
+    "to_iso_date",
+    "write_form",
+    "write_person_days",
 ]
@@ -0,0 +1,320 @@
+# -*- coding: utf-8 -*-
+"""Eski ``gorev_formu_XXXXX.xlsx`` arşivlerini veritabanına aktarır.
+
+Web uygulamasından önce her form proje kökünde tek bir Excel dosyası olarak
+saklanıyordu. Bu modül bir klasördeki dosyaları openpyxl salt okunur kipinde
+süreç havuzunda ayrıştırır, A sütunundaki etiket / B sütunundaki değer
+düzenini form verisine geri çevirir ve formları parça parça, her parça tek
+işlemde (transaction) olacak şekilde toplu ekler. Veritabanında zaten bulunan
+form numaraları atlanır; parça yazılırken de aynı işlem içinde yeniden
+denetlendiğinden aktarım sürerken web uygulamasında oluşturulan kayıtların
+üzerine yazılmaz.
+
+Kullanım::
+
+    python -m core.importer /yol/arsiv --workers 4
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from datetime import time as dt_time
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from openpyxl import load_workbook
+
+from .db import get_connection
+from .form_service import (
+    DEFAULT_EXPENSE_CURRENCY,
+    EXPENSE_CURRENCIES,
+    PERSONEL_FIELDS,
+    insert_new_forms,
+    parse_amount,
+)
+
+DEFAULT_CHUNK_SIZE = 200
+FILENAME_PATTERN = re.compile(r"^gorev_formu_(?P<form_no>.+)\.xlsx$", re.IGNORECASE)
+
+# Excel düzenindeki etiket → form alanı (bkz. ``form_service._excel_rows``).
+_LABEL_FIELDS: Dict[str, str] = {
+    "Tarih": "tarih",
+    "Görev Tarihi": "gorev_tarih",
+    "DOK.NO": "dok_no",
+    "REV.NO/TRH": "rev_no",
+    "Avans Tutarı": "avans",
+    "Taşeron Şirket": "taseron",
+    "Görevin Tanımı": "gorev_tanimi",
+    "Görev Yeri": "gorev_yeri",
+    "Görev İli": "gorev_il",
+    "Görev İlçesi": "gorev_ilce",
+    "Firma/Lokasyon": "gorev_firma",
+    "Yapılan İşler": "yapilan_isler",
+    "Araç Plaka No": "arac_plaka",
+    "Hazırlayan": "hazirlayan",
+}
+_LABEL_FIELDS.update({name.replace("_", " ").title(): name for name in PERSONEL_FIELDS})
+
+_DATETIME_FIELDS: Dict[str, Tuple[str, str]] = {
+    "Yola Çıkış": ("yola_cikis_tarih", "yola_cikis_saat"),
+    "Dönüş": ("donus_tarih", "donus_saat"),
+    "Çalışma Başlangıç": ("calisma_baslangic_tarih", "calisma_baslangic_saat"),
+    "Çalışma Bitiş": ("calisma_bitis_tarih", "calisma_bitis_saat"),
+}
+
+_TIME_PATTERN = re.compile(r"^\d{1,2}:\d{2}(?::\d{2})?$")
+_EXPENSE_PATTERN = re.compile(r"^\d+\.\s+(?P<body>.*?)(?: \(Ekler: [^()]*\))?$")
+_AMOUNT_PATTERN = re.compile(r"^(?P<amount>-?[\d.]+(?:,\d+)?) (?P<currency>[A-Z]{3})$")
+_NO_DESCRIPTION = "Açıklama belirtilmedi"
+
+
+@dataclass
+class ImportSummary:
+    """Aktarım sonucu."""
+
+    files: int = 0
+    imported: int = 0
+    skipped_existing: int = 0
+    duplicates: int = 0
+    failed: List[Tuple[str, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    def lines(self) -> List[str]:
+        rate = self.files / self.seconds if self.seconds else 0.0
+        lines = [
+            f"Taranan dosya      : {self.files}",
+            f"Aktarılan form     : {self.imported}",
+            f"Zaten kayıtlı      : {self.skipped_existing}",
+            f"Arşivde tekrar     : {self.duplicates}",
+            f"Hatalı dosya       : {len(self.failed)}",
+            f"Süre               : {self.seconds:.1f} sn ({rate:.0f} dosya/sn)",
+        ]
+        lines.extend(f"  - {os.path.basename(path)}: {error}" for path, error in self.failed)
+        return lines
+
+
+def _cell_text(value: Any) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, datetime):
+        if value.time() == dt_time(0, 0):
+            return value.strftime("%d.%m.%Y")
+        return value.strftime("%d.%m.%Y %H:%M")
+    if isinstance(value, date):
+        return value.strftime("%d.%m.%Y")
+    if isinstance(value, dt_time):
+        return value.strftime("%H:%M")
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value).strip()
+
+
+def _split_datetime(text: str) -> Tuple[str, str]:
+    if _TIME_PATTERN.match(text):
+        return "", text
+    date_part, _, time_part = text.rpartition(" ")
+    if date_part and _TIME_PATTERN.match(time_part):
+        return date_part.strip(), time_part
+    return text, ""
+
+
+def _parse_expense_line(line: str) -> Optional[Dict[str, Any]]:
+    match = _EXPENSE_PATTERN.match(line.strip())
+    if match is None:
+        return None
+    body = match.group("body").strip()
+    description, category, amount, currency = body, "", None, DEFAULT_EXPENSE_CURRENCY
+    # Kategori ve tutar yalnızca sonda "<tutar> <para birimi>" varsa ayrılır; eski
+    # şablonda bu sütunlar yoktu ve "Otel - Ankara şubesi" gibi açıklamalar bölünmemeli.
+    head, separator, details = body.rpartition(" - ")
+    if separator:
+        parts = details.split(" / ")
+        amount_match = _AMOUNT_PATTERN.match(parts[-1])
+        if amount_match and amount_match.group("currency") in EXPENSE_CURRENCIES:
+            amount = parse_amount(amount_match.group("amount"))
+            currency = amount_match.group("currency")
+            description, category = head, " / ".join(parts[:-1])
+    if description == _NO_DESCRIPTION:
+        description = ""
+    return {
+        "description": description,
+        "amount": amount,
+        "currency": currency,
+        "category": category,
+        "attachments": [],
+    }
+
+
+def form_data_from_cells(cells: Sequence[Tuple[str, str]]) -> Tuple[str, Dict[str, Any]]:
+    """(etiket, değer) çiftlerinden (form no, form verisi) üret."""
+
+    form_no = ""
+    form_data: Dict[str, Any] = {field_name: "" for field_name in PERSONEL_FIELDS}
+    form_data["gorev_ekleri"] = []
+    form_data["harcama_bildirimleri"] = []
+    for label, value in cells:
+        if label == "Form No":
+            form_no = value
+        elif label in _LABEL_FIELDS:
+            form_data[_LABEL_FIELDS[label]] = value
+        elif label in _DATETIME_FIELDS:
+            date_key, time_key = _DATETIME_FIELDS[label]
+            form_data[date_key], form_data[time_key] = _split_datetime(value)
+        elif label == "Toplam Mola":
+            form_data["mola_suresi"] = value.replace("dakika", "").strip()
+        elif label == "Harcama Bildirimleri":
+            # Fiş dosyaları arşivde bulunmadığından yalnızca harcama satırları aktarılır.
+            form_data["harcama_bildirimleri"] = [
+                expense
+                for expense in (_parse_expense_line(line) for line in value.splitlines())
+                if expense is not None
+            ]
+    return form_no, form_data
+
+
+def _filename_form_no(path: str) -> str:
+    match = FILENAME_PATTERN.match(os.path.basename(path))
+    if match is None:
+        return ""
+    form_no = match.group("form_no")
+    return form_no.zfill(5) if form_no.isdigit() else form_no
+
+
+def parse_workbook(path: str) -> Tuple[str, str, Optional[Dict[str, Any]], str]:
+    """Dosyayı ayrıştır: (yol, form no, form verisi, hata). İşçi süreçte çalışır."""
+
+    try:
+        workbook = load_workbook(path, read_only=True, data_only=True)
+        try:
+            cells = [
+                (_cell_text(label), _cell_text(value))
+                for label, value in workbook.worksheets[0].iter_rows(
+                    min_row=2, max_col=2, values_only=True
+                )
+                if label is not None
+            ]
+        finally:
+            workbook.close()
+        form_no, form_data = form_data_from_cells(cells)
+    except Exception as exc:
+        return path, "", None, str(exc) or exc.__class__.__name__
+
+    if not form_no:
+        form_no = _filename_form_no(path)
+    if form_no.isdigit():
+        form_no = form_no.zfill(5)
+    if not form_no:
+        return path, "", None, "Form numarası bulunamadı."
+    return path, form_no, form_data, ""
+
+
+def find_archive_files(directory: str) -> List[str]:
+    return sorted(
+        os.path.join(directory, name)
+        for name in os.listdir(directory)
+        if FILENAME_PATTERN.match(name) and not name.startswith("~$")
+    )
+
+
+def _parsed_files(paths: Sequence[str], workers: int) -> Iterator[Tuple[str, str, Optional[Dict[str, Any]], str]]:
+    workers = min(workers, len(paths))
+    if workers <= 1:
+        for path in paths:
+            yield parse_workbook(path)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(parse_workbook, paths, chunksize=max(1, min(64, len(paths) // (workers * 8))))
+
+
+def _write_chunk(connection, chunk: Sequence[Tuple[str, Dict[str, Any]]]) -> int:
+    """Parçayı tek işlemde ekle; aktarım sırasında kaydedilen formlar atlanır."""
+
+    inserted = insert_new_forms(connection, chunk)
+    connection.commit()
+    return len(inserted)
+
+
+def _record_chunk(summary: ImportSummary, size: int, inserted: int) -> None:
+    summary.imported += inserted
+    summary.skipped_existing += size - inserted
+
+
+def import_directory(
+    directory: str,
+    *,
+    base_path: str = ".",
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+) -> ImportSummary:
+    """Klasördeki arşiv dosyalarını aktar ve özet döndür."""
+
+    started = time.perf_counter()
+    paths = find_archive_files(directory)
+    summary = ImportSummary(files=len(paths))
+    workers = workers or os.cpu_count() or 1
+
+    with get_connection(base_path) as connection:
+        seen: Set[str] = {row["form_no"] for row in connection.execute("SELECT form_no FROM forms").fetchall()}
+        existing = set(seen)
+        # Dosya adındaki numarası zaten kayıtlı olan dosyalar hiç açılmaz.
+        pending = [path for path in paths if _filename_form_no(path) not in existing]
+        summary.skipped_existing = len(paths) - len(pending)
+        chunk: List[Tuple[str, Dict[str, Any]]] = []
+        for path, form_no, form_data, error in _parsed_files(pending, workers):
+            if form_data is None:
+                summary.failed.append((path, error))
+                continue
+            if form_no in seen:
+                if form_no in existing:
+                    summary.skipped_existing += 1
+                else:
+                    summary.duplicates += 1
+                continue
+            seen.add(form_no)
+            chunk.append((form_no, form_data))
+            if len(chunk) >= chunk_size:
+                _record_chunk(summary, len(chunk), _write_chunk(connection, chunk))
+                chunk = []
+        if chunk:
+            _record_chunk(summary, len(chunk), _write_chunk(connection, chunk))
+
+    summary.seconds = time.perf_counter() - started
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Eski gorev_formu_XXXXX.xlsx arşivlerini veritabanına aktarır.")
+    parser.add_argument("directory", help="Excel dosyalarının bulunduğu klasör")
+    parser.add_argument("--workers", type=int, default=None, help="Ayrıştırma süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="İşlem başına form sayısı")
+    parser.add_argument("--base-path", default=".", help="Veritabanı klasörü (DATA_FOLDER tanımlı değilse)")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.directory):
+        parser.error(f"Klasör bulunamadı: {args.directory}")
+    summary = import_directory(
+        args.directory,
+        base_path=args.base_path,
+        workers=args.workers,
+        chunk_size=max(1, args.chunk_size),
+    )
+    print("\n".join(summary.lines()))
+    return 1 if summary.failed else 0
+
+
+__all__ = [
+    "ImportSummary",
+    "find_archive_files",
+    "form_data_from_cells",
+    "import_directory",
+    "main",
+    "parse_workbook",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,507 @@
+# -*- coding: utf-8 -*-
+"""Analiz için Parquet anlık görüntüsü (isteğe bağlı, pyarrow gerektirir).
+
+Formlar, form personeli, harcamalar ve görev talepleri tipli sütunlarla
+(tarihler ``date``, zamanlar ``timestamp``, süreler ve tutarlar ``float``)
+Parquet dosyalarına yazılır. Satırlar sunucu tarafı imleçten okunur ve
+``row_group_size`` satırlık satır grupları halinde yazılır; bellekte tablo
+başına en fazla bir satır grubu tutulur.
+
+Çıktı dizini tablo başına bir klasördür; yıla göre bölümlemede
+``<tablo>/year=2024/part-<çalışma>.parquet`` (Hive düzeni) kullanılır ve
+``pyarrow.dataset`` ya da DuckDB ile doğrudan okunabilir. Artımlı çalışmada
+yalnızca son çalışmadan bu yana ``updated_at`` değeri değişen formlar ve
+talepler yeni ``part`` dosyalarına eklenir; pencere ``[önceki kesim, kesim)``
+aralığı olduğundan satırlar kaçmaz ya da iki kez yazılmaz. Güncellenen bir
+kaydın yeni hali ayrı bir dosyada yer alır: analizde her anahtar için en yeni
+``updated_at`` (personel/harcama için ``form_updated_at``) alınmalıdır.
+
+Kullanım::
+
+    python -m core.parquet_snapshot /yol/snapshot --partition-year --incremental
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow isteğe bağlıdır
+    pa = None
+    pq = None
+
+from .db import get_connection
+from .form_service import PERSONEL_FIELDS, combine_datetime, parse_amount, row_hours
+
+SNAPSHOT_TABLES: Tuple[str, ...] = ("forms", "personnel", "expenses", "task_requests")
+ROW_GROUP_SIZE = 10_000
+FETCH_BATCH_SIZE = 1000
+SNAPSHOT_DIRNAME = "snapshots"
+STATE_FILENAME = "_snapshot_state.json"
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+EPOCH = "1970-01-01 00:00:00"
+
+
+class SnapshotError(Exception):
+    """Anlık görüntü alınamadı."""
+
+
+def is_available() -> bool:
+    return pa is not None
+
+
+def snapshot_dir(base_path: str = ".") -> str:
+    """Yönetici ekranından alınan görüntülerin sunucuda biriktiği klasör."""
+
+    configured = os.environ.get("PARQUET_SNAPSHOT_DIR", "").strip()
+    if configured:
+        return configured
+    data_folder = os.environ.get("DATA_FOLDER", "").strip()
+    return os.path.join(data_folder or base_path, SNAPSHOT_DIRNAME)
+
+
+def _date(value: Any) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value)[:10]) if value else None
+    except ValueError:
+        return None
+
+
+def _timestamp(value: Any) -> Optional[datetime]:
+    if isinstance(value, datetime):
+        return value.replace(tzinfo=None)
+    try:
+        return datetime.fromisoformat(str(value)) if value else None
+    except ValueError:
+        return None
+
+
+def _text(value: Any) -> Optional[str]:
+    return None if value is None else str(value)
+
+
+def _year(*values: Any) -> Optional[int]:
+    for value in values:
+        parsed = _date(value)
+        if parsed is not None:
+            return parsed.year
+    return None
+
+
+_FORM_WINDOW = "updated_at >= ? AND updated_at < ?"
+
+_FORM_QUERY = (
+    "SELECT * FROM forms WHERE " + _FORM_WINDOW + " ORDER BY updated_at, id"
+)
+
+_EXPENSE_QUERY = """
+    SELECT e.id, e.form_id, e.position, e.description, e.amount, e.currency, e.category,
+           f.form_no, f.updated_at AS form_updated_at, f.created_at AS form_created_at,
+           COALESCE(f.yola_cikis_tarih_iso, f.gorev_tarih_iso, f.tarih_iso) AS report_date
+    FROM form_expenses AS e
+    JOIN forms AS f ON f.id = e.form_id
+    WHERE f.updated_at >= ? AND f.updated_at < ?
+    ORDER BY f.updated_at, e.form_id, e.position
+"""
+
+_TASK_REQUEST_QUERY = (
+    "SELECT * FROM task_requests WHERE " + _FORM_WINDOW + " ORDER BY updated_at, id"
+)
+
+
+def _form_records(row) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    travel_hours, work_hours = row_hours(row)
+    mola = parse_amount(row["mola_suresi"])
+    report_date = _date(row["yola_cikis_tarih_iso"] or row["gorev_tarih_iso"])
+    yield _year(report_date, row["tarih_iso"], row["created_at"]), {
+        "id": row["id"],
+        "form_no": row["form_no"],
+        "tarih": _date(row["tarih_iso"]),
+        "gorev_tarih": _date(row["gorev_tarih_iso"]),
+        "report_date": report_date,
+        "dok_no": row["dok_no"],
+        "rev_no": row["rev_no"],
+        "avans": parse_amount(row["avans"]),
+        "taseron": row["taseron"],
+        "gorev_tanimi": row["gorev_tanimi"],
+        "gorev_yeri": row["gorev_yeri"],
+        "gorev_il": row["gorev_il"],
+        "gorev_ilce": row["gorev_ilce"],
+        "gorev_firma": row["gorev_firma"],
+        "yapilan_isler": row["yapilan_isler"],
+        "yola_cikis": combine_datetime(row, "yola_cikis_tarih", "yola_cikis_tarih_iso", "yola_cikis_saat"),
+        "donus": combine_datetime(row, "donus_tarih", "donus_tarih_iso", "donus_saat"),
+        "calisma_baslangic": combine_datetime(
+            row, "calisma_baslangic_tarih", "calisma_baslangic_tarih_iso", "calisma_baslangic_saat"
+        ),
+        "calisma_bitis": combine_datetime(
+            row, "calisma_bitis_tarih", "calisma_bitis_tarih_iso", "calisma_bitis_saat"
+        ),
+        "travel_hours": travel_hours,
+        "work_hours": work_hours,
+        "break_minutes": mola,
+        "arac_plaka": row["arac_plaka"],
+        "hazirlayan": row["hazirlayan"],
+        "durum": (row["durum"] or "YARIM").upper(),
+        "assigned_to_user_id": row["assigned_to_user_id"],
+        "created_at": _timestamp(row["created_at"]),
+        "updated_at": _timestamp(row["updated_at"]),
+    }
+
+
+def _personnel_records(row) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    year = _year(row["yola_cikis_tarih_iso"] or row["gorev_tarih_iso"], row["tarih_iso"], row["created_at"])
+    updated_at = _timestamp(row["updated_at"])
+    for position, field_name in enumerate(PERSONEL_FIELDS, 1):
+        person = (row[field_name] or "").strip()
+        if person:
+            yield year, {
+                "form_id": row["id"],
+                "form_no": row["form_no"],
+                "position": position,
+                "person": person,
+                "form_updated_at": updated_at,
+            }
+
+
+def _expense_records(row) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    yield _year(row["report_date"], row["form_created_at"]), {
+        "id": row["id"],
+        "form_id": row["form_id"],
+        "form_no": row["form_no"],
+        "position": row["position"],
+        "description": row["description"],
+        "amount": float(row["amount"]) if row["amount"] is not None else None,
+        "currency": row["currency"],
+        "category": row["category"],
+        "form_updated_at": _timestamp(row["form_updated_at"]),
+    }
+
+
+def _task_request_records(row) -> Iterator[Tuple[Optional[int], Dict[str, Any]]]:
+    yield _year(row["created_at"]), {
+        "id": row["id"],
+        "customer_name": row["customer_name"],
+        "customer_phone": row["customer_phone"],
+        "customer_email": row["customer_email"],
+        "customer_address": row["customer_address"],
+        "request_description": row["request_description"],
+        "requirements": row["requirements"],
+        "urgency": row["urgency"],
+        "requested_by_user_id": row["requested_by_user_id"],
+        "status": row["status"],
+        "notes": row["notes"],
+        "assigned_to_user_id": row["assigned_to_user_id"],
+        "converted_form_no": row["converted_form_no"],
+        "created_at": _timestamp(row["created_at"]),
+        "updated_at": _timestamp(row["updated_at"]),
+        "converted_at": _timestamp(row["converted_at"]),
+    }
+
+
+@dataclass(frozen=True)
+class _Table:
+    query: str
+    records: Callable[[Any], Iterator[Tuple[Optional[int], Dict[str, Any]]]]
+    fields: Tuple[Tuple[str, str], ...]
+
+
+_STRING, _INT, _FLOAT, _DATE, _TIMESTAMP = "string", "int64", "float64", "date", "timestamp"
+
+_TABLES: Dict[str, _Table] = {
+    "forms": _Table(
+        _FORM_QUERY,
+        _form_records,
+        (
+            ("id", _INT),
+            ("form_no", _STRING),
+            ("tarih", _DATE),
+            ("gorev_tarih", _DATE),
+            ("report_date", _DATE),
+            ("dok_no", _STRING),
+            ("rev_no", _STRING),
+            ("avans", _FLOAT),
+            ("taseron", _STRING),
+            ("gorev_tanimi", _STRING),
+            ("gorev_yeri", _STRING),
+            ("gorev_il", _STRING),
+            ("gorev_ilce", _STRING),
+            ("gorev_firma", _STRING),
+            ("yapilan_isler", _STRING),
+            ("yola_cikis", _TIMESTAMP),
+            ("donus", _TIMESTAMP),
+            ("calisma_baslangic", _TIMESTAMP),
+            ("calisma_bitis", _TIMESTAMP),
+            ("travel_hours", _FLOAT),
+            ("work_hours", _FLOAT),
+            ("break_minutes", _FLOAT),
+            ("arac_plaka", _STRING),
+            ("hazirlayan", _STRING),
+            ("durum", _STRING),
+            ("assigned_to_user_id", _INT),
+            ("created_at", _TIMESTAMP),
+            ("updated_at", _TIMESTAMP),
+        ),
+    ),
+    "personnel": _Table(
+        _FORM_QUERY,
+        _personnel_records,
+        (
+            ("form_id", _INT),
+            ("form_no", _STRING),
+            ("position", _INT),
+            ("person", _STRING),
+            ("form_updated_at", _TIMESTAMP),
+        ),
+    ),
+    "expenses": _Table(
+        _EXPENSE_QUERY,
+        _expense_records,
+        (
+            ("id", _INT),
+            ("form_id", _INT),
+            ("form_no", _STRING),
+            ("position", _INT),
+            ("description", _STRING),
+            ("amount", _FLOAT),
+            ("currency", _STRING),
+            ("category", _STRING),
+            ("form_updated_at", _TIMESTAMP),
+        ),
+    ),
+    "task_requests": _Table(
+        _TASK_REQUEST_QUERY,
+        _task_request_records,
+        (
+            ("id", _INT),
+            ("customer_name", _STRING),
+            ("customer_phone", _STRING),
+            ("customer_email", _STRING),
+            ("customer_address", _STRING),
+            ("request_description", _STRING),
+            ("requirements", _STRING),
+            ("urgency", _STRING),
+            ("requested_by_user_id", _INT),
+            ("status", _STRING),
+            ("notes", _STRING),
+            ("assigned_to_user_id", _INT),
+            ("converted_form_no", _STRING),
+            ("created_at", _TIMESTAMP),
+            ("updated_at", _TIMESTAMP),
+            ("converted_at", _TIMESTAMP),
+        ),
+    ),
+}
+
+
+def _schema(table: _Table):
+    types = {
+        _STRING: pa.string(),
+        _INT: pa.int64(),
+        _FLOAT: pa.float64(),
+        _DATE: pa.date32(),
+        _TIMESTAMP: pa.timestamp("ms"),
+    }
+    return pa.schema([(name, types[kind]) for name, kind in table.fields])
+
+
+class _PartitionWriter:
+    """Satırları bölüm (yıl) başına tamponlayıp satır grupları halinde yazar."""
+
+    def __init__(self, directory: str, schema, run_id: str, partitioned: bool, row_group_size: int) -> None:
+        self.directory = directory
+        self.schema = schema
+        self.run_id = run_id
+        self.partitioned = partitioned
+        self.row_group_size = row_group_size
+        self.rows = 0
+        self.files: List[str] = []
+        self._buffers: Dict[Optional[int], Dict[str, List[Any]]] = {}
+        self._writers: Dict[Optional[int], Any] = {}
+
+    def add(self, year: Optional[int], record: Dict[str, Any]) -> None:
+        key = year if self.partitioned else None
+        buffer = self._buffers.get(key)
+        if buffer is None:
+            buffer = self._buffers[key] = {name: [] for name in self.schema.names}
+        for name, column in buffer.items():
+            column.append(record[name])
+        if len(buffer[self.schema.names[0]]) >= self.row_group_size:
+            self._flush(key)
+
+    def _flush(self, key: Optional[int]) -> None:
+        buffer = self._buffers.pop(key, None)
+        if not buffer or not buffer[self.schema.names[0]]:
+            return
+        writer = self._writers.get(key)
+        if writer is None:
+            directory = self.directory
+            if self.partitioned:
+                directory = os.path.join(directory, f"year={NULL_PARTITION if key is None else key}")
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, f"part-{self.run_id}.parquet")
+            writer = self._writers[key] = pq.ParquetWriter(path, self.schema, compression="zstd")
+            self.files.append(path)
+        batch = pa.Table.from_pydict(buffer, schema=self.schema)
+        writer.write_table(batch, row_group_size=self.row_group_size)
+        self.rows += batch.num_rows
+
+    def close(self, *, keep_schema: bool = False) -> None:
+        for key in list(self._buffers):
+            self._flush(key)
+        if keep_schema and not self.files:
+            # Boş tam görüntüde de şemanın okunabilmesi için boş bir dosya yazılır.
+            os.makedirs(self.directory, exist_ok=True)
+            path = os.path.join(self.directory, f"part-{self.run_id}.parquet")
+            pq.write_table(self.schema.empty_table(), path, compression="zstd")
+            self.files.append(path)
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+def _load_state(output_dir: str) -> Dict[str, Any]:
+    try:
+        with open(os.path.join(output_dir, STATE_FILENAME), "r", encoding="utf-8") as handle:
+            return json.load(handle)
+    except FileNotFoundError:
+        return {}
+
+
+def _save_state(output_dir: str, state: Dict[str, Any]) -> None:
+    path = os.path.join(output_dir, STATE_FILENAME)
+    temp_path = path + ".tmp"
+    with open(temp_path, "w", encoding="utf-8") as handle:
+        json.dump(state, handle, ensure_ascii=False, indent=2)
+    os.replace(temp_path, path)
+
+
+def write_snapshot(
+    output_dir: str,
+    *,
+    tables: Sequence[str] = SNAPSHOT_TABLES,
+    incremental: bool = False,
+    partition_by_year: bool = False,
+    row_group_size: int = ROW_GROUP_SIZE,
+    base_path: str = ".",
+    now: Optional[datetime] = None,
+) -> Dict[str, Any]:
+    """Seçilen tabloları ``output_dir`` altına Parquet olarak yaz ve özet döndür.
+
+    Artımlı çalışmada önceki kesim zamanından bu yana değişen kayıtlar eklenir;
+    önceki çalışma yoksa tam görüntü alınır. Tam görüntü, ilgili tablonun
+    klasörünü baştan yazar.
+    """
+
+    if not is_available():
+        raise SnapshotError("Parquet dışa aktarımı için pyarrow kurulu olmalıdır (pip install pyarrow).")
+    unknown = [name for name in tables if name not in _TABLES]
+    if unknown or not tables:
+        raise SnapshotError(f"Bilinmeyen tablo: {', '.join(unknown) or '-'}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    table_states: Dict[str, Any] = _load_state(output_dir).get("tables", {})
+    if incremental:
+        for name in tables:
+            previous = table_states.get(name)
+            if previous and bool(previous.get("partition_by_year")) != partition_by_year:
+                raise SnapshotError(
+                    f"{name}: artımlı çalışmada bölümleme önceki görüntüyle aynı olmalıdır."
+                )
+
+    # Kesim, saniye hassasiyetindeki ``updated_at`` ile karşılaştırılır; bu
+    # saniyede yazılan kayıtlar bir sonraki çalışmaya kalır.
+    cutoff_at = (now or datetime.now(timezone.utc)).astimezone(timezone.utc).replace(tzinfo=None)
+    cutoff = cutoff_at.strftime(TIMESTAMP_FORMAT)
+    run_id = cutoff_at.strftime("%Y%m%dT%H%M%S")
+
+    summary: Dict[str, Any] = {"cutoff": cutoff, "incremental": incremental, "tables": {}}
+    with get_connection(base_path) as connection:
+        for name in tables:
+            table = _TABLES[name]
+            since = (table_states.get(name) or {}).get("cutoff") if incremental else None
+            table_dir = os.path.join(output_dir, name)
+            if not since:
+                # Klasör silinmeden önce durum kaydı da silinir; yarıda kalan
+                # tam görüntüden sonra artımlı çalışma eksik veri üzerine eklemez.
+                if table_states.pop(name, None) is not None:
+                    _save_state(output_dir, {"tables": table_states})
+                shutil.rmtree(table_dir, ignore_errors=True)
+            writer = _PartitionWriter(table_dir, _schema(table), run_id, partition_by_year, row_group_size)
+            try:
+                rows = connection.iter_rows(table.query, (since or EPOCH, cutoff), batch_size=FETCH_BATCH_SIZE)
+                for row in rows:
+                    for year, record in table.records(row):
+                        writer.add(year, record)
+                writer.close(keep_schema=not since)
+            except BaseException:
+                # Yarım dosyalar bırakılmaz; durum değişmediğinden yeniden deneme
+                # aynı aralığı baştan yazar.
+                writer.close()
+                for path in writer.files:
+                    os.remove(path)
+                raise
+            table_states[name] = {"cutoff": cutoff, "partition_by_year": partition_by_year}
+            _save_state(output_dir, {"tables": table_states})
+            summary["tables"][name] = {
+                "since": since,
+                "rows": writer.rows,
+                "files": [os.path.relpath(path, output_dir) for path in writer.files],
+            }
+
+    return summary
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Formları ve talepleri Parquet anlık görüntüsü olarak dışa aktarır.")
+    parser.add_argument("output_dir", help="Parquet dosyalarının yazılacağı klasör")
+    parser.add_argument("--tables", nargs="+", default=list(SNAPSHOT_TABLES), choices=SNAPSHOT_TABLES)
+    parser.add_argument("--incremental", action="store_true", help="Yalnızca son çalışmadan beri değişenleri ekle")
+    parser.add_argument("--partition-year", action="store_true", help="Dosyaları yıl klasörlerine böl")
+    parser.add_argument("--row-group-size", type=int, default=ROW_GROUP_SIZE)
+    parser.add_argument("--base-path", default=".", help="Veritabanı klasörü (DATA_FOLDER tanımlı değilse)")
+    args = parser.parse_args(argv)
+
+    try:
+        summary = write_snapshot(
+            args.output_dir,
+            tables=args.tables,
+            incremental=args.incremental,
+            partition_by_year=args.partition_year,
+            row_group_size=max(1, args.row_group_size),
+            base_path=args.base_path,
+        )
+    except SnapshotError as exc:
+        parser.error(str(exc))
+    for name, info in summary["tables"].items():
+        print(f"{name:14} {info['rows']:>8} satır  {len(info['files'])} dosya  (başlangıç: {info['since'] or 'tam'})")
+    print(f"Kesim zamanı (UTC): {summary['cutoff']}")
+    return 0
+
+
+__all__ = [
+    "ROW_GROUP_SIZE",
+    "SNAPSHOT_TABLES",
+    "STATE_FILENAME",
+    "SnapshotError",
+    "is_available",
+    "main",
+    "snapshot_dir",
+    "write_snapshot",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,295 @@
+# -*- coding: utf-8 -*-
+"""Bir tarih aralığındaki formların tek PDF kitapçığı olarak dışa aktarımı.
+
+Kitapçık tek bir reportlab tuvali üzerinde tek geçişte üretilir: başta
+içindekiler sayfaları, ardından her form yeni bir sayfadan başlayarak
+``draw_form_pdf`` ile çizilir. Yazı tipleri süreç başına bir kez kaydedilir ve
+belgeye bir kez gömülür; form başına ayrı PDF üretmeye göre dosya belirgin
+biçimde küçüktür.
+
+Formların sayfa numaraları çizim bitene kadar bilinmediğinden her içindekiler
+sayfasındaki numara sütunu bir PDF form nesnesine (XObject) bırakılır ve nesne belge
+kaydedilmeden hemen önce tanımlanır. Satırlar ilgili forma bağlantı içerir ve
+her form belge ana hattına (bookmark) eklenir.
+
+Form verileri veritabanından birer birer okunur ve çizildikten sonra bırakılır.
+reportlab tuvali normalde tüm sayfaları ``save()`` çağrısına kadar bellekte
+tutar ve belgeyi bellekte birleştirip yazar. Kitapçıkta her formun sayfaları
+kapanır kapanmaz içerik akışlarıyla birlikte doğrudan çıktıya yazılır
+(``_flush_pages``); içindekiler sayfaları, ana hat ve kalan nesneler
+``_finish_document`` ile en sonda eklenir. Bellekte form başına yalnızca nesne
+tablosu girdileri, içindekiler satırı ve ana hat girdisi kalır (8000 formda
+tepe bellek ~28 MiB; ``benchmarks/bench_booklet.py``).
+"""
+from __future__ import annotations
+
+import tempfile
+import time
+from datetime import datetime
+from typing import Any, BinaryIO, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfgen import canvas
+
+from .bulk_export import PROGRESS_INTERVAL_SECONDS
+from .export_cache import load_export_data
+from .form_service import draw_form_pdf, search_forms
+from .pdf_layout import LINE_SPACING, PdfLayout, wrap_text
+
+STREAM_CHUNK_SIZE = 64 * 1024
+TOC_FONT_SIZE = 9
+TITLE_FONT_SIZE = 16
+
+_TOC_PAGE_COLUMN = 1.5 * cm
+
+
+class BookletError(Exception):
+    """Kitapçık oluşturulamadı."""
+
+
+def booklet_entries(
+    *,
+    person: str = "",
+    location: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> List[Dict[str, Any]]:
+    """Filtrelere uyan formları kitapçık sırasıyla (yola çıkış tarihi, form no) döndür."""
+
+    entries = search_forms(
+        person=person,
+        location=location,
+        start_date=start_date,
+        end_date=end_date,
+        base_path=base_path,
+    )
+    if not entries:
+        raise BookletError("Kriterlere uygun form bulunamadı.")
+    entries.sort(key=lambda item: (item.get("yola_cikis_tarih_iso") or "", item["form_no"]))
+    return entries
+
+
+def _toc_label(entry: Dict[str, Any]) -> str:
+    parts = [
+        entry["form_no"],
+        entry.get("yola_cikis_tarih") or entry.get("tarih") or "-",
+        entry.get("gorev_yeri") or "-",
+        ", ".join(entry.get("personel") or []) or "-",
+    ]
+    return "   ".join(parts)
+
+
+def _bookmark_key(form_no: str) -> str:
+    return f"form_{form_no}"
+
+
+def _draw_toc(
+    layout: PdfLayout, title: str, entries: Sequence[Dict[str, Any]]
+) -> List[Tuple[int, List[Tuple[float, str]]]]:
+    """İçindekileri çiz; sayfa başına (sayfa, [(y, form no)]) listesi döndür."""
+
+    pdf = layout.pdf
+    leading = TOC_FONT_SIZE * LINE_SPACING
+    label_width = layout.content_width - _TOC_PAGE_COLUMN
+    layout.text(title, size=TITLE_FONT_SIZE, bold=True, color=colors.HexColor("#D32F2F"))
+    layout.text(f"İçindekiler · {len(entries)} form", size=10, bold=True)
+    layout.spacer(0.5 * cm)
+
+    pages: List[Tuple[int, List[Tuple[float, str]]]] = []
+    for entry in entries:
+        layout.ensure_space(leading)
+        if not pages or pages[-1][0] != layout.page:
+            pages.append((layout.page, []))
+            pdf.doForm(f"toc_{layout.page}")
+        label = wrap_text(_toc_label(entry), layout.font_name, TOC_FONT_SIZE, label_width)[0]
+        pdf.setFillColor(colors.black)
+        pdf.setFont(layout.font_name, TOC_FONT_SIZE)
+        pdf.drawString(layout.margin, layout.y, label)
+        pdf.linkRect(
+            "",
+            _bookmark_key(entry["form_no"]),
+            (layout.margin, layout.y - 2, layout.width - layout.margin, layout.y + TOC_FONT_SIZE),
+            relative=0,
+        )
+        pages[-1][1].append((layout.y, entry["form_no"]))
+        layout.y -= leading
+    return pages
+
+
+class _OutputFile(pdfdoc.PDFFile):
+    """Yazılanı biriktirmek yerine doğrudan çıktıya yazan ``PDFFile``."""
+
+    def __init__(self, output: BinaryIO, pdf_version: Any) -> None:
+        self.write = output.write
+        self.offset = 0
+        self.add(pdfdoc.PDFFile(pdf_version).format(None))
+
+
+def _write_object(doc: pdfdoc.PDFDocument, out: _OutputFile, oid: str) -> None:
+    """Nesneyi çıktıya yaz ve belgedeki kopyasını bırak; referansları numarasıyla çözülmeye devam eder."""
+
+    doc.idToOffset[oid] = out.add(pdfdoc.PDFIndirectObject(oid, doc.idToObject[oid]).format(doc))
+    doc.idToObject[oid] = None
+
+
+def _flush_pages(pdf: canvas.Canvas, out: _OutputFile, start: int) -> int:
+    """``start`` sırasından itibaren kapanmış sayfaları içerikleriyle birlikte çıktıya yaz.
+
+    Sayfa ağacında yalnızca sayfanın referansı kalır. Sonraki çağrı için ilk
+    yazılmamış sayfanın sırasını döndürür.
+    """
+
+    doc = pdf._doc
+    pages = doc.Pages.pages
+    for index in range(start, len(pages)):
+        page = pages[index]
+        name = getattr(page, "__InternalName__")
+        _write_object(doc, out, name)
+        _write_object(doc, out, doc.Reference(page.Contents).name)
+        pages[index] = pdfdoc.PDFObjectReference(name)
+    return len(pages)
+
+
+def _finish_document(pdf: canvas.Canvas, out: _OutputFile) -> None:
+    """``Canvas.save`` yerine kalan nesneleri, çapraz referans tablosunu ve sonlandırıcıyı yaz.
+
+    ``PDFDocument.GetPDFData`` ve ``PDFDocument.format`` ile aynı adımları
+    izler; önceden yazılmış nesneler atlanır ve çıktı bellekte birleştirilmez.
+    """
+
+    if len(pdf._code):
+        pdf.showPage()
+    doc = pdf._doc
+    for font in doc.delayedFonts:
+        font.addObjects(doc)
+    doc.info.invariant = doc.invariant
+    doc.info.digest(doc.signature)
+    doc.Reference(doc.Catalog)
+    doc.Reference(doc.info)
+    doc.Outlines.prepare(doc, pdf)
+    if doc.Outlines.ready < 0:
+        doc.Catalog.Outlines = None
+    encrypt_info = doc.encrypt.info()
+    encrypt_ref = doc.Reference(encrypt_info) if encrypt_info else None
+
+    ids = []
+    counter = 1
+    # Biçimlendirme sırasında yeni nesneler eklenebilir; numaralar tükenene kadar devam edilir.
+    while counter in doc.numberToId:
+        oid = doc.numberToId[counter]
+        if oid not in doc.idToOffset:
+            _write_object(doc, out, oid)
+        ids.append(oid)
+        counter += 1
+    xref = pdfdoc.PDFCrossReferenceTable()
+    xref.addsection(0, ids)
+    xref_offset = out.add(xref.format(doc))
+    trailer = pdfdoc.PDFTrailer(
+        startxref=xref_offset,
+        Size=len(ids) + 1,
+        Root=doc.Reference(doc.Catalog),
+        Info=doc.Reference(doc.info),
+        Encrypt=encrypt_ref,
+        ID=doc.ID(),
+    )
+    out.add(trailer.format(doc))
+
+
+def write_booklet(
+    entries: Sequence[Dict[str, Any]],
+    output: BinaryIO,
+    *,
+    title: str = "Görev Formları",
+    base_path: str = ".",
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> int:
+    """Formları ``output`` dosyasına tek PDF olarak yaz ve toplam sayfa sayısını döndür.
+
+    ``on_progress`` en fazla ``PROGRESS_INTERVAL_SECONDS`` aralıkla çizilen form
+    sayısıyla çağrılır.
+    """
+
+    pdf = canvas.Canvas(output, pagesize=A4, pageCompression=1)
+    pdf.setTitle(title)
+    pdf._doc.encrypt.prepare(pdf._doc)
+    out = _OutputFile(output, pdf._doc._pdfVersion)
+    layout = PdfLayout(pdf, footer=title)
+    # İçindekiler sayfaları bağlantıları ve sayfa numaraları çözülene kadar bellekte kalır.
+    toc_pages = _draw_toc(layout, title, entries)
+
+    start_pages: Dict[str, int] = {}
+    flushed: Optional[int] = None
+    last_progress = time.monotonic()
+    for index, entry in enumerate(entries, 1):
+        form_no = entry["form_no"]
+        layout.new_page()
+        flushed = len(pdf._doc.Pages.pages) if flushed is None else _flush_pages(pdf, out, flushed)
+        layout.footer = f"{title} · Form {form_no}"
+        key = _bookmark_key(form_no)
+        pdf.bookmarkPage(key)
+        pdf.addOutlineEntry(f"{form_no} · {entry.get('gorev_yeri') or '-'}", key, level=0)
+        start_pages[form_no] = layout.page
+        draw_form_pdf(layout, form_no, load_export_data(form_no, base_path=base_path))
+        if on_progress is not None and time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+            on_progress(index)
+            last_progress = time.monotonic()
+    layout.finish_page()
+    if flushed is not None:
+        _flush_pages(pdf, out, flushed)
+
+    # İçindekiler sayfalarındaki numara sütunları artık bilinen sayfalarla doldurulur.
+    for page, lines in toc_pages:
+        pdf.beginForm(f"toc_{page}")
+        pdf.setFillColor(colors.black)
+        pdf.setFont(layout.font_name, TOC_FONT_SIZE)
+        for y, form_no in lines:
+            pdf.drawRightString(layout.width - layout.margin, y, str(start_pages[form_no]))
+        pdf.endForm()
+    _finish_document(pdf, out)
+    if on_progress is not None:
+        on_progress(len(entries))
+    return layout.page
+
+
+def stream_booklet(
+    entries: Sequence[Dict[str, Any]],
+    *,
+    title: str = "Görev Formları",
+    base_path: str = ".",
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[bytes]:
+    """Kitapçığı geçici dosyaya üretip ``STREAM_CHUNK_SIZE`` parçalar halinde akıt."""
+
+    with tempfile.TemporaryFile() as handle:
+        write_booklet(entries, handle, title=title, base_path=base_path, on_progress=on_progress)
+        handle.seek(0)
+        while True:
+            chunk = handle.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                break
+            yield chunk
+
+
+def booklet_title(start_date: str = "", end_date: str = "") -> str:
+    if start_date or end_date:
+        return f"Görev Formları {start_date or '…'} – {end_date or '…'}"
+    return f"Görev Formları ({datetime.now().strftime('%d.%m.%Y')})"
+
+
+def booklet_filename(start_date: str = "", end_date: str = "") -> str:
+    label = "_".join(part for part in (start_date, end_date) if part) or "tumu"
+    return f"gorev_formlari_kitapcik_{label}.pdf"
+
+
+__all__ = [
+    "BookletError",
+    "booklet_entries",
+    "booklet_filename",
+    "booklet_title",
+    "stream_booklet",
+    "write_booklet",
+]
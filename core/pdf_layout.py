@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""PDF çıktıları için satır kaydırmalı, sayfa taşmalı basit yerleşim motoru.
+
+``PdfLayout`` bir reportlab tuvali üzerinde yukarıdan aşağı akar: metinler
+sütun genişliğine göre kelime kelime kaydırılır, alt kenar boşluğuna gelindiğinde
+yeni sayfaya geçilir ve her sayfaya altbilgi yazılır.
+
+Türkçe karakterleri kapsayan TTF yazı tipi süreç başına bir kez kaydedilir
+(``register_fonts``). Sırasıyla ``PDF_FONT_PATH``/``PDF_FONT_BOLD_PATH``,
+sistemdeki DejaVu Sans ve reportlab ile gelen Bitstream Vera denenir.
+Kelime genişlikleri sınırlı bir önbellekte tutulur; tekrar eden kelimeler
+yeniden ölçülmez.
+"""
+from __future__ import annotations
+
+import os
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+import reportlab
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfbase import pdfmetrics
+from reportlab.pdfbase.ttfonts import TTFError, TTFont
+from reportlab.pdfgen import canvas
+
+FONT_NAME = "FormSans"
+BOLD_FONT_NAME = "FormSans-Bold"
+
+LINE_SPACING = 1.3
+FOOTER_FONT_SIZE = 8
+HEADING_COLOR = colors.HexColor("#0D47A1")
+FOOTER_COLOR = colors.HexColor("#757575")
+
+_SYSTEM_FONT_DIRS = (
+    "/usr/share/fonts/truetype/dejavu",
+    "/usr/share/fonts/dejavu",
+    "/usr/share/fonts/TTF",
+    "/Library/Fonts",
+    "C:\\Windows\\Fonts",
+)
+_BUNDLED_FONT_DIR = os.path.join(os.path.dirname(reportlab.__file__), "fonts")
+
+
+def _font_candidates() -> List[Tuple[str, str]]:
+    candidates: List[Tuple[str, str]] = []
+    configured = os.environ.get("PDF_FONT_PATH", "").strip()
+    if configured:
+        bold = os.environ.get("PDF_FONT_BOLD_PATH", "").strip() or configured
+        candidates.append((configured, bold))
+    for directory in _SYSTEM_FONT_DIRS:
+        candidates.append(
+            (os.path.join(directory, "DejaVuSans.ttf"), os.path.join(directory, "DejaVuSans-Bold.ttf"))
+        )
+    candidates.append(
+        (os.path.join(_BUNDLED_FONT_DIR, "Vera.ttf"), os.path.join(_BUNDLED_FONT_DIR, "VeraBd.ttf"))
+    )
+    return candidates
+
+
+@lru_cache(maxsize=1)
+def register_fonts() -> Tuple[str, str]:
+    """Yazı tiplerini kaydet ve (normal, kalın) adlarını döndür.
+
+    İlk çağrıdan sonra sonuç önbellekten döner; işçi süreçler başlarken
+    çağrılarak ilk PDF isteğindeki yükleme maliyeti önlenebilir. Hiçbir TTF
+    yüklenemezse yerleşik Helvetica kullanılır.
+    """
+
+    for regular, bold in _font_candidates():
+        if not os.path.isfile(regular):
+            continue
+        try:
+            pdfmetrics.registerFont(TTFont(FONT_NAME, regular))
+            pdfmetrics.registerFont(
+                TTFont(BOLD_FONT_NAME, bold if os.path.isfile(bold) else regular)
+            )
+        except TTFError:
+            continue
+        return FONT_NAME, BOLD_FONT_NAME
+    return "Helvetica", "Helvetica-Bold"
+
+
+@lru_cache(maxsize=16384)
+def _word_width(word: str, font_name: str, size: float) -> float:
+    return pdfmetrics.stringWidth(word, font_name, size)
+
+
+def wrap_text(text: str, font_name: str, size: float, max_width: float) -> List[str]:
+    """Metni ``max_width`` genişliğine sığan satırlara böl.
+
+    Açık satır sonları korunur; sütuna sığmayan tek kelime karakter
+    düzeyinde bölünür.
+    """
+
+    space = _word_width(" ", font_name, size)
+    lines: List[str] = []
+    for paragraph in str(text).splitlines() or [""]:
+        current: List[str] = []
+        current_width = 0.0
+        for word in paragraph.split():
+            width = _word_width(word, font_name, size)
+            if width > max_width:
+                if current:
+                    lines.append(" ".join(current))
+                    current, current_width = [], 0.0
+                pieces = _split_word(word, font_name, size, max_width)
+                lines.extend(pieces[:-1])
+                word = pieces[-1]
+                width = _word_width(word, font_name, size)
+            if current and current_width + space + width > max_width:
+                lines.append(" ".join(current))
+                current, current_width = [], 0.0
+            current_width += (space if current else 0.0) + width
+            current.append(word)
+        lines.append(" ".join(current))
+    return lines
+
+
+def _split_word(word: str, font_name: str, size: float, max_width: float) -> List[str]:
+    pieces: List[str] = []
+    start = 0
+    for end in range(1, len(word) + 1):
+        if end - start > 1 and pdfmetrics.stringWidth(word[start:end], font_name, size) > max_width:
+            pieces.append(word[start : end - 1])
+            start = end - 1
+    pieces.append(word[start:])
+    return pieces
+
+
+class PdfLayout:
+    """Bir tuval üzerinde yukarıdan aşağı akan metin yerleşimi."""
+
+    def __init__(
+        self,
+        pdf: canvas.Canvas,
+        *,
+        page_size: Tuple[float, float] = A4,
+        margin: float = 2 * cm,
+        footer: str = "",
+    ) -> None:
+        self.pdf = pdf
+        self.width, self.height = page_size
+        self.margin = margin
+        self.footer = footer
+        self.font_name, self.bold_font_name = register_fonts()
+        self.page = 1
+        self.y = self.height - margin
+
+    @property
+    def content_width(self) -> float:
+        return self.width - 2 * self.margin
+
+    @property
+    def bottom(self) -> float:
+        return self.margin + FOOTER_FONT_SIZE * 2
+
+    def _draw_footer(self) -> None:
+        label = f"{self.footer} · Sayfa {self.page}" if self.footer else f"Sayfa {self.page}"
+        self.pdf.setFillColor(FOOTER_COLOR)
+        self.pdf.setFont(self.font_name, FOOTER_FONT_SIZE)
+        self.pdf.drawRightString(self.width - self.margin, self.margin / 2, label)
+
+    def new_page(self) -> None:
+        self._draw_footer()
+        self.pdf.showPage()
+        self.page += 1
+        self.y = self.height - self.margin
+
+    def ensure_space(self, height: float) -> None:
+        """Kalan alan ``height`` için yetmiyorsa yeni sayfaya geç."""
+
+        if self.y - height < self.bottom:
+            self.new_page()
+
+    def spacer(self, height: float) -> None:
+        self.y -= height
+
+    def text(
+        self,
+        text: str,
+        *,
+        size: float = 10,
+        bold: bool = False,
+        color: colors.Color = colors.black,
+        indent: float = 0.0,
+    ) -> None:
+        """Metni kaydırarak yaz; satırlar gerektiğinde sonraki sayfaya taşar."""
+
+        font_name = self.bold_font_name if bold else self.font_name
+        leading = size * LINE_SPACING
+        for line in wrap_text(text, font_name, size, self.content_width - indent):
+            self.ensure_space(leading)
+            self.pdf.setFillColor(color)
+            self.pdf.setFont(font_name, size)
+            self.pdf.drawString(self.margin + indent, self.y, line)
+            self.y -= leading
+
+    def heading(self, text: str, *, size: float = 11, color: colors.Color = HEADING_COLOR) -> None:
+        """Bölüm başlığı; altında en az bir satırlık yer yoksa yeni sayfada başlar."""
+
+        self.ensure_space(size * LINE_SPACING * 3)
+        self.text(text, size=size, bold=True, color=color)
+        self.spacer(size * 0.25)
+
+    def field(
+        self,
+        label: str,
+        value: Optional[str],
+        *,
+        size: float = 10,
+        indent: float = 0.0,
+        label_width: float = 4.5 * cm,
+    ) -> None:
+        """Kalın etiket ve sağındaki kaydırılmış değerden oluşan iki sütunlu satır."""
+
+        leading = size * LINE_SPACING
+        gutter = 0.2 * cm
+        value_x = self.margin + indent + label_width
+        label_lines = wrap_text(label, self.bold_font_name, size, label_width - gutter)
+        value_lines = wrap_text(
+            str(value) if value not in (None, "") else "-",
+            self.font_name,
+            size,
+            self.width - self.margin - value_x,
+        )
+        for index in range(max(len(label_lines), len(value_lines))):
+            self.ensure_space(leading)
+            self.pdf.setFillColor(colors.black)
+            if index < len(label_lines):
+                self.pdf.setFont(self.bold_font_name, size)
+                self.pdf.drawString(self.margin + indent, self.y, label_lines[index])
+            if index < len(value_lines):
+                self.pdf.setFont(self.font_name, size)
+                self.pdf.drawString(value_x, self.y, value_lines[index])
+            self.y -= leading
+
+    def finish_page(self) -> None:
+        """Son sayfanın altbilgisini yaz ve sayfayı kapat."""
+
+        self._draw_footer()
+        self.pdf.showPage()
+
+
+__all__ = [
+    "BOLD_FONT_NAME",
+    "FONT_NAME",
+    "PdfLayout",
+    "register_fonts",
+    "wrap_text",
+]
@@ -0,0 +1,284 @@
+# -*- coding: utf-8 -*-
+"""Form kayıt defteri: filtrelere uyan her form için tek satırlık liste.
+
+Muhasebe için dönem bazında tüm formları (tarih, personel, lokasyon, süreler,
+avans, harcamalar, durum) XLSX ya da CSV olarak üretir. Satırlar veritabanından
+sunucu tarafı imleçle parça parça okunur; her parçanın harcama toplamları tek
+bir sorguyla alınır. CSV üretildiği anda satır satır akıtılır; XLSX openpyxl
+write-only kipinde geçici dosyaya yazılıp ardından parça parça gönderilir.
+Böylece on binlerce satırlık bir dönem de sabit bellekle indirilir.
+"""
+from __future__ import annotations
+
+import csv
+import io
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+from .bulk_export import PROGRESS_INTERVAL_SECONDS
+from .db import Connection, get_connection
+from .form_service import (
+    DEFAULT_EXPENSE_CURRENCY,
+    PERSONEL_FIELDS,
+    REPORT_FORM_COLUMNS,
+    SEARCH_FORM_ORDER,
+    format_amount,
+    parse_amount,
+    row_hours,
+    search_where,
+)
+
+REGISTER_FORMATS: Tuple[str, ...] = ("xlsx", "csv")
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+CSV_MIMETYPE = "text/csv"
+FETCH_BATCH_SIZE = 500
+STREAM_ROWS_PER_CHUNK = 200
+STREAM_CHUNK_BYTES = 64 * 1024
+
+REGISTER_COLUMNS: Tuple[Tuple[str, int], ...] = (
+    ("Form No", 10),
+    ("Tarih", 12),
+    ("Görev Tarihi", 12),
+    ("Yola Çıkış", 17),
+    ("Dönüş", 17),
+    ("Görevli Personel", 32),
+    ("Görev Yeri", 24),
+    ("İl", 14),
+    ("İlçe", 14),
+    ("Firma", 24),
+    ("Yol Süresi (sa)", 12),
+    ("Çalışma Süresi (sa)", 12),
+    ("Mola (dk)", 10),
+    ("Avans", 12),
+    ("Harcama Adedi", 10),
+    ("Harcama Toplamı", 28),
+    ("Durum", 14),
+)
+REGISTER_HEADERS: Tuple[str, ...] = tuple(title for title, _ in REGISTER_COLUMNS)
+
+_SELECT_COLUMNS = ("id", "tarih", "avans", "mola_suresi", "durum") + tuple(
+    column for column in REPORT_FORM_COLUMNS if column not in {"avans"} and " AS " not in column
+)
+_HEADER_STYLE = "Kayıt Başlık"
+
+
+def _batched(rows: Iterable[Any], size: int) -> Iterator[List[Any]]:
+    batch: List[Any] = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _expense_summaries(connection: Connection, form_ids: Sequence[int]) -> Dict[int, Tuple[int, str]]:
+    """Form kimliği → (harcama adedi, para birimi bazında toplamlar)."""
+
+    placeholders = ", ".join("?" for _ in form_ids)
+    rows = connection.execute(
+        f"""
+        SELECT form_id, currency, COUNT(*) AS count, SUM(amount) AS total
+        FROM form_expenses
+        WHERE form_id IN ({placeholders})
+        GROUP BY form_id, currency
+        ORDER BY form_id, currency
+        """,
+        tuple(form_ids),
+    ).fetchall()
+    summaries: Dict[int, Tuple[int, List[str]]] = {}
+    for row in rows:
+        count, totals = summaries.get(row["form_id"], (0, []))
+        if row["total"] is not None:
+            totals.append(format_amount(float(row["total"]), row["currency"] or DEFAULT_EXPENSE_CURRENCY))
+        summaries[row["form_id"]] = (count + int(row["count"] or 0), totals)
+    return {form_id: (count, "; ".join(totals)) for form_id, (count, totals) in summaries.items()}
+
+
+def _joined(row, date_key: str, time_key: str) -> str:
+    return f"{row[date_key] or ''} {row[time_key] or ''}".strip()
+
+
+def _register_row(row, expenses: Optional[Tuple[int, str]]) -> List[Any]:
+    travel_hours, work_hours = row_hours(row)
+    expense_count, expense_total = expenses or (0, "")
+    mola = parse_amount(row["mola_suresi"])
+    avans = parse_amount(row["avans"])
+    return [
+        row["form_no"],
+        row["tarih"] or "",
+        row["gorev_tarih"] or "",
+        _joined(row, "yola_cikis_tarih", "yola_cikis_saat"),
+        _joined(row, "donus_tarih", "donus_saat"),
+        ", ".join(row[field] for field in PERSONEL_FIELDS if row[field]),
+        row["gorev_yeri"] or "",
+        row["gorev_il"] or "",
+        row["gorev_ilce"] or "",
+        row["gorev_firma"] or "",
+        travel_hours,
+        work_hours,
+        (int(mola) if mola.is_integer() else mola) if mola is not None else (row["mola_suresi"] or ""),
+        avans if avans is not None else (row["avans"] or ""),
+        expense_count,
+        expense_total,
+        (row["durum"] or "YARIM").upper(),
+    ]
+
+
+def count_register_rows(
+    *,
+    person: str = "",
+    location: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> int:
+    """Arama filtrelerine uyan form sayısı (kayıt defterinin satır sayısı)."""
+
+    where_clause, params = search_where(
+        person=person, location=location, start_date=start_date, end_date=end_date
+    )
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            f"SELECT COUNT(*) AS total FROM forms{where_clause}", tuple(params)
+        ).fetchone()
+    return int(row["total"] or 0) if row else 0
+
+
+def iter_register_rows(
+    *,
+    person: str = "",
+    location: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[List[Any]]:
+    """Arama filtrelerine uyan formları ``REGISTER_HEADERS`` sırasıyla satır satır üret.
+
+    ``on_progress`` her parçadan sonra, en fazla ``PROGRESS_INTERVAL_SECONDS``
+    aralıkla üretilen satır sayısıyla; son olarak da toplam satır sayısıyla
+    çağrılır.
+    """
+
+    where_clause, params = search_where(
+        person=person, location=location, start_date=start_date, end_date=end_date
+    )
+    query = "SELECT " + ", ".join(_SELECT_COLUMNS) + " FROM forms" + where_clause + SEARCH_FORM_ORDER
+    done = 0
+    last_progress = time.monotonic()
+    with get_connection(base_path) as connection:
+        rows = connection.iter_rows(query, tuple(params), batch_size=FETCH_BATCH_SIZE)
+        for batch in _batched(rows, FETCH_BATCH_SIZE):
+            expenses = _expense_summaries(connection, [row["id"] for row in batch])
+            for row in batch:
+                yield _register_row(row, expenses.get(row["id"]))
+            done += len(batch)
+            if on_progress is not None and time.monotonic() - last_progress >= PROGRESS_INTERVAL_SECONDS:
+                on_progress(done)
+                last_progress = time.monotonic()
+    if on_progress is not None:
+        on_progress(done)
+
+
+def stream_register_csv(rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Satırları UTF-8 (BOM'lu, Excel uyumlu) CSV parçaları olarak akıt."""
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write("\ufeff")
+    writer.writerow(REGISTER_HEADERS)
+    for index, row in enumerate(rows, 1):
+        writer.writerow(["" if value is None else value for value in row])
+        if index % STREAM_ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode("utf-8")
+
+
+def _register_workbook() -> Tuple[Workbook, Any]:
+    """Başlık stili, sütun genişlikleri ve başlık satırı yazılmış write-only çalışma kitabı."""
+
+    workbook = Workbook(write_only=True)
+    workbook.add_named_style(
+        NamedStyle(
+            name=_HEADER_STYLE,
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="0D47A1", end_color="0D47A1", fill_type="solid"),
+        )
+    )
+    sheet = workbook.create_sheet("Form Kayıtları")
+    sheet.freeze_panes = "A2"
+    for index, (_, width) in enumerate(REGISTER_COLUMNS, 1):
+        sheet.column_dimensions[get_column_letter(index)].width = width
+    cells = []
+    for title in REGISTER_HEADERS:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.style = _HEADER_STYLE
+        cells.append(cell)
+    sheet.append(cells)
+    return workbook, sheet
+
+
+def stream_register_xlsx(rows: Iterable[Sequence[Any]]) -> Iterator[bytes]:
+    """Satırları openpyxl write-only ile geçici dosyaya yaz, ardından dosyayı parça parça akıt."""
+
+    workbook, sheet = _register_workbook()
+    for row in rows:
+        sheet.append([None if value == "" else value for value in row])
+    with tempfile.TemporaryFile() as handle:
+        workbook.save(handle)
+        handle.seek(0)
+        while True:
+            chunk = handle.read(STREAM_CHUNK_BYTES)
+            if not chunk:
+                break
+            yield chunk
+
+
+def stream_register(
+    file_format: str,
+    *,
+    person: str = "",
+    location: str = "",
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+    on_progress: Optional[Callable[[int], None]] = None,
+) -> Iterator[bytes]:
+    """Kayıt defterini ``xlsx`` ya da ``csv`` olarak akıtan bir yineleyici döndür."""
+
+    if file_format not in REGISTER_FORMATS:
+        raise ValueError(f"Desteklenmeyen kayıt defteri biçimi: {file_format}")
+    rows = iter_register_rows(
+        person=person,
+        location=location,
+        start_date=start_date,
+        end_date=end_date,
+        base_path=base_path,
+        on_progress=on_progress,
+    )
+    if file_format == "csv":
+        return stream_register_csv(rows)
+    return stream_register_xlsx(rows)
+
+
+__all__ = [
+    "CSV_MIMETYPE",
+    "REGISTER_FORMATS",
+    "REGISTER_HEADERS",
+    "XLSX_MIMETYPE",
+    "count_register_rows",
+    "iter_register_rows",
+    "stream_register",
+    "stream_register_csv",
+    "stream_register_xlsx",
+]
@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+"""Rapor sonuçları için veritabanı tabanlı, işçiler arası paylaşılan önbellek.
+
+Önbellek anahtarı rapor parametreleri ile ``data_version`` sayacından oluşur.
+Formlar, atamalar ve görev talepleri değiştiğinde sayaç artırılır; böylece
+eski sonuçlar bir sonraki okumada kendiliğinden geçersiz sayılır.
+
+İsabetler yalnızca okuma yapar: isabet/ıskalama sayaçları ve girdilerin son
+erişim zamanları süreç içinde biriktirilir ve bir ıskalamanın yazma işlemiyle
+birlikte, ``STATS_FLUSH_EVENTS`` olaya ya da ``STATS_FLUSH_SECONDS`` süreye
+ulaşıldığında veya istatistik okunurken toplu olarak yazılır.
+"""
+from __future__ import annotations
+
+import atexit
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .db import Connection, get_connection
+
+REPORT_CACHE_NAME = "report"
+STATS_FLUSH_EVENTS = 100
+STATS_FLUSH_SECONDS = 30.0
+
+
+@dataclass
+class _PendingWrites:
+    """Bir veritabanı için henüz yazılmamış sayaçlar ve son erişim zamanları."""
+
+    counts: Dict[str, List[int]] = field(default_factory=dict)
+    accessed: Dict[str, float] = field(default_factory=dict)
+    events: int = 0
+    since: float = field(default_factory=time.monotonic)
+
+
+_pending_lock = threading.Lock()
+_pending: Dict[str, _PendingWrites] = {}
+
+
+def _max_entries() -> int:
+    raw = os.environ.get("REPORT_CACHE_MAX_ENTRIES", "64")
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return 64
+
+
+def bump_data_version(connection: Connection) -> None:
+    """Rapor verisini etkileyen bir yazma işleminde veri sürümünü artır.
+
+    Çağıran tarafın açık bağlantısı kullanılır; böylece sayaç, değişikliği
+    yapan işlemle aynı transaction içinde kalıcı hale gelir.
+    """
+
+    connection.execute("UPDATE data_version SET version = version + 1 WHERE id = 1")
+
+
+def get_data_version(connection: Connection) -> int:
+    row = connection.execute("SELECT version FROM data_version WHERE id = 1").fetchone()
+    return int(row["version"] or 0) if row else 0
+
+
+def _write_counts(connection: Connection, name: str, hits: int, misses: int) -> None:
+    result = connection.execute(
+        "UPDATE cache_stats SET hits = hits + ?, misses = misses + ? WHERE name = ?",
+        (hits, misses, name),
+    )
+    if result.rowcount == 0:
+        connection.execute(
+            "INSERT INTO cache_stats (name, hits, misses) VALUES (?, ?, ?)",
+            (name, hits, misses),
+        )
+
+
+def _take_pending(base_path: str) -> Optional[_PendingWrites]:
+    with _pending_lock:
+        return _pending.pop(base_path, None)
+
+
+def _write_pending(connection: Connection, pending: Optional[_PendingWrites]) -> None:
+    """Biriken sayaçları ve erişim zamanlarını çağıranın işlemine yaz (commit etmez)."""
+
+    if pending is None:
+        return
+    for name, (hits, misses) in pending.counts.items():
+        _write_counts(connection, name, hits, misses)
+    if pending.accessed:
+        connection.executemany(
+            "UPDATE report_cache SET last_accessed = ? WHERE cache_key = ? AND last_accessed < ?",
+            [(accessed, key, accessed) for key, accessed in pending.accessed.items()],
+        )
+
+
+def flush_cache_stats(*, base_path: str = ".") -> None:
+    """Bu süreçte biriken sayaçları ve erişim zamanlarını tek işlemde yaz."""
+
+    pending = _take_pending(base_path)
+    if pending is None:
+        return
+    with get_connection(base_path) as connection:
+        _write_pending(connection, pending)
+        connection.commit()
+
+
+@atexit.register
+def _flush_all() -> None:
+    with _pending_lock:
+        base_paths = list(_pending)
+    for base_path in base_paths:
+        try:
+            flush_cache_stats(base_path=base_path)
+        except Exception:  # pragma: no cover - kapanışta en iyi çaba
+            pass
+
+
+def record_cache_event(
+    name: str, *, hit: bool, base_path: str = ".", cache_key: Optional[str] = None
+) -> None:
+    """İsabet/ıskalamayı (ve rapor girdisinin erişimini) veritabanına yazmadan biriktir."""
+
+    with _pending_lock:
+        pending = _pending.setdefault(base_path, _PendingWrites())
+        counts = pending.counts.setdefault(name, [0, 0])
+        counts[0 if hit else 1] += 1
+        if cache_key is not None:
+            pending.accessed[cache_key] = time.time()
+        pending.events += 1
+        due = (
+            pending.events >= STATS_FLUSH_EVENTS
+            or time.monotonic() - pending.since >= STATS_FLUSH_SECONDS
+        )
+    if due:
+        flush_cache_stats(base_path=base_path)
+
+
+def _make_key(key_parts: Sequence[Any]) -> str:
+    return "|".join("" if part is None else str(part) for part in key_parts)
+
+
+def _lookup(connection: Connection, cache_key: str) -> Tuple[int, Optional[Dict[str, Any]]]:
+    version = get_data_version(connection)
+    row = connection.execute(
+        "SELECT payload FROM report_cache WHERE cache_key = ? AND data_version = ?",
+        (cache_key, version),
+    ).fetchone()
+    if row is None:
+        return version, None
+    return version, json.loads(row["payload"])
+
+
+def get_cached(key_parts: Sequence[Any], *, base_path: str = ".") -> Optional[Dict[str, Any]]:
+    """Güncel sonuç önbellekteyse döndür; yoksa hesaplamadan ``None`` döndür."""
+
+    if _max_entries() == 0:
+        return None
+    cache_key = _make_key(key_parts)
+    with get_connection(base_path) as connection:
+        cached = _lookup(connection, cache_key)[1]
+    if cached is not None:
+        record_cache_event(REPORT_CACHE_NAME, hit=True, base_path=base_path, cache_key=cache_key)
+    return cached
+
+
+def get_or_compute(
+    key_parts: Sequence[Any],
+    compute: Callable[[], Dict[str, Any]],
+    *,
+    base_path: str = ".",
+) -> Dict[str, Any]:
+    """Önbellekte güncel sonuç varsa döndür, yoksa hesaplayıp sakla."""
+
+    max_entries = _max_entries()
+    if max_entries == 0:
+        return compute()
+
+    cache_key = _make_key(key_parts)
+
+    with get_connection(base_path) as connection:
+        version, cached = _lookup(connection, cache_key)
+    if cached is not None:
+        record_cache_event(REPORT_CACHE_NAME, hit=True, base_path=base_path, cache_key=cache_key)
+        return cached
+
+    result = compute()
+    payload = json.dumps(result, ensure_ascii=False)
+
+    pending = _take_pending(base_path)
+    with get_connection(base_path) as connection:
+        # Biriken erişim zamanları LRU silmesinden önce yazılır.
+        _write_pending(connection, pending)
+        # Hesaplama sırasında veri değiştiyse sonuç yine de bu sürümle
+        # etiketlenir; yeni sürümle yapılan okumalar onu kullanmaz. Daha yeni
+        # bir sürümle yazılmış girdinin üzerine yazılmaz.
+        connection.execute(
+            """
+            INSERT INTO report_cache (cache_key, data_version, payload, last_accessed)
+            VALUES (?, ?, ?, ?)
+            ON CONFLICT(cache_key) DO UPDATE SET
+                data_version = excluded.data_version,
+                payload = excluded.payload,
+                last_accessed = excluded.last_accessed
+            WHERE report_cache.data_version <= excluded.data_version
+            """,
+            (cache_key, version, payload, time.time()),
+        )
+        connection.execute(
+            "DELETE FROM report_cache WHERE data_version < ?", (version,)
+        )
+        connection.execute(
+            """
+            DELETE FROM report_cache
+            WHERE cache_key NOT IN (
+                SELECT cache_key FROM report_cache
+                ORDER BY last_accessed DESC
+                LIMIT ?
+            )
+            """,
+            (max_entries,),
+        )
+        _write_counts(connection, REPORT_CACHE_NAME, 0, 1)
+        connection.commit()
+
+    return result
+
+
+def get_cache_stats(name: str = REPORT_CACHE_NAME, *, base_path: str = ".") -> Dict[str, Any]:
+    """Önbellek isabet oranı ve doluluk bilgisini döndür."""
+
+    flush_cache_stats(base_path=base_path)
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            "SELECT hits, misses FROM cache_stats WHERE name = ?", (name,)
+        ).fetchone()
+        entries: Optional[int] = None
+        if name == REPORT_CACHE_NAME:
+            count_row = connection.execute(
+                "SELECT COUNT(*) AS total FROM report_cache"
+            ).fetchone()
+            entries = int(count_row["total"] or 0) if count_row else 0
+
+    hits = int(row["hits"] or 0) if row else 0
+    misses = int(row["misses"] or 0) if row else 0
+    lookups = hits + misses
+    stats: Dict[str, Any] = {
+        "name": name,
+        "hits": hits,
+        "misses": misses,
+        "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+    }
+    if entries is not None:
+        stats["entries"] = entries
+        stats["max_entries"] = _max_entries()
+    return stats
+
+
+def clear_report_cache(*, base_path: str = ".") -> None:
+    with get_connection(base_path) as connection:
+        connection.execute("DELETE FROM report_cache")
+        connection.commit()
+
+
+__all__ = [
+    "bump_data_version",
+    "clear_report_cache",
+    "flush_cache_stats",
+    "get_cache_stats",
+    "get_cached",
+    "get_data_version",
+    "get_or_compute",
+    "record_cache_event",
+]
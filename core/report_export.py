@@ -0,0 +1,252 @@
+# -*- coding: utf-8 -*-
+"""Raporlama panosunun XLSX olarak dışa aktarımı.
+
+Çalışma kitabı openpyxl'in yalnızca-yazma (write-only) kipinde üretilir: her
+satır yazıldığı anda geçici dosyaya aktarılır. Form tablosu veritabanından
+sunucu tarafı imleçle parça parça okunduğundan, on binlerce formluk aralıklarda
+bile bellek kullanımı sabit kalır. Sonuç disk üzerindeki geçici dosyadan
+parçalar halinde istemciye akıtılır.
+"""
+from __future__ import annotations
+
+import tempfile
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Optional, Sequence
+
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill
+
+from .db import get_connection
+from .form_service import (
+    PERSONEL_FIELDS,
+    REPORT_FORM_COLUMNS,
+    REPORT_FORM_ORDER,
+    get_reporting_summary,
+    report_where,
+    row_hours,
+    to_iso_date,
+)
+
+XLSX_MIMETYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+STREAM_CHUNK_SIZE = 64 * 1024
+FETCH_BATCH_SIZE = 1000
+
+FORM_SHEET_HEADERS = (
+    "Form No",
+    "Görev Tanımı",
+    "Görev Tarihi",
+    "Görevli Personel",
+    "Yol Süresi (sa)",
+    "Çalışma Süresi (sa)",
+    "Harcama Bildirimi",
+    "İl",
+    "İlçe",
+    "Firma",
+    "Görev Yeri",
+)
+
+_HEADER_FONT = Font(bold=True, color="FFFFFF")
+_HEADER_FILL = PatternFill(start_color="0D47A1", end_color="0D47A1", fill_type="solid")
+_TITLE_FONT = Font(bold=True, size=12)
+
+
+def _header_row(sheet, titles: Sequence[str]) -> List[WriteOnlyCell]:
+    cells = []
+    for title in titles:
+        cell = WriteOnlyCell(sheet, value=title)
+        cell.font = _HEADER_FONT
+        cell.fill = _HEADER_FILL
+        cells.append(cell)
+    return cells
+
+
+def _title_row(sheet, title: str) -> List[WriteOnlyCell]:
+    cell = WriteOnlyCell(sheet, value=title)
+    cell.font = _TITLE_FONT
+    return [cell]
+
+
+def _write_table(sheet, headers: Sequence[str], rows: Iterable[Sequence[Any]]) -> None:
+    sheet.append(_header_row(sheet, headers))
+    for row in rows:
+        sheet.append(list(row))
+
+
+def _write_summary_sheet(workbook: Workbook, summary: Dict[str, Any]) -> None:
+    sheet = workbook.create_sheet("Özet")
+    sheet.column_dimensions["A"].width = 36
+    sheet.column_dimensions["B"].width = 18
+    filters = summary["filters"]
+    travel = summary["travel_hours"]
+    work = summary["work_hours"]
+    requests = summary["task_requests"]
+
+    sheet.append(_title_row(sheet, "Raporlama Özeti"))
+    _write_table(
+        sheet,
+        ("Metrik", "Değer"),
+        (
+            ("Başlangıç", filters["start_date"] or "-"),
+            ("Bitiş", filters["end_date"] or "-"),
+            ("Toplam Form", summary["total_forms"]),
+            ("Doğrudan Oluşturulan", summary["form_origins"]["direct"]),
+            ("Talepten Dönüşen", summary["form_origins"]["converted"]),
+            ("Görev Talebi", requests["total"]),
+            ("Dönüştürülen Talep", requests["converted"]),
+            ("Dönüşüm Oranı (%)", requests["conversion_rate"]),
+            ("Görevlendirilen Kişi Sayısı", summary["unique_person_count"]),
+            ("Toplam Yol Süresi (sa)", travel["total"]),
+            ("Ortalama Yol Süresi (sa)", travel["average"]),
+            ("Yol Süresi p50 / p90 / p99 (sa)", f"{travel['p50']} / {travel['p90']} / {travel['p99']}"),
+            ("Toplam Çalışma Süresi (sa)", work["total"]),
+            ("Ortalama Çalışma Süresi (sa)", work["average"]),
+            ("Çalışma Süresi p50 / p90 / p99 (sa)", f"{work['p50']} / {work['p90']} / {work['p99']}"),
+        ),
+    )
+
+    expenses = summary.get("expenses") or {}
+    if expenses.get("totals"):
+        sheet.append([])
+        sheet.append(_title_row(sheet, "Harcama Tutarları"))
+        _write_table(
+            sheet,
+            ("Para Birimi", "Adet", "Toplam", "Ortalama"),
+            (
+                (item["currency"], item["count"], item["total"], item["average"])
+                for item in expenses["totals"]
+            ),
+        )
+
+
+def _write_breakdown_sheets(workbook: Workbook, summary: Dict[str, Any]) -> None:
+    sheet = workbook.create_sheet("Kişiler")
+    _write_table(
+        sheet,
+        ("Kişi", "Görev Sayısı", "Yol Süresi (sa)", "Çalışma Süresi (sa)"),
+        (
+            (item["person"], item["count"], item["travel_hours"], item["work_hours"])
+            for item in summary["person_breakdown"]
+        ),
+    )
+
+    sheet = workbook.create_sheet("Lokasyonlar")
+    _write_table(
+        sheet,
+        ("Lokasyon", "Görev Sayısı"),
+        ((item["label"], item["count"]) for item in summary["locations"]),
+    )
+
+    expenses = summary.get("expenses") or {}
+    sheet = workbook.create_sheet("Harcamalar")
+    for title, key in (("Kişi", "by_person"), ("Firma", "by_firm"), ("Ay", "by_month")):
+        sheet.append(_title_row(sheet, f"{title} Bazında"))
+        _write_table(
+            sheet,
+            (title, "Para Birimi", "Adet", "Toplam", "Ortalama"),
+            (
+                (item["label"], item["currency"], item["count"], item["total"], item["average"])
+                for item in expenses.get(key, [])
+            ),
+        )
+        sheet.append([])
+
+
+def _form_rows(
+    start_iso: Optional[str], end_iso: Optional[str], base_path: str
+) -> Iterator[List[Any]]:
+    where_clause, params = report_where(start_iso, end_iso)
+    query = (
+        "SELECT "
+        + ", ".join(REPORT_FORM_COLUMNS)
+        + " FROM forms"
+        + where_clause
+        + REPORT_FORM_ORDER
+    )
+    with get_connection(base_path) as connection:
+        for row in connection.iter_rows(query, tuple(params), batch_size=FETCH_BATCH_SIZE):
+            travel_hours, work_hours = row_hours(row)
+            yield [
+                row["form_no"],
+                row["gorev_tanimi"] or "",
+                row["gorev_tarih"] or "",
+                ", ".join(row[field] for field in PERSONEL_FIELDS if row[field]),
+                travel_hours,
+                work_hours,
+                int(row["expense_count"] or 0),
+                row["gorev_il"] or "",
+                row["gorev_ilce"] or "",
+                row["gorev_firma"] or "",
+                row["gorev_yeri"] or "",
+            ]
+
+
+def write_report_workbook(
+    target,
+    *,
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+) -> None:
+    """Rapor özetini ve form tablosunu ``target`` dosyasına XLSX olarak yaz."""
+
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
+    summary = get_reporting_summary(
+        start_date=start_iso or "", end_date=end_iso or "", base_path=base_path
+    )
+
+    workbook = Workbook(write_only=True)
+    _write_summary_sheet(workbook, summary)
+    _write_breakdown_sheets(workbook, summary)
+
+    sheet = workbook.create_sheet("Formlar")
+    sheet.freeze_panes = "A2"
+    _write_table(sheet, FORM_SHEET_HEADERS, _form_rows(start_iso, end_iso, base_path))
+
+    workbook.save(target)
+
+
+def _iter_file(stream: BinaryIO, chunk_size: int) -> Iterator[bytes]:
+    try:
+        while True:
+            chunk = stream.read(chunk_size)
+            if not chunk:
+                break
+            yield chunk
+    finally:
+        stream.close()
+
+
+def stream_report_workbook(
+    *,
+    start_date: str = "",
+    end_date: str = "",
+    base_path: str = ".",
+    chunk_size: int = STREAM_CHUNK_SIZE,
+) -> Iterator[bytes]:
+    """Çalışma kitabını geçici dosyada üret ve dosyayı parça parça okuyan bir yineleyici döndür.
+
+    Üretim bu çağrı sırasında tamamlanır; böylece olası hatalar yanıt
+    başlamadan önce ortaya çıkar. Geçici dosya adsız açılır (diskteki adı hemen
+    silinir); yanıt hiç okunmasa bile dosya tanıtıcısı kapandığında alan geri
+    verilir.
+    """
+
+    stream = tempfile.TemporaryFile(prefix="rapor_", suffix=".xlsx")
+    try:
+        write_report_workbook(
+            stream, start_date=start_date, end_date=end_date, base_path=base_path
+        )
+        stream.seek(0)
+    except Exception:
+        stream.close()
+        raise
+    return _iter_file(stream, chunk_size)
+
+
+__all__ = [
+    "FORM_SHEET_HEADERS",
+    "XLSX_MIMETYPE",
+    "stream_report_workbook",
+    "write_report_workbook",
+]
@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+"""Uzun tarih aralıklı raporlar için arka plan iş kuyruğu.
+
+Kısa aralıklar istek içinde hesaplanmaya devam eder. Uzun aralıklar için
+``report_jobs`` tablosuna bir iş kaydı açılır ve hesaplama süreç içindeki
+sınırlı boyutlu bir iş parçacığı havuzunda yürütülür. İş durumu veritabanında
+tutulduğu için sonuç, isteği hangi gunicorn işçisi karşılarsa karşılasın
+sorgulanabilir.
+"""
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+from typing import Any, Dict, Optional
+
+from .db import get_connection
+from .form_service import get_reporting_summary, to_iso_date
+from .report_cache import get_data_version
+
+ACTIVE_STATUSES = ("queued", "running")
+
+# Bu süreden eski bekleyen/çalışan işler, sahibi olan süreç yeniden
+# başlatılmış olabileceğinden tekrar kullanılmaz.
+STALE_JOB_SECONDS = 60 * 60
+FINISHED_JOB_RETENTION_SECONDS = 24 * 60 * 60
+CLAIM_RETRY_SECONDS = 0.5
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def max_concurrent_jobs() -> int:
+    raw = os.environ.get("REPORT_JOB_MAX_CONCURRENT", "2")
+    try:
+        return max(1, int(raw))
+    except (TypeError, ValueError):
+        return 2
+
+
+def async_min_days() -> int:
+    """Bu günden uzun aralıklar arka planda hesaplanır."""
+
+    raw = os.environ.get("REPORT_ASYNC_MIN_DAYS", "366")
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return 366
+
+
+def is_long_range(start_date: str, end_date: str) -> bool:
+    """Aralık arka planda hesaplanacak kadar uzun mu? Açık uçlu aralıklar uzundur."""
+
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
+    if not start_iso or not end_iso:
+        return True
+    span = date.fromisoformat(end_iso) - date.fromisoformat(start_iso)
+    return span.days > async_min_days()
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    # Havuz ilk kullanımda oluşturulur; böylece gunicorn fork ettikten sonra
+    # her işçi kendi iş parçacıklarına sahip olur.
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=max_concurrent_jobs(), thread_name_prefix="report-job"
+            )
+        return _executor
+
+
+def _job_to_dict(row) -> Dict[str, Any]:
+    job: Dict[str, Any] = {
+        "job_id": row["job_id"],
+        "status": row["status"],
+        "start_date": row["start_date"] or "",
+        "end_date": row["end_date"] or "",
+        "error": row["error"] or "",
+        "created_at": row["created_at"],
+        "finished_at": row["finished_at"],
+    }
+    end = row["finished_at"] or time.time()
+    job["elapsed_seconds"] = round(end - (row["started_at"] or row["created_at"]), 2)
+    if row["status"] == "done" and row["result"]:
+        job["result"] = json.loads(row["result"])
+    return job
+
+
+def _claim_slot(job_id: str, base_path: str) -> bool:
+    """Çalışan iş sayısı sınırın altındaysa işi ``running`` durumuna al.
+
+    Sınır tüm süreçlerdeki işler için veritabanı üzerinden uygulanır; yerel
+    havuz boyutu yalnızca bu süreçteki iş parçacığı sayısını belirler.
+    """
+
+    now = time.time()
+    with get_connection(base_path) as connection:
+        cursor = connection.execute(
+            """
+            UPDATE report_jobs SET status = 'running', started_at = ?
+            WHERE job_id = ? AND status = 'queued' AND (
+                SELECT COUNT(*) FROM report_jobs
+                WHERE status = 'running' AND started_at >= ?
+            ) < ?
+            """,
+            (now, job_id, now - STALE_JOB_SECONDS, max_concurrent_jobs()),
+        )
+        connection.commit()
+    return cursor.rowcount > 0
+
+
+def _run_job(job_id: str, start_iso: str, end_iso: str, base_path: str) -> None:
+    while not _claim_slot(job_id, base_path):
+        job = get_report_job(job_id, base_path=base_path)
+        if job is None or job["status"] != "queued":
+            return
+        time.sleep(CLAIM_RETRY_SECONDS)
+
+    try:
+        result = get_reporting_summary(
+            start_date=start_iso, end_date=end_iso, base_path=base_path
+        )
+    except Exception as exc:  # pragma: no cover - beklenmeyen hata iş kaydına yazılır
+        with get_connection(base_path) as connection:
+            connection.execute(
+                "UPDATE report_jobs SET status = 'failed', error = ?, finished_at = ? WHERE job_id = ?",
+                (str(exc) or exc.__class__.__name__, time.time(), job_id),
+            )
+            connection.commit()
+        return
+
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "UPDATE report_jobs SET status = 'done', result = ?, finished_at = ? WHERE job_id = ?",
+            (json.dumps(result, ensure_ascii=False), time.time(), job_id),
+        )
+        connection.commit()
+
+
+def submit_report_job(
+    *, start_date: str = "", end_date: str = "", base_path: str = "."
+) -> Dict[str, Any]:
+    """Rapor işini kuyruğa al ve iş kaydını döndür.
+
+    Aynı aralık ve veri sürümü için bekleyen, çalışan ya da tamamlanmış bir iş
+    varsa yeni iş açılmaz; mevcut kayıt döndürülür.
+    """
+
+    start_iso = to_iso_date(start_date) or ""
+    end_iso = to_iso_date(end_date) or ""
+    now = time.time()
+
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "DELETE FROM report_jobs WHERE created_at < ?",
+            (now - FINISHED_JOB_RETENTION_SECONDS,),
+        )
+        version = get_data_version(connection)
+        existing = connection.execute(
+            """
+            SELECT * FROM report_jobs
+            WHERE start_date = ? AND end_date = ? AND data_version = ?
+              AND (status = 'done' OR (status IN ('queued', 'running') AND created_at >= ?))
+            ORDER BY created_at DESC
+            LIMIT 1
+            """,
+            (start_iso, end_iso, version, now - STALE_JOB_SECONDS),
+        ).fetchone()
+        if existing is not None:
+            connection.commit()
+            return _job_to_dict(existing)
+
+        job_id = uuid.uuid4().hex
+        connection.execute(
+            """
+            INSERT INTO report_jobs (job_id, start_date, end_date, data_version, status, created_at)
+            VALUES (?, ?, ?, ?, 'queued', ?)
+            """,
+            (job_id, start_iso, end_iso, version, now),
+        )
+        job = _job_to_dict(
+            connection.execute("SELECT * FROM report_jobs WHERE job_id = ?", (job_id,)).fetchone()
+        )
+        connection.commit()
+
+    _get_executor().submit(_run_job, job_id, start_iso, end_iso, base_path)
+    return job
+
+
+def get_report_job(job_id: str, *, base_path: str = ".") -> Optional[Dict[str, Any]]:
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            "SELECT * FROM report_jobs WHERE job_id = ?", (job_id,)
+        ).fetchone()
+    if row is None:
+        return None
+    return _job_to_dict(row)
+
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "async_min_days",
+    "get_report_job",
+    "is_long_range",
+    "max_concurrent_jobs",
+    "submit_report_job",
+]
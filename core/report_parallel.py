@@ -0,0 +1,397 @@
+# -*- coding: utf-8 -*-
+"""Çok yıllık raporlar için paralel (map-reduce) hesaplama.
+
+Uzun tarih aralıkları aylık dilimlere bölünür. Her dilim bir
+``ProcessPoolExecutor`` işçisinde kendi veritabanı bağlantısıyla okunur ve
+birleştirilebilir kısmi toplamlar üretir: sayaçlar, kişi/lokasyon toplamları,
+harcama grafiği adayları ve süre yüzdelikleri için bir özet (sketch). Süreler
+0,01 saate yuvarlandığından özet, yuvarlanmış değer → adet sayacıdır; birleşimi
+kayıpsızdır ve yüzdelikler tek geçişli motorla aynı çıkar. Kısmi sonuçlar
+``form_service.build_summary`` ile aynı özet yapısına dönüştürülür.
+
+Motor isteğe bağlıdır: ``REPORT_PARALLEL_WORKERS`` 2 veya üzerine
+ayarlanmadıkça raporlar tek geçişli motorla hesaplanır. Açıldığında işçi
+havuzu süreç başına bir kez, ilk paralel raporda kurulur ve sonraki raporlarda
+yeniden kullanılır; süreç kapanırken kapatılır.
+"""
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+from bisect import bisect_right
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date
+from itertools import accumulate
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import reporting
+from .db import get_connection
+from .form_service import (
+    HOURS_HISTOGRAM_EDGES,
+    HOURS_HISTOGRAM_LABELS,
+    PERSONEL_FIELDS,
+    REPORT_CHART_MAX_BARS,
+    REPORT_FORM_COLUMNS,
+    REPORT_FORM_ORDER,
+    build_summary,
+    compute_expense_breakdown,
+    form_location_key,
+    report_where,
+    row_hours,
+    task_request_metrics,
+)
+
+# (başlangıç, bitiş) ISO tarihleri; ``None`` dilimi tarihsiz formları kapsar.
+Shard = Optional[Tuple[str, str]]
+
+
+_POOL_LOCK = threading.Lock()
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_WORKERS = 0
+
+
+def max_workers() -> int:
+    """Paralel rapor işçi sayısı; varsayılan 1 paralel motoru kapalı tutar."""
+
+    raw = os.environ.get("REPORT_PARALLEL_WORKERS", "1")
+    try:
+        return max(1, int(raw))
+    except (TypeError, ValueError):
+        return 1
+
+
+def _shared_pool(workers: int) -> ProcessPoolExecutor:
+    """Süreç genelinde paylaşılan işçi havuzunu döndür (gerekirse kur)."""
+
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is None or _POOL_WORKERS != workers:
+            if _POOL is not None:
+                _POOL.shutdown(wait=True)
+            _POOL = ProcessPoolExecutor(max_workers=workers)
+            _POOL_WORKERS = workers
+        return _POOL
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    """Paylaşılan işçi havuzunu kapat."""
+
+    global _POOL, _POOL_WORKERS
+    with _POOL_LOCK:
+        if _POOL is not None:
+            _POOL.shutdown(wait=True)
+        _POOL = None
+        _POOL_WORKERS = 0
+
+
+def min_days() -> int:
+    raw = os.environ.get("REPORT_PARALLEL_MIN_DAYS", "730")
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return 730
+
+
+def min_rows() -> int:
+    raw = os.environ.get("REPORT_PARALLEL_MIN_ROWS", "20000")
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return 20000
+
+
+def _count_forms(start_iso: Optional[str], end_iso: Optional[str], base_path: str) -> int:
+    where_clause, params = report_where(start_iso, end_iso)
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            f"SELECT COUNT(*) AS total FROM forms{where_clause}", tuple(params)
+        ).fetchone()
+    return int(row["total"] or 0) if row else 0
+
+
+def should_parallelize(
+    start_iso: Optional[str], end_iso: Optional[str], *, base_path: str = "."
+) -> bool:
+    """Aralık uzun, form sayısı yüksek ve birden fazla işçi tanımlıysa ``True``."""
+
+    if max_workers() <= 1:
+        return False
+    if start_iso and end_iso:
+        span = date.fromisoformat(end_iso) - date.fromisoformat(start_iso)
+        if span.days < min_days():
+            return False
+    return _count_forms(start_iso, end_iso, base_path) >= min_rows()
+
+
+def monthly_shards(
+    start_iso: Optional[str], end_iso: Optional[str], *, base_path: str = "."
+) -> List[Shard]:
+    """Aralığı en yeni aydan en eskiye doğru aylık dilimlere böl.
+
+    Dilimler rapor tablosunun sıralamasıyla (tarihe göre azalan) aynı sırada
+    döner; açık uçlu aralıklar verideki ilk/son tarihle sınırlanır. İki uç da
+    boşsa tarihsiz formlar için sona ``None`` dilimi eklenir.
+    """
+
+    shards: List[Shard] = []
+    lower, upper = start_iso, end_iso
+    if not lower or not upper:
+        where_clause, params = report_where(start_iso, end_iso)
+        with get_connection(base_path) as connection:
+            row = connection.execute(
+                f"SELECT MIN({reporting.FORM_DATE_EXPR}) AS first_day, "
+                f"MAX({reporting.FORM_DATE_EXPR}) AS last_day FROM forms{where_clause}",
+                tuple(params),
+            ).fetchone()
+        lower = lower or (row["first_day"] if row else None)
+        upper = upper or (row["last_day"] if row else None)
+
+    if lower and upper and lower <= upper:
+        first, last = date.fromisoformat(str(lower)[:10]), date.fromisoformat(str(upper)[:10])
+        current = reporting.bucket_start(first, "month")
+        while current <= last:
+            following = reporting.next_bucket(current, "month")
+            shard_start = max(current, first)
+            shard_end = min(date.fromordinal(following.toordinal() - 1), last)
+            shards.append((shard_start.isoformat(), shard_end.isoformat()))
+            current = following
+        shards.reverse()
+
+    if not start_iso and not end_iso:
+        shards.append(None)
+    return shards
+
+
+def _shard_where(shard: Shard) -> Tuple[str, List[Any]]:
+    if shard is None:
+        return f" WHERE {reporting.FORM_DATE_EXPR} IS NULL", []
+    return report_where(*shard)
+
+
+def compute_shard(shard: Shard, base_path: str) -> Dict[str, Any]:
+    """Tek bir dilimin kısmi toplamlarını hesapla (işçi süreçte çalışır)."""
+
+    where_clause, params = _shard_where(shard)
+    query = (
+        "SELECT "
+        + ", ".join(REPORT_FORM_COLUMNS)
+        + " FROM forms"
+        + where_clause
+        + REPORT_FORM_ORDER
+    )
+
+    forms = 0
+    person_counts: Counter = Counter()
+    person_hours: Dict[str, List[float]] = {}
+    locations: Counter = Counter()
+    travel: Counter = Counter()
+    work: Counter = Counter()
+    expense_items: List[Tuple[float, int, str]] = []
+    expense_total = 0.0
+
+    with get_connection(base_path) as connection:
+        for row in connection.iter_rows(query, tuple(params)):
+            travel_hours, work_hours = row_hours(row)
+            if travel_hours is not None:
+                travel[travel_hours] += 1
+            if work_hours is not None:
+                work[work_hours] += 1
+
+            for field in PERSONEL_FIELDS:
+                person = (row[field] or "").strip()
+                if not person:
+                    continue
+                person_counts[person] += 1
+                totals = person_hours.setdefault(person, [0.0, 0.0])
+                totals[0] += travel_hours or 0.0
+                totals[1] += work_hours or 0.0
+
+            value = float(int(row["expense_count"] or 0))
+            expense_items.append((value, forms, row["form_no"]))
+            expense_total += value
+            locations[form_location_key(row)] += 1
+            forms += 1
+
+    # Genel sıralamada ilk ``limit`` içine girebilecek adaylar her dilimin
+    # kendi ilk ``limit`` öğesinin içindedir.
+    expense_items.sort(key=lambda item: (-item[0], item[1]))
+    return {
+        "forms": forms,
+        "person_counts": person_counts,
+        "person_hours": person_hours,
+        "locations": locations,
+        "travel": travel,
+        "work": work,
+        "expense_top": expense_items[:REPORT_CHART_MAX_BARS],
+        "expense_total": expense_total,
+    }
+
+
+def _sketch_distribution(sketch: Counter) -> Dict[str, Any]:
+    """Değer → adet özetinden ``form_service._distribution`` ile aynı yapıyı üret."""
+
+    values = sorted(sketch)
+    cumulative = list(accumulate(sketch[value] for value in values))
+    samples = cumulative[-1] if cumulative else 0
+
+    def value_at(index: int) -> float:
+        return values[bisect_right(cumulative, index)]
+
+    def percentile(fraction: float) -> float:
+        # ``form_service._percentile`` ile aynı doğrusal enterpolasyon; özet
+        # sıralı listeye açılmadan konumdaki değer bulunur.
+        if not samples:
+            return 0.0
+        position = (samples - 1) * fraction
+        lower = int(position)
+        upper = min(lower + 1, samples - 1)
+        return value_at(lower) + (value_at(upper) - value_at(lower)) * (position - lower)
+
+    total = sum(value * sketch[value] for value in values)
+    edges = HOURS_HISTOGRAM_EDGES
+    counts = [0] * len(edges)
+    for value in values:
+        counts[bisect_right(edges, value) - 1] += sketch[value]
+    return {
+        "total": round(total, 2),
+        "average": round(total / samples, 2) if samples else 0.0,
+        "samples": samples,
+        "p50": round(percentile(0.50), 2),
+        "p90": round(percentile(0.90), 2),
+        "p99": round(percentile(0.99), 2),
+        "histogram": {
+            "labels": list(HOURS_HISTOGRAM_LABELS),
+            "counts": counts,
+        },
+    }
+
+
+def _merge_expense_chart(partials: List[Dict[str, Any]], limit: int) -> Dict[str, Any]:
+    total_forms = sum(partial["forms"] for partial in partials)
+    candidates = [
+        (value, (shard_index, position), form_no)
+        for shard_index, partial in enumerate(partials)
+        for value, position, form_no in partial["expense_top"]
+    ]
+    if total_forms <= limit:
+        candidates.sort(key=lambda item: item[1])
+        return {
+            "labels": [item[2] for item in candidates],
+            "values": [item[0] for item in candidates],
+            "aggregated": False,
+        }
+    candidates.sort(key=lambda item: (-item[0], item[1]))
+    keep = candidates[: limit - 1]
+    rest_total = sum(partial["expense_total"] for partial in partials) - sum(
+        item[0] for item in keep
+    )
+    return {
+        "labels": [item[2] for item in keep] + [f"Diğer ({total_forms - len(keep)} form)"],
+        "values": [item[0] for item in keep] + [rest_total],
+        "aggregated": True,
+    }
+
+
+def merge_partials(partials: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Dilim sonuçlarını (tarihe göre azalan sırada) tek bir toplamda birleştir."""
+
+    person_counts: Counter = Counter()
+    person_hours: Dict[str, List[float]] = {}
+    locations: Counter = Counter()
+    travel: Counter = Counter()
+    work: Counter = Counter()
+    for partial in partials:
+        person_counts.update(partial["person_counts"])
+        locations.update(partial["locations"])
+        travel.update(partial["travel"])
+        work.update(partial["work"])
+        for name, (travel_hours, work_hours) in partial["person_hours"].items():
+            totals = person_hours.setdefault(name, [0.0, 0.0])
+            totals[0] += travel_hours
+            totals[1] += work_hours
+
+    return {
+        "forms": sum(partial["forms"] for partial in partials),
+        "person_counts": dict(person_counts),
+        "locations": dict(locations),
+        "durations": {
+            "travel_hours": _sketch_distribution(travel),
+            "work_hours": _sketch_distribution(work),
+            "person_hours": {
+                name: {"travel": round(totals[0], 2), "work": round(totals[1], 2)}
+                for name, totals in person_hours.items()
+            },
+        },
+        "expense_chart": _merge_expense_chart(partials, REPORT_CHART_MAX_BARS),
+    }
+
+
+def _count_converted_forms(
+    start_iso: Optional[str], end_iso: Optional[str], converted_form_nos: set[str], base_path: str
+) -> int:
+    if not converted_form_nos:
+        return 0
+    where_clause, params = report_where(start_iso, end_iso)
+    with get_connection(base_path) as connection:
+        return sum(
+            1
+            for row in connection.iter_rows(f"SELECT form_no FROM forms{where_clause}", tuple(params))
+            if row["form_no"] in converted_form_nos
+        )
+
+
+def compute_reporting_summary(
+    start_iso: Optional[str],
+    end_iso: Optional[str],
+    *,
+    base_path: str = ".",
+    workers: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Rapor özetini aylık dilimler üzerinde paralel hesapla."""
+
+    shards = monthly_shards(start_iso, end_iso, base_path=base_path)
+    workers = workers or max_workers()
+    if workers == 1 or len(shards) <= 1:
+        partials = [compute_shard(shard, base_path) for shard in shards]
+    else:
+        executor = _shared_pool(workers)
+        partials = list(executor.map(compute_shard, shards, [base_path] * len(shards)))
+    merged = merge_partials(partials)
+
+    where_clause, params = report_where(start_iso, end_iso)
+    with get_connection(base_path) as connection:
+        expense_breakdown = compute_expense_breakdown(connection, where_clause, params)
+    total_requests, converted_requests, converted_form_nos = task_request_metrics(
+        start_iso, end_iso, base_path=base_path
+    )
+
+    return build_summary(
+        start_iso=start_iso,
+        end_iso=end_iso,
+        total_forms=merged["forms"],
+        converted_forms=_count_converted_forms(start_iso, end_iso, converted_form_nos, base_path),
+        person_counts=merged["person_counts"],
+        durations=merged["durations"],
+        expense_chart=merged["expense_chart"],
+        expense_breakdown=expense_breakdown,
+        location_counter=merged["locations"],
+        total_requests=total_requests,
+        converted_requests=converted_requests,
+        engine_name="parallel",
+    )
+
+
+__all__ = [
+    "compute_reporting_summary",
+    "compute_shard",
+    "max_workers",
+    "merge_partials",
+    "min_days",
+    "min_rows",
+    "monthly_shards",
+    "should_parallelize",
+    "shutdown_pool",
+]
@@ -0,0 +1,249 @@
+# -*- coding: utf-8 -*-
+"""Zaman serisi raporları.
+
+Gruplama (gün/hafta/ay) doğrudan SQL içinde tarih kırpma ile yapılır; her
+metrik için tek bir ``GROUP BY`` sorgusu çalışır ve sonuçlar ``report_cache``
+üzerinden veri sürümüne bağlı olarak önbelleğe alınır.
+"""
+from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from . import report_cache
+from .db import Connection, get_connection, is_postgres
+
+TIMESERIES_BUCKETS: Tuple[str, ...] = ("day", "week", "month")
+MAX_TIMESERIES_BUCKETS = 5000
+
+FORM_DATE_EXPR = "COALESCE(yola_cikis_tarih_iso, gorev_tarih_iso)"
+EXPENSE_COUNT_EXPR = "(SELECT COUNT(*) FROM form_expenses AS fe WHERE fe.form_id = forms.id)"
+
+
+class ReportingError(Exception):
+    """Raporlama parametrelerine ilişkin hata."""
+
+
+def truncate_date_expr(expr: str, bucket: str) -> str:
+    """``expr`` tarihini kova başlangıcına (YYYY-MM-DD metni) kırpan SQL ifadesi."""
+
+    if is_postgres():
+        return f"to_char(date_trunc('{bucket}', CAST({expr} AS DATE)), 'YYYY-MM-DD')"
+    if bucket == "day":
+        return f"date({expr})"
+    if bucket == "week":
+        # ISO haftası: pazartesi başlangıçlı.
+        return f"date({expr}, 'weekday 0', '-6 days')"
+    return f"strftime('%Y-%m-01', {expr})"
+
+
+# PostgreSQL'de yalnızca geçerli saatler TIMESTAMP'e çevrilir; "25:99" gibi
+# değerler CAST hatası yerine NULL olur (SQLite'taki julianday davranışı).
+CLOCK_PATTERN = "^([01][0-9]|2[0-3]):[0-5][0-9](:[0-5][0-9])?$"
+
+
+def _timestamp_expr(iso_column: str, time_column: str) -> str:
+    clock = f"COALESCE(NULLIF(TRIM({time_column}), ''), '00:00')"
+    if is_postgres():
+        return (
+            f"CASE WHEN {clock} ~ '{CLOCK_PATTERN}' "
+            f"THEN CAST({iso_column} || ' ' || {clock} AS TIMESTAMP) END"
+        )
+    return f"julianday({iso_column} || ' ' || {clock})"
+
+
+def _hours_expr(start: Tuple[str, str], end: Tuple[str, str]) -> str:
+    """Negatif ya da hesaplanamayan süreler için NULL döndüren saat farkı ifadesi."""
+
+    start_ts = _timestamp_expr(*start)
+    end_ts = _timestamp_expr(*end)
+    if is_postgres():
+        hours = f"EXTRACT(EPOCH FROM ({end_ts} - {start_ts})) / 3600.0"
+    else:
+        hours = f"({end_ts} - {start_ts}) * 24.0"
+    return f"CASE WHEN {hours} >= 0 THEN {hours} END"
+
+
+def _range_filters(
+    expr: str, start_iso: Optional[str], end_iso: Optional[str]
+) -> Tuple[List[str], List[Any]]:
+    filters = [f"{expr} IS NOT NULL"]
+    params: List[Any] = []
+    if start_iso:
+        filters.append(f"{expr} >= ?")
+        params.append(start_iso)
+    if end_iso:
+        filters.append(f"{expr} <= ?")
+        params.append(end_iso)
+    return filters, params
+
+
+def bucket_start(value: date, bucket: str) -> date:
+    if bucket == "week":
+        return value - timedelta(days=value.weekday())
+    if bucket == "month":
+        return value.replace(day=1)
+    return value
+
+
+def next_bucket(value: date, bucket: str) -> date:
+    if bucket == "day":
+        return value + timedelta(days=1)
+    if bucket == "week":
+        return value + timedelta(days=7)
+    if value.month == 12:
+        return value.replace(year=value.year + 1, month=1)
+    return value.replace(month=value.month + 1)
+
+
+def bucket_labels(start: date, end: date, bucket: str) -> List[str]:
+    """``start`` ile ``end`` arasındaki (dahil) tüm kova başlangıçlarını üret."""
+
+    labels: List[str] = []
+    current = bucket_start(start, bucket)
+    while current <= end:
+        labels.append(current.isoformat())
+        if len(labels) > MAX_TIMESERIES_BUCKETS:
+            raise ReportingError(
+                "Seçilen aralık çok fazla dilim üretiyor; daha büyük bir gruplama seçin."
+            )
+        current = next_bucket(current, bucket)
+    return labels
+
+
+def _grouped(connection: Connection, query: str, params: List[Any]) -> Dict[str, Tuple[Any, ...]]:
+    rows = connection.execute(query, tuple(params)).fetchall()
+    return {
+        str(row["bucket"]): tuple(row[key] for key in row.keys() if key != "bucket")
+        for row in rows
+        if row["bucket"]
+    }
+
+
+def _compute_timeseries(
+    start_iso: Optional[str], end_iso: Optional[str], bucket: str, *, base_path: str
+) -> Dict[str, Any]:
+    form_bucket = truncate_date_expr(FORM_DATE_EXPR, bucket)
+    form_filters, form_params = _range_filters(FORM_DATE_EXPR, start_iso, end_iso)
+    travel = _hours_expr(
+        ("yola_cikis_tarih_iso", "yola_cikis_saat"), ("donus_tarih_iso", "donus_saat")
+    )
+    work = _hours_expr(
+        ("calisma_baslangic_tarih_iso", "calisma_baslangic_saat"),
+        ("calisma_bitis_tarih_iso", "calisma_bitis_saat"),
+    )
+    form_query = f"""
+        SELECT {form_bucket} AS bucket,
+               COUNT(*) AS forms,
+               COALESCE(SUM({travel}), 0) AS travel_hours,
+               COALESCE(SUM({work}), 0) AS work_hours,
+               COALESCE(SUM({EXPENSE_COUNT_EXPR}), 0) AS expenses
+        FROM forms
+        WHERE {" AND ".join(form_filters)}
+        GROUP BY 1
+    """
+
+    created_bucket = truncate_date_expr("DATE(created_at)", bucket)
+    request_filters, request_params = _range_filters("DATE(created_at)", start_iso, end_iso)
+    request_query = f"""
+        SELECT {created_bucket} AS bucket, COUNT(*) AS task_requests
+        FROM task_requests
+        WHERE {" AND ".join(request_filters)}
+        GROUP BY 1
+    """
+
+    converted_bucket = truncate_date_expr("DATE(converted_at)", bucket)
+    conversion_filters, conversion_params = _range_filters(
+        "DATE(converted_at)", start_iso, end_iso
+    )
+    conversion_filters.append("status = 'converted'")
+    conversion_query = f"""
+        SELECT {converted_bucket} AS bucket, COUNT(*) AS conversions
+        FROM task_requests
+        WHERE {" AND ".join(conversion_filters)}
+        GROUP BY 1
+    """
+
+    with get_connection(base_path) as connection:
+        form_rows = _grouped(connection, form_query, form_params)
+        request_rows = _grouped(connection, request_query, request_params)
+        conversion_rows = _grouped(connection, conversion_query, conversion_params)
+
+    seen = sorted(set(form_rows) | set(request_rows) | set(conversion_rows))
+    range_start = date.fromisoformat(start_iso) if start_iso else None
+    range_end = date.fromisoformat(end_iso) if end_iso else None
+    if seen:
+        range_start = range_start or date.fromisoformat(seen[0])
+        range_end = range_end or date.fromisoformat(seen[-1])
+    labels = (
+        bucket_labels(range_start, range_end, bucket)
+        if range_start and range_end and range_start <= range_end
+        else []
+    )
+
+    def series(rows: Dict[str, Tuple[Any, ...]], position: int, *, hours: bool = False) -> List[Any]:
+        values = []
+        for label in labels:
+            value = rows.get(label, (0,) * (position + 1))[position] or 0
+            values.append(round(float(value), 2) if hours else int(value))
+        return values
+
+    return {
+        "bucket": bucket,
+        "start_date": start_iso or "",
+        "end_date": end_iso or "",
+        "labels": labels,
+        "series": {
+            "forms": series(form_rows, 0),
+            "travel_hours": series(form_rows, 1, hours=True),
+            "work_hours": series(form_rows, 2, hours=True),
+            "expenses": series(form_rows, 3),
+            "task_requests": series(request_rows, 0),
+            "conversions": series(conversion_rows, 0),
+        },
+    }
+
+
+def get_reporting_timeseries(
+    *,
+    start_date: str = "",
+    end_date: str = "",
+    bucket: str = "month",
+    base_path: str = ".",
+) -> Dict[str, Any]:
+    """Gün/hafta/ay dilimlerine bölünmüş rapor serilerini döndür.
+
+    Boş dilimler sıfırla doldurulur; aralık verilmezse verideki ilk ve son
+    dilim kullanılır.
+    """
+
+    from .form_service import to_iso_date
+
+    bucket = (bucket or "month").strip().lower()
+    if bucket not in TIMESERIES_BUCKETS:
+        raise ReportingError("Geçersiz gruplama seçimi.")
+
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
+    if ((start_date or "").strip() and not start_iso) or ((end_date or "").strip() and not end_iso):
+        raise ReportingError("Geçersiz tarih.")
+
+    return report_cache.get_or_compute(
+        ("timeseries", bucket, start_iso, end_iso),
+        lambda: _compute_timeseries(start_iso, end_iso, bucket, base_path=base_path),
+        base_path=base_path,
+    )
+
+
+__all__ = [
+    "EXPENSE_COUNT_EXPR",
+    "FORM_DATE_EXPR",
+    "MAX_TIMESERIES_BUCKETS",
+    "ReportingError",
+    "TIMESERIES_BUCKETS",
+    "bucket_labels",
+    "bucket_start",
+    "get_reporting_timeseries",
+    "next_bucket",
+    "truncate_date_expr",
+]
@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+"""Sunucu tarafı oturum deposu.
+
+Oturum verisi (açık formlar, kilitler, kullanıcı bilgisi) ``web_sessions``
+tablosunda zlib ile sıkıştırılmış olarak tutulur; tarayıcıya yalnızca rastgele,
+tahmin edilemez bir oturum kimliği gönderilir. Böylece çerez boyutu açık form
+sayısından bağımsız olarak birkaç düzine bayt kalır.
+
+Kayıtlar ``SESSION_TTL_HOURS`` (varsayılan 72) saat kullanılmadığında geçersiz
+olur; süre, kalan ömrün yarısı dolduğunda uzatılır ve her istekte yazma
+yapılmaz. Süresi dolan kayıtlar her işçi süreçte bir arka plan iş parçacığı
+tarafından ``SESSION_GC_SECONDS`` (varsayılan 600) aralıkla silinir; aynı tur
+eskimiş form taslaklarını da (bkz. ``form_drafts``) temizler.
+"""
+from __future__ import annotations
+
+import logging
+import os
+import re
+import secrets
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from typing import Optional
+
+from .db import get_connection
+from .form_drafts import purge_stale_drafts
+
+SESSION_ID_BYTES = 32
+COMPRESSION_LEVEL = 6
+# Kalan ömür bu oranın altına düştüğünde süre uzatılır.
+REFRESH_FRACTION = 0.5
+
+_SESSION_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{43}$")
+
+_gc_lock = threading.Lock()
+_gc_pid: Optional[int] = None
+
+logger = logging.getLogger(__name__)
+
+
+def _int_env(name: str, default: int, minimum: int) -> int:
+    raw = os.environ.get(name, str(default))
+    try:
+        return max(minimum, int(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def ttl_seconds() -> int:
+    return _int_env("SESSION_TTL_HOURS", 72, 1) * 60 * 60
+
+
+def gc_interval_seconds() -> int:
+    return _int_env("SESSION_GC_SECONDS", 600, 10)
+
+
+def new_session_id() -> str:
+    return secrets.token_urlsafe(SESSION_ID_BYTES)
+
+
+def is_valid_session_id(value: Optional[str]) -> bool:
+    return bool(value) and _SESSION_ID_PATTERN.match(value) is not None
+
+
+@dataclass(frozen=True)
+class StoredSession:
+    """Depodan okunan oturum: açılmış veri ve geçerlilik sonu (epoch saniye)."""
+
+    payload: bytes
+    expires_at: float
+
+    def needs_refresh(self, now: Optional[float] = None) -> bool:
+        remaining = self.expires_at - (now if now is not None else time.time())
+        return remaining < ttl_seconds() * REFRESH_FRACTION
+
+
+def load_session(session_id: str, *, base_path: str = ".") -> Optional[StoredSession]:
+    """Geçerli oturumu döndür; bulunamayan, süresi dolan ya da bozuk kayıtta ``None``."""
+
+    if not is_valid_session_id(session_id):
+        return None
+    with get_connection(base_path) as connection:
+        row = connection.execute(
+            "SELECT payload, expires_at FROM web_sessions WHERE session_id = ? AND expires_at > ?",
+            (session_id, time.time()),
+        ).fetchone()
+    if row is None:
+        return None
+    try:
+        payload = zlib.decompress(bytes(row["payload"]))
+    except zlib.error:
+        return None
+    return StoredSession(payload=payload, expires_at=float(row["expires_at"]))
+
+
+def save_session(session_id: str, payload: bytes, *, base_path: str = ".") -> float:
+    """Oturumu sıkıştırarak yaz (varsa üzerine) ve yeni geçerlilik sonunu döndür."""
+
+    now = time.time()
+    expires_at = now + ttl_seconds()
+    with get_connection(base_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO web_sessions (session_id, payload, created_at, updated_at, expires_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(session_id) DO UPDATE SET
+                payload = excluded.payload,
+                updated_at = excluded.updated_at,
+                expires_at = excluded.expires_at
+            """,
+            (session_id, zlib.compress(payload, COMPRESSION_LEVEL), now, now, expires_at),
+        )
+        connection.commit()
+    start_gc(base_path)
+    return expires_at
+
+
+def touch_session(session_id: str, *, base_path: str = ".") -> float:
+    """Veri değişmeden oturumun süresini uzat."""
+
+    expires_at = time.time() + ttl_seconds()
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "UPDATE web_sessions SET expires_at = ? WHERE session_id = ?",
+            (expires_at, session_id),
+        )
+        connection.commit()
+    return expires_at
+
+
+def delete_session(session_id: str, *, base_path: str = ".") -> None:
+    with get_connection(base_path) as connection:
+        connection.execute("DELETE FROM web_sessions WHERE session_id = ?", (session_id,))
+        connection.commit()
+
+
+def purge_expired_sessions(*, base_path: str = ".", now: Optional[float] = None) -> int:
+    """Süresi dolan oturumları sil ve silinen kayıt sayısını döndür."""
+
+    with get_connection(base_path) as connection:
+        cursor = connection.execute(
+            "DELETE FROM web_sessions WHERE expires_at <= ?",
+            (now if now is not None else time.time(),),
+        )
+        connection.commit()
+    return cursor.rowcount
+
+
+def _gc_loop(base_path: str) -> None:
+    while True:
+        time.sleep(gc_interval_seconds())
+        try:
+            purge_expired_sessions(base_path=base_path)
+            purge_stale_drafts(base_path=base_path)
+        except Exception:  # pragma: no cover - bir sonraki turda yeniden denenir
+            logger.exception("Süresi dolan oturumlar silinemedi")
+
+
+def start_gc(base_path: str = ".") -> None:
+    """Süreç başına bir temizlik iş parçacığı başlat (gunicorn fork'undan sonra da)."""
+
+    global _gc_pid
+    if _gc_pid == os.getpid():
+        return
+    with _gc_lock:
+        if _gc_pid == os.getpid():
+            return
+        thread = threading.Thread(target=_gc_loop, args=(base_path,), name="session-gc", daemon=True)
+        thread.start()
+        _gc_pid = os.getpid()
+
+
+__all__ = [
+    "StoredSession",
+    "delete_session",
+    "is_valid_session_id",
+    "load_session",
+    "new_session_id",
+    "purge_expired_sessions",
+    "save_session",
+    "start_gc",
+    "touch_session",
+    "ttl_seconds",
+]
@@ -7,6 +7,7 @@ from datetime import UTC, datetime
 from typing import Any, Dict, Iterable, List, Optional
 
 from .db import get_connection
+from .report_cache import bump_data_version
 
 
 class TaskRequestError(Exception):
@@ -199,6 +200,7 @@ def create_task_request(
                 None,
             ),
         )
+        bump_data_version(connection)
         connection.commit()
 
     created = get_task_request(request_id, base_path=base_path)
@@ -331,6 +333,7 @@ def update_task_request_status(
         )
         if cursor.rowcount == 0:
             raise TaskRequestError("Talep bulunamadı.")
+        bump_data_version(connection)
         connection.commit()
 
     updated = get_task_request(request_id, base_path=base_path)
@@ -355,6 +358,7 @@ def update_task_request_notes(
         )
         if cursor.rowcount == 0:
             raise TaskRequestError("Talep bulunamadı.")
+        bump_data_version(connection)
         connection.commit()
 
     updated = get_task_request(request_id, base_path=base_path)
@@ -385,6 +389,7 @@ def mark_converted(
         )
         if cursor.rowcount == 0:
             raise TaskRequestError("Talep bulunamadı.")
+        bump_data_version(connection)
         connection.commit()
 
     updated = get_task_request(request_id, base_path=base_path)
@@ -0,0 +1,173 @@
+# -*- coding: utf-8 -*-
+"""Personel bazında süre ve kullanım oranı raporu.
+
+Veriler ``person_days`` (kişi × gün) indeksinden okunur. Bu tablo form her
+kaydedildiğinde ``form_service`` tarafından güncellenir; birincil anahtarı
+``(person, work_date, form_id)`` olduğundan tek bir çalışanın bir yılı tek bir
+indeks aralık taramasıyla gelir. Tablo eklenmeden önce kaydedilmiş formlar
+şema kurulumunda bir kez indekslenir. Kullanım oranı, net çalışma saatinin
+(çalışma − mola) aralıktaki iş günü kapasitesine oranıdır.
+"""
+from __future__ import annotations
+
+import os
+from datetime import date, timedelta
+from typing import Any, Dict, List
+
+from . import report_cache, reporting
+from .db import get_connection
+from .form_service import to_iso_date
+from .reporting import ReportingError
+
+
+def workday_hours() -> float:
+    """Bir iş gününün kapasite saati (varsayılan 8)."""
+
+    raw = os.environ.get("UTILIZATION_WORKDAY_HOURS", "8")
+    try:
+        value = float(raw)
+    except (TypeError, ValueError):
+        return 8.0
+    return value if value > 0 else 8.0
+
+
+def working_days(start: date, end: date) -> int:
+    """``start`` ile ``end`` arasındaki (dahil) hafta içi gün sayısı."""
+
+    if end < start:
+        return 0
+    total = (end - start).days + 1
+    full_weeks, remainder = divmod(total, 7)
+    days = full_weeks * 5
+    for offset in range(remainder):
+        if (start.weekday() + offset) % 7 < 5:
+            days += 1
+    return days
+
+
+def _person_item(row, capacity: float) -> Dict[str, Any]:
+    work = float(row["work_hours"] or 0)
+    breaks = float(row["break_hours"] or 0)
+    net = max(work - breaks, 0.0)
+    return {
+        "forms": int(row["forms"] or 0),
+        "active_days": int(row["active_days"] or 0),
+        "travel_hours": round(float(row["travel_hours"] or 0), 2),
+        "work_hours": round(work, 2),
+        "break_hours": round(breaks, 2),
+        "net_work_hours": round(net, 2),
+        "utilization": round(net / capacity * 100, 1) if capacity else 0.0,
+    }
+
+
+_AGGREGATES = """
+    COUNT(DISTINCT form_id) AS forms,
+    COUNT(DISTINCT work_date) AS active_days,
+    SUM(travel_hours) AS travel_hours,
+    SUM(work_hours) AS work_hours,
+    SUM(break_hours) AS break_hours
+"""
+_EMPTY_TOTALS = dict.fromkeys(("forms", "active_days", "travel_hours", "work_hours", "break_hours"), 0)
+
+
+def _compute_utilization(
+    start: date, end: date, bucket: str, person: str, *, base_path: str
+) -> Dict[str, Any]:
+    hours_per_day = workday_hours()
+    days = working_days(start, end)
+    capacity = days * hours_per_day
+    params: List[Any] = [start.isoformat(), end.isoformat()]
+    person_filter = ""
+    if person:
+        person_filter = " AND person = ?"
+        params.append(person)
+
+    with get_connection(base_path) as connection:
+        rows = connection.execute(
+            f"""
+            SELECT person, {_AGGREGATES}
+            FROM person_days
+            WHERE work_date >= ? AND work_date <= ?{person_filter}
+            GROUP BY person
+            ORDER BY SUM(work_hours) DESC, person
+            """,
+            tuple(params),
+        ).fetchall()
+        period_rows = []
+        if person:
+            period_expr = reporting.truncate_date_expr("work_date", bucket)
+            period_rows = connection.execute(
+                f"""
+                SELECT {period_expr} AS bucket, {_AGGREGATES}
+                FROM person_days
+                WHERE work_date >= ? AND work_date <= ? AND person = ?
+                GROUP BY 1
+                """,
+                tuple(params),
+            ).fetchall()
+
+    result: Dict[str, Any] = {
+        "start_date": start.isoformat(),
+        "end_date": end.isoformat(),
+        "bucket": bucket,
+        "person": person,
+        "workday_hours": hours_per_day,
+        "working_days": days,
+        "capacity_hours": round(capacity, 2),
+        "people": [dict(person=row["person"], **_person_item(row, capacity)) for row in rows],
+    }
+
+    if person:
+        by_period = {str(row["bucket"])[:10]: row for row in period_rows}
+        periods = []
+        for label in reporting.bucket_labels(start, end, bucket):
+            period_start = max(date.fromisoformat(label), start)
+            period_end = min(
+                reporting.next_bucket(date.fromisoformat(label), bucket) - timedelta(days=1), end
+            )
+            period_capacity = working_days(period_start, period_end) * hours_per_day
+            item = _person_item(by_period.get(label, _EMPTY_TOTALS), period_capacity)
+            periods.append(dict(period=label, capacity_hours=round(period_capacity, 2), **item))
+        result["periods"] = periods
+
+    return result
+
+
+def get_utilization(
+    *,
+    start_date: str,
+    end_date: str,
+    bucket: str = "month",
+    person: str = "",
+    base_path: str = ".",
+) -> Dict[str, Any]:
+    """Aralıktaki her kişinin yol/çalışma/mola saatlerini ve kullanım oranını döndür.
+
+    ``person`` verilirse yalnızca o kişi döner ve ``periods`` altında
+    gün/hafta/ay dilimlerine bölünmüş değerler eklenir.
+    """
+
+    bucket = (bucket or "month").strip().lower()
+    if bucket not in reporting.TIMESERIES_BUCKETS:
+        raise ReportingError("Geçersiz gruplama seçimi.")
+    start_iso = to_iso_date(start_date)
+    end_iso = to_iso_date(end_date)
+    if not start_iso or not end_iso:
+        raise ReportingError("Başlangıç ve bitiş tarihi gereklidir.")
+    start, end = date.fromisoformat(start_iso), date.fromisoformat(end_iso)
+    if end < start:
+        raise ReportingError("Bitiş tarihi başlangıç tarihinden önce olamaz.")
+    person = (person or "").strip()
+
+    return report_cache.get_or_compute(
+        ("utilization", bucket, start_iso, end_iso, person),
+        lambda: _compute_utilization(start, end, bucket, person, base_path=base_path),
+        base_path=base_path,
+    )
+
+
+__all__ = [
+    "get_utilization",
+    "working_days",
+    "workday_hours",
+]
@@ -0,0 +1,88 @@
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from core import db  # noqa: E402
+
+
+@pytest.fixture(autouse=True)
+def _fresh_schema():
+    """Her test kendi geçici veritabanında şemayı yeniden oluşturur."""
+    db.reset_schema_flag()
+    yield
+    db.reset_schema_flag()
+
+
+@pytest.fixture
+def sample_form_data():
+    return {
+        "tarih": "01.01.2024",
+        "dok_no": "F-001",
+        "rev_no": "R1",
+        "avans": "1000",
+        "taseron": "ABC",
+        "gorev_tanimi": "Bakım",
+        "gorev_yeri": "İstanbul",
+        "gorev_il": "İstanbul",
+        "gorev_ilce": "Kadıköy",
+        "gorev_firma": "Delta Proje",
+        "gorev_tarih": "05.01.2024",
+        "personel_1": "Ali",
+        "personel_2": "Veli",
+        "personel_3": "",
+        "personel_4": "",
+        "personel_5": "",
+        "yola_cikis_tarih": "02.01.2024",
+        "yola_cikis_saat": "08:00",
+        "calisma_baslangic_tarih": "02.01.2024",
+        "calisma_baslangic_saat": "09:00",
+        "calisma_bitis_tarih": "02.01.2024",
+        "calisma_bitis_saat": "18:00",
+        "donus_tarih": "02.01.2024",
+        "donus_saat": "19:00",
+        "mola_suresi": "30",
+        "arac_plaka": "34 ABC 123",
+        "hazirlayan": "Ahmet",
+        "harcama_bildirimleri": [
+            {
+                "description": "Yemek",
+                "attachments": [
+                    {
+                        "filename": "fis1.png",
+                        "original_name": "Yemek Fişi.png",
+                    }
+                ],
+            },
+            {
+                "description": "Konaklama",
+                "attachments": [],
+            },
+        ],
+    }
+
+
+@pytest.fixture
+def web_client(tmp_path, monkeypatch):
+    """Geçici veri klasörüne bağlı Flask test istemcisi; ``login`` ile oturum açar."""
+
+    monkeypatch.setenv("DATA_FOLDER", str(tmp_path))
+    import web_app
+    from core import session_store
+
+    monkeypatch.setattr(session_store, "start_gc", lambda base_path=".": None)
+    monkeypatch.setattr(web_app, "UPLOAD_DIR", tmp_path / "uploads")
+    app = web_app.create_app()
+    app.testing = True
+    client = app.test_client()
+
+    def login(user_id=1, role="admin", full_name="Admin", locked_forms=()):
+        with client.session_transaction() as session:
+            session["user"] = {"id": user_id, "full_name": full_name, "email": "", "role": role}
+            session["locked_forms"] = sorted(locked_forms)
+
+    client.login = login
+    client.base_path = str(tmp_path)
+    return client
@@ -0,0 +1,69 @@
+import io
+import zipfile
+
+from core import attachment_archive, form_service
+
+
+def test_attachments_are_grouped_named_and_streamed_in_chunks(tmp_path):
+    upload_dir = tmp_path / "00001"
+    upload_dir.mkdir()
+    (upload_dir / "rapor.txt").write_bytes(b"rapor " * 1000)
+    (upload_dir / "fis1.jpg").write_bytes(bytes(range(256)) * 100)
+    (upload_dir / "fis2.jpg").write_bytes(b"jpg")
+    (tmp_path / "gizli.txt").write_text("gizli")
+    form_data = {
+        "gorev_ekleri": [
+            {"filename": "rapor.txt", "original_name": "Saha Raporu.txt"},
+            {"filename": "../gizli.txt", "original_name": "gizli.txt"},
+            {"filename": "silinmis.png", "original_name": "silinmis.png"},
+        ],
+        "harcama_bildirimleri": [
+            {"description": "Konaklama", "attachments": []},
+            {
+                "description": "Yakıt/Benzin",
+                "attachments": [
+                    {"filename": "fis1.jpg", "original_name": "fiş.jpg"},
+                    {"filename": "fis2.jpg", "original_name": "fiş.jpg"},
+                ],
+            },
+        ],
+    }
+
+    entries = attachment_archive.archive_entries(form_data, upload_dir)
+    assert [entry.name for entry in entries] == [
+        "Görev Ekleri/Saha Raporu.txt",
+        "Harcama 02 - Yakıt_Benzin/fiş.jpg",
+        "Harcama 02 - Yakıt_Benzin/fiş (2).jpg",
+    ]
+
+    chunks = list(attachment_archive.stream_attachments(entries, chunk_size=4096))
+    assert len(chunks) > len(entries)
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+    assert archive.testzip() is None
+    assert archive.read("Harcama 02 - Yakıt_Benzin/fiş.jpg") == bytes(range(256)) * 100
+    types = {info.filename: info.compress_type for info in archive.infolist()}
+    assert types["Görev Ekleri/Saha Raporu.txt"] == zipfile.ZIP_DEFLATED
+    assert types["Harcama 02 - Yakıt_Benzin/fiş (2).jpg"] == zipfile.ZIP_STORED
+
+
+def test_attachment_archive_route_requires_form_access(web_client, sample_form_data, tmp_path):
+    upload_dir = tmp_path / "uploads" / "00001"
+    upload_dir.mkdir(parents=True)
+    (upload_dir / "rapor.txt").write_bytes(b"rapor")
+    form_data = dict(
+        sample_form_data,
+        gorev_ekleri=[{"filename": "rapor.txt", "original_name": "rapor.txt"}],
+        assigned_to_user_id=5,
+    )
+    form_service.save_form("00001", form_data, base_path=web_client.base_path)
+
+    anonymous = web_client.get("/form/00001/attachments.zip")
+    assert anonymous.mimetype != "application/zip"
+
+    web_client.login(user_id=9, role="calisan", full_name="Yabancı")
+    assert web_client.get("/form/00001/attachments.zip").status_code == 302
+
+    web_client.login(user_id=1)
+    response = web_client.get("/form/00001/attachments.zip")
+    assert response.status_code == 200 and response.mimetype == "application/zip"
+    assert zipfile.ZipFile(io.BytesIO(response.data)).namelist() == ["Görev Ekleri/rapor.txt"]
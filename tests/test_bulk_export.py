@@ -0,0 +1,41 @@
+import io
+import zipfile
+
+import pytest
+
+from core import bulk_export, form_service
+
+
+def _save_forms(base_path, sample_form_data, count):
+    for index in range(1, count + 1):
+        form_service.save_form(f"{index:05d}", sample_form_data, base_path=base_path)
+
+
+@pytest.mark.parametrize("workers", ["1", "2"])
+def test_archive_streams_every_form(tmp_path, sample_form_data, monkeypatch, workers):
+    monkeypatch.setenv("BULK_EXPORT_WORKERS", workers)
+    base_path = str(tmp_path)
+    _save_forms(base_path, sample_form_data, 3)
+
+    form_nos = bulk_export.matching_form_nos(person="ali", base_path=base_path)
+    progress = []
+    chunks = list(
+        bulk_export.iter_archive(form_nos, bulk_export.BULK_EXPORT_FORMATS, base_path, progress.append)
+    )
+    archive = zipfile.ZipFile(io.BytesIO(b"".join(chunks)))
+
+    assert sorted(archive.namelist()) == [
+        f"gorev_formu_{index:05d}.{ext}" for index in range(1, 4) for ext in ("pdf", "xlsx")
+    ]
+    assert archive.read("gorev_formu_00001.pdf").startswith(b"%PDF")
+    assert progress[-1] == 6
+
+
+def test_bulk_export_rejects_empty_selection(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    _save_forms(base_path, sample_form_data, 1)
+
+    with pytest.raises(bulk_export.BulkExportError):
+        bulk_export.matching_form_nos(person="yok", base_path=base_path)
+    with pytest.raises(bulk_export.BulkExportError):
+        bulk_export.normalize_formats(["docx"])
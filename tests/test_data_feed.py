@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+
+import pytest
+
+from core import data_feed, form_service, task_request_service, user_service
+from core.db import get_connection
+
+
+def _save_forms(base_path, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    second = dict(sample_form_data, harcama_bildirimleri=[], yola_cikis_tarih="10.02.2024")
+    form_service.save_form("00002", second, base_path=base_path)
+    with get_connection(base_path) as connection:
+        connection.execute("UPDATE forms SET updated_at = ? WHERE form_no = ?", ("2024-03-01 09:00:00", "00001"))
+        connection.execute("UPDATE forms SET updated_at = ? WHERE form_no = ?", ("2024-03-02 09:00:00", "00002"))
+        connection.commit()
+
+
+def test_form_feed_filters_and_streams_ndjson(tmp_path, sample_form_data, monkeypatch):
+    monkeypatch.setattr(data_feed, "STREAM_RECORDS_PER_CHUNK", 1)
+    base_path = str(tmp_path)
+    _save_forms(base_path, sample_form_data)
+
+    chunks = list(data_feed.stream_feed("forms", "ndjson", base_path=base_path))
+    assert len(chunks) == 2
+    records = [json.loads(line) for line in b"".join(chunks).decode("utf-8").splitlines()]
+    assert [record["form_no"] for record in records] == ["00001", "00002"]
+    assert records[0]["expense_count"] == 2
+    assert (records[0]["travel_hours"], records[0]["work_hours"]) == (11.0, 9.0)
+    assert records[0]["updated_at"] == "2024-03-01 09:00:00"
+
+    since = data_feed.iter_records("forms", updated_since="2024-03-02T11:00:00+03:00", base_path=base_path)
+    assert [record["form_no"] for record in since] == ["00002"]
+    dated = data_feed.iter_records("forms", start_date="01.02.2024", base_path=base_path)
+    assert [record["form_no"] for record in dated] == ["00002"]
+
+    with pytest.raises(data_feed.FeedError):
+        data_feed.stream_feed("forms", "ndjson", updated_since="dün", base_path=base_path)
+    with pytest.raises(data_feed.FeedError):
+        data_feed.stream_feed("forms", "xml", base_path=base_path)
+
+
+def test_task_request_feed_streams_csv(tmp_path):
+    base_path = str(tmp_path)
+    user_service.ensure_default_users(base_path=base_path)
+    requester = user_service.list_users_by_role("admin", base_path=base_path)[0]
+    created = task_request_service.create_task_request(
+        customer_name="ABC Şirketi",
+        customer_phone=None,
+        customer_email=None,
+        customer_address="",
+        request_description="Klima arızası, sistem soğutmuyor.",
+        requirements=None,
+        urgency="urgent",
+        requested_by_user_id=requester.id,
+        base_path=base_path,
+    )
+
+    text = b"".join(data_feed.stream_feed("task_requests", "csv", base_path=base_path)).decode("utf-8")
+    rows = list(csv.DictReader(io.StringIO(text)))
+    assert [int(row["id"]) for row in rows] == [created["id"]]
+    assert rows[0]["customer_name"] == "ABC Şirketi"
+    assert rows[0]["urgency"] == "urgent"
+
+    later = data_feed.iter_records("task_requests", updated_since="2999-01-01", base_path=base_path)
+    assert list(later) == []
@@ -0,0 +1,112 @@
+import os
+
+from core import export_cache, form_service
+
+
+def test_export_is_served_from_cache_until_form_changes(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+
+    first = export_cache.get_export("00001", sample_form_data, "xlsx", base_path=base_path)
+    second = export_cache.get_export("00001", sample_form_data, "xlsx", base_path=base_path)
+    assert (first.cached, second.cached) == (False, True)
+    assert second.data == first.data
+    assert second.filename == "gorev_formu_00001.xlsx"
+
+    sample_form_data["last_step"] = 3
+    assert export_cache.get_export("00001", sample_form_data, "xlsx", base_path=base_path).cached
+
+    sample_form_data["gorev_tanimi"] = "Revize bakım"
+    changed = export_cache.get_export("00001", sample_form_data, "xlsx", base_path=base_path)
+    assert not changed.cached
+    assert changed.etag != first.etag
+
+    pdf = export_cache.get_export("00001", sample_form_data, "pdf", base_path=base_path)
+    assert pdf.data.startswith(b"%PDF") and pdf.mimetype == "application/pdf"
+
+    stats = export_cache.get_cache_stats(base_path=base_path)
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 3, 3)
+    assert stats["size_bytes"] > 0
+
+
+def test_cache_key_includes_renderer_version(sample_form_data, monkeypatch):
+    before = export_cache.cache_key("00001", sample_form_data, "pdf")
+    monkeypatch.setitem(
+        export_cache._RENDERERS,
+        "pdf",
+        (form_service.PDF_RENDERER_VERSION + 1, "application/pdf", form_service.export_form_to_pdf),
+    )
+    assert export_cache.cache_key("00001", sample_form_data, "pdf") != before
+
+
+def test_least_recently_used_exports_are_evicted(tmp_path, sample_form_data, monkeypatch):
+    base_path = str(tmp_path)
+    size = len(export_cache.get_export("00000", sample_form_data, "pdf", base_path=base_path).data)
+    export_cache.clear_export_cache(base_path=base_path)
+    monkeypatch.setenv("EXPORT_CACHE_MAX_MB", str(size * 2.5 / 1024 / 1024))
+
+    paths = {}
+    for index, form_no in enumerate(("00001", "00002")):
+        export = export_cache.get_export(form_no, sample_form_data, "pdf", base_path=base_path)
+        paths[form_no] = export_cache._entry_path(export_cache.cache_dir(base_path), export.etag, "pdf")
+        os.utime(paths[form_no], (1000 + index, 1000 + index))
+    assert export_cache.get_export("00001", sample_form_data, "pdf", base_path=base_path).cached
+
+    export_cache.get_export("00003", sample_form_data, "pdf", base_path=base_path)
+
+    assert os.path.exists(paths["00001"])
+    assert not os.path.exists(paths["00002"])
+    assert export_cache.get_cache_stats(base_path=base_path)["entries"] == 2
+
+
+def test_cache_directory_is_scanned_only_when_estimate_exceeds_limit(
+    tmp_path, sample_form_data, monkeypatch
+):
+    base_path = str(tmp_path)
+    size = len(export_cache.get_export("00000", sample_form_data, "pdf", base_path=base_path).data)
+    export_cache.clear_export_cache(base_path=base_path)
+    monkeypatch.setenv("EXPORT_CACHE_MAX_MB", str(size * 3.5 / 1024 / 1024))
+    scans = []
+    entries = export_cache._entries
+    monkeypatch.setattr(export_cache, "_entries", lambda directory: scans.append(directory) or entries(directory))
+
+    for form_no in ("00001", "00002", "00003"):
+        export_cache.get_export(form_no, sample_form_data, "pdf", base_path=base_path)
+    assert len(scans) == 1
+
+    export_cache.get_export("00004", sample_form_data, "pdf", base_path=base_path)
+    assert len(scans) == 2
+    assert len(entries(export_cache.cache_dir(base_path))) == 3
+
+
+def test_cache_can_be_disabled(tmp_path, sample_form_data, monkeypatch):
+    monkeypatch.setenv("EXPORT_CACHE_MAX_MB", "0")
+    base_path = str(tmp_path)
+
+    export_cache.get_export("00001", sample_form_data, "xlsx", base_path=base_path)
+    assert not export_cache.get_export("00001", sample_form_data, "xlsx", base_path=base_path).cached
+    assert not os.path.exists(export_cache.cache_dir(base_path))
+
+
+def test_completed_form_is_prerendered_in_background(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    export_cache.schedule_prerender("00001", base_path=base_path).result(timeout=30)
+
+    saved = export_cache.load_export_data("00001", base_path=base_path)
+    for file_format in ("xlsx", "pdf"):
+        assert export_cache.get_export("00001", saved, file_format, base_path=base_path).cached
+    stats = export_cache.get_cache_stats(base_path=base_path)
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (2, 2, 2)
+
+
+def test_export_response_is_revalidated_with_etag(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    web_client.login(user_id=1)
+
+    response = web_client.get("/form/00001/export/pdf")
+    assert response.status_code == 200
+    assert response.cache_control.private and response.cache_control.no_cache
+
+    again = web_client.get("/form/00001/export/pdf", headers={"If-None-Match": response.headers["ETag"]})
+    assert again.status_code == 304
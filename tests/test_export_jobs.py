@@ -0,0 +1,127 @@
+import io
+import os
+import time
+import zipfile
+
+import pytest
+
+from core import export_jobs, form_service
+from core.db import get_connection
+
+
+@pytest.fixture
+def base_path(tmp_path, monkeypatch, sample_form_data):
+    monkeypatch.setenv("BULK_EXPORT_WORKERS", "1")
+    monkeypatch.setenv("EXPORT_JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(export_jobs, "_kick", lambda base_path: None)
+    form_service.save_form("00001", sample_form_data, base_path=str(tmp_path))
+    return str(tmp_path)
+
+
+def test_export_job_runs_stores_artifact_and_expires(base_path):
+    job = export_jobs.submit_export_job(
+        "bulk", {"formats": ["xlsx"]}, requested_by=7, base_path=base_path, start=False
+    )
+    assert (job["status"], job["total"], job["requested_by"]) == ("queued", 1, 7)
+    with pytest.raises(export_jobs.ExportJobError):
+        export_jobs.get_export_artifact(job["job_id"], base_path=base_path)
+
+    assert export_jobs.run_pending_jobs(base_path=base_path) == 1
+    finished = export_jobs.get_export_job(job["job_id"], base_path=base_path)
+    assert (finished["status"], finished["done"], finished["attempts"]) == ("done", 1, 1)
+    assert finished["expires_at"] > time.time()
+
+    path, filename, mimetype = export_jobs.get_export_artifact(job["job_id"], base_path=base_path)
+    assert filename.endswith(".zip") and mimetype == "application/zip"
+    with open(path, "rb") as handle:
+        assert zipfile.ZipFile(io.BytesIO(handle.read())).namelist() == ["gorev_formu_00001.xlsx"]
+
+    with get_connection(base_path) as connection:
+        connection.execute("UPDATE export_jobs SET expires_at = ?", (time.time() - 1,))
+        connection.commit()
+    assert export_jobs.purge_expired_jobs(base_path=base_path) == 1
+    assert not os.path.exists(path)
+    assert export_jobs.get_export_job(job["job_id"], base_path=base_path) is None
+
+
+def test_failed_export_job_is_retried_then_marked_failed(base_path, monkeypatch):
+    monkeypatch.setenv("EXPORT_JOB_MAX_ATTEMPTS", "2")
+    monkeypatch.setattr(export_jobs, "RETRY_BASE_SECONDS", 0.0)
+
+    def broken(params, base_path, progress):
+        raise RuntimeError("disk dolu")
+        yield b""
+
+    kind = export_jobs.EXPORT_KINDS["register"]
+    monkeypatch.setitem(export_jobs.EXPORT_KINDS, "register", kind.__class__(kind.prepare, broken))
+    job = export_jobs.submit_export_job("register", {"format": "csv"}, base_path=base_path, start=False)
+
+    export_jobs.run_pending_jobs(base_path=base_path)
+    failed = export_jobs.get_export_job(job["job_id"], base_path=base_path)
+    assert (failed["status"], failed["attempts"], failed["error"]) == ("failed", 2, "disk dolu")
+    assert not [name for name in os.listdir(export_jobs.artifact_dir(base_path)) if name.startswith(".tmp_")]
+
+
+def test_concurrency_cap_and_stale_job_recovery(base_path, monkeypatch):
+    monkeypatch.setenv("EXPORT_JOB_MAX_CONCURRENT", "1")
+    busy = export_jobs.submit_export_job("register", {"format": "csv"}, base_path=base_path, start=False)
+    waiting = export_jobs.submit_export_job("register", {"format": "xlsx"}, base_path=base_path, start=False)
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "UPDATE export_jobs SET status = 'running', attempts = 1, heartbeat_at = ? WHERE job_id = ?",
+            (time.time(), busy["job_id"]),
+        )
+        connection.commit()
+
+    assert export_jobs.run_pending_jobs(base_path=base_path) == 0
+    assert export_jobs.get_export_job(waiting["job_id"], base_path=base_path)["status"] == "queued"
+
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "UPDATE export_jobs SET heartbeat_at = ? WHERE job_id = ?",
+            (time.time() - export_jobs.STALE_JOB_SECONDS - 1, busy["job_id"]),
+        )
+        connection.commit()
+    assert export_jobs.run_pending_jobs(base_path=base_path) == 2
+    recovered = export_jobs.get_export_job(busy["job_id"], base_path=base_path)
+    assert (recovered["status"], recovered["attempts"]) == ("done", 2)
+
+
+def test_invalid_export_jobs_are_rejected(base_path):
+    with pytest.raises(export_jobs.ExportJobError):
+        export_jobs.submit_export_job("pdf", {}, base_path=base_path, start=False)
+    with pytest.raises(export_jobs.ExportJobError):
+        export_jobs.submit_export_job("bulk", {"person": "yok"}, base_path=base_path, start=False)
+    with pytest.raises(export_jobs.ExportJobError):
+        export_jobs.submit_export_job("register", {"format": "ods"}, base_path=base_path, start=False)
+
+
+def test_register_job_reports_row_progress(base_path, sample_form_data):
+    form_service.save_form("00002", sample_form_data, base_path=base_path)
+    job = export_jobs.submit_export_job("register", {"format": "csv"}, base_path=base_path, start=False)
+    assert job["total"] == 2
+
+    export_jobs.run_pending_jobs(base_path=base_path)
+    finished = export_jobs.get_export_job(job["job_id"], base_path=base_path)
+    assert (finished["status"], finished["done"], finished["total"]) == ("done", 2, 2)
+
+
+def test_running_job_heartbeats_before_first_chunk(base_path, monkeypatch):
+    monkeypatch.setattr(export_jobs, "HEARTBEAT_SECONDS", 0.01)
+    beats = []
+
+    def slow(params, base_path, progress):
+        started = time.time()
+        time.sleep(0.2)
+        with get_connection(base_path) as connection:
+            row = connection.execute("SELECT heartbeat_at FROM export_jobs").fetchone()
+        beats.append(row["heartbeat_at"] - started)
+        yield b"veri"
+
+    kind = export_jobs.EXPORT_KINDS["register"]
+    monkeypatch.setitem(export_jobs.EXPORT_KINDS, "register", kind.__class__(kind.prepare, slow))
+    job = export_jobs.submit_export_job("register", {"format": "csv"}, base_path=base_path, start=False)
+
+    export_jobs.run_pending_jobs(base_path=base_path)
+    assert export_jobs.get_export_job(job["job_id"], base_path=base_path)["status"] == "done"
+    assert beats and beats[0] > 0
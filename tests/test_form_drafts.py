@@ -0,0 +1,63 @@
+import time
+
+from core import form_drafts, form_service
+from core.db import get_connection
+
+
+def test_cache_evicts_least_recent_and_spills_dirty_forms_to_drafts(tmp_path):
+    base_path = str(tmp_path)
+    store = {}
+    cache = form_drafts.SessionFormCache(store, user_id=7, base_path=base_path, capacity=2)
+
+    assert cache.put("00001", {"yapilan_isler": "taslak"}) == []
+    assert cache.put("00002", {"yapilan_isler": "kayıtlı"}, dirty=False) == []
+    assert cache.get("00001") == {"yapilan_isler": "taslak"}
+    assert cache.put("00003", {}) == ["00002"]
+    assert store["form_order"] == ["00001", "00003"]
+    assert form_drafts.load_draft(7, "00002", base_path=base_path) is None
+
+    assert cache.put("00004", {}) == ["00001"]
+    assert set(store["forms"]) == {"00003", "00004"}
+    assert form_drafts.load_draft(7, "00001", base_path=base_path).payload == {"yapilan_isler": "taslak"}
+
+    assert cache.get("00001") == {"yapilan_isler": "taslak"}
+    assert "00001" in store["dirty_forms"] and "00003" not in store["forms"]
+    cache.mark_saved("00001")
+    assert "00001" not in store["dirty_forms"]
+    assert form_drafts.load_draft(7, "00001", base_path=base_path) is None
+
+    anonymous = form_drafts.SessionFormCache({}, user_id=None, base_path=base_path, capacity=1)
+    anonymous.put("00005", {})
+    assert anonymous.put("00006", {}) == []
+
+    form_drafts.save_draft(8, "00009", {}, base_path=base_path)
+    assert form_drafts.purge_stale_drafts(base_path=base_path, now=time.time() + 31 * 86400) == 2
+
+
+def test_draft_is_discarded_when_the_form_was_saved_after_it(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    version = form_drafts.form_version("00001", base_path=base_path)
+    assert version is not None
+
+    store = {}
+    cache = form_drafts.SessionFormCache(store, user_id=7, base_path=base_path, capacity=1)
+    cache.put("00001", dict(sample_form_data, gorev_yeri="Taslak"), dirty=False, version=version)
+    cache.put("00001", dict(sample_form_data, gorev_yeri="Taslak"))
+    cache.put("00002", {})
+    assert form_drafts.load_draft(7, "00001", base_path=base_path).form_updated_at == version
+
+    # Taslak değişmemiş kayda göre hâlâ geçerli.
+    assert cache.get("00001")["gorev_yeri"] == "Taslak"
+    cache.put("00002", {})
+
+    # Başka bir kullanıcı formu sonradan kaydeder.
+    with get_connection(base_path) as connection:
+        connection.execute(
+            "UPDATE forms SET gorev_yeri = ?, updated_at = ? WHERE form_no = ?",
+            ("Yeni", "2999-01-01 00:00:00", "00001"),
+        )
+        connection.commit()
+    assert form_drafts.load_draft(7, "00001", base_path=base_path).is_stale
+    assert cache.get("00001") is None and cache.discarded_stale_draft
+    assert form_drafts.load_draft(7, "00001", base_path=base_path) is None
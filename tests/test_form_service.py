@@ -1,61 +1,15 @@
+import json
 import sqlite3
 from pathlib import Path
 
-import pytest
-
 import sys
 
+from openpyxl import load_workbook
+
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
-from core import form_service, task_request_service, user_service
-
-
-@pytest.fixture
-def sample_form_data():
-    return {
-        "tarih": "01.01.2024",
-        "dok_no": "F-001",
-        "rev_no": "R1",
-        "avans": "1000",
-        "taseron": "ABC",
-        "gorev_tanimi": "Bakım",
-        "gorev_yeri": "İstanbul",
-        "gorev_il": "İstanbul",
-        "gorev_ilce": "Kadıköy",
-        "gorev_firma": "Delta Proje",
-        "gorev_tarih": "05.01.2024",
-        "personel_1": "Ali",
-        "personel_2": "Veli",
-        "personel_3": "",
-        "personel_4": "",
-        "personel_5": "",
-        "yola_cikis_tarih": "02.01.2024",
-        "yola_cikis_saat": "08:00",
-        "calisma_baslangic_tarih": "02.01.2024",
-        "calisma_baslangic_saat": "09:00",
-        "calisma_bitis_tarih": "02.01.2024",
-        "calisma_bitis_saat": "18:00",
-        "donus_tarih": "02.01.2024",
-        "donus_saat": "19:00",
-        "mola_suresi": "30",
-        "arac_plaka": "34 ABC 123",
-        "hazirlayan": "Ahmet",
-        "harcama_bildirimleri": [
-            {
-                "description": "Yemek",
-                "attachments": [
-                    {
-                        "filename": "fis1.png",
-                        "original_name": "Yemek Fişi.png",
-                    }
-                ],
-            },
-            {
-                "description": "Konaklama",
-                "attachments": [],
-            },
-        ],
-    }
+from core import db, form_service, report_cache, task_request_service, user_service
+from core.db import get_connection
 
 
 def _fetch_form(base_path: Path, form_no: str):
@@ -140,7 +94,11 @@ def test_save_and_load_form(tmp_path, sample_form_data):
     assert loaded["durum"] == "TAMAMLANDI"
     assert loaded["last_step"] == 4
     assert loaded["gorev_tarih"] == sample_form_data["gorev_tarih"]
-    assert loaded["harcama_bildirimleri"] == sample_form_data["harcama_bildirimleri"]
+    assert [
+        {"description": item["description"], "attachments": item["attachments"]}
+        for item in loaded["harcama_bildirimleri"]
+    ] == sample_form_data["harcama_bildirimleri"]
+    assert all(item["currency"] == "TRY" for item in loaded["harcama_bildirimleri"])
 
 
 def test_search_forms_filters(tmp_path, sample_form_data):
@@ -307,3 +265,109 @@ def test_list_forms_for_assignee_includes_team_members(tmp_path, sample_form_dat
     assert assignments, "Takım üyesi görevlendirildiği formu görmelidir."
     assert assignments[0]["form_no"] == "00099"
     assert not assignments[0]["is_responsible"]
+
+
+def test_parse_amount_handles_turkish_grouping_and_rejects_invalid_values():
+    assert form_service.parse_amount("1.250") == 1250.0
+    assert form_service.parse_amount("1.250.000") == 1250000.0
+    assert form_service.parse_amount("1.250,50") == 1250.5
+    assert form_service.parse_amount("1250.5") == 1250.5
+    assert form_service.parse_amount("1.25") == 1.25
+    for invalid in ("inf", "nan", "-5", float("inf"), -5):
+        assert form_service.parse_amount(invalid) is None
+
+
+def test_expenses_are_stored_in_normalized_tables(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    sample_form_data["harcama_bildirimleri"] = [
+        {"description": "Yakıt", "amount": "1.250,50", "category": "Yakıt", "attachments": []},
+        {"description": "Otel", "amount": 800, "currency": "EUR", "attachments": []},
+    ]
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    with get_connection(base_path) as connection:
+        rows = connection.execute(
+            "SELECT position, amount, currency, category FROM form_expenses ORDER BY position"
+        ).fetchall()
+        legacy = connection.execute("SELECT harcama_bildirimleri FROM forms").fetchone()
+    assert [tuple(row) for row in rows] == [(0, 1250.5, "TRY", "Yakıt"), (1, 800.0, "EUR", None)]
+    assert legacy["harcama_bildirimleri"] is None
+
+    loaded = form_service.load_form_data("00001", base_path=base_path)
+    assert loaded["harcama_bildirimleri"][0]["amount"] == 1250.5
+    assert loaded["harcama_bildirimleri"][1]["currency"] == "EUR"
+
+    summary = form_service.get_reporting_summary(
+        start_date="2024-01-01", end_date="2024-12-31", base_path=base_path
+    )
+    totals = {item["currency"]: item["total"] for item in summary["expenses"]["totals"]}
+    assert totals == {"TRY": 1250.5, "EUR": 800.0}
+    ali = [item for item in summary["expenses"]["by_person"] if item["label"] == "Ali"]
+    assert {item["currency"]: item["total"] for item in ali} == {"TRY": 1250.5, "EUR": 800.0}
+    assert summary["expenses"]["by_month"][0]["label"] == "2024-01-01"
+    assert summary["expenses"]["by_firm"][0]["label"] == "Delta Proje"
+
+
+def test_legacy_json_expenses_are_migrated(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    legacy = [dict(sample_form_data["harcama_bildirimleri"][0], amount="1.250,50", category="Yemek")]
+    legacy.append(dict(sample_form_data["harcama_bildirimleri"][1], amount="800", currency="eur"))
+    with get_connection(base_path) as connection:
+        # Harcamaların henüz JSON sütununda tutulduğu eski bir veritabanı.
+        connection.execute("DELETE FROM form_expenses")
+        connection.execute("DELETE FROM schema_migrations")
+        connection.execute("UPDATE forms SET harcama_bildirimleri = ?", (json.dumps(legacy),))
+        connection.commit()
+        version = report_cache.get_data_version(connection)
+
+    db.reset_schema_flag()
+    loaded = form_service.load_form_data("00001", base_path=base_path)
+
+    expenses = loaded["harcama_bildirimleri"]
+    assert [item["description"] for item in expenses] == ["Yemek", "Konaklama"]
+    assert [(item["amount"], item["currency"]) for item in expenses] == [(1250.5, "TRY"), (800.0, "EUR")]
+    assert expenses[0]["category"] == "Yemek"
+    assert expenses[0]["attachments"][0]["original_name"] == "Yemek Fişi.png"
+    with get_connection(base_path) as connection:
+        assert report_cache.get_data_version(connection) == version + 1
+        row = connection.execute("SELECT harcama_bildirimleri FROM forms").fetchone()
+        assert json.loads(row["harcama_bildirimleri"]) == legacy
+
+    # Kayıtlı geçiş ikinci kez çalışmaz; sonradan düzenlenen harcamalar korunur.
+    form_service.save_form("00001", dict(loaded, harcama_bildirimleri=[]), base_path=base_path)
+    db.reset_schema_flag()
+    assert form_service.load_form_data("00001", base_path=base_path)["harcama_bildirimleri"] == []
+
+
+def test_export_form_to_excel_layout(sample_form_data):
+    sample_form_data["yapilan_isler"] = "Bakım <ve> test\nyapıldı"
+    stream = form_service.export_form_to_excel("00001", sample_form_data)
+
+    sheet = load_workbook(stream).active
+    assert sheet.title == "Görev Formu"
+    assert [str(item) for item in sheet.merged_cells.ranges] == ["A1:B1"]
+    assert sheet.column_dimensions["B"].width == 60
+    assert sheet["A1"].value == "DELTA PROJE - GÖREV FORMU"
+    assert sheet["A1"].font.b and sheet["A1"].font.color.rgb.endswith("D32F2F")
+
+    rows = {row[0].value: row for row in sheet.iter_rows(min_row=2, max_col=2) if row[0].value}
+    assert rows["Form No"][1].value == "00001"
+    assert rows["Yapılan İşler"][1].value == "Bakım <ve> test\nyapıldı"
+    assert rows["Form No"][0].fill.fgColor.rgb.endswith("FFEB3B")
+    assert rows["Form No"][1].border.left.style == "thin"
+    assert rows["DURUM"][1].value == "TAMAMLANDI"
+    assert rows["DURUM"][0].fill.fgColor.rgb.endswith("4CAF50")
+
+
+def test_excel_export_dimension_and_wrapped_values(sample_form_data):
+    sheet = load_workbook(form_service.export_form_to_excel("00001", sample_form_data)).active
+
+    assert sheet.dimensions == f"A1:B{sheet.max_row}"
+    assert sheet["A" + str(sheet.max_row)].value == "DURUM"
+    assert [str(item) for item in sheet.merged_cells.ranges] == ["A1:B1"]
+    assert sheet.column_dimensions["B"].width == 60
+    rows = {row[0].value: row for row in sheet.iter_rows(min_row=2, max_col=2) if row[0].value}
+    assert rows["Yapılan İşler"][1].alignment.wrap_text is True
+    assert rows["DURUM"][1].alignment.wrap_text is True
+    assert not rows["Form No"][0].alignment.wrap_text
@@ -0,0 +1,129 @@
+import os
+
+from openpyxl import Workbook
+
+from core import form_service, importer
+
+
+def _write_archive(directory, form_no, form_data, name=None):
+    path = os.path.join(directory, name or f"gorev_formu_{form_no}.xlsx")
+    with open(path, "wb") as handle:
+        handle.write(form_service.export_form_to_excel(form_no, form_data).getvalue())
+    return path
+
+
+def test_excel_layout_round_trips_into_form_data(tmp_path, sample_form_data):
+    sample_form_data["harcama_bildirimleri"][0].update(category="Yakıt", amount=1250.5)
+    path = _write_archive(str(tmp_path), "00042", sample_form_data)
+
+    _, form_no, form_data, error = importer.parse_workbook(path)
+    assert (form_no, error) == ("00042", "")
+    for key in ("tarih", "gorev_tarih", "avans", "gorev_yeri", "gorev_ilce", "personel_1", "personel_2",
+                "yola_cikis_tarih", "yola_cikis_saat", "calisma_bitis_saat", "mola_suresi", "hazirlayan"):
+        assert form_data[key] == (sample_form_data[key] or ""), key
+    assert form_data["harcama_bildirimleri"][0] == {
+        "description": sample_form_data["harcama_bildirimleri"][0]["description"],
+        "amount": 1250.5,
+        "currency": "TRY",
+        "category": "Yakıt",
+        "attachments": [],
+    }
+    assert form_service.determine_form_status(form_data).code == "TAMAMLANDI"
+
+
+def _write_legacy_archive(path):
+    """Kategori/tutar sütunu olmayan eski ``_build_excel_workbook`` düzeni."""
+
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = "Görev Formu"
+    rows = [
+        ("DELTA PROJE - GÖREV FORMU", None),
+        ("Form No", "00007"),
+        ("Tarih", "05.01.2024"),
+        ("Görev Tarihi", "06.01.2024"),
+        (None, None),
+        ("Görevli Personel", None),
+        ("Personel 1", "Ali"),
+        (None, None),
+        ("Görev Yeri", "Ankara"),
+        (
+            "Harcama Bildirimleri",
+            "1. Otel - Ankara şubesi (Ekler: fis.jpg)\n2. Yakıt\n3. Açıklama belirtilmedi",
+        ),
+        ("Yola Çıkış", "06.01.2024 08:00"),
+        ("Toplam Mola", "30 dakika"),
+        ("DURUM", "YARIM"),
+    ]
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def test_legacy_layout_keeps_dashes_in_expense_descriptions(tmp_path):
+    path = str(tmp_path / "gorev_formu_00007.xlsx")
+    _write_legacy_archive(path)
+
+    _, form_no, form_data, error = importer.parse_workbook(path)
+    assert (form_no, error) == ("00007", "")
+    assert (form_data["personel_1"], form_data["gorev_yeri"]) == ("Ali", "Ankara")
+    assert (form_data["yola_cikis_tarih"], form_data["yola_cikis_saat"]) == ("06.01.2024", "08:00")
+    assert form_data["mola_suresi"] == "30"
+    assert [
+        (item["description"], item["category"], item["amount"])
+        for item in form_data["harcama_bildirimleri"]
+    ] == [("Otel - Ankara şubesi", "", None), ("Yakıt", "", None), ("", "", None)]
+
+
+def test_import_directory_dedupes_and_reports(tmp_path, sample_form_data):
+    archive = tmp_path / "arsiv"
+    archive.mkdir()
+    base_path = str(tmp_path / "db")
+    os.makedirs(base_path)
+    form_service.save_form("00001", dict(sample_form_data, gorev_yeri="Web"), base_path=base_path)
+
+    for number in range(1, 6):
+        _write_archive(str(archive), f"{number:05d}", dict(sample_form_data, gorev_yeri=f"Arşiv {number}"))
+    _write_archive(str(archive), "00003", sample_form_data, name="gorev_formu_00003_kopya.xlsx")
+    (archive / "gorev_formu_00009.xlsx").write_bytes(b"bozuk")
+
+    summary = importer.import_directory(str(archive), base_path=base_path, workers=2, chunk_size=2)
+    assert (summary.files, summary.imported, summary.skipped_existing, summary.duplicates) == (7, 4, 1, 1)
+    assert [os.path.basename(path) for path, _ in summary.failed] == ["gorev_formu_00009.xlsx"]
+    assert "Aktarılan form     : 4" in summary.lines()
+
+    assert form_service.load_form_data("00001", base_path=base_path)["gorev_yeri"] == "Web"
+    imported = form_service.load_form_data("00004", base_path=base_path)
+    assert imported["gorev_yeri"] == "Arşiv 4" and imported["durum"] == "TAMAMLANDI"
+    assert len(imported["harcama_bildirimleri"]) == 2
+    assert form_service.get_next_form_no(base_path=base_path) == "00006"
+
+    again = importer.import_directory(str(archive), base_path=base_path, workers=1)
+    assert (again.imported, again.skipped_existing) == (0, 6)
+
+
+def test_forms_saved_during_import_are_not_overwritten(tmp_path, monkeypatch, sample_form_data):
+    archive = tmp_path / "arsiv"
+    archive.mkdir()
+    base_path = str(tmp_path / "db")
+    os.makedirs(base_path)
+    for number in range(1, 4):
+        _write_archive(str(archive), f"{number:05d}", dict(sample_form_data, gorev_yeri=f"Arşiv {number}"))
+
+    parsed_files = importer._parsed_files
+
+    def parse_while_saving(paths, workers):
+        for index, item in enumerate(parsed_files(paths, workers)):
+            if index == 1:
+                # Arşiv ayrıştırılırken aynı numara web uygulamasında kaydedilir.
+                form_service.save_form("00002", dict(sample_form_data, gorev_yeri="Web"), base_path=base_path)
+            yield item
+
+    monkeypatch.setattr(importer, "_parsed_files", parse_while_saving)
+    summary = importer.import_directory(str(archive), base_path=base_path, workers=1, chunk_size=5)
+    assert (summary.imported, summary.skipped_existing) == (2, 1)
+
+    saved = form_service.load_form_data("00002", base_path=base_path)
+    assert saved["gorev_yeri"] == "Web"
+    assert len(saved["harcama_bildirimleri"]) == len(sample_form_data["harcama_bildirimleri"])
+    assert form_service.load_form_data("00003", base_path=base_path)["gorev_yeri"] == "Arşiv 3"
@@ -0,0 +1,95 @@
+import io
+import zipfile
+from datetime import date, datetime, timezone
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+ds = pytest.importorskip("pyarrow.dataset")
+
+from core import export_jobs, form_service, parquet_snapshot  # noqa: E402
+from core.db import get_connection  # noqa: E402
+
+
+def _set_updated_at(base_path, form_no, value):
+    with get_connection(base_path) as connection:
+        connection.execute("UPDATE forms SET updated_at = ? WHERE form_no = ?", (value, form_no))
+        connection.commit()
+
+
+def _read(output_dir, table):
+    return ds.dataset(str(output_dir / table), partitioning="hive").to_table()
+
+
+def test_snapshot_is_typed_partitioned_and_incremental(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    output_dir = tmp_path / "snapshot"
+    sample_form_data["harcama_bildirimleri"][0].update(amount="1.250,50", category="Yemek")
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    form_service.save_form("00002", dict(sample_form_data, yola_cikis_tarih="03.01.2023"), base_path=base_path)
+    _set_updated_at(base_path, "00001", "2024-03-01 10:00:00")
+    _set_updated_at(base_path, "00002", "2024-03-01 10:00:00")
+
+    first = parquet_snapshot.write_snapshot(
+        str(output_dir),
+        partition_by_year=True,
+        row_group_size=1,
+        base_path=base_path,
+        now=datetime(2024, 3, 2, tzinfo=timezone.utc),
+    )
+    assert {name: info["rows"] for name, info in first["tables"].items()} == {
+        "forms": 2,
+        "personnel": 4,
+        "expenses": 4,
+        "task_requests": 0,
+    }
+    assert "forms/year=2023/part-20240302T000000.parquet" in first["tables"]["forms"]["files"]
+
+    forms = _read(output_dir, "forms").sort_by("form_no")
+    assert forms.schema.field("gorev_tarih").type == pa.date32()
+    assert forms.schema.field("work_hours").type == pa.float64()
+    assert forms.column("year").to_pylist() == [2024, 2023]
+    record = forms.to_pylist()[0]
+    assert record["gorev_tarih"] == date(2024, 1, 5)
+    assert record["yola_cikis"] == datetime(2024, 1, 2, 8, 0)
+    assert (record["travel_hours"], record["work_hours"], record["avans"]) == (11.0, 9.0, 1000.0)
+    assert 1250.5 in _read(output_dir, "expenses").column("amount").to_pylist()
+
+    form_service.save_form("00001", dict(sample_form_data, gorev_yeri="Ankara"), base_path=base_path)
+    _set_updated_at(base_path, "00001", "2024-03-05 09:00:00")
+    second = parquet_snapshot.write_snapshot(
+        str(output_dir),
+        incremental=True,
+        partition_by_year=True,
+        base_path=base_path,
+        now=datetime(2024, 3, 6, tzinfo=timezone.utc),
+    )
+    assert second["tables"]["forms"]["since"] == "2024-03-02 00:00:00"
+    assert (second["tables"]["forms"]["rows"], second["tables"]["task_requests"]["files"]) == (1, [])
+    latest = _read(output_dir, "forms").to_pylist()
+    assert sorted(row["gorev_yeri"] for row in latest if row["form_no"] == "00001") == ["Ankara", "İstanbul"]
+
+    with pytest.raises(parquet_snapshot.SnapshotError):
+        parquet_snapshot.write_snapshot(str(output_dir), incremental=True, base_path=base_path)
+
+
+def test_parquet_export_job_streams_written_files(tmp_path, monkeypatch, sample_form_data):
+    base_path = str(tmp_path)
+    monkeypatch.setenv("EXPORT_JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setenv("PARQUET_SNAPSHOT_DIR", str(tmp_path / "snapshots"))
+    monkeypatch.setattr(export_jobs, "_kick", lambda base_path: None)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    with pytest.raises(export_jobs.ExportJobError):
+        export_jobs.submit_export_job("parquet", {"tables": ["users"]}, base_path=base_path, start=False)
+    job = export_jobs.submit_export_job(
+        "parquet", {"tables": ["forms", "expenses"]}, base_path=base_path, start=False
+    )
+    assert export_jobs.run_pending_jobs(base_path=base_path) == 1
+
+    path, filename, mimetype = export_jobs.get_export_artifact(job["job_id"], base_path=base_path)
+    assert filename.startswith("parquet_tam_") and mimetype == "application/zip"
+    with open(path, "rb") as handle:
+        names = zipfile.ZipFile(io.BytesIO(handle.read())).namelist()
+    assert names[-1] == parquet_snapshot.STATE_FILENAME
+    assert [name.split("/")[0] for name in names[:-1]] == ["forms", "expenses"]
@@ -0,0 +1,76 @@
+import io
+import re
+
+import pytest
+from reportlab import rl_config
+
+from core import export_jobs, form_service, pdf_booklet
+
+
+@pytest.fixture
+def base_path(tmp_path, sample_form_data):
+    for number, day in ((1, "03.01.2024"), (2, "01.01.2024"), (3, "15.02.2024")):
+        form_data = dict(sample_form_data, yola_cikis_tarih=day, gorev_yeri=f"Saha {number}")
+        form_service.save_form(f"{number:05d}", form_data, base_path=str(tmp_path))
+    return str(tmp_path)
+
+
+def test_booklet_has_toc_outline_and_one_section_per_form(base_path):
+    entries = pdf_booklet.booklet_entries(start_date="2024-01-01", end_date="2024-01-31", base_path=base_path)
+    assert [entry["form_no"] for entry in entries] == ["00002", "00001"]
+
+    output = io.BytesIO()
+    pages = pdf_booklet.write_booklet(entries, output, title="Ocak 2024", base_path=base_path)
+    data = output.getvalue()
+    assert data.startswith(b"%PDF") and pages == 3
+    assert data.count(b"/Subtype /Link") == 2
+    assert b"/Outlines" in data and data.count(b"/Subtype /Form") == 1
+
+    with pytest.raises(pdf_booklet.BookletError):
+        pdf_booklet.booklet_entries(start_date="2030-01-01", base_path=base_path)
+
+
+def _pdf_objects(data):
+    """Çapraz referans tablosundaki her girdinin işaret ettiği nesne başlığını doğrula."""
+
+    xref = int(re.search(rb"startxref\s+(\d+)", data).group(1))
+    count = int(re.match(rb"xref\s+0 (\d+)", data[xref:]).group(1))
+    offsets = re.findall(rb"(\d{10}) 00000 n", data[xref:])
+    assert len(offsets) == count - 1
+    for number, offset in enumerate(offsets, 1):
+        assert data[int(offset):].startswith(b"%d 0 obj" % number)
+    return sorted(re.findall(rb"stream\r?\n(.*?)endstream", data, re.S))
+
+
+def test_booklet_is_written_page_by_page(base_path, monkeypatch):
+    monkeypatch.setattr(rl_config, "invariant", 1)
+    entries = pdf_booklet.booklet_entries(base_path=base_path)
+    streamed = io.BytesIO()
+    pdf_booklet.write_booklet(entries, streamed, base_path=base_path)
+
+    output_file = pdf_booklet._OutputFile
+    monkeypatch.setattr(pdf_booklet, "_OutputFile", lambda output, version: output_file(io.BytesIO(), version))
+    monkeypatch.setattr(pdf_booklet, "_flush_pages", lambda pdf, out, start: start)
+    monkeypatch.setattr(pdf_booklet, "_finish_document", lambda pdf, out: pdf.save())
+    saved = io.BytesIO()
+    pdf_booklet.write_booklet(entries, saved, base_path=base_path)
+
+    # Nesne sırası farklı olsa da içerik reportlab'in kendi çıktısıyla aynıdır.
+    assert _pdf_objects(streamed.getvalue()) == _pdf_objects(saved.getvalue())
+    assert streamed.getvalue().count(b"/Type /Page\n") == 4
+
+
+def test_booklet_export_job(base_path, tmp_path, monkeypatch):
+    monkeypatch.setenv("EXPORT_JOB_DIR", str(tmp_path / "jobs"))
+    monkeypatch.setattr(export_jobs, "_kick", lambda base_path: None)
+
+    job = export_jobs.submit_export_job("booklet", {}, base_path=base_path, start=False)
+    assert (job["total"], job["filename"]) == (3, "gorev_formlari_kitapcik_tumu.pdf")
+    export_jobs.run_pending_jobs(base_path=base_path)
+
+    finished = export_jobs.get_export_job(job["job_id"], base_path=base_path)
+    assert (finished["status"], finished["done"]) == ("done", 3)
+    path, _, mimetype = export_jobs.get_export_artifact(job["job_id"], base_path=base_path)
+    assert mimetype == "application/pdf"
+    with open(path, "rb") as handle:
+        assert handle.read(4) == b"%PDF"
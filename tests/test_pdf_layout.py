@@ -0,0 +1,46 @@
+import re
+
+from reportlab.pdfbase import pdfmetrics
+
+from core import form_service, pdf_layout
+
+
+def _page_count(data: bytes) -> int:
+    return len(re.findall(rb"/Type /Page(?![s\w])", data))
+
+
+def test_wrap_text_fits_width_and_keeps_line_breaks():
+    regular, _ = pdf_layout.register_fonts()
+    text = "Çağrı merkezindeki arıza giderildi ve sistem yeniden başlatıldı. " * 5 + "\nİkinci satır"
+
+    lines = pdf_layout.wrap_text(text, regular, 10, 150)
+
+    assert len(lines) > 5
+    assert lines[-1] == "İkinci satır"
+    assert all(pdfmetrics.stringWidth(line, regular, 10) <= 150 for line in lines)
+    assert " ".join(lines[:-1]).split() == text.split("\n")[0].split()
+
+
+def test_wrap_text_splits_words_longer_than_the_column():
+    regular, _ = pdf_layout.register_fonts()
+
+    lines = pdf_layout.wrap_text("x" * 200, regular, 10, 100)
+
+    assert "".join(lines) == "x" * 200
+    assert all(pdfmetrics.stringWidth(line, regular, 10) <= 100 for line in lines)
+
+
+def test_turkish_font_is_registered_once():
+    assert pdf_layout.register_fonts() == (pdf_layout.FONT_NAME, pdf_layout.BOLD_FONT_NAME)
+    assert pdf_layout.register_fonts() is pdf_layout.register_fonts()
+
+
+def test_long_form_flows_onto_additional_pages(sample_form_data):
+    short = form_service.export_form_to_pdf("00001", sample_form_data).getvalue()
+    sample_form_data["yapilan_isler"] = "Pano bakımı ve kablo kontrolü yapıldı. " * 300
+
+    long = form_service.export_form_to_pdf("00001", sample_form_data).getvalue()
+
+    assert _page_count(short) == 1
+    assert _page_count(long) > 2
+    assert b"/FontFile2" in long
@@ -0,0 +1,55 @@
+import csv
+import io
+
+from openpyxl import load_workbook
+
+from core import form_service, register_export
+
+
+def _save_forms(base_path, sample_form_data):
+    sample_form_data["harcama_bildirimleri"][0]["amount"] = "1.250,50"
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    second = dict(sample_form_data, personel_1="Zeynep", harcama_bildirimleri=[], yola_cikis_tarih="10.02.2024")
+    form_service.save_form("00002", second, base_path=base_path)
+
+
+def test_register_rows_follow_search_filters(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    _save_forms(base_path, sample_form_data)
+
+    rows = list(register_export.iter_register_rows(base_path=base_path))
+    assert [row[0] for row in rows] == ["00002", "00001"]
+
+    row = dict(zip(register_export.REGISTER_HEADERS, rows[1]))
+    assert row["Görevli Personel"] == "Ali, Veli"
+    assert row["Yola Çıkış"] == "02.01.2024 08:00"
+    assert (row["Yol Süresi (sa)"], row["Çalışma Süresi (sa)"]) == (11.0, 9.0)
+    assert (row["Mola (dk)"], row["Avans"]) == (30, 1000.0)
+    assert (row["Harcama Adedi"], row["Harcama Toplamı"]) == (2, "1.250,50 TRY")
+    assert row["Durum"] == "TAMAMLANDI"
+
+    filtered = register_export.iter_register_rows(person="zeynep", base_path=base_path)
+    assert [row[0] for row in filtered] == ["00002"]
+    dated = register_export.iter_register_rows(end_date="31.01.2024", base_path=base_path)
+    assert [row[0] for row in dated] == ["00001"]
+
+
+def test_register_streams_as_xlsx_and_csv(tmp_path, sample_form_data, monkeypatch):
+    monkeypatch.setattr(register_export, "FETCH_BATCH_SIZE", 1)
+    base_path = str(tmp_path)
+    _save_forms(base_path, sample_form_data)
+
+    chunks = list(register_export.stream_register("xlsx", base_path=base_path))
+    sheet = load_workbook(io.BytesIO(b"".join(chunks))).active
+    values = list(sheet.iter_rows(values_only=True))
+    assert values[0] == register_export.REGISTER_HEADERS
+    assert [row[0] for row in values[1:]] == ["00002", "00001"]
+    assert values[2][15] == "1.250,50 TRY"
+    assert sheet.freeze_panes == "A2"
+
+    assert sheet.dimensions == "A1:Q3"
+
+    text = b"".join(register_export.stream_register("csv", base_path=base_path)).decode("utf-8-sig")
+    records = list(csv.reader(io.StringIO(text)))
+    assert tuple(records[0]) == register_export.REGISTER_HEADERS
+    assert [record[0] for record in records[1:]] == ["00002", "00001"]
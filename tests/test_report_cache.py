@@ -0,0 +1,101 @@
+from core import form_service, report_cache
+from core.db import get_connection
+
+
+def _summary(base_path):
+    return form_service.get_reporting_summary(
+        start_date="2024-01-01",
+        end_date="2024-12-31",
+        base_path=base_path,
+    )
+
+
+def test_repeated_summary_is_served_from_cache(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    first = _summary(base_path)
+    second = _summary(base_path)
+
+    assert first == second
+    stats = report_cache.get_cache_stats(base_path=base_path)
+    assert stats["misses"] == 1
+    assert stats["hits"] == 1
+    assert stats["hit_rate"] == 0.5
+    assert stats["entries"] == 1
+
+
+def test_form_save_invalidates_cached_summary(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    assert _summary(base_path)["total_forms"] == 1
+
+    form_service.save_form("00002", sample_form_data, base_path=base_path)
+    assert _summary(base_path)["total_forms"] == 2
+
+    form_service.assign_form(
+        "00002", assigned_to_user_id=None, assigned_by_user_id=None, base_path=base_path
+    )
+    _summary(base_path)
+    stats = report_cache.get_cache_stats(base_path=base_path)
+    assert stats["hits"] == 0
+    assert stats["misses"] == 3
+
+
+def test_cache_is_bounded_by_max_entries(tmp_path, sample_form_data, monkeypatch):
+    base_path = str(tmp_path)
+    monkeypatch.setenv("REPORT_CACHE_MAX_ENTRIES", "2")
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    for month in ("01", "02", "03"):
+        form_service.get_reporting_summary(
+            start_date=f"2024-{month}-01", end_date=f"2024-{month}-28", base_path=base_path
+        )
+
+    with get_connection(base_path) as connection:
+        keys = [
+            row["cache_key"]
+            for row in connection.execute("SELECT cache_key FROM report_cache").fetchall()
+        ]
+    assert len(keys) == 2
+    assert not any("2024-01-01" in key for key in keys)
+
+
+def test_cache_hit_does_not_write_until_flushed(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    _summary(base_path)
+
+    def _last_accessed():
+        with get_connection(base_path) as connection:
+            return connection.execute("SELECT last_accessed FROM report_cache").fetchone()[
+                "last_accessed"
+            ]
+
+    stored = _last_accessed()
+    _summary(base_path)
+    assert _last_accessed() == stored
+
+    report_cache.flush_cache_stats(base_path=base_path)
+    assert _last_accessed() > stored
+    assert report_cache.get_cache_stats(base_path=base_path)["hits"] == 1
+
+
+def test_stale_compute_does_not_overwrite_newer_entry(tmp_path):
+    base_path = str(tmp_path)
+    key_parts = ("stale",)
+    with get_connection(base_path) as connection:
+        report_cache.get_data_version(connection)
+
+    def _stale_compute():
+        # Hesaplama sürerken veri değişir ve başka bir istek yeni sonucu yazar.
+        with get_connection(base_path) as connection:
+            report_cache.bump_data_version(connection)
+            connection.commit()
+        report_cache.get_or_compute(key_parts, lambda: {"value": "yeni"}, base_path=base_path)
+        return {"value": "eski"}
+
+    assert report_cache.get_or_compute(key_parts, _stale_compute, base_path=base_path) == {
+        "value": "eski"
+    }
+    assert report_cache.get_cached(key_parts, base_path=base_path) == {"value": "yeni"}
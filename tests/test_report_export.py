@@ -0,0 +1,55 @@
+import io
+
+from openpyxl import load_workbook
+
+from core import form_service, report_export
+
+
+def test_report_workbook_contains_summary_and_all_forms(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    for index in range(1, 4):
+        form_service.save_form(f"{index:05d}", sample_form_data, base_path=base_path)
+
+    stream = io.BytesIO()
+    report_export.write_report_workbook(
+        stream, start_date="2024-01-01", end_date="2024-12-31", base_path=base_path
+    )
+    stream.seek(0)
+    workbook = load_workbook(stream, read_only=True)
+
+    assert workbook.sheetnames == ["Özet", "Kişiler", "Lokasyonlar", "Harcamalar", "Formlar"]
+    rows = list(workbook["Formlar"].iter_rows(values_only=True))
+    assert rows[0] == report_export.FORM_SHEET_HEADERS
+    assert [row[0] for row in rows[1:]] == ["00003", "00002", "00001"]
+    assert rows[1][3] == "Ali, Veli"
+    assert rows[1][4:7] == (11.0, 9.0, 2)
+
+    summary = {
+        row[0]: row[1] for row in workbook["Özet"].iter_rows(min_col=1, max_col=2, values_only=True)
+    }
+    assert summary["Toplam Form"] == 3
+
+
+def test_stream_uses_anonymous_temporary_file(tmp_path, sample_form_data, monkeypatch):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    created = []
+    original = report_export.tempfile.TemporaryFile
+
+    def tracking_temporary_file(*args, **kwargs):
+        stream = original(*args, **kwargs)
+        created.append(stream)
+        return stream
+
+    monkeypatch.setattr(report_export.tempfile, "TemporaryFile", tracking_temporary_file)
+
+    data = b"".join(report_export.stream_report_workbook(base_path=base_path, chunk_size=1024))
+
+    assert data.startswith(b"PK")
+    assert len(created) == 1 and created[0].closed
+
+    chunks = report_export.stream_report_workbook(base_path=base_path, chunk_size=1024)
+    next(chunks)
+    chunks.close()
+
+    assert created[1].closed
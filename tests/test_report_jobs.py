@@ -0,0 +1,96 @@
+import time
+
+from core import report_jobs
+from core.db import get_connection
+
+
+def _wait_for(job_id, base_path, timeout=10.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = report_jobs.get_report_job(job_id, base_path=base_path)
+        if job["status"] in {"done", "failed"}:
+            return job
+        time.sleep(0.05)
+    raise AssertionError("Rapor işi zamanında tamamlanmadı.")
+
+
+def test_long_range_detection(monkeypatch):
+    monkeypatch.setenv("REPORT_ASYNC_MIN_DAYS", "31")
+    assert not report_jobs.is_long_range("2024-01-01", "2024-01-31")
+    assert report_jobs.is_long_range("2024-01-01", "2024-03-31")
+    assert report_jobs.is_long_range("", "2024-03-31")
+
+
+def test_report_job_runs_in_background_and_is_reused(tmp_path, sample_form_data):
+    from core import form_service
+
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    job = report_jobs.submit_report_job(
+        start_date="2020-01-01", end_date="2024-12-31", base_path=base_path
+    )
+    assert job["status"] in {"queued", "running", "done"}
+
+    finished = _wait_for(job["job_id"], base_path)
+    assert finished["status"] == "done"
+    assert finished["result"]["total_forms"] == 1
+
+    again = report_jobs.submit_report_job(
+        start_date="01.01.2020", end_date="31.12.2024", base_path=base_path
+    )
+    assert again["job_id"] == job["job_id"]
+    assert again["result"] == finished["result"]
+
+
+def test_concurrency_limit_keeps_job_queued(tmp_path, monkeypatch):
+    base_path = str(tmp_path)
+    monkeypatch.setenv("REPORT_JOB_MAX_CONCURRENT", "1")
+    with get_connection(base_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO report_jobs (job_id, start_date, end_date, data_version, status, created_at, started_at)
+            VALUES ('busy', '', '', 0, 'running', ?, ?)
+            """,
+            (time.time(), time.time()),
+        )
+        connection.execute(
+            """
+            INSERT INTO report_jobs (job_id, start_date, end_date, data_version, status, created_at)
+            VALUES ('waiting', '', '', 0, 'queued', ?)
+            """,
+            (time.time(),),
+        )
+        connection.commit()
+
+    assert not report_jobs._claim_slot("waiting", base_path)
+
+    with get_connection(base_path) as connection:
+        connection.execute("UPDATE report_jobs SET status = 'done' WHERE job_id = 'busy'")
+        connection.commit()
+
+    assert report_jobs._claim_slot("waiting", base_path)
+    assert report_jobs.get_report_job("waiting", base_path=base_path)["status"] == "running"
+
+
+def test_report_page_redirects_job_to_its_own_range(web_client):
+    web_client.login(user_id=1)
+    with get_connection(web_client.base_path) as connection:
+        connection.execute(
+            """
+            INSERT INTO report_jobs (job_id, start_date, end_date, data_version, status, created_at)
+            VALUES ('job-a', '2024-01-01', '2024-03-31', 0, 'queued', ?)
+            """,
+            (time.time(),),
+        )
+        connection.commit()
+
+    response = web_client.get("/reports?start_date=2024-05-01&end_date=2024-05-31&job=job-a")
+    assert response.status_code == 302
+    location = response.headers["Location"]
+    assert "start_date=2024-01-01" in location
+    assert "end_date=2024-03-31" in location
+    assert "job=job-a" in location
+
+    response = web_client.get("/reports?start_date=2024-01-01&end_date=2024-03-31&job=job-a")
+    assert response.status_code == 200
@@ -0,0 +1,78 @@
+import pytest
+
+from core import form_service, report_parallel
+
+
+def _save_months(base_path, sample_form_data):
+    months = ["02.01.2024", "15.01.2024", "10.03.2024", "28.02.2025", "05.06.2025"]
+    for index, day in enumerate(months, 1):
+        payload = dict(
+            sample_form_data,
+            yola_cikis_tarih=day,
+            donus_tarih=day,
+            calisma_baslangic_tarih=day,
+            calisma_bitis_tarih=day,
+            personel_3="Ayşe" if index % 2 else "",
+            gorev_il="Ankara" if index > 3 else "İstanbul",
+        )
+        if index == 4:
+            payload["harcama_bildirimleri"] = []
+        form_service.save_form(f"{index:05d}", payload, base_path=base_path)
+
+
+def test_monthly_shards_are_newest_first_and_clipped(tmp_path):
+    shards = report_parallel.monthly_shards("2024-01-15", "2024-03-10", base_path=str(tmp_path))
+
+    assert shards == [
+        ("2024-03-01", "2024-03-10"),
+        ("2024-02-01", "2024-02-29"),
+        ("2024-01-15", "2024-01-31"),
+    ]
+
+
+@pytest.mark.parametrize("bounds", [("2024-01-01", "2025-12-31"), (None, None)])
+def test_parallel_summary_matches_single_pass(tmp_path, sample_form_data, monkeypatch, bounds):
+    monkeypatch.setattr(form_service, "REPORT_CHART_MAX_BARS", 3)
+    monkeypatch.setattr(report_parallel, "REPORT_CHART_MAX_BARS", 3)
+    base_path = str(tmp_path)
+    _save_months(base_path, sample_form_data)
+
+    expected = form_service._compute_reporting_summary(*bounds, base_path=base_path, engine="python")
+    merged = report_parallel.compute_reporting_summary(*bounds, base_path=base_path, workers=2)
+
+    assert merged["engine"] == "parallel"
+    expected.pop("engine")
+    merged.pop("engine")
+    assert merged == expected
+    assert merged["expense_chart"]["aggregated"] is True
+
+
+def test_parallel_engine_selected_for_long_ranges(tmp_path, sample_form_data, monkeypatch):
+    base_path = str(tmp_path)
+    _save_months(base_path, sample_form_data)
+    monkeypatch.setenv("REPORT_PARALLEL_WORKERS", "2")
+    monkeypatch.setenv("REPORT_PARALLEL_MIN_ROWS", "5")
+
+    assert report_parallel.should_parallelize("2020-01-01", "2025-12-31", base_path=base_path)
+    assert not report_parallel.should_parallelize("2025-01-01", "2025-12-31", base_path=base_path)
+    monkeypatch.setenv("REPORT_PARALLEL_WORKERS", "1")
+    assert not report_parallel.should_parallelize("2020-01-01", "2025-12-31", base_path=base_path)
+    monkeypatch.delenv("REPORT_PARALLEL_WORKERS")
+    assert not report_parallel.should_parallelize("2020-01-01", "2025-12-31", base_path=base_path)
+
+
+def test_worker_pool_is_reused_between_reports(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    _save_months(base_path, sample_form_data)
+    bounds = ("2020-01-01", "2025-12-31")
+
+    try:
+        report_parallel.compute_reporting_summary(*bounds, base_path=base_path, workers=2)
+        pool = report_parallel._POOL
+        report_parallel.compute_reporting_summary(*bounds, base_path=base_path, workers=2)
+
+        assert pool is not None
+        assert report_parallel._POOL is pool
+    finally:
+        report_parallel.shutdown_pool()
+    assert report_parallel._POOL is None
@@ -0,0 +1,128 @@
+import re
+
+import pytest
+
+from core import form_service, reporting
+
+
+def test_monthly_timeseries_buckets_forms_in_sql(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    march = dict(
+        sample_form_data,
+        yola_cikis_tarih="10.03.2024",
+        donus_tarih="10.03.2024",
+        calisma_baslangic_tarih="10.03.2024",
+        calisma_bitis_tarih="10.03.2024",
+        harcama_bildirimleri=[],
+    )
+    form_service.save_form("00002", march, base_path=base_path)
+
+    result = reporting.get_reporting_timeseries(
+        start_date="2024-01-01", end_date="2024-04-30", bucket="month", base_path=base_path
+    )
+
+    assert result["labels"] == ["2024-01-01", "2024-02-01", "2024-03-01", "2024-04-01"]
+    assert result["series"]["forms"] == [1, 0, 1, 0]
+    assert result["series"]["travel_hours"] == [11.0, 0.0, 11.0, 0.0]
+    assert result["series"]["work_hours"] == [9.0, 0.0, 9.0, 0.0]
+    assert result["series"]["expenses"] == [2, 0, 0, 0]
+    assert result["series"]["conversions"] == [0, 0, 0, 0]
+
+
+def test_weekly_buckets_start_on_monday(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+
+    result = reporting.get_reporting_timeseries(
+        start_date="02.01.2024", end_date="10.01.2024", bucket="week", base_path=base_path
+    )
+
+    assert result["labels"] == ["2024-01-01", "2024-01-08"]
+    assert result["series"]["forms"] == [1, 0]
+
+
+def test_out_of_range_times_are_excluded_from_hours(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    broken = dict(sample_form_data, calisma_bitis_saat="25:99", harcama_bildirimleri=[])
+    form_service.save_form("00001", broken, base_path=base_path)
+
+    result = reporting.get_reporting_timeseries(
+        start_date="2024-01-01", end_date="2024-01-31", bucket="month", base_path=base_path
+    )
+    assert result["series"]["forms"] == [1]
+    assert result["series"]["work_hours"] == [0.0]
+
+    # PostgreSQL ifadesi aynı değeri CAST etmeden NULL'a çevirmeli.
+    pattern = re.compile(reporting.CLOCK_PATTERN)
+    assert not pattern.match("25:99") and not pattern.match("12:60")
+    assert pattern.match("23:59") and pattern.match("08:30:15")
+
+
+def test_invalid_parameters_are_rejected(tmp_path):
+    with pytest.raises(reporting.ReportingError):
+        reporting.get_reporting_timeseries(bucket="year", base_path=str(tmp_path))
+    with pytest.raises(reporting.ReportingError):
+        reporting.get_reporting_timeseries(start_date="yarın", base_path=str(tmp_path))
+    with pytest.raises(reporting.ReportingError):
+        reporting.get_reporting_timeseries(
+            start_date="2000-01-01", end_date="2030-01-01", bucket="day", base_path=str(tmp_path)
+        )
+
+
+def test_forms_table_is_paginated(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    for index in range(1, 6):
+        form_service.save_form(f"{index:05d}", sample_form_data, base_path=base_path)
+
+    page = form_service.get_report_forms_page(
+        start_date="2024-01-01", end_date="2024-12-31", page=2, per_page=2, base_path=base_path
+    )
+
+    assert page["total"] == 5
+    assert page["pages"] == 3
+    assert [item["form_no"] for item in page["items"]] == ["00003", "00002"]
+    assert page["items"][0]["travel_hours"] == 11.0
+    assert page["items"][0]["expense_count"] == 2
+
+
+def test_expense_chart_is_capped_with_other_bucket(tmp_path, sample_form_data, monkeypatch):
+    base_path = str(tmp_path)
+    monkeypatch.setattr(form_service, "REPORT_CHART_MAX_BARS", 3)
+    for index in range(1, 6):
+        payload = dict(sample_form_data)
+        payload["harcama_bildirimleri"] = [{"description": "x", "attachments": []}] * index
+        form_service.save_form(f"{index:05d}", payload, base_path=base_path)
+
+    chart = form_service.get_reporting_summary(
+        start_date="2024-01-01", end_date="2024-12-31", base_path=base_path
+    )["expense_chart"]
+
+    assert chart["aggregated"] is True
+    assert chart["labels"] == ["00005", "00004", "Diğer (3 form)"]
+    assert chart["values"] == [5.0, 4.0, 6.0]
+
+
+def test_summary_reports_duration_distribution(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    variants = [
+        {},
+        {"donus_saat": "", "calisma_bitis_saat": "7:00"},
+        {"donus_tarih": "01.01.2024"},
+        {"yola_cikis_tarih": "10.02.2024", "donus_tarih": "12.02.2024", "personel_3": "Ayşe"},
+        {"calisma_baslangic_saat": "25:00"},
+    ]
+    for index, overrides in enumerate(variants, 1):
+        form_service.save_form(f"{index:05d}", dict(sample_form_data, **overrides), base_path=base_path)
+
+    summary = form_service.get_reporting_summary(
+        start_date="2024-01-01", end_date="2024-12-31", base_path=base_path
+    )
+    travel = summary["travel_hours"]
+
+    assert travel["samples"] == 3
+    assert travel["p50"] == pytest.approx(11.0)
+    assert travel["p90"] == pytest.approx(49.4)
+    assert sum(travel["histogram"]["counts"]) == travel["samples"]
+    ali = next(item for item in summary["person_breakdown"] if item["person"] == "Ali")
+    assert ali["travel_hours"] == pytest.approx(81.0)
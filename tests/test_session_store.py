@@ -0,0 +1,35 @@
+import time
+
+from core import session_store
+from core.db import get_connection
+
+
+def test_session_round_trip_is_compressed_and_expires(tmp_path, monkeypatch):
+    base_path = str(tmp_path)
+    monkeypatch.setenv("SESSION_TTL_HOURS", "2")
+    monkeypatch.setattr(session_store, "start_gc", lambda base_path: None)
+    sid = session_store.new_session_id()
+    assert session_store.is_valid_session_id(sid) and len(sid) == 43
+    assert not session_store.is_valid_session_id("../" + sid[3:])
+
+    payload = b'{"forms": {"00001": {"yapilan_isler": "' + b"bakim " * 2000 + b'"}}}'
+    expires_at = session_store.save_session(sid, payload, base_path=base_path)
+    assert expires_at > time.time() + 7000
+
+    stored = session_store.load_session(sid, base_path=base_path)
+    assert stored.payload == payload and not stored.needs_refresh()
+    with get_connection(base_path) as connection:
+        raw = connection.execute("SELECT payload FROM web_sessions").fetchone()["payload"]
+    assert len(raw) < len(payload) / 10
+
+    with get_connection(base_path) as connection:
+        connection.execute("UPDATE web_sessions SET expires_at = ?", (time.time() + 60,))
+        connection.commit()
+    assert session_store.load_session(sid, base_path=base_path).needs_refresh()
+    session_store.touch_session(sid, base_path=base_path)
+    assert not session_store.load_session(sid, base_path=base_path).needs_refresh()
+
+    other = session_store.new_session_id()
+    session_store.save_session(other, b"{}", base_path=base_path)
+    assert session_store.purge_expired_sessions(base_path=base_path, now=time.time() + 3 * 3600) == 2
+    assert session_store.load_session(sid, base_path=base_path) is None
@@ -0,0 +1,113 @@
+from datetime import date
+
+import pytest
+
+from core import db, form_service, utilization
+from core.db import get_connection
+from core.reporting import ReportingError
+
+
+def test_working_days_skip_weekends():
+    assert utilization.working_days(date(2024, 1, 1), date(2024, 1, 7)) == 5
+    assert utilization.working_days(date(2024, 1, 6), date(2024, 1, 7)) == 0
+    assert utilization.working_days(date(2024, 1, 1), date(2024, 1, 31)) == 23
+
+
+def test_person_days_index_follows_form_edits(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    trip = dict(sample_form_data, donus_tarih="03.01.2024", calisma_bitis_tarih="03.01.2024")
+    form_service.save_form("00001", trip, base_path=base_path)
+
+    with get_connection(base_path) as connection:
+        rows = connection.execute(
+            "SELECT person, work_date FROM person_days ORDER BY person, work_date"
+        ).fetchall()
+    assert [(row["person"], row["work_date"]) for row in rows] == [
+        ("Ali", "2024-01-02"),
+        ("Ali", "2024-01-03"),
+        ("Veli", "2024-01-02"),
+        ("Veli", "2024-01-03"),
+    ]
+
+    form_service.save_form("00001", dict(trip, personel_2=""), base_path=base_path)
+    with get_connection(base_path) as connection:
+        people = {
+            row["person"]
+            for row in connection.execute("SELECT person FROM person_days").fetchall()
+        }
+    assert people == {"Ali"}
+
+
+def test_utilization_per_person_and_period(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    form_service.save_form(
+        "00002",
+        dict(
+            sample_form_data,
+            personel_2="",
+            yola_cikis_tarih="05.02.2024",
+            donus_tarih="05.02.2024",
+            calisma_baslangic_tarih="05.02.2024",
+            calisma_bitis_tarih="05.02.2024",
+        ),
+        base_path=base_path,
+    )
+
+    report = utilization.get_utilization(
+        start_date="2024-01-01", end_date="2024-02-29", base_path=base_path
+    )
+    assert report["working_days"] == 44
+    ali, veli = report["people"]
+    assert ali["person"] == "Ali"
+    assert (ali["forms"], ali["active_days"]) == (2, 2)
+    assert ali["work_hours"] == pytest.approx(18.0)
+    assert ali["break_hours"] == pytest.approx(1.0)
+    assert ali["utilization"] == pytest.approx(round(17.0 / (44 * 8) * 100, 1))
+    assert veli["travel_hours"] == pytest.approx(11.0)
+
+    detail = utilization.get_utilization(
+        start_date="2024-01-01", end_date="2024-03-31", person="Ali", base_path=base_path
+    )
+    assert [item["person"] for item in detail["people"]] == ["Ali"]
+    assert [period["period"] for period in detail["periods"]] == [
+        "2024-01-01",
+        "2024-02-01",
+        "2024-03-01",
+    ]
+    assert [period["forms"] for period in detail["periods"]] == [1, 1, 0]
+    assert detail["periods"][0]["capacity_hours"] == 23 * 8
+
+
+def test_index_is_backfilled_once_for_existing_forms(tmp_path, sample_form_data):
+    base_path = str(tmp_path)
+    form_service.save_form("00001", sample_form_data, base_path=base_path)
+    with get_connection(base_path) as connection:
+        # İndeks tablosundan önceki bir veritabanı.
+        connection.execute("DELETE FROM person_days")
+        connection.execute("DELETE FROM schema_migrations WHERE name = ?", (db.PERSON_DAYS_BACKFILL,))
+        connection.commit()
+
+    db.reset_schema_flag()
+    report = utilization.get_utilization(
+        start_date="2024-01-01", end_date="2024-01-31", base_path=base_path
+    )
+    assert [item["person"] for item in report["people"]] == ["Ali", "Veli"]
+
+    with get_connection(base_path) as connection:
+        connection.execute("DELETE FROM person_days")
+        connection.commit()
+    db.reset_schema_flag()
+    report = utilization.get_utilization(
+        start_date="2024-02-01", end_date="2024-02-29", base_path=base_path
+    )
+    assert report["people"] == []
+
+
+def test_utilization_requires_valid_range(tmp_path):
+    with pytest.raises(ReportingError):
+        utilization.get_utilization(start_date="", end_date="2024-01-31", base_path=str(tmp_path))
+    with pytest.raises(ReportingError):
+        utilization.get_utilization(
+            start_date="2024-02-01", end_date="2024-01-31", base_path=str(tmp_path)
+        )
@@ -0,0 +1,111 @@
+import io
+
+from core import form_service
+
+
+def _submit(client, form_no, step_id, **kwargs):
+    return client.post(f"/api/v1/forms/{form_no}/steps/{step_id}", **kwargs)
+
+
+def test_form_resource_is_compact_and_lists_steps(web_client, sample_form_data):
+    form_service.save_form("00001", dict(sample_form_data, taseron=""), base_path=web_client.base_path)
+    web_client.login(user_id=1)
+
+    payload = web_client.get("/api/v1/forms/00001").get_json()
+    assert payload["status"] == "TAMAMLANDI" and payload["locked"] is False
+    assert [step["id"] for step in payload["steps"]][-1] == "gorev_bilgileri"
+    assert all(step["editable"] for step in payload["steps"])
+    assert "taseron" not in payload["data"] and payload["data"]["gorev_yeri"] == "İstanbul"
+
+    step = web_client.get("/api/v1/forms/00001/steps/finans_arac").get_json()
+    assert step == {
+        "form_no": "00001",
+        "step": "finans_arac",
+        "editable": True,
+        "data": {"avans": "1000", "arac_plaka": "34 ABC 123"},
+    }
+    assert web_client.get("/api/v1/forms/00001/steps/ozet").status_code == 404
+    assert web_client.get("/api/v1/forms/00404").status_code == 404
+
+
+def test_step_actions_route_and_save(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    web_client.login(user_id=1)
+
+    response = _submit(web_client, "00001", "gorev_detay", json={"gorev_yeri": " Fabrika "})
+    assert response.status_code == 200
+    body = response.get_json()
+    assert body["next_step"] == "gorev_bilgileri"
+    # Gönderilmeyen alanlar korunur, değerler doğrulanır.
+    assert body["data"]["gorev_yeri"] == "Fabrika" and body["data"]["gorev_il"] == "İstanbul"
+    assert "status" not in body
+
+    back = _submit(web_client, "00001", "gorev_detay", json={"action": "previous"}).get_json()
+    assert back["next_step"] == "finans_arac"
+    last = _submit(web_client, "00001", "gorev_bilgileri", json={"mola_suresi": "45"}).get_json()
+    assert last["next_step"] is None
+
+    saved = _submit(web_client, "00001", "gorev_detay", json={"action": "save"}).get_json()
+    assert saved["next_step"] == "gorev_detay" and saved["status"] == "TAMAMLANDI"
+    stored = form_service.load_form_data("00001", base_path=web_client.base_path)
+    assert (stored["gorev_yeri"], stored["mola_suresi"]) == ("Fabrika", "45")
+
+    assert _submit(web_client, "00001", "gorev_detay", json={"action": "sil"}).status_code == 400
+    assert _submit(web_client, "00001", "gorev_detay", json={"gorev_yeri": 1}).status_code == 400
+    invalid = _submit(
+        web_client,
+        "00001",
+        "gorev_bilgileri",
+        json={"action": "add_expense", "harcama_tutari": "abc", "mola_suresi": "90"},
+    )
+    assert invalid.status_code == 400
+    # Reddedilen gönderim oturumdaki formu değiştirmez.
+    step = web_client.get("/api/v1/forms/00001/steps/gorev_bilgileri").get_json()
+    assert step["data"]["mola_suresi"] == "45"
+
+
+def test_multipart_submission_uploads_files_and_adds_expenses(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    web_client.login(user_id=1)
+
+    response = _submit(
+        web_client,
+        "00001",
+        "gorev_bilgileri",
+        data={
+            "action": "add_expense",
+            "harcama_aciklamasi": "Yakıt",
+            "harcama_tutari": "1.250",
+            "harcama_dosyalari": (io.BytesIO(b"fis"), "fis.jpg"),
+            "gorev_ekleri": (io.BytesIO(b"rapor"), "rapor.txt"),
+        },
+        content_type="multipart/form-data",
+    )
+    assert response.status_code == 200
+    data = response.get_json()["data"]
+    assert [item["original_name"] for item in data["gorev_ekleri"]][-1] == "rapor.txt"
+    expense = data["harcama_bildirimleri"][-1]
+    assert (expense["description"], expense["amount"]) == ("Yakıt", 1250.0)
+    assert expense["attachments"][0]["original_name"] == "fis.jpg"
+    assert response.get_json()["next_step"] == "gorev_bilgileri"
+
+
+def test_employee_can_only_submit_the_report_step(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    form_service.assign_form(
+        "00001", assigned_to_user_id=5, assigned_by_user_id=1, base_path=web_client.base_path
+    )
+
+    web_client.login(user_id=9, role="calisan", full_name="Başka")
+    assert web_client.get("/api/v1/forms/00001").status_code == 403
+
+    web_client.login(user_id=5, role="calisan", full_name="Sorumlu")
+    steps = {step["id"]: step["editable"] for step in web_client.get("/api/v1/forms/00001").get_json()["steps"]}
+    assert steps["gorev_bilgileri"] and not steps["gorev_detay"]
+    assert _submit(web_client, "00001", "gorev_detay", json={"gorev_yeri": "x"}).status_code == 403
+    response = _submit(web_client, "00001", "gorev_bilgileri", json={"action": "previous"})
+    assert response.status_code == 200 and response.get_json()["next_step"] == "gorev_bilgileri"
+
+    web_client.login(user_id=1, locked_forms=["00001"])
+    assert _submit(web_client, "00001", "gorev_detay", json={}).status_code == 409
+    assert web_client.get("/api/v1/forms/00001").get_json()["locked"] is True
@@ -0,0 +1,57 @@
+from core import form_drafts, form_service
+
+
+def _patch(client, form_no, step, fields):
+    return client.patch(f"/form/{form_no}/autosave", json={"step": step, "fields": fields})
+
+
+def test_autosave_validates_fields_and_writes_the_draft(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    web_client.login(user_id=1)
+
+    response = _patch(web_client, "00001", "gorev_bilgileri", {"yola_cikis_tarih": "2024-01-03"})
+    assert response.status_code == 200
+    assert response.get_json() == {"fields": {"yola_cikis_tarih": "03.01.2024"}}
+    draft = form_drafts.load_draft(1, "00001", base_path=web_client.base_path)
+    assert draft.payload["yola_cikis_tarih"] == "03.01.2024"
+    assert draft.payload["yapilan_isler"] == sample_form_data.get("yapilan_isler", "")
+    assert not draft.is_stale
+    # Veritabanındaki kayıt değişmez.
+    stored = form_service.load_form_data("00001", base_path=web_client.base_path)
+    assert stored["yola_cikis_tarih"] == "02.01.2024"
+
+
+def test_autosave_rejects_invalid_requests(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    web_client.login(user_id=1)
+
+    unknown = _patch(web_client, "00001", "gorev_detay", {"gorev_ekleri": "x"})
+    assert unknown.status_code == 400 and "gorev_ekleri" in unknown.get_json()["error"]
+    assert _patch(web_client, "00001", "ozet", {"gorev_yeri": "x"}).status_code == 400
+    # Alan başka bir adıma ait.
+    assert _patch(web_client, "00001", "finans_arac", {"gorev_yeri": "x"}).status_code == 400
+    assert _patch(web_client, "00001", "gorev_detay", {"gorev_yeri": 5}).status_code == 400
+    assert _patch(web_client, "00001", "gorev_detay", {"gorev_yeri": "x" * 10001}).status_code == 400
+    assert _patch(web_client, "00404", "gorev_detay", {"gorev_yeri": "x"}).status_code == 404
+    assert form_drafts.load_draft(1, "00001", base_path=web_client.base_path) is None
+
+
+def test_autosave_applies_wizard_role_rules(web_client, sample_form_data):
+    form_service.save_form("00001", sample_form_data, base_path=web_client.base_path)
+    form_service.assign_form(
+        "00001", assigned_to_user_id=5, assigned_by_user_id=1, base_path=web_client.base_path
+    )
+
+    web_client.login(user_id=9, role="calisan", full_name="Başka")
+    assert _patch(web_client, "00001", "gorev_bilgileri", {"mola_suresi": "10"}).status_code == 403
+
+    web_client.login(user_id=5, role="calisan", full_name="Sorumlu")
+    assert _patch(web_client, "00001", "gorev_detay", {"gorev_yeri": "x"}).status_code == 403
+    assert _patch(web_client, "00001", "gorev_bilgileri", {"mola_suresi": "10"}).status_code == 200
+
+    web_client.login(user_id=1, locked_forms=["00001"])
+    assert _patch(web_client, "00001", "gorev_detay", {"gorev_yeri": "x"}).status_code == 409
+
+    with web_client.session_transaction() as session:
+        session.clear()
+    assert _patch(web_client, "00001", "gorev_detay", {"gorev_yeri": "x"}).status_code == 401
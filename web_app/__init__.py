@@ -1,20 +1,28 @@
 # -*- coding: utf-8 -*-
 from __future__ import annotations
 
+import hmac
+import io
 import json
 import os
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Dict, List, Optional, Set, Tuple
 from uuid import uuid4
 
 import jwt as pyjwt
-from flask import (Flask, flash, g, redirect, render_template, request,
-                   send_file, send_from_directory, session, url_for)
+from flask import (Flask, Response, flash, g, jsonify, redirect,
+                   render_template, request, send_file, send_from_directory,
+                   session, stream_with_context, url_for)
+from flask.json.tag import TaggedJSONSerializer
+from flask.sessions import SessionInterface, SessionMixin
+from werkzeug.datastructures import CallbackDict
 from werkzeug.middleware.proxy_fix import ProxyFix
 from werkzeug.utils import secure_filename
 
-from core import form_service, task_request_service, user_service
+from core import (attachment_archive, data_feed, export_cache, export_jobs,
+                  form_drafts, form_service, pdf_layout, register_export, report_cache, report_export, report_jobs,
+                  reporting, session_store, task_request_service, user_service, utilization)
 from core.form_service import FormServiceError
 from core.user_service import UserServiceError
 
@@ -24,6 +32,11 @@ from core.user_service import UserServiceError
 DEV_MODE = os.environ.get("DEV_MODE", "1").strip().lower() in {"1", "true", "yes", "on"}
 SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-key")
 APP_MODE = os.environ.get("APP_MODE", "STANDALONE")  # PORTAL or STANDALONE
+# "server": oturum verisi veritabanında, çerezde yalnızca kimlik; "cookie": Flask'in imzalı çerezi.
+SESSION_BACKEND = os.environ.get("SESSION_BACKEND", "server").strip().lower()
+FEED_API_TOKENS = [
+    token.strip() for token in os.environ.get("FEED_API_TOKENS", "").split(",") if token.strip()
+]
 
 BASE_PATH = Path(__file__).resolve().parents[1]
 DATA_FOLDER = os.environ.get("DATA_FOLDER", "").strip()
@@ -127,6 +140,29 @@ FORM_STEPS: List[Dict[str, str]] = [
     {"id": "gorev_bilgileri", "title": "Görev Bilgileri", "template": "steps/gorev_bilgileri.html"},
 ]
 
+# Otomatik kaydetme (PATCH) ile tek tek gönderilebilen metin alanları. Dosya
+# yüklemeleri ve harcama ekleme yalnızca adım gönderimiyle yapılır.
+AUTOSAVE_FIELDS: Dict[str, Tuple[str, ...]] = {
+    "form_bilgileri": ("dok_no", "rev_no", "tarih"),
+    "hazirlayan": ("hazirlayan",),
+    "gorevli_personel": tuple(f"personel_{index}" for index in range(1, 6)) + ("gorev_tarih",),
+    "finans_arac": ("avans", "taseron", "arac_plaka"),
+    "gorev_detay": ("gorev_tanimi", "gorev_yeri", "gorev_il", "gorev_ilce", "gorev_firma"),
+    "gorev_bilgileri": (
+        "yola_cikis_tarih",
+        "yola_cikis_saat",
+        "donus_tarih",
+        "donus_saat",
+        "calisma_baslangic_tarih",
+        "calisma_baslangic_saat",
+        "calisma_bitis_tarih",
+        "calisma_bitis_saat",
+        "mola_suresi",
+        "yapilan_isler",
+    ),
+}
+AUTOSAVE_MAX_VALUE_LENGTH = 10000
+
 
 def normalize_options(values) -> List[str]:
     if not isinstance(values, list):
@@ -319,9 +355,98 @@ def set_form_defaults(defaults: Dict[str, str]) -> None:
     save_form_defaults(cleaned)
 
 
+class ServerSideSession(CallbackDict, SessionMixin):
+    """Verisi ``web_sessions`` tablosunda duran oturum; çerezde yalnızca kimliği bulunur."""
+
+    def __init__(self, initial=None, *, sid: str, new: bool = False, stored=None) -> None:
+        def on_update(self_) -> None:
+            self_.modified = True
+
+        super().__init__(initial, on_update)
+        self.sid = sid
+        self.new = new
+        self.stored = stored
+        self.modified = False
+        self.rotated_from: str | None = None
+
+    def clear(self) -> None:
+        # Çıkışta oturum temizlenir; eski kimlik bir daha kullanılmasın diye yenilenir.
+        super().clear()
+        if not self.new and self.rotated_from is None:
+            self.rotated_from = self.sid
+            self.sid = session_store.new_session_id()
+            self.new = True
+
+
+class ServerSideSessionInterface(SessionInterface):
+    """Flask oturumunu ``core.session_store`` üzerinden sunucuda saklar.
+
+    Boş oturumlar hiç yazılmaz ve çerez almaz; değişmeyen oturumlar yalnızca
+    süresinin uzatılması gerektiğinde veritabanına dokunur. Statik dosya
+    istekleri oturum açmaz.
+    """
+
+    serializer = TaggedJSONSerializer()
+
+    def open_session(self, app: Flask, request) -> ServerSideSession | None:
+        if request.path.startswith(f"{app.static_url_path}/"):
+            return None
+        sid = request.cookies.get(self.get_cookie_name(app), "")
+        stored = session_store.load_session(sid, base_path=str(BASE_PATH))
+        if stored is None:
+            # Bilinmeyen kimlik yeniden kullanılmaz (oturum sabitleme önlenir).
+            return ServerSideSession(sid=session_store.new_session_id(), new=True)
+        try:
+            data = self.serializer.loads(stored.payload.decode("utf-8"))
+        except ValueError:
+            return ServerSideSession(sid=session_store.new_session_id(), new=True)
+        return ServerSideSession(data, sid=sid, stored=stored)
+
+    def save_session(self, app: Flask, session: ServerSideSession, response: Response) -> None:
+        name = self.get_cookie_name(app)
+        domain = self.get_cookie_domain(app)
+        path = self.get_cookie_path(app)
+        secure = self.get_cookie_secure(app)
+        samesite = self.get_cookie_samesite(app)
+        httponly = self.get_cookie_httponly(app)
+        response.vary.add("Cookie")
+        if session.rotated_from is not None:
+            session_store.delete_session(session.rotated_from, base_path=str(BASE_PATH))
+
+        if not session:
+            if not session.new:
+                session_store.delete_session(session.sid, base_path=str(BASE_PATH))
+            if not session.new or session.rotated_from is not None:
+                response.delete_cookie(
+                    name, domain=domain, path=path, secure=secure, samesite=samesite, httponly=httponly
+                )
+            return
+
+        if session.modified or session.new:
+            payload = self.serializer.dumps(dict(session)).encode("utf-8")
+            session_store.save_session(session.sid, payload, base_path=str(BASE_PATH))
+        elif session.stored is not None and session.stored.needs_refresh():
+            session_store.touch_session(session.sid, base_path=str(BASE_PATH))
+        elif not session.permanent:
+            return
+
+        response.set_cookie(
+            name,
+            session.sid,
+            expires=self.get_expiration_time(app, session),
+            domain=domain,
+            path=path,
+            secure=secure,
+            samesite=samesite,
+            httponly=httponly,
+        )
+
+
 def create_app() -> Flask:
     app = Flask(__name__)
     app.secret_key = os.environ.get("FLASK_SECRET_KEY", SECRET_KEY)
+    if SESSION_BACKEND != "cookie":
+        app.session_interface = ServerSideSessionInterface()
 
     # ProxyFix: trust X-Forwarded-* headers from reverse proxy (Nginx)
     app.wsgi_app = ProxyFix(app.wsgi_app, x_for=1, x_proto=1, x_host=1, x_prefix=1)
@@ -330,6 +455,8 @@ def create_app() -> Flask:
         user_service.ensure_default_users(base_path=str(BASE_PATH))
         migrate_legacy_user_lists(base_path=str(BASE_PATH))
 
+    # PDF yazı tipleri işçi başlarken bir kez yüklenir.
+    pdf_layout.register_fonts()
     register_routes(app)
     return app
 
@@ -447,26 +574,7 @@ def register_routes(app: Flask) -> None:
         session.pop("user", None)
 
     def normalize_expense_entries(form_data: Dict[str, Any]) -> List[Dict[str, Any]]:
-        entries = form_data.get("harcama_bildirimleri", [])
-        normalized_entries: List[Dict[str, Any]] = []
-        if isinstance(entries, list):
-            for item in entries:
-                if not isinstance(item, dict):
-                    continue
-                description = (item.get("description") or "").strip()
-                attachments: List[Dict[str, str]] = []
-                raw_attachments = item.get("attachments", [])
-                if isinstance(raw_attachments, list):
-                    for attachment in raw_attachments:
-                        if isinstance(attachment, dict) and attachment.get("filename"):
-                            attachments.append(
-                                {
-                                    "filename": attachment["filename"],
-                                    "original_name": attachment.get("original_name")
-                                    or attachment["filename"],
-                                }
-                            )
-                normalized_entries.append({"description": description, "attachments": attachments})
+        normalized_entries = form_service.normalize_expenses(form_data.get("harcama_bildirimleri", []))
         form_data["harcama_bildirimleri"] = normalized_entries
         return normalized_entries
 
@@ -508,6 +616,17 @@ def register_routes(app: Flask) -> None:
             uploaded.append({"filename": unique_name, "original_name": file.filename})
         return uploaded
 
+    def has_uploaded_files(files, field_name: str) -> bool:
+        """``save_uploaded_files`` bu alandan en az bir dosya kaydedecek mi?"""
+
+        if not files:
+            return False
+        try:
+            file_items = files.getlist(field_name)
+        except AttributeError:
+            return False
+        return any(file and file.filename and secure_filename(file.filename) for file in file_items)
+
     def delete_attachment_file(form_no: str, filename: str) -> bool:
         if not filename:
             return False
@@ -569,6 +688,10 @@ def register_routes(app: Flask) -> None:
                 return parsed.strftime("%Y-%m-%d")
         return value
 
+    @app.template_filter("amount")
+    def format_amount_filter(value, currency: str = "TRY") -> str:
+        return form_service.format_amount(value, currency or "TRY")
+
     @app.context_processor
     def inject_user():  # pragma: no cover - template helper
         return {"current_user": get_current_user(), "DEV_MODE": DEV_MODE}
@@ -615,6 +738,21 @@ def register_routes(app: Flask) -> None:
             locked.remove(form_no)
             set_locked_forms(sorted(locked))
 
+    def can_edit_form(user: Dict[str, Any] | None, form_data: Dict[str, Any]) -> bool:
+        """Sihirbaz erişimi: ekip üyeleri yalnızca kendilerine atanan formu açabilir."""
+
+        if not user:
+            return False
+        return user.get("role") != "calisan" or form_data.get("assigned_to_user_id") == user.get("id")
+
+    def can_view_form(user: Dict[str, Any] | None, form_data: Dict[str, Any]) -> bool:
+        """Özet erişimi: ekip üyeleri atandıkları ya da personel listesinde oldukları formu görür."""
+
+        return can_edit_form(user, form_data) or user_is_form_personnel(user, form_data)
+
+    def is_step_read_only(user: Dict[str, Any] | None, step_id: str) -> bool:
+        return bool(user) and user.get("role") == "calisan" and step_id != "gorev_bilgileri"
+
     def user_is_form_personnel(user: Dict[str, Any] | None, form_data: Dict[str, Any]) -> bool:
         if not user or user.get("role") != "calisan":
             return False
@@ -861,6 +999,24 @@ def register_routes(app: Flask) -> None:
         selected_start = request.args.get("start_date", "").strip()
         selected_end = request.args.get("end_date", "").strip()
 
+        job_id = request.args.get("job", "").strip()
+        job = report_jobs.get_report_job(job_id, base_path=str(BASE_PATH)) if job_id else None
+        if job is not None:
+            requested = (
+                form_service.to_iso_date(selected_start) or "",
+                form_service.to_iso_date(selected_end) or "",
+            )
+            if requested != (job["start_date"], job["end_date"]):
+                # İşin sonucu yalnızca kendi aralığı için gösterilir.
+                return redirect(
+                    url_for(
+                        "reports",
+                        start_date=job["start_date"],
+                        end_date=job["end_date"],
+                        job=job_id,
+                    )
+                )
+
         today = datetime.utcnow().date()
         month_start = today.replace(day=1)
         if month_start.month == 12:
@@ -872,15 +1028,45 @@ def register_routes(app: Flask) -> None:
         year_start = today.replace(month=1, day=1)
         year_end = year_start.replace(year=year_start.year + 1) - timedelta(days=1)
 
-        if not selected_start and not selected_end:
+        if not selected_start and not selected_end and job is None:
             selected_start = month_start.isoformat()
             selected_end = month_end.isoformat()
 
-        summary = form_service.get_reporting_summary(
-            start_date=selected_start,
-            end_date=selected_end,
-            base_path=str(BASE_PATH),
-        )
+        summary = None
+        pending_job = None
+        if job_id:
+            if job is None:
+                flash("Rapor işi bulunamadı; rapor yeniden hazırlanıyor.", "warning")
+            elif job["status"] == "done":
+                summary = job["result"]
+            elif job["status"] == "failed":
+                flash(f"Rapor hazırlanamadı: {job['error']}", "error")
+            else:
+                pending_job = job
+
+        if summary is None and pending_job is None:
+            if report_jobs.is_long_range(selected_start, selected_end):
+                summary = form_service.get_cached_reporting_summary(
+                    start_date=selected_start,
+                    end_date=selected_end,
+                    base_path=str(BASE_PATH),
+                )
+                if summary is None:
+                    job = report_jobs.submit_report_job(
+                        start_date=selected_start,
+                        end_date=selected_end,
+                        base_path=str(BASE_PATH),
+                    )
+                    if job["status"] == "done":
+                        summary = job["result"]
+                    else:
+                        pending_job = job
+            else:
+                summary = form_service.get_reporting_summary(
+                    start_date=selected_start,
+                    end_date=selected_end,
+                    base_path=str(BASE_PATH),
+                )
 
         quick_filters = {
             "month": {
@@ -898,11 +1084,139 @@ def register_routes(app: Flask) -> None:
         return render_template(
             "reports.html",
             report=summary,
+            pending_job=pending_job,
             selected_start=selected_start,
             selected_end=selected_end,
             quick_filters=quick_filters,
         )
 
+    @app.get("/reports/forms")
+    def reports_forms():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        page = request.args.get("page", 1, type=int) or 1
+        per_page = request.args.get("per_page", 50, type=int) or 50
+        return jsonify(
+            form_service.get_report_forms_page(
+                start_date=request.args.get("start_date", ""),
+                end_date=request.args.get("end_date", ""),
+                page=page,
+                per_page=per_page,
+                base_path=str(BASE_PATH),
+            )
+        )
+
+    @app.get("/reports/utilization")
+    def reports_utilization():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        try:
+            payload = utilization.get_utilization(
+                start_date=request.args.get("start_date", ""),
+                end_date=request.args.get("end_date", ""),
+                bucket=request.args.get("bucket", "month"),
+                person=request.args.get("person", ""),
+                base_path=str(BASE_PATH),
+            )
+        except reporting.ReportingError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify(payload)
+
+    @app.get("/reports/export.xlsx")
+    def reports_export():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        start_date = request.args.get("start_date", "").strip()
+        end_date = request.args.get("end_date", "").strip()
+        chunks = report_export.stream_report_workbook(
+            start_date=start_date,
+            end_date=end_date,
+            base_path=str(BASE_PATH),
+        )
+        label = "_".join(part for part in (start_date, end_date) if part) or "tumu"
+        filename = secure_filename(f"rapor_{label}.xlsx")
+        return Response(
+            stream_with_context(chunks),
+            mimetype=report_export.XLSX_MIMETYPE,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    def report_job_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+        payload = {key: value for key, value in job.items() if key != "result"}
+        payload["poll_url"] = url_for("report_job_status", job_id=job["job_id"])
+        payload["result_url"] = url_for(
+            "reports",
+            start_date=job["start_date"],
+            end_date=job["end_date"],
+            job=job["job_id"],
+        )
+        if "result" in job:
+            payload["result"] = job["result"]
+        return payload
+
+    @app.post("/reports/jobs")
+    def report_job_create():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        job = report_jobs.submit_report_job(
+            start_date=request.form.get("start_date", ""),
+            end_date=request.form.get("end_date", ""),
+            base_path=str(BASE_PATH),
+        )
+        status_code = 200 if job["status"] == "done" else 202
+        return jsonify(report_job_payload(job)), status_code
+
+    @app.get("/reports/jobs/<job_id>")
+    def report_job_status(job_id: str):
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        job = report_jobs.get_report_job(job_id, base_path=str(BASE_PATH))
+        if job is None:
+            return jsonify({"error": "Rapor işi bulunamadı."}), 404
+        return jsonify(report_job_payload(job))
+
+    @app.get("/reports/timeseries")
+    def reports_timeseries():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        try:
+            payload = reporting.get_reporting_timeseries(
+                start_date=request.args.get("start_date", ""),
+                end_date=request.args.get("end_date", ""),
+                bucket=request.args.get("bucket", "month"),
+                base_path=str(BASE_PATH),
+            )
+        except reporting.ReportingError as exc:
+            return jsonify({"error": str(exc)}), 400
+
+        # Aynı veri sürümünde yanıt değişmediği için istemci ETag ile
+        # yeniden doğrulayıp 304 alabilir.
+        result = jsonify(payload)
+        result.add_etag()
+        result.cache_control.private = True
+        result.cache_control.no_cache = True
+        return result.make_conditional(request)
+
+    @app.get("/reports/cache-stats")
+    def reports_cache_stats():
+        response = ensure_admin_access()
+        if response is not None:
+            return response
+
+        return jsonify(report_cache.get_cache_stats(base_path=str(BASE_PATH)))
+
     @app.route("/task-requests")
     def task_requests_list():
         response = require_roles("admin", "atayan")
@@ -1048,7 +1362,7 @@ def register_routes(app: Flask) -> None:
 
         status = form_service.determine_form_status(form_data)
         form_data["durum"] = status.code
-        store_form_in_session(form_no, form_data)
+        store_form_in_session(form_no, form_data, dirty=False)
 
         if status.is_complete:
             lock_form(form_no)
@@ -1065,7 +1379,7 @@ def register_routes(app: Flask) -> None:
         unlock_form(form_no)
         last_step = clamp_step(form_data.get("last_step", 0))
         form_data["last_step"] = last_step
-        store_form_in_session(form_no, form_data)
+        store_form_in_session(form_no, form_data, dirty=False)
         return redirect(url_for("form_wizard", form_no=form_no, step=last_step))
 
     @app.post("/form/<form_no>/assign")
@@ -1113,6 +1427,7 @@ def register_routes(app: Flask) -> None:
         form_data["assigned_by_user_id"] = current.get("id") if current else None
         form_data["assigned_at"] = assigned_timestamp
         store_form_in_session(form_no, form_data)
+        session_form_cache().mark_saved(form_no)
 
         flash(f"Form {employee.full_name} kullanıcısına atandı.", "success")
         return redirect(url_for("form_wizard", form_no=form_no, step=4))
@@ -1207,9 +1522,8 @@ def register_routes(app: Flask) -> None:
             return redirect(url_for("index"))
 
         current = get_current_user()
-        role = current.get("role") if current else None
-        is_employee = role == "calisan"
-        if is_employee and form_data.get("assigned_to_user_id") != current.get("id"):
+        is_employee = bool(current) and current.get("role") == "calisan"
+        if not can_edit_form(current, form_data):
             flash("Bu göreve erişiminiz yok.", "error")
             return redirect(url_for("index"))
 
@@ -1218,7 +1532,7 @@ def register_routes(app: Flask) -> None:
             return redirect(url_for("form_summary", form_no=form_no))
 
         current_step = FORM_STEPS[step]
-        read_only_step = is_employee and current_step["id"] != "gorev_bilgileri"
+        read_only_step = is_step_read_only(current, current_step["id"])
 
         if request.method == "POST":
             if read_only_step:
@@ -1306,12 +1620,10 @@ def register_routes(app: Flask) -> None:
                 return redirect(url_for("form_wizard", form_no=form_no, step=previous_step))
             if action == "save":
                 try:
-                    _, status = form_service.save_form(form_no, form_data, base_path=str(BASE_PATH))
+                    status = save_form_record(form_no, form_data)
                 except FormServiceError as exc:
                     flash(str(exc), "error")
                 else:
-                    form_data["durum"] = status.code
-                    store_form_in_session(form_no, form_data)
                     flash(f"Form {status.code} olarak veritabanına kaydedildi.", "success")
                 return redirect(url_for("form_wizard", form_no=form_no, step=step))
 
@@ -1358,8 +1670,204 @@ def register_routes(app: Flask) -> None:
             assigned_user=assigned_user,
             assigned_by_user=assigned_by_user,
             responsible_name=responsible_name,
+            autosave_fields=AUTOSAVE_FIELDS[current_step["id"]],
+        )
+
+    def with_current_step_values(
+        form_data: Dict[str, Any], step_id: str, fields: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Gönderilmeyen adım alanlarını mevcut değerleriyle tamamla.
+
+        Böylece yalnızca değişen alanlar gönderildiğinde de adım gönderimindeki
+        doğrulama (``update_form_data_from_request``) olduğu gibi kullanılır.
+        """
+
+        data = {name: str(form_data.get(name) or "") for name in AUTOSAVE_FIELDS[step_id]}
+        data.update(fields)
+        return data
+
+    @app.route("/form/<form_no>/autosave", methods=["PATCH"])
+    def form_autosave(form_no: str):
+        """Sihirbaz adımındaki değişen alanları JSON ile taslağa yaz.
+
+        Gövde ``{"step": "<adım id>", "fields": {"alan": "değer", ...}}``
+        biçimindedir. Alanlar adım gönderimindeki doğrulamadan geçirilir,
+        oturumdaki form güncellenir ve kullanıcının taslağı tek sorguda yazılır;
+        veritabanındaki form kaydı değişmez.
+        """
+
+        current = get_current_user()
+        if current is None:
+            return jsonify({"error": "Oturum bulunamadı."}), 401
+
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({"error": "Geçersiz istek gövdesi."}), 400
+        step_id = payload.get("step")
+        fields = payload.get("fields")
+        allowed = AUTOSAVE_FIELDS.get(step_id) if isinstance(step_id, str) else None
+        if allowed is None:
+            return jsonify({"error": "Geçersiz adım."}), 400
+        if not isinstance(fields, dict) or not fields:
+            return jsonify({"error": "Kaydedilecek alan yok."}), 400
+        unknown = sorted(set(fields) - set(allowed))
+        if unknown:
+            return jsonify({"error": f"Bu adımda olmayan alan: {', '.join(unknown)}"}), 400
+        if any(
+            not isinstance(value, str) or len(value) > AUTOSAVE_MAX_VALUE_LENGTH
+            for value in fields.values()
+        ):
+            return jsonify({"error": "Alan değerleri metin olmalıdır."}), 400
+
+        form_data = ensure_form_data(form_no, report_errors=False)
+        if form_data is None:
+            return jsonify({"error": f"Form {form_no} bulunamadı."}), 404
+        if not can_edit_form(current, form_data):
+            return jsonify({"error": "Bu göreve erişiminiz yok."}), 403
+        if is_step_read_only(current, step_id):
+            return jsonify({"error": "Bu adımda değişiklik yapamazsınız."}), 403
+        if is_form_locked(form_no):
+            return jsonify({"error": "Tamamlanmış formlar düzenlenemez."}), 409
+
+        data = with_current_step_values(form_data, step_id, fields)
+        update_form_data_from_request(form_no, form_data, step_id, data, {}, action="autosave")
+        store_form_in_session(form_no, form_data)
+        session_form_cache().write_draft(form_no)
+        return jsonify({"fields": {name: form_data.get(name, "") for name in fields}})
+
+    # --- JSON API (v1) -------------------------------------------------
+    # Sihirbazı sayfa yüklemeden yürütmek isteyen istemciler (portal, mobil)
+    # için. Doğrulama ve rol kuralları HTML sihirbazıyla aynıdır; boş
+    # değerler yanıtlardan çıkarılır, istemci eksik alanı boş kabul eder.
+
+    API_STEP_FIELDS: Dict[str, Tuple[str, ...]] = dict(
+        AUTOSAVE_FIELDS,
+        gorev_bilgileri=AUTOSAVE_FIELDS["gorev_bilgileri"] + ("gorev_ekleri", "harcama_bildirimleri"),
+    )
+    API_STEP_ACTIONS = ("next", "previous", "save", "add_expense")
+    step_indexes = {step["id"]: index for index, step in enumerate(FORM_STEPS)}
+
+    def compact(values: Dict[str, Any]) -> Dict[str, Any]:
+        return {key: value for key, value in values.items() if value not in ("", None, [], {})}
+
+    def api_form_context(form_no: str):
+        """API için (kullanıcı, form verisi) ya da hata yanıtı döndür."""
+
+        current = get_current_user()
+        if current is None:
+            return None, None, (jsonify({"error": "Oturum bulunamadı."}), 401)
+        form_data = ensure_form_data(form_no, report_errors=False)
+        if form_data is None:
+            return None, None, (jsonify({"error": f"Form {form_no} bulunamadı."}), 404)
+        if not can_edit_form(current, form_data):
+            return None, None, (jsonify({"error": "Bu göreve erişiminiz yok."}), 403)
+        return current, form_data, None
+
+    def api_step_payload(form_no: str, form_data: Dict[str, Any], step_id: str, current) -> Dict[str, Any]:
+        return {
+            "form_no": form_no,
+            "step": step_id,
+            "editable": not is_form_locked(form_no) and not is_step_read_only(current, step_id),
+            "data": compact({name: form_data.get(name) for name in API_STEP_FIELDS[step_id]}),
+        }
+
+    @app.get("/api/v1/forms/<form_no>")
+    def api_form(form_no: str):
+        current, form_data, error = api_form_context(form_no)
+        if error is not None:
+            return error
+        locked = is_form_locked(form_no)
+        return jsonify(
+            {
+                "form_no": form_no,
+                "status": form_service.determine_form_status(form_data).code,
+                "locked": locked,
+                "last_step": FORM_STEPS[clamp_step(form_data.get("last_step", 0))]["id"],
+                "steps": [
+                    {
+                        "id": step["id"],
+                        "title": step["title"],
+                        "editable": not locked and not is_step_read_only(current, step["id"]),
+                    }
+                    for step in FORM_STEPS
+                ],
+                "data": compact(form_data),
+            }
         )
 
+    @app.get("/api/v1/forms/<form_no>/steps/<step_id>")
+    def api_form_step(form_no: str, step_id: str):
+        if step_id not in step_indexes:
+            return jsonify({"error": "Geçersiz adım."}), 404
+        current, form_data, error = api_form_context(form_no)
+        if error is not None:
+            return error
+        return jsonify(api_step_payload(form_no, form_data, step_id, current))
+
+    @app.post("/api/v1/forms/<form_no>/steps/<step_id>")
+    def api_form_step_submit(form_no: str, step_id: str):
+        """Adımı gönder: JSON ya da (dosya yüklemek için) multipart gövde.
+
+        ``action`` alanı ``next`` (varsayılan), ``previous``, ``save`` ya da
+        ``add_expense`` olabilir; ``save`` formu veritabanına da kaydeder.
+        Gönderilmeyen alanlar mevcut değerlerini korur.
+        Yanıt, adımın doğrulanmış değerlerini ve gidilecek adımı içerir.
+        """
+
+        if step_id not in step_indexes:
+            return jsonify({"error": "Geçersiz adım."}), 404
+        current, form_data, error = api_form_context(form_no)
+        if error is not None:
+            return error
+        if is_form_locked(form_no):
+            return jsonify({"error": "Tamamlanmış formlar düzenlenemez."}), 409
+        if is_step_read_only(current, step_id):
+            return jsonify({"error": "Bu adımda değişiklik yapamazsınız."}), 403
+
+        if request.mimetype == "application/json":
+            fields = request.get_json(silent=True)
+            if not isinstance(fields, dict) or any(
+                not isinstance(value, str) for value in fields.values()
+            ):
+                return jsonify({"error": "Geçersiz istek gövdesi."}), 400
+            files = {}
+        else:
+            fields, files = request.form.to_dict(), request.files
+        data = with_current_step_values(form_data, step_id, fields)
+        action = data.get("action") or "next"
+        if action not in API_STEP_ACTIONS:
+            return jsonify({"error": "Geçersiz işlem."}), 400
+        if action == "add_expense" and step_id == "gorev_bilgileri":
+            # Hatalı harcamada oturumdaki form ve yüklenen dosyalar değişmez.
+            expense_error = expense_input_error(data, files)
+            if expense_error:
+                return jsonify({"error": expense_error}), 400
+
+        update_form_data_from_request(form_no, form_data, step_id, data, files, action=action)
+        step = step_indexes[step_id]
+        if action == "previous":
+            target_step = max(0, step - 1)
+        elif action in ("save", "add_expense"):
+            target_step = step
+        else:
+            target_step = min(total_steps - 1, step + 1)
+        if is_step_read_only(current, FORM_STEPS[target_step]["id"]):
+            target_step = step_indexes["gorev_bilgileri"]
+        update_last_step(form_data, target_step)
+        store_form_in_session(form_no, form_data)
+
+        payload = api_step_payload(form_no, form_data, step_id, current)
+        finished = action == "next" and step == total_steps - 1
+        # Son adımdan sonra gidilecek adım yoktur; istemci özete geçer.
+        payload["next_step"] = None if finished else FORM_STEPS[target_step]["id"]
+        if action == "save":
+            try:
+                status = save_form_record(form_no, form_data)
+            except FormServiceError as exc:
+                return jsonify({"error": str(exc)}), 400
+            payload["status"] = status.code
+        return jsonify(payload)
+
     @app.route("/form/<form_no>/summary", methods=["GET", "POST"])
     def form_summary(form_no: str):
         response = require_login()
@@ -1398,12 +1906,10 @@ def register_routes(app: Flask) -> None:
                 try:
                     update_last_step(form_data, total_steps - 1)
                     store_form_in_session(form_no, form_data)
-                    _, status = form_service.save_form(form_no, form_data, base_path=str(BASE_PATH))
+                    status = save_form_record(form_no, form_data)
                 except FormServiceError as exc:
                     flash(str(exc), "error")
                 else:
-                    form_data["durum"] = status.code
-                    store_form_in_session(form_no, form_data)
                     flash(f"Form {status.code} olarak veritabanına kaydedildi.", "success")
                 return redirect(url_for("form_summary", form_no=form_no))
             if action == "previous":
@@ -1474,6 +1980,35 @@ def register_routes(app: Flask) -> None:
             download_name=original_name,
         )
 
+    @app.get("/form/<form_no>/attachments.zip")
+    def download_all_attachments(form_no: str):
+        response = require_login()
+        if response is not None:
+            return response
+
+        form_data = ensure_form_data(form_no)
+        if form_data is None:
+            flash(f"Form {form_no} yüklenemedi.", "error")
+            return redirect(url_for("index"))
+        if not can_view_form(get_current_user(), form_data):
+            flash("Bu göreve erişiminiz yok.", "error")
+            return redirect(url_for("index"))
+
+        entries = attachment_archive.archive_entries(form_data, UPLOAD_DIR / form_no)
+        if not entries:
+            flash("Bu formda indirilebilecek ek bulunmuyor.", "warning")
+            return redirect(url_for("form_summary", form_no=form_no))
+
+        filename = secure_filename(attachment_archive.archive_filename(form_no))
+        return Response(
+            stream_with_context(attachment_archive.stream_attachments(entries)),
+            mimetype="application/zip",
+            headers={
+                "Content-Disposition": f'attachment; filename="{filename}"',
+                "X-Accel-Buffering": "no",
+            },
+        )
+
     @app.route("/admin")
     def admin_panel():
         response = ensure_admin_access()
@@ -1615,37 +2150,233 @@ def register_routes(app: Flask) -> None:
     def admin_logout():
         return redirect(url_for("logout"))
 
-    @app.get("/form/<form_no>/export/excel")
-    def export_form_excel(form_no: str):
-        form_data = ensure_form_data(form_no)
-        if form_data is None:
-            flash(f"Form {form_no} bulunamadı.", "error")
-            return redirect(url_for("index"))
+    def export_job_payload(job: Dict[str, Any]) -> Dict[str, Any]:
+        payload = dict(job)
+        payload["status_url"] = url_for("export_job_status", job_id=job["job_id"])
+        if job["status"] == "done":
+            payload["download_url"] = url_for("export_job_download", job_id=job["job_id"])
+        return payload
+
+    def find_export_job(job_id: str) -> Dict[str, Any] | None:
+        job = export_jobs.get_export_job(job_id, base_path=str(BASE_PATH))
+        if job is None:
+            return None
+        user_data = get_current_user() or {}
+        if not has_role("admin") and job["requested_by"] != user_data.get("id"):
+            return None
+        return job
+
+    @app.post("/exports/jobs")
+    def export_job_create():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        payload = request.get_json(silent=True)
+        source = payload if isinstance(payload, dict) else request.form
+        formats = source.getlist("formats") if source is request.form else source.get("formats")
+        params = {
+            "person": source.get("personel", ""),
+            "location": source.get("gorev_yeri", ""),
+            "start_date": source.get("start_date", ""),
+            "end_date": source.get("end_date", ""),
+            "format": source.get("format", ""),
+            "formats": formats if isinstance(formats, list) else [],
+        }
+        kind = str(source.get("kind", ""))
+        if kind in export_jobs.ADMIN_EXPORT_JOB_KINDS and not has_role("admin"):
+            return jsonify({"error": "Bu dışa aktarımı yalnızca admin kullanıcılar başlatabilir."}), 403
+        try:
+            job = export_jobs.submit_export_job(
+                kind,
+                params,
+                requested_by=(get_current_user() or {}).get("id"),
+                base_path=str(BASE_PATH),
+            )
+        except export_jobs.ExportJobError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify(export_job_payload(job)), 202
+
+    @app.post("/admin/snapshots/parquet")
+    def parquet_snapshot_create():
+        response = require_roles("admin")
+        if response is not None:
+            return response
+
+        payload = request.get_json(silent=True)
+        source = payload if isinstance(payload, dict) else request.form
+        tables = source.getlist("tables") if source is request.form else source.get("tables")
+        params = {
+            "tables": tables if isinstance(tables, list) else [],
+            "incremental": source.get("incremental", ""),
+            "partition_year": source.get("partition_year", ""),
+        }
+        try:
+            job = export_jobs.submit_export_job(
+                "parquet",
+                params,
+                requested_by=(get_current_user() or {}).get("id"),
+                base_path=str(BASE_PATH),
+            )
+        except export_jobs.ExportJobError as exc:
+            return jsonify({"error": str(exc)}), 400
+        return jsonify(export_job_payload(job)), 202
+
+    @app.get("/exports/jobs/<job_id>")
+    def export_job_status(job_id: str):
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        job = find_export_job(job_id)
+        if job is None:
+            return jsonify({"error": "Dışa aktarım işi bulunamadı."}), 404
+        return jsonify(export_job_payload(job))
 
-        stream = form_service.export_form_to_excel(form_no, form_data)
-        filename = f"gorev_formu_{form_no}.xlsx"
+    @app.get("/exports/jobs/<job_id>/download")
+    def export_job_download(job_id: str):
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        job = find_export_job(job_id)
+        if job is None:
+            return jsonify({"error": "Dışa aktarım işi bulunamadı."}), 404
+        if job["status"] != "done":
+            return jsonify(export_job_payload(job)), 409
+        try:
+            path, filename, mimetype = export_jobs.get_export_artifact(
+                job_id, base_path=str(BASE_PATH)
+            )
+        except export_jobs.ExportJobError as exc:
+            return jsonify({"error": str(exc)}), 410
         return send_file(
-            stream,
+            path,
+            mimetype=mimetype,
             as_attachment=True,
-            download_name=filename,
-            mimetype="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            download_name=secure_filename(filename),
         )
 
-    @app.get("/form/<form_no>/export/pdf")
-    def export_form_pdf(form_no: str):
+    @app.get("/forms/register")
+    def forms_register():
+        response = require_roles("admin", "atayan")
+        if response is not None:
+            return response
+
+        file_format = request.args.get("format", "xlsx").strip().lower()
+        if file_format not in register_export.REGISTER_FORMATS:
+            return jsonify({"error": "Geçersiz dosya biçimi."}), 400
+
+        start_date = request.args.get("start_date", "").strip()
+        end_date = request.args.get("end_date", "").strip()
+        chunks = register_export.stream_register(
+            file_format,
+            person=request.args.get("personel", ""),
+            location=request.args.get("gorev_yeri", ""),
+            start_date=start_date,
+            end_date=end_date,
+            base_path=str(BASE_PATH),
+        )
+        label = "_".join(part for part in (start_date, end_date) if part) or "tumu"
+        filename = secure_filename(f"form_kayitlari_{label}.{file_format}")
+        mimetype = (
+            register_export.CSV_MIMETYPE if file_format == "csv" else register_export.XLSX_MIMETYPE
+        )
+        return Response(
+            stream_with_context(chunks),
+            mimetype=mimetype,
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    def feed_client() -> Dict[str, Any] | None:
+        """Veri akışı istemcisini oturumdan ya da ``Authorization: Bearer`` başlığından çöz."""
+
+        user_data = get_current_user()
+        if user_data:
+            return user_data
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        token = token.strip()
+        if scheme.lower() != "bearer" or not token:
+            return None
+        if any(hmac.compare_digest(token, known) for known in FEED_API_TOKENS):
+            return {"id": None, "full_name": "Veri akışı", "email": "", "role": "admin"}
+        try:
+            payload = pyjwt.decode(token, SECRET_KEY, algorithms=["HS256"])
+        except pyjwt.InvalidTokenError:
+            return None
+        return _auto_provision_user(payload)
+
+    @app.get("/api/feed/<feed_name>")
+    def api_feed(feed_name: str):
+        client = feed_client()
+        if client is None:
+            return (
+                jsonify({"error": "Kimlik doğrulaması gerekli."}),
+                401,
+                {"WWW-Authenticate": 'Bearer realm="feed"'},
+            )
+        if client.get("role") not in {"admin", "atayan"}:
+            return jsonify({"error": "Bu veri akışına erişim yetkiniz yok."}), 403
+
+        file_format = request.args.get("format", "ndjson").strip().lower()
+        try:
+            chunks = data_feed.stream_feed(
+                feed_name.replace("-", "_"),
+                file_format,
+                updated_since=request.args.get("updated_since", ""),
+                start_date=request.args.get("start_date", ""),
+                end_date=request.args.get("end_date", ""),
+                base_path=str(BASE_PATH),
+            )
+        except data_feed.FeedError as exc:
+            return jsonify({"error": str(exc)}), 400
+        filename = secure_filename(f"{feed_name}.{file_format}")
+        return Response(
+            stream_with_context(chunks),
+            mimetype=data_feed.FEED_MIMETYPES[file_format],
+            headers={
+                "Content-Disposition": f'inline; filename="{filename}"',
+                "Cache-Control": "no-store",
+                "X-Accel-Buffering": "no",
+            },
+        )
+
+    def send_form_export(form_no: str, file_format: str):
         form_data = ensure_form_data(form_no)
         if form_data is None:
             flash(f"Form {form_no} bulunamadı.", "error")
             return redirect(url_for("index"))
 
-        stream = form_service.export_form_to_pdf(form_no, form_data)
-        filename = f"gorev_formu_{form_no}.pdf"
-        return send_file(
-            stream,
+        export = export_cache.get_export(
+            form_no, form_data, file_format, base_path=str(BASE_PATH)
+        )
+        response = send_file(
+            io.BytesIO(export.data),
             as_attachment=True,
-            download_name=filename,
-            mimetype="application/pdf",
+            download_name=export.filename,
+            mimetype=export.mimetype,
+            etag=export.etag,
         )
+        # Form değişince içerik değişir; tarayıcı her seferinde ETag ile doğrular.
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        return response
+
+    @app.get("/form/<form_no>/export/excel")
+    def export_form_excel(form_no: str):
+        return send_form_export(form_no, "xlsx")
+
+    @app.get("/form/<form_no>/export/pdf")
+    def export_form_pdf(form_no: str):
+        return send_form_export(form_no, "pdf")
+
+    @app.get("/exports/cache-stats")
+    def export_cache_stats():
+        response = ensure_admin_access()
+        if response is not None:
+            return response
+
+        return jsonify(export_cache.get_cache_stats(base_path=str(BASE_PATH)))
 
     def clamp_step(step_value) -> int:
         try:
@@ -1657,29 +2388,72 @@ def register_routes(app: Flask) -> None:
     def update_last_step(form_data: Dict[str, Any], value: int) -> None:
         form_data["last_step"] = clamp_step(value)
 
-    def ensure_form_data(form_no: str):
-        forms = session.get("forms", {})
-        form_data = forms.get(form_no)
+    def session_form_cache() -> form_drafts.SessionFormCache:
+        current = get_current_user()
+        return form_drafts.SessionFormCache(
+            session,
+            user_id=current.get("id") if current else None,
+            base_path=str(BASE_PATH),
+        )
+
+    def ensure_form_data(form_no: str, *, report_errors: bool = True):
+        cache = session_form_cache()
+        form_data = cache.get(form_no)
         if form_data:
             normalize_attachments(form_data)
             update_last_step(form_data, form_data.get("last_step", 0))
             return form_data
+        if cache.discarded_stale_draft and report_errors:
+            flash(
+                f"Form {form_no} siz ayrıldıktan sonra güncellendi; kaydedilmemiş taslağınız "
+                "kullanılmadı ve güncel kayıt açıldı.",
+                "warning",
+            )
         try:
+            version = form_drafts.form_version(form_no, base_path=str(BASE_PATH))
             loaded = form_service.load_form_data(form_no, base_path=str(BASE_PATH))
         except FormServiceError as exc:
-            flash(str(exc), "error")
+            if report_errors:
+                flash(str(exc), "error")
             return None
         else:
             normalize_attachments(loaded)
-            store_form_in_session(form_no, loaded)
+            store_form_in_session(form_no, loaded, dirty=False, version=version)
             return loaded
 
-    def store_form_in_session(form_no: str, form_data: Dict[str, Any]) -> None:
+    def save_form_record(form_no: str, form_data: Dict[str, Any]):
+        """Formu kaydet; tamamlanan formun Excel/PDF çıktılarını arka planda hazırlat."""
+
+        _, status = form_service.save_form(form_no, form_data, base_path=str(BASE_PATH))
+        form_data["durum"] = status.code
+        if status.is_complete:
+            # Oturumdaki kopya kayıtlı halle değiştirilir ki indirme, önceden
+            # üretilen dosyaları aynı önbellek anahtarıyla bulsun.
+            saved = export_cache.load_export_data(form_no, base_path=str(BASE_PATH))
+            saved["last_step"] = form_data.get("last_step", 0)
+            form_data.clear()
+            form_data.update(saved)
+            export_cache.schedule_prerender(form_no, base_path=str(BASE_PATH))
+        store_form_in_session(form_no, form_data)
+        session_form_cache().mark_saved(form_no)
+        return status
+
+    def store_form_in_session(
+        form_no: str,
+        form_data: Dict[str, Any],
+        *,
+        dirty: bool = True,
+        version: Optional[str] = None,
+    ) -> None:
+        """Formu oturum önbelleğine yaz; sığmayan eski formlar taslağa aktarılır."""
+
         normalize_attachments(form_data)
         update_last_step(form_data, form_data.get("last_step", 0))
-        forms = session.get("forms", {})
-        forms[form_no] = form_data
-        session["forms"] = forms
+        evicted = session_form_cache().put(form_no, form_data, dirty=dirty, version=version)
+        if evicted:
+            locked = set(get_locked_forms())
+            if locked & set(evicted):
+                set_locked_forms(sorted(locked - set(evicted)))
 
     def normalize_date(value: str) -> str:
         value = (value or "").strip()
@@ -1792,20 +2566,37 @@ def register_routes(app: Flask) -> None:
             if not isinstance(expenses, list):
                 expenses = []
             if action == "add_expense":
-                description = data.get("harcama_aciklamasi", "").strip()
-                receipt_uploads = save_uploaded_files(form_no, files, "harcama_dosyalari")
-                if description or receipt_uploads:
+                expense_error = expense_input_error(data, files)
+                if expense_error:
+                    result["expense_error"] = expense_error
+                else:
                     expenses.append(
                         {
-                            "description": description,
-                            "attachments": receipt_uploads,
+                            "description": data.get("harcama_aciklamasi", "").strip(),
+                            "amount": form_service.parse_amount(data.get("harcama_tutari", "").strip()),
+                            "currency": data.get("harcama_para_birimi", "").strip(),
+                            "category": data.get("harcama_kategorisi", "").strip(),
+                            "attachments": save_uploaded_files(form_no, files, "harcama_dosyalari"),
                         }
                     )
                     result["expense_added"] = True
-                else:
-                    result["expense_error"] = "Harcama eklemek için açıklama veya görsel yükleyin."
             form_data["harcama_bildirimleri"] = expenses
         return result
+
+    def expense_input_error(data: Dict[str, str], files) -> Optional[str]:
+        """Eklenecek harcama geçersizse kullanıcıya gösterilecek mesajı döndür."""
+
+        raw_amount = data.get("harcama_tutari", "").strip()
+        amount = form_service.parse_amount(raw_amount)
+        if raw_amount and amount is None:
+            return "Harcama tutarı sayı olmalıdır (ör. 1250,50)."
+        if (
+            not data.get("harcama_aciklamasi", "").strip()
+            and amount is None
+            and not has_uploaded_files(files, "harcama_dosyalari")
+        ):
+            return "Harcama eklemek için açıklama, tutar veya görsel girin."
+        return None
     app.jinja_env.globals.update(
         FIELD_LABELS=FIELD_LABELS,
         datetime=datetime,